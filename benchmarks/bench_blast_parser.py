@@ -0,0 +1,117 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the ingestion of BLAST output into the orthoMCL
+database.
+
+Synthetic proteomes with `n_taxa` taxa and `n_genes` genes each are written
+to a `compliantFasta` directory, along with an all-vs-all output in BLAST6
+format (`-outfmt 6`) with `n_hits` subjects per query and up to three HSPs
+per subject. The output is then parsed into a new orthoMCL database with
+:func:`orthomcl_blast_parser`, including the creation of the
+`SimilarSequences` indexes, with 1 and `jobs` worker processes. The
+throughput is reported in lines/sec and rows/sec.
+
+Usage::
+
+    python benchmarks/bench_blast_parser.py [n_taxa] [n_genes] [n_hits]
+        [jobs]
+"""
+
+import os
+import sys
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from multiprocessing import cpu_count
+from os.path import join, dirname, abspath, getsize
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.ortho import orthomclBlastParser, orthomclInstallSchema
+
+
+def write_proteomes(dest, n_taxa, n_genes):
+    """Writes one proteome per taxon and returns the list of (gene,
+    length) tuples"""
+
+    genes = []
+
+    for i in xrange(n_taxa):
+        with open(join(dest, "tx{}.fasta".format(i)), "w") as fh:
+            for j in xrange(n_genes):
+                gene = "tx{}|gene_{}".format(i, j)
+                length = random.randint(100, 600)
+                fh.write(">{}\n{}\n".format(gene, "M" * length))
+                genes.append((gene, length))
+
+    return genes
+
+
+def write_blast(path, genes, n_hits):
+    """Writes a synthetic all-vs-all output and returns the number of
+    lines"""
+
+    lines = 0
+
+    with open(path, "w") as fh:
+        for query, qlen in genes:
+            for subject, slen in [(query, qlen)] + random.sample(genes,
+                                                                 n_hits - 1):
+                evalue = "{:.1e}".format(10 ** -random.randint(5, 180))
+                for _ in xrange(random.randint(1, 3)):
+                    length = random.randint(30, min(qlen, slen))
+                    qstart = random.randint(1, qlen - length + 1)
+                    sstart = random.randint(1, slen - length + 1)
+                    fh.write("\t".join(str(x) for x in [
+                        query, subject,
+                        "{:.1f}".format(random.uniform(25, 100)), length, 0,
+                        0, qstart, qstart + length - 1, sstart,
+                        sstart + length - 1, evalue, 100]) + "\n")
+                    lines += 1
+
+    return lines
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:5]]
+    n_taxa, n_genes, n_hits, jobs = \
+        args + [20, 2000, 50, cpu_count()][len(args):]
+
+    dest = tempfile.mkdtemp()
+    fasta_dir = join(dest, "compliantFasta")
+    blast_file = join(dest, "AllVsAll.out")
+    os.makedirs(fasta_dir)
+
+    try:
+        genes = write_proteomes(fasta_dir, n_taxa, n_genes)
+        lines = write_blast(blast_file, genes, n_hits)
+        mb = getsize(blast_file) / 1024. ** 2
+
+        for n in sorted(set([1, jobs])):
+
+            orthomclInstallSchema.execute(dest)
+
+            start = time.time()
+            orthomclBlastParser.orthomcl_blast_parser(blast_file, fasta_dir,
+                                                      dest, None, jobs=n)
+            elapsed = time.time() - start
+
+            con = sqlite3.connect(join(dest, "orthoDB.db"))
+            rows = con.execute(
+                "SELECT COUNT(*) FROM SimilarSequences").fetchone()[0]
+            con.close()
+
+            print("{} jobs: {} lines ({:.0f} MB) -> {} rows in "
+                  "{:.2f}s".format(n, lines, mb, rows, elapsed))
+            print("{:>12.0f} lines/sec".format(lines / elapsed))
+            print("{:>12.0f} rows/sec".format(rows / elapsed))
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
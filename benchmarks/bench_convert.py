@@ -0,0 +1,83 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the conversion of many small alignments.
+
+A set of `n_loci` synthetic fasta alignments is generated and loaded into
+an `AlignmentList`. Each alignment is then converted into the fasta, phylip
+and nexus formats (one output file per alignment and format), first with a
+single process and then with `jobs` worker processes. The number of written
+files per second is reported for each run.
+
+Usage::
+
+    python benchmarks/bench_convert.py [n_loci] [n_taxa] [locus_length] [jobs]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from multiprocessing import cpu_count
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process.sequence import AlignmentList
+
+formats = ["fasta", "phylip", "nexus"]
+
+
+def write_alignments(dest, n_loci, n_taxa, locus_length):
+    """Generates `n_loci` random fasta alignments in `dest`"""
+
+    paths = []
+
+    for i in xrange(n_loci):
+        path = join(dest, "locus_{}.fas".format(i))
+        with open(path, "w") as fh:
+            for j in xrange(n_taxa):
+                seq = "".join(random.choice("ACGT-")
+                              for _ in xrange(locus_length))
+                fh.write(">taxon_{}\n{}\n".format(j, seq))
+        paths.append(path)
+
+    return paths
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:5]]
+    n_loci, n_taxa, locus_length, jobs = \
+        args + [10000, 10, 200, max(cpu_count(), 2)][len(args):]
+
+    dest = tempfile.mkdtemp()
+
+    try:
+        input_dir = join(dest, "input")
+        os.makedirs(input_dir)
+        paths = write_alignments(input_dir, n_loci, n_taxa, locus_length)
+        aln_obj = AlignmentList(paths, sql_db=join(dest, "bench.db"))
+
+        n_files = n_loci * len(formats)
+
+        for n_jobs in [1, jobs]:
+            output_dir = join(dest, "output_{}".format(n_jobs))
+
+            start = time.time()
+            aln_obj.write_to_file(formats, output_dir=output_dir,
+                                  conversion_suffix="_conv", jobs=n_jobs)
+            elapsed = time.time() - start
+
+            print("{} job(s) {:>8.0f} files/sec ({} files in {:.2f}s)".format(
+                n_jobs, n_files / elapsed, n_files, elapsed))
+
+        aln_obj.con.close()
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the ortholog filters of :class:`GroupLight`.
+
+A synthetic groups file with `n_clusters` clusters is written, where each
+cluster has a random subset of `n_taxa` taxa with one to five gene copies
+each. The file is parsed once, and then the time of parsing, of each
+filter update (as done when the gene copy and minimum taxa sliders of the
+GUI are changed), of a taxon exclusion, and of the four distribution plots
+is reported.
+
+Usage::
+
+    python benchmarks/bench_group_filters.py [n_clusters] [n_taxa]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.ortho.OrthomclToolbox import GroupLight
+
+
+def write_groups(path, n_clusters, n_taxa):
+    """Writes the groups file"""
+
+    taxa = ["tx{}".format(i) for i in xrange(n_taxa)]
+
+    with open(path, "w") as fh:
+        for i in xrange(n_clusters):
+            fh.write("Ortholog{}: {}\n".format(i, " ".join(
+                "{}|gene_{}_{}".format(tx, i, j)
+                for tx in random.sample(taxa, random.randint(1, n_taxa))
+                for j in xrange(random.choice([1, 1, 1, 2, 3, 5])))))
+
+
+def timed(label, func, *args, **kwargs):
+
+    start = time.time()
+    func(*args, **kwargs)
+    print("{:<28} {:.1f} ms".format(label, (time.time() - start) * 1000))
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:3]]
+    n_clusters, n_taxa = args + [100000, 20][len(args):]
+
+    dest = tempfile.mkdtemp()
+    groups_file = join(dest, "groups.txt")
+
+    try:
+        write_groups(groups_file, n_clusters, n_taxa)
+
+        start = time.time()
+        group = GroupLight(groups_file, 1, n_taxa)
+        print("{:<28} {:.2f} s".format("parse", time.time() - start))
+
+        for gn, sp in [(2, n_taxa // 2), (3, 2), (1, 1), (5, n_taxa)]:
+            timed("update_filters({}, {})".format(gn, sp),
+                  group.update_filters, gn, sp, update_stats=True)
+
+        timed("exclude_taxa", group.exclude_taxa, ["tx0", "tx1"], True)
+
+        for call in ["bar_species_distribution", "bar_genecopy_distribution",
+                     "bar_species_coverage", "bar_genecopy_per_species"]:
+            timed(call, getattr(group, call), True)
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the sql and pandas engines of orthomclPairs.
+
+A synthetic SimilarSequences table is generated for `n_taxa` taxa with
+`n_families` gene families. Each family has one to three copies of the
+gene in each taxon (or in a single taxon, for 5% of the families), and
+each pair of genes of the same family is similar with a probability of 0.9
+(with random e-values and percent matches). Half of the pairs of copies in
+the same taxon have lower e-values, so that orthologs, in-paralogs and
+co-orthologs are found. The same database is then processed by both
+engines, reporting the elapsed time of each and whether the dumped pairs
+files are identical. With `integer_ids` set to 1, the database uses the
+integer id schema.
+
+Usage::
+
+    python benchmarks/bench_pairs.py [n_taxa] [n_families] [integer_ids]
+"""
+
+import os
+import sys
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.ortho import orthomclInstallSchema, orthomclPairs, \
+    orthomclDumpPairsFiles
+
+pairs_files = ["orthologs.txt", "inparalogs.txt", "coorthologs.txt",
+               "mclInput"]
+
+
+def random_evalue(paralog=False):
+
+    if random.random() < 0.05:
+        return 0., 0
+
+    if paralog and random.random() < 0.5:
+        return round(random.uniform(1, 9.99), 2), -random.randint(150, 180)
+
+    return round(random.uniform(1, 9.99), 2), -random.randint(1, 180)
+
+
+def write_similar_sequences(db_dir, n_taxa, n_families, integer_ids=False):
+    """Creates the orthoMCL database with the synthetic SimilarSequences
+    table and returns the number of rows"""
+
+    orthomclInstallSchema.execute(db_dir, integer_ids=integer_ids)
+
+    families = []
+    for i in xrange(n_families):
+        if random.random() < 0.05:
+            taxa = [random.randrange(n_taxa)]
+        else:
+            taxa = xrange(n_taxa)
+        families.append([("tx{}|fam{}_{}".format(t, i, c), "tx{}".format(t))
+                         for t in taxa
+                         for c in xrange(random.randint(1, 3))])
+
+    con = sqlite3.connect(join(db_dir, "orthoDB.db"))
+
+    if integer_ids:
+        seq_ids = dict((x, i) for i, x in enumerate(
+            sorted(x[0] for fam in families for x in fam)))
+        taxon_ids = dict((x, i) for i, x in enumerate(
+            sorted("tx{}".format(t) for t in xrange(n_taxa))))
+        con.executemany("INSERT INTO SequenceIds VALUES(?, ?)",
+                        ((i, x) for x, i in seq_ids.iteritems()))
+        con.executemany("INSERT INTO TaxonIds VALUES(?, ?)",
+                        ((i, x) for x, i in taxon_ids.iteritems()))
+
+    rows = 0
+    for fam in families:
+        batch = []
+        for query, query_taxon in fam:
+            for subject, subject_taxon in fam:
+                if random.random() > 0.9:
+                    continue
+                mant, exp = random_evalue(query != subject and
+                                          query_taxon == subject_taxon)
+                row = [query, subject, query_taxon, subject_taxon, mant, exp,
+                       round(random.uniform(20, 100), 1),
+                       round(random.uniform(30, 100), 1)]
+                if integer_ids:
+                    row[:4] = [seq_ids[query], seq_ids[subject],
+                               taxon_ids[query_taxon],
+                               taxon_ids[subject_taxon]]
+                batch.append(row)
+
+        con.executemany("INSERT INTO SimilarSequences VALUES "
+                        "(?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        rows += len(batch)
+
+    orthomclInstallSchema.createSimilarSequencesIndexes(con.cursor())
+    con.commit()
+    con.close()
+
+    return rows
+
+
+def run(db_dir, engine):
+    """Runs one engine and the dump of the pairs files, and returns the
+    elapsed time of the engine"""
+
+    start = time.time()
+    orthomclPairs.execute(db_dir, engine=engine)
+    elapsed = time.time() - start
+
+    os.makedirs(join(db_dir, "backstage_files"))
+    orthomclDumpPairsFiles.execute(db_dir, db_dir)
+
+    return elapsed
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:4]]
+    n_taxa, n_families, integer_ids = args + [20, 2000, 0][len(args):]
+
+    dest = tempfile.mkdtemp()
+    sql_dir = join(dest, "sql")
+    pandas_dir = join(dest, "pandas")
+    os.makedirs(sql_dir)
+
+    try:
+        rows = write_similar_sequences(sql_dir, n_taxa, n_families,
+                                       bool(integer_ids))
+        shutil.copytree(sql_dir, pandas_dir)
+
+        for engine, db_dir in [("sql", sql_dir), ("pandas", pandas_dir)]:
+            elapsed = run(db_dir, engine)
+            print("{:<8} {} rows in {:.2f}s ({:.0f} rows/sec)".format(
+                engine, rows, elapsed, rows / elapsed))
+
+        identical = all(
+            open(join(sql_dir, "backstage_files", x)).read() ==
+            open(join(pandas_dir, "backstage_files", x)).read()
+            for x in pairs_files)
+        print("Identical pairs files: {}".format(identical))
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
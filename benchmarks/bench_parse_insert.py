@@ -0,0 +1,87 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the insertion of parsed alignment data into the sqlite
+database.
+
+A set of synthetic fasta alignments is generated and loaded into an
+`AlignmentList` twice: once flushing each parsed row individually (the
+behaviour prior to buffered insertions) and once with the default insert
+buffer. The number of inserted rows per second is reported for each mode.
+
+Usage::
+
+    python benchmarks/bench_parse_insert.py [n_loci] [n_taxa] [locus_length]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process import sequence
+from trifusion.process.sequence import AlignmentList
+
+
+def write_alignments(dest, n_loci, n_taxa, locus_length):
+    """Generates `n_loci` random fasta alignments in `dest`"""
+
+    paths = []
+
+    for i in xrange(n_loci):
+        path = join(dest, "locus_{}.fas".format(i))
+        with open(path, "w") as fh:
+            for j in xrange(n_taxa):
+                seq = "".join(random.choice("ACGT-")
+                              for _ in xrange(locus_length))
+                fh.write(">taxon_{}\n{}\n".format(j, seq))
+        paths.append(path)
+
+    return paths
+
+
+def run(paths, buffer_size, dest):
+    """Loads `paths` into a new database and returns the elapsed time"""
+
+    sequence.insert_buffer_size = buffer_size
+    sql_db = join(dest, "bench_{}.db".format(buffer_size))
+
+    start = time.time()
+    aln_obj = AlignmentList(paths, sql_db=sql_db)
+    aln_obj.con.commit()
+    elapsed = time.time() - start
+
+    aln_obj.con.close()
+    os.remove(sql_db)
+
+    return elapsed
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:4]]
+    n_loci, n_taxa, locus_length = args + [500, 100, 200][len(args):]
+    rows = n_loci * n_taxa
+
+    default_size = sequence.insert_buffer_size
+    dest = tempfile.mkdtemp()
+
+    try:
+        paths = write_alignments(dest, n_loci, n_taxa, locus_length)
+
+        for label, size in [("per-row", 0), ("buffered", default_size)]:
+            elapsed = run(paths, size, dest)
+            print("{:<10} {:>10.0f} rows/sec ({} rows in {:.2f}s)".format(
+                label, rows / elapsed, rows, elapsed))
+    finally:
+        sequence.insert_buffer_size = default_size
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
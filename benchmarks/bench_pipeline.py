@@ -0,0 +1,114 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the fusion of alignment operations with
+:class:`~trifusion.process.pipeline.OperationPipeline`.
+
+A set of synthetic fasta alignments is generated and a chain of five
+operations (codon filter, missing data filter, collapse, gap coding and
+consensus) is executed twice on the same data: once calling each operation
+in turn, and once through the pipeline, where the first four operations are
+fused in a single pass. The number of passes over the alignment data (the
+number of times a complete table is read and written) and the elapsed time
+are reported for each mode.
+
+Usage::
+
+    python benchmarks/bench_pipeline.py [n_loci] [n_taxa] [locus_length]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process.sequence import AlignmentList
+from trifusion.process.pipeline import OperationPipeline
+
+
+def write_alignments(dest, n_loci, n_taxa, locus_length):
+    """Generates `n_loci` random fasta alignments in `dest`"""
+
+    paths = []
+
+    for i in xrange(n_loci):
+        path = join(dest, "locus_{}.fas".format(i))
+        with open(path, "w") as fh:
+            for j in xrange(n_taxa):
+                seq = [random.choice("ACGT") for _ in xrange(locus_length)]
+                # Add a few indel events
+                for _ in xrange(3):
+                    start = random.randint(0, locus_length - 10)
+                    size = random.randint(1, 10)
+                    seq[start:start + size] = "-" * size
+                fh.write(">taxon_{}\n{}\n".format(j, "".join(seq)))
+        paths.append(path)
+
+    return paths
+
+
+def add_operations(pipeline, dest):
+    """Adds the benchmarked chain of operations to `pipeline`"""
+
+    pipeline.add("filter_codon_positions", [[True, True, False]])
+    pipeline.add("filter_missing_data", [50, 50])
+    pipeline.add("collapse", kwargs={"dest": dest})
+    pipeline.add("code_gaps")
+    pipeline.add("consensus", ["First sequence"])
+
+
+def run(paths, dest, fused):
+    """Executes the chain of operations and returns the elapsed time and
+    the number of passes"""
+
+    sql_db = join(dest, "bench.db")
+    aln_obj = AlignmentList(paths, sql_db=sql_db)
+    aln_obj.con.commit()
+
+    pipeline = OperationPipeline(aln_obj, use_main_table=True)
+    add_operations(pipeline, dest)
+
+    start = time.time()
+    if fused:
+        passes = len(pipeline.plan())
+        pipeline.run()
+    else:
+        # Each operation is a pipeline of its own
+        passes = 0
+        for step in pipeline.steps:
+            single = OperationPipeline(aln_obj, use_main_table=True)
+            single.steps.append(step)
+            single.run()
+            passes += 1
+    elapsed = time.time() - start
+
+    aln_obj.con.close()
+    os.remove(sql_db)
+
+    return elapsed, passes
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:4]]
+    n_loci, n_taxa, locus_length = args + [200, 50, 600][len(args):]
+
+    dest = tempfile.mkdtemp()
+
+    try:
+        paths = write_alignments(dest, n_loci, n_taxa, locus_length)
+
+        for label, fused in [("chained", False), ("fused", True)]:
+            elapsed, passes = run(paths, dest, fused)
+            print("{:<8} {} passes in {:.2f}s".format(label, passes, elapsed))
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
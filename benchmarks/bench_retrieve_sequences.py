@@ -0,0 +1,86 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the export of ortholog clusters to protein sequence
+files with :meth:`GroupLight.retrieve_sequences`.
+
+A synthetic protein database with `n_taxa` taxa and `n_groups` genes per
+taxon is written in the goodProteins format, along with a groups file with
+`n_groups` clusters (one gene of each taxon per cluster). The clusters are
+then exported twice: the first export builds the `.fai` index of the
+database and the second one reuses it. The throughput is reported in
+clusters/sec.
+
+Usage::
+
+    python benchmarks/bench_retrieve_sequences.py [n_taxa] [n_groups]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.ortho.OrthomclToolbox import GroupLight
+
+
+def write_database(path, n_taxa, n_groups):
+    """Writes the protein database"""
+
+    # Sequences are random slices of a single random sequence
+    pool = "".join(random.choice("ACDEFGHIKLMNPQRSTVWY")
+                   for _ in xrange(100000))
+
+    with open(path, "w") as fh:
+        for i in xrange(n_taxa):
+            for j in xrange(n_groups):
+                start = random.randint(0, len(pool) - 600)
+                fh.write(">tx{}|gene_{}\n{}\n".format(
+                    i, j, pool[start:start + random.randint(100, 600)]))
+
+
+def write_groups(path, n_taxa, n_groups):
+    """Writes the groups file"""
+
+    with open(path, "w") as fh:
+        for j in xrange(n_groups):
+            fh.write("Ortholog{}: {}\n".format(j, " ".join(
+                "tx{}|gene_{}".format(i, j) for i in xrange(n_taxa))))
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:3]]
+    n_taxa, n_groups = args + [20, 20000][len(args):]
+
+    dest = tempfile.mkdtemp()
+    protein_db = join(dest, "goodProteins")
+    groups_file = join(dest, "groups.txt")
+
+    try:
+        write_database(protein_db, n_taxa, n_groups)
+        write_groups(groups_file, n_taxa, n_groups)
+        group = GroupLight(groups_file)
+
+        for run in ["build index", "reuse index"]:
+            out_dir = join(dest, "Orthologs")
+
+            start = time.time()
+            group.retrieve_sequences(None, protein_db, dest=out_dir)
+            elapsed = time.time() - start
+
+            print("{:<12} {} clusters in {:.2f}s ({:.0f} clusters/sec)".format(
+                run, n_groups, elapsed, n_groups / elapsed))
+
+            shutil.rmtree(out_dir)
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the TriStats plot methods that derive their data from the
+feature cube of :class:`~trifusion.process.sequence.AlignmentList`.
+
+A set of synthetic fasta alignments with gaps, missing data and absent taxa
+is generated, and every plot method that uses the feature cube is called
+twice: first with an empty cache, where the first method builds the cube,
+and then on a view of the `AlignmentList` object (see
+:meth:`~trifusion.process.sequence.AlignmentList.view`), as done by
+TriFusion for each plot request. The elapsed time of each method
+and the number of scans of the alignment data are reported.
+
+Usage::
+
+    python benchmarks/bench_stats.py [n_loci] [n_taxa] [locus_length]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process.sequence import AlignmentList
+
+methods = ["missing_data_distribution", "missing_data_per_species",
+           "average_seqsize_per_species", "characters_proportion",
+           "characters_proportion_per_species", "sequence_segregation",
+           "length_polymorphism_correlation", "allele_frequency_spectrum",
+           "outlier_missing_data", "outlier_missing_data_sp",
+           "outlier_segregating", "outlier_sequence_size",
+           "outlier_sequence_size_sp"]
+
+
+def write_alignments(dest, n_loci, n_taxa, locus_length):
+    """Generates `n_loci` random fasta alignments in `dest`"""
+
+    paths = []
+    taxa = ["taxon_{}".format(x) for x in xrange(n_taxa)]
+
+    for i in xrange(n_loci):
+        path = join(dest, "locus_{}.fas".format(i))
+        ref = [random.choice("ACGT") for _ in xrange(locus_length)]
+        with open(path, "w") as fh:
+            for tx in random.sample(taxa, random.randint(n_taxa // 2,
+                                                         n_taxa)):
+                seq = [random.choice("ACGT") if random.random() < .05 else x
+                       for x in ref]
+                # Add a gap and a missing data block
+                for symbol in "-N":
+                    start = random.randint(0, locus_length - 10)
+                    seq[start:start + random.randint(1, 10)] = symbol * 10
+                fh.write(">{}\n{}\n".format(tx, "".join(seq)[:locus_length]))
+        paths.append(path)
+
+    return paths
+
+
+def count_scans(aln_obj, counter):
+    """Counts the calls to the generators that scan the alignment data"""
+
+    def counted(func):
+        def wrapper(*args, **kwargs):
+            counter[0] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for name in ["iter_alignments", "iter_columns"]:
+        setattr(aln_obj, name, counted(getattr(aln_obj, name)))
+
+
+def run_methods(aln_obj, label):
+
+    counter = [0]
+    count_scans(aln_obj, counter)
+
+    total = time.time()
+
+    for m in methods:
+        start = time.time()
+        getattr(aln_obj, m)()
+        print("{:<36} {:.1f} ms".format(m, (time.time() - start) * 1000))
+
+    print("{}: {} plots in {:.2f}s with {} scans of the data\n".format(
+        label, len(methods), time.time() - total, counter[0]))
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:4]]
+    n_loci, n_taxa, locus_length = args + [2000, 30, 500][len(args):]
+
+    dest = tempfile.mkdtemp()
+
+    try:
+        paths = write_alignments(dest, n_loci, n_taxa, locus_length)
+        aln_obj = AlignmentList(paths, sql_db=join(dest, "bench.db"))
+
+        # TriFusion requests each plot on a view of the AlignmentList
+        aln_copy = aln_obj.view()
+
+        run_methods(aln_obj, "empty cache")
+        run_methods(aln_copy, "stored features")
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the fasta and phylip parsers.
+
+Synthetic fasta, sequential phylip and interleave phylip alignments with
+approximately `size_mb` megabytes each are generated and parsed into a new
+sqlite database with the line based parsers and with the memory mapped
+tokenizers (`sequence.fast_parsing`). The throughput of each parser is
+reported in MB/sec, along with the throughput of the tokenizers alone
+(without inserting the data in the database).
+
+Usage::
+
+    python benchmarks/bench_tokenizer.py [size_mb] [n_taxa]
+"""
+
+import os
+import sys
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from os.path import join, dirname, abspath, getsize
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process import sequence
+from trifusion.process.sequence import Alignment
+from trifusion.process.tokenizer import map_file, fasta_records, \
+    phylip_records
+
+
+def random_block(length):
+    """Returns a random sequence block that is repeated along sequences"""
+
+    return "".join(random.choice("ACGTN-") for _ in xrange(length))
+
+
+def write_fasta(path, n_taxa, locus_length):
+
+    block = random_block(60)
+
+    with open(path, "w") as fh:
+        for i in xrange(n_taxa):
+            fh.write(">taxon_{}\n".format(i))
+            for _ in xrange(locus_length / 60):
+                fh.write(block + "\n")
+
+
+def write_phylip(path, n_taxa, locus_length):
+
+    block = random_block(1000)
+
+    with open(path, "w") as fh:
+        fh.write("{} {}\n".format(n_taxa, locus_length))
+        for i in xrange(n_taxa):
+            fh.write("taxon_{} ".format(i).ljust(20))
+            for _ in xrange(locus_length / 1000):
+                fh.write(block)
+            fh.write("\n")
+
+
+def write_interleave_phylip(path, n_taxa, locus_length):
+
+    block = random_block(90)
+
+    with open(path, "w") as fh:
+        fh.write("{} {}\n".format(n_taxa, locus_length))
+        for j in xrange(locus_length / 90):
+            for i in xrange(n_taxa):
+                if not j:
+                    fh.write("taxon_{} ".format(i).ljust(20))
+                fh.write(block + "\n")
+            fh.write("\n")
+
+
+def parse(path, fast, dest):
+    """Parses `path` into a new database and returns the elapsed time"""
+
+    sequence.fast_parsing = fast
+
+    sql_db = join(dest, "bench.db")
+    con = sqlite3.connect(sql_db)
+    cur = con.cursor()
+    cur.execute("CREATE TABLE alignment_data("
+                "txId INT, taxon TEXT, seq TEXT, aln_idx INT)")
+
+    start = time.time()
+    Alignment(path, sql_cursor=cur, sql_con=con, db_idx=1, temp_dir=dest)
+    con.commit()
+    elapsed = time.time() - start
+
+    con.close()
+    os.remove(sql_db)
+
+    return elapsed
+
+
+def tokenize(path, fmt):
+    """Tokenizes `path` without storing the data and returns the elapsed
+    time"""
+
+    start = time.time()
+
+    buf = map_file(path)
+    if fmt == "fasta":
+        records = fasta_records(buf)
+    else:
+        records = phylip_records(buf)[2]
+
+    for _ in records:
+        pass
+
+    buf.close()
+
+    return time.time() - start
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:3]]
+    size_mb, n_taxa = args + [1024, 100][len(args):]
+
+    # Length of each sequence, rounded to the block sizes of the writers
+    locus_length = (size_mb * 1024 ** 2 / n_taxa) / 9000 * 9000
+
+    dest = tempfile.mkdtemp()
+
+    files = [
+        ("fasta", "fasta", join(dest, "bench.fas"), write_fasta),
+        ("phylip", "phylip", join(dest, "bench.phy"), write_phylip),
+        ("interleave", "phylip", join(dest, "bench_int.phy"),
+         write_interleave_phylip)
+    ]
+
+    try:
+        for label, fmt, path, writer in files:
+
+            writer(path, n_taxa, locus_length)
+            mb = getsize(path) / 1024. ** 2
+
+            for mode, elapsed in [
+                    ("line based", parse(path, False, dest)),
+                    ("mmap", parse(path, True, dest)),
+                    ("tokenizer only", tokenize(path, fmt))]:
+                print("{:<12} {:<16} {:>8.1f} MB/sec ({:.0f} MB in "
+                      "{:.2f}s)".format(label, mode, mb / elapsed, mb,
+                                        elapsed))
+
+            os.remove(path)
+    finally:
+        sequence.fast_parsing = True
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the copies of :class:`~trifusion.process.sequence.
+AlignmentList` made by TriFusion before each statistics request.
+
+A set of synthetic fasta alignments is loaded, and the object is copied
+with `copy.deepcopy` (as previously done by the statistics tasks) and with
+:meth:`AlignmentList.view`. After each copy, the active file set (half of
+the alignments) is applied, and the active taxa set is applied either with
+all taxa active or with one shelved taxon, which requires copying the
+`Alignment` objects of the view. The elapsed time of each mode is reported.
+
+Usage::
+
+    python benchmarks/bench_view.py [n_loci] [n_taxa]
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from copy import deepcopy
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process.sequence import AlignmentList
+
+
+def write_alignments(dest, n_loci, n_taxa):
+    """Generates `n_loci` random fasta alignments in `dest`"""
+
+    paths = []
+
+    for i in xrange(n_loci):
+        path = join(dest, "locus_{}.fas".format(i))
+        with open(path, "w") as fh:
+            for j in xrange(n_taxa):
+                fh.write(">taxon_{}\n{}\n".format(j, "".join(
+                    random.choice("ACGT") for _ in xrange(50))))
+        paths.append(path)
+
+    return paths
+
+
+def deepcopy_list(aln_obj):
+
+    aln_copy = deepcopy(aln_obj)
+    aln_copy.set_database_connections(aln_obj.cur, aln_obj.con, aln_obj.pool)
+
+    return aln_copy
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:3]]
+    n_loci, n_taxa = args + [5000, 10][len(args):]
+
+    dest = tempfile.mkdtemp()
+
+    try:
+        paths = write_alignments(dest, n_loci, n_taxa)
+        aln_obj = AlignmentList(paths, sql_db=join(dest, "bench.db"))
+
+        file_set = list(aln_obj.alignments)[::2]
+        taxa = list(aln_obj.taxa_names)
+
+        for label, taxa_set in [("all taxa", taxa), ("shelved taxon",
+                                                     taxa[1:])]:
+            for mode, func in [("deepcopy", deepcopy_list),
+                               ("view", AlignmentList.view)]:
+
+                start = time.time()
+                aln_copy = func(aln_obj)
+                aln_copy.update_active_alignments(file_set)
+                aln_copy.update_taxa_names(taxa_set)
+
+                print("{:<14} {:<9} {:.3f}s".format(
+                    label, mode, time.time() - start))
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
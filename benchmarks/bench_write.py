@@ -0,0 +1,93 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the export of an alignment to several output formats.
+
+A set of synthetic fasta alignments is generated, loaded into an
+`AlignmentList` and concatenated. The concatenated alignment is then
+written to the fasta, phylip and nexus formats twice: once with a
+`write_to_file` call per format (one scan of the data per format) and once
+with a single call for all formats (one scan of the data in total). Both
+the sequential and the interleave variants are reported.
+
+Usage::
+
+    python benchmarks/bench_write.py [n_loci] [n_taxa] [locus_length]
+"""
+
+import sys
+import random
+import shutil
+import tempfile
+import time
+from os.path import join, dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from trifusion.process.sequence import AlignmentList
+
+formats = ["fasta", "phylip", "nexus"]
+
+
+def write_alignments(dest, n_loci, n_taxa, locus_length):
+    """Generates `n_loci` random fasta alignments in `dest`"""
+
+    paths = []
+
+    for i in xrange(n_loci):
+        path = join(dest, "locus_{}.fas".format(i))
+        with open(path, "w") as fh:
+            for j in xrange(n_taxa):
+                seq = "".join(random.choice("ACGT-")
+                              for _ in xrange(locus_length))
+                fh.write(">taxon_{}\n{}\n".format(j, seq))
+        paths.append(path)
+
+    return paths
+
+
+def run(aln_obj, output_file, fanout, interleave):
+    """Writes the output formats and returns the elapsed time"""
+
+    # Discard the interleave data of previous runs
+    aln_obj.interleave_data = False
+
+    start = time.time()
+    if fanout:
+        aln_obj.write_to_file(formats, output_file=output_file,
+                              interleave=interleave)
+    else:
+        for fmt in formats:
+            aln_obj.write_to_file([fmt], output_file=output_file,
+                                  interleave=interleave)
+
+    return time.time() - start
+
+
+def main():
+
+    args = [int(x) for x in sys.argv[1:4]]
+    n_loci, n_taxa, locus_length = args + [200, 100, 1000][len(args):]
+
+    dest = tempfile.mkdtemp()
+
+    try:
+        paths = write_alignments(dest, n_loci, n_taxa, locus_length)
+        aln_obj = AlignmentList(paths, sql_db=join(dest, "bench.db"))
+        aln_obj.concatenate()
+        output_file = join(dest, "output")
+
+        for interleave in [False, True]:
+            for label, fanout in [("per format", False), ("fan-out", True)]:
+                elapsed = run(aln_obj, output_file, fanout, interleave)
+                print("{:<12} {:<11} {:.2f}s".format(
+                    "interleave" if interleave else "sequential", label,
+                    elapsed))
+
+        aln_obj.con.close()
+    finally:
+        shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
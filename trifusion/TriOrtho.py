@@ -230,7 +230,7 @@ def main():
             group_object.export_filtered_group(dest=output_dir)
             print_col("Filtering complete.\nTotal orthologs: %s;\nAfter gene "
                       "filter: %s;\nAfter species filter: %s;\nAfter both "
-                      "filters: %s" % (len(group_object.species_frequency),
+                      "filters: %s" % (group_object.counts.shape[0],
                                        group_object.num_gene_compliant,
                                        group_object.num_species_compliant,
                                        group_object.all_compliant), GREEN, 3)
@@ -280,7 +280,7 @@ def main():
                           "orthologs: %s;\nAfter gene filter: %s;\nAfter "
                           "species filter: %s;\nAfter both filters: %s" %
                           (gname,
-                           len(gobj.species_frequency),
+                           gobj.counts.shape[0],
                            gobj.num_gene_compliant,
                            gobj.num_species_compliant,
                            gobj.all_compliant), GREEN, 3)
@@ -35,6 +35,8 @@ with warnings.catch_warnings():
         from process.base import print_col, RED, GREEN, YELLOW, CleanUp
         from process import sequence as seqset
         from process import data
+        from process.cache import ParseCache
+        from process.pipeline import OperationPipeline
         from process.error_handling import *
         from base.sanity import triseq_arg_check, mfilters, post_aln_checks, \
             check_infile_list
@@ -46,6 +48,8 @@ with warnings.catch_warnings():
             CleanUp
         from trifusion.process import sequence as seqset
         from trifusion.process import data
+        from trifusion.process.cache import ParseCache
+        from trifusion.process.pipeline import OperationPipeline
         from trifusion.process.error_handling import *
         from trifusion.base.sanity import triseq_arg_check, mfilters, \
             post_aln_checks, check_infile_list
@@ -142,8 +146,10 @@ def main_parser(arg, alignment_list):
 
     print_col("Parsing %s alignments" % len(alignment_list), GREEN,
               quiet=arg.quiet)
-    alignments = seqset.AlignmentList(alignment_list, sql_db=sql_db,
-                                      pbar=pbar)
+    alignments = seqset.AlignmentList(
+        alignment_list, sql_db=sql_db, pbar=pbar, jobs=arg.jobs,
+        packed=arg.packed,
+        cache=None if arg.no_cache else ParseCache(arg.cache_dir))
 
     # If a partitions file was provided, and there is only a single input file,
     # try to associate the partitions.
@@ -224,62 +230,88 @@ def main_parser(arg, alignment_list):
                   quiet=arg.quiet)
         alignments.filter_by_taxa(arg.exclude_filter, "Exclude", pbar=pbar)
 
+    def print_labels(labels):
+        for label in labels:
+            print_col(label, GREEN, quiet=arg.quiet)
+
+    # The operations that modify the alignment data are executed by a
+    # pipeline, which applies consecutive operations that work on one
+    # alignment at a time in a single pass over the data
+    pipeline = OperationPipeline(alignments, use_main_table=True, pbar=pbar)
+
     # Filter by codon position
     if arg.codon_filter:
-        print_col("Filtering by codon positions", GREEN, quiet=arg.quiet)
         if alignments.sequence_code[0] == "DNA":
             codon_settings = [True if str(x) in arg.codon_filter else False
                               for x in range(1, 4)]
-            alignments.filter_codon_positions(codon_settings, pbar=pbar)
+            pipeline.add("filter_codon_positions", [codon_settings],
+                         label="Filtering by codon positions")
 
     # Filter by missing data
     if arg.m_filter:
-        print_col("Filtering by missing data", GREEN, quiet=arg.quiet)
-        alignments.filter_missing_data(arg.m_filter[0], arg.m_filter[1],
-                                       pbar=pbar, use_main_table=True)
+        pipeline.add("filter_missing_data", arg.m_filter[:2],
+                     label="Filtering by missing data")
 
     # Filtering by variable sites
     if arg.var_filter:
-        print_col("Filtering by variable sites", GREEN, quiet=arg.quiet)
-        alignments.filter_segregating_sites(arg.var_filter[0],
-                                            arg.var_filter[1],
-                                            pbar=pbar)
+        pipeline.add("filter_segregating_sites", arg.var_filter[:2],
+                     label="Filtering by variable sites")
 
     # Filtering by informative sites
     if arg.inf_filter:
-        print_col("Filtering by variable sites", GREEN, quiet=arg.quiet)
-        alignments.filter_informative_sites(arg.inf_filter[0],
-                                            arg.inf_filter[1],
-                                            pbar=pbar)
+        pipeline.add("filter_informative_sites", arg.inf_filter[:2],
+                     label="Filtering by informative sites")
+
+    pipeline.run(print_labels)
 
     # Concatenation
     if not arg.conversion and not arg.consensus and len(alignment_list) > 1:
-        print_col("Concatenating", GREEN, quiet=arg.quiet)
-        alignments.concatenate(pbar=pbar)
+
+        # When the concatenated alignment is not modified any further, it is
+        # streamed directly to the output files instead of being stored in
+        # the database
+        stream = outfile and not interleave and not arg.collapse and \
+            not arg.gcoder and \
+            all([x in ["fasta", "phylip", "nexus"] for x in output_format])
+
+        if stream:
+            print_col("Concatenating and writing output", GREEN,
+                      quiet=arg.quiet)
+            alignments.concatenate_to_file(output_format, outfile,
+                                           partition_file=True,
+                                           use_charset=True,
+                                           pbar=pbar,
+                                           upper_case=upper_case)
+        else:
+            print_col("Concatenating", GREEN, quiet=arg.quiet)
+            alignments.concatenate(pbar=pbar)
 
         # Concatenate zorro files
         if arg.zorro:
             zorro = data.Zorro(alignment_list, arg.zorro)
             zorro.write_to_file(outfile)
 
+        if stream:
+            return
+
+    pipeline = OperationPipeline(alignments, use_main_table=True, pbar=pbar)
+
     # Collapsing
     if arg.collapse:
-        print_col("Collapsing", GREEN, quiet=arg.quiet)
-        alignments.collapse(use_main_table=True, pbar=pbar,
-                            haplotypes_file=outfile)
+        pipeline.add("collapse", kwargs={"haplotypes_file": outfile},
+                     label="Collapsing")
 
     # Gcoder
-    if arg.gcoder:
-        print_col("Coding gaps", GREEN, quiet=arg.quiet)
-        if output_format == ["nexus"]:
-            alignments.code_gaps(use_main_table=True, pbar=pbar)
+    if arg.gcoder and output_format == ["nexus"]:
+        pipeline.add("code_gaps", label="Coding gaps")
 
     # Consensus
     if arg.consensus:
-        consensus_type = arg.consensus[0]
-        print_col("Creating consensus sequences", GREEN, quiet=arg.quiet)
-        alignments.consensus(consensus_type, single_file=arg.consensus_single,
-                             pbar=pbar)
+        pipeline.add("consensus", [arg.consensus[0]],
+                     {"single_file": arg.consensus_single},
+                     label="Creating consensus sequences")
+
+    pipeline.run(print_labels)
 
     # Write output
     print_col("Writing output", GREEN, quiet=arg.quiet)
@@ -290,7 +322,8 @@ def main_parser(arg, alignment_list):
                              partition_file=True,
                              use_charset=True,
                              pbar=pbar,
-                             upper_case=upper_case)
+                             upper_case=upper_case,
+                             jobs=arg.jobs)
 
 
 def get_args(arg_list=None, unittest=False):
@@ -486,6 +519,26 @@ def get_args(arg_list=None, unittest=False):
     miscellaneous.add_argument("-quiet", dest="quiet", action="store_const",
                                const=True, default=False, help="Removes all "
                                "terminal output")
+    miscellaneous.add_argument("-threads", "--jobs", dest="jobs", type=int,
+                               default=1, help="Number of processes used to "
+                               "parse the input files and to write the output "
+                               "files in conversion mode (default is "
+                               "'%(default)s')")
+    miscellaneous.add_argument("--no-cache", dest="no_cache",
+                               action="store_const", const=True,
+                               default=False, help="Parses all input files, "
+                               "instead of loading previously parsed files "
+                               "from the parse cache")
+    miscellaneous.add_argument("--cache-dir", dest="cache_dir",
+                               help="Directory of the parse cache (default "
+                               "is the TRIFUSION_CACHE_DIR environment "
+                               "variable or ~/.trifusion/cache)")
+    miscellaneous.add_argument("--packed", dest="packed",
+                               action="store_const", const=True,
+                               default=False, help="Stores nucleotide "
+                               "sequences with 4 bits per site in the "
+                               "temporary database. Reduces the size of the "
+                               "database for large data sets")
     miscellaneous.add_argument("-v", "--version", dest="version",
                                action="store_const", const=True,
                                help="Displays software version")
@@ -31,12 +31,14 @@ with warnings.catch_warnings():
 
     try:
         from process.sequence import *
+        from process.cache import ParseCache
         from base.plotter import *
         from process.base import print_col, GREEN, RED, YELLOW, CleanUp
         from process.error_handling import EmptyData
         from __init__ import __version__
     except ImportError:
         from trifusion.process.sequence import *
+        from trifusion.process.cache import ParseCache
         from trifusion.base.plotter import *
         from trifusion.process.base import print_col, GREEN, RED, YELLOW,\
             CleanUp
@@ -131,6 +133,23 @@ def main():
     main_exec.add_argument("-quiet", dest="quiet", action="store_const",
                            const=True, default=False, help="Removes all"
                            " terminal output")
+    main_exec.add_argument("-threads", "--jobs", dest="jobs", type=int,
+                           default=1, help="Number of processes used to "
+                           "parse the input files (default is "
+                           "'%(default)s')")
+    main_exec.add_argument("--no-cache", dest="no_cache",
+                           action="store_const", const=True, default=False,
+                           help="Parses all input files, instead of loading "
+                           "previously parsed files from the parse cache")
+    main_exec.add_argument("--cache-dir", dest="cache_dir",
+                           help="Directory of the parse cache (default is "
+                           "the TRIFUSION_CACHE_DIR environment variable or "
+                           "~/.trifusion/cache)")
+    main_exec.add_argument("--packed", dest="packed", action="store_const",
+                           const=True, default=False, help="Stores "
+                           "nucleotide sequences with 4 bits per site in the "
+                           "temporary database. Reduces the size of the "
+                           "database for large data sets")
     main_exec.add_argument("-v", "--version", dest="version",
                                action="store_const", const=True,
                                help="Displays software version")
@@ -187,7 +206,9 @@ def stats_main(args):
         input_files = fl
 
     print_col("Parsing %s alignments" % len(input_files), GREEN, 2)
-    alignments = AlignmentList(input_files, sql_db=sql_db)
+    alignments = AlignmentList(
+        input_files, sql_db=sql_db, jobs=args.jobs, packed=args.packed,
+        cache=None if args.no_cache else ParseCache(args.cache_dir))
 
     # Create output dir
     if not os.path.exists(output_dir):
@@ -7809,6 +7809,25 @@ class TriFusionApp(App):
 
         self.show_popup(title=title, content=content)
 
+    def get_threads(self):
+        """
+        Returns the number of threads set in the Orthology screen. Since
+        the screen may not be the current one, the loaded instance of the
+        screen is used instead. If the screen was never loaded, a single
+        thread is returned.
+        :return: integer. Number of threads
+        """
+
+        if self.screen.name == "Orthology":
+            screen = self.screen
+        else:
+            screen = self.loaded_screens[self.available_screens[1]]
+
+        try:
+            return int(screen.ids.usearch_threads.text)
+        except (AttributeError, ValueError):
+            return 1
+
     def orto_export_groups(self, export_idx, output_dir=None,
                            output_name=None):
         """
@@ -7936,7 +7955,8 @@ class TriFusionApp(App):
                 [self.active_group.retrieve_sequences,
                  [self.ortho_sqldb, self.protein_db, output_dir]],
             "nucleotide":
-                [protein2dna.convert_group,
+                [partial(protein2dna.convert_group,
+                         jobs=self.get_threads()),
                  [self.ortho_sqldb, self.cds_db, self.protein_db,
                   self.active_group, self.usearch_file, output_dir]]}
 
@@ -12137,7 +12157,8 @@ class TriFusionApp(App):
             "consensus_type": self.process_options.ids.consensus_mode.text,
             "ld_hat": bool(self.ld_hat),
             "ima2_params": list(self.ima2_options),
-            "state_fl": state_fl}
+            "state_fl": state_fl,
+            "jobs": self.get_threads()}
 
         # Remove lock from background process
         self.terminate_process_exec = False
@@ -141,6 +141,7 @@ try:
     from process.error_handling import KillByUser,\
         MultipleSequenceTypes, EmptyAlignment
     from process.sequence import AlignmentList, Alignment
+    from process.pipeline import OperationPipeline
     import orthomcl_pipeline as ortho_pipe
     from ortho import OrthomclToolbox as OrthoTool
 except ImportError:
@@ -148,12 +149,12 @@ except ImportError:
     from trifusion.process.error_handling import KillByUser,\
         MultipleSequenceTypes, EmptyAlignment
     from trifusion.process.sequence import AlignmentList, Alignment
+    from trifusion.process.pipeline import OperationPipeline
     import trifusion.orthomcl_pipeline as ortho_pipe
     from trifusion.ortho import OrthomclToolbox as OrthoTool
 
 from os.path import join, basename
 from collections import OrderedDict
-from copy import deepcopy
 import logging
 import shutil
 import cPickle as pickle
@@ -260,10 +261,9 @@ def get_stats_summary(dest, aln_list, active_file_set, active_taxa_set,
     time.sleep(.4)
 
     try:
-        # Creating deepcopy to perform changes  without impacting main
+        # Creating a view to perform changes without impacting main
         # attribute
-        main_aln = deepcopy(aln_list)
-        main_aln.set_database_connections(aln_list.cur, aln_list.con)
+        main_aln = aln_list.view()
         # Update alignment object according to active file and taxa sets
         main_aln.update_active_alignments(active_file_set)
         main_aln.update_taxa_names(active_taxa_set)
@@ -384,7 +384,8 @@ def orto_execution(nm, temp_dir, proteome_files, protein_min_len,
     usearch_evalue: int or float
         Evalue for usearch execution.
     usearch_threads : int
-        Number of threads used by usearch execution.
+        Number of threads used by usearch execution, and of processes used
+        to parse its output.
     usearch_output : str
         Name of usearch's output file.
     mcl_file : str
@@ -446,7 +447,8 @@ def orto_execution(nm, temp_dir, proteome_files, protein_min_len,
 
         nm.task = "parse"
         ortho_pipe.blast_parser(usearch_output, ortho_dir,
-                                db_dir=temp_dir, nm=nm)
+                                db_dir=temp_dir, nm=nm,
+                                cpus=usearch_threads)
         nm.finished_tasks = ["schema", "adjust", "filter", "usearch", "parse"]
 
         if nm.stop:
@@ -462,7 +464,8 @@ def orto_execution(nm, temp_dir, proteome_files, protein_min_len,
             raise KillByUser("")
 
         nm.task = "mcl"
-        ortho_pipe.mcl(mcl_inflation, ortho_dir, mcl_file=mcl_file, nm=nm)
+        ortho_pipe.mcl(mcl_inflation, ortho_dir, mcl_file=mcl_file, nm=nm,
+                       cpus=usearch_threads)
         nm.finished_tasks = ["schema", "adjust", "filter", "usearch", "parse",
                              "pairs", "mcl"]
 
@@ -590,7 +593,7 @@ def process_execution(aln_list, file_set_name, file_list, active_file_list,
                         use_nexus_partitions, use_nexus_models,
                         phylip_truncate_name, output_dir, use_app_partitions,
                         consensus_type, ld_hat, ima2_params,
-                        conversion_suffix, state_fl):
+                        conversion_suffix, state_fl, jobs=1):
     """The Process execution
 
     Parameters
@@ -664,6 +667,10 @@ def process_execution(aln_list, file_set_name, file_list, active_file_list,
         See :attr:`~trifusion.app.TriFusionApp.ima2_options` attribute.
     conversion_suffix : str
         See :attr:`~trifusion.app.TriFusionApp.conversion_suffix` attribute.
+    state_fl : str
+        Path to the file where the state of `aln_list` is saved.
+    jobs : int
+        Number of processes used by `AlignmentList.write_to_file`.
 
     """
 
@@ -880,7 +887,8 @@ def process_execution(aln_list, file_set_name, file_list, active_file_list,
                 use_nexus_models=use_nexus_models,
                 ns_pipe=ns,
                 table_name=table_name,
-                upper_case=secondary_options["upper_case"])
+                upper_case=secondary_options["upper_case"],
+                jobs=jobs)
 
         except IOError as e:
             logging.exception(e)
@@ -931,66 +939,72 @@ def process_execution(aln_list, file_set_name, file_list, active_file_list,
         # alignment if any of the secondary operations is specified
         main_table = "main_output"
 
+        # The operations on the main output are executed through a pipeline,
+        # so that consecutive operations that only need one alignment at a
+        # time (e.g. collapse and gap coding) are done in a single pass over
+        # the alignment data. The labels of the pipeline are the names of
+        # the tasks that are appended to `ns.finished_tasks`
+        pipeline = OperationPipeline(main_aln, table_in=main_table,
+                                     table_out=main_table, ns=ns)
+
         # Reverse concatenation
         # Active table: Based on partition names
         if main_operations["reverse_concatenation"]:
-            ns.task = "reverse_concatenation"
-            reverse_concatenation(main_aln, table_in=main_table,
-                                  table_out=main_table)
-            ns.finished_tasks.append("reverse_concatenation")
+            pipeline.add_call(lambda aln: reverse_concatenation(
+                aln, table_in=main_table, table_out=main_table),
+                label="reverse_concatenation")
 
         # Filtering
         # Active table: * / *main
         if secondary_options["collapse_filter"] and not \
                 secondary_options["collapse_file"]:
-            ns.task = "collapse"
             # If the the collapse filter is active, perform this
             # filtering first. This is because the filter will allow 0% of
             # missing data, which will always be as stringent or more than any
             # missing data filter set.
-            main_aln.filter_missing_data(0, 0,table_in=main_table,
-                                         table_out=main_table, ns=ns)
-            ns.finished_tasks.append("collapse_filter")
+            pipeline.add("filter_missing_data", [0, 0],
+                         label="collapse_filter")
 
         # Active table: * / *main
         if secondary_operations["filter"] and not \
                 secondary_options["filter_file"]:
-            ns.task = "filter"
-            main_aln = filter_aln(main_aln, table_in=main_table,
-                                  table_out=main_table)
-            ns.finished_tasks.append("filter")
+            pipeline.add_call(lambda aln: filter_aln(
+                aln, table_in=main_table, table_out=main_table),
+                label="filter")
         # Concatenation
         # Active table: concatenation
         if main_operations["concatenation"]:
-            ns.task = "concatenation"
-            main_aln = concatenation(main_aln, table_in=main_table,
-                                     table_out=main_table)
-            ns.finished_tasks.append("concatenation")
+            pipeline.add_call(lambda aln: concatenation(
+                aln, table_in=main_table, table_out=main_table),
+                label="concatenation")
         # Collapsing
         # Active table: *main / concatenationmain
         if secondary_operations["collapse"] and not \
                 secondary_options["collapse_file"]:
-            ns.task = "collapse"
             hap_file = output_file if output_file else None
-            main_aln.collapse(haplotype_name=hap_prefix, dest=output_dir,
-                              table_out=main_table, ns=ns, table_in=main_table,
-                              haplotypes_file=hap_file)
-            ns.finished_tasks.append("collapse")
+            pipeline.add("collapse", kwargs={"haplotype_name": hap_prefix,
+                                             "dest": output_dir,
+                                             "haplotypes_file": hap_file},
+                         label="collapse")
         # Gcoder
         # Active table: *main / concatenationmain
         if secondary_operations["gcoder"] and not \
                 secondary_options["gcoder_file"]:
-            ns.task = "gcoder"
-            main_aln.code_gaps(table_in=main_table, table_out=main_table,
-                               ns=ns)
-            ns.finished_tasks.append("gcoder")
+            pipeline.add("code_gaps", label="gcoder")
         # Consensus
         # Active table: *main / concatenationmain / consensus
         if secondary_operations["consensus"] and not \
                 secondary_options["consensus_file"]:
-            ns.task = "consensus"
-            consensus(main_aln, table_in=main_table, table_out=main_table)
-            ns.finished_tasks.append("consensus")
+            pipeline.add_call(lambda aln: consensus(
+                aln, table_in=main_table, table_out=main_table),
+                label="consensus")
+
+        def start_task(labels):
+            # The collapse filter shares the progress of the collapse task
+            ns.task = "collapse" if labels[0] == "collapse_filter" \
+                else labels[0]
+
+        pipeline.run(start_task, ns.finished_tasks.extend)
 
         ns.task = "write"
         writer(main_aln, conv_suffix=conversion_suffix,
@@ -1350,9 +1364,8 @@ def get_stats_data(aln_obj, stats_idx, active_file_set, active_taxa_set,
         threads.
     """
 
-    # Creating deepcopy to perform changes without impacting the main attribute
-    main_aln = deepcopy(aln_obj)
-    main_aln.set_database_connections(aln_obj.cur, aln_obj.con)
+    # Creating a view to perform changes without impacting the main attribute
+    main_aln = aln_obj.view()
 
     # Update alignment object according to active file and taxa sets
     main_aln.update_active_alignments(active_file_set)
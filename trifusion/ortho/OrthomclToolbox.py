@@ -22,19 +22,22 @@ try:
     from process.sequence import Alignment
     from base.plotter import bar_plot, multi_bar_plot
     from process.error_handling import KillByUser
+    from ortho.fasta_index import FastaIndex
 except ImportError:
     from trifusion.process.sequence import Alignment
     from trifusion.base.plotter import bar_plot, multi_bar_plot
     from trifusion.process.error_handling import KillByUser
+    from trifusion.ortho.fasta_index import FastaIndex
 
 from collections import OrderedDict, Counter
+from scipy.sparse import csr_matrix
+import numpy as np
 import pickle
-import os
 import sqlite3
+import os
 from os.path import join
 import random
 import string
-import copy
 
 
 class Cluster(object):
@@ -142,7 +145,16 @@ class GroupLight(object):
         self.species_list = []
         # Attribute that will contain taxa to be excluded from analyses
         self.excluded_taxa = []
-        self.species_frequency = []
+
+        # Sparse matrix with the number of sequences of each taxon (columns)
+        # in each cluster (rows). The columns follow the order of the taxa
+        # attribute, which contains all taxa (including excluded ones)
+        self.counts = None
+        self.taxa = []
+        # Number of taxa and maximum number of copies of each cluster, for
+        # the current excluded taxa. Stored as (excluded taxa, taxa counts,
+        # copy counts)
+        self._cluster_cache = None
 
         # Attributes that will store the number (int) of cluster after gene and
         # species filter
@@ -185,120 +197,121 @@ class GroupLight(object):
             if line.strip() != "":
                 yield line.strip()
 
-    def iter_species_frequency(self):
+    def _cluster_counts(self, excluded_taxa=None):
         """
-        In order to prevent permanent changes to the species_frequency
-        attribute due to the filtering of taxa, this iterable should be used
-        instead of the said variable. This creates a temporary deepcopy of
-        species_frequency which will be iterated over and eventually modified.
+        Returns the number of taxa and the maximum number of gene copies of
+        each cluster, ignoring the excluded taxa. The values for the current
+        excluded taxa are cached, so that changing the filters does not
+        require going through the clusters again.
+        :param excluded_taxa: list. Taxa that are ignored. If None, the
+        excluded_taxa attribute is used
+        :return: tuple, with arrays of the number of taxa and the maximum
+        number of gene copies of each cluster
         """
 
-        # Since the items of species_frequency are mutable, this ensures
-        # that even those objects are correctly cloned
-        sp_freq = copy.deepcopy(self.species_frequency)
+        if excluded_taxa is None:
+            excluded_taxa = self.excluded_taxa
 
-        for cl in sp_freq:
-            yield cl
+        key = sorted(excluded_taxa)
 
-    def _remove_tx(self, line):
-        """
-        Given a group line, remove all references to the excluded taxa
-        :param line: raw group file line
-        """
+        if self._cluster_cache and self._cluster_cache[0] == key:
+            return self._cluster_cache[1:]
 
-        new_line = "{}:".format(line.split(":")[0])
+        cols = [i for i, x in enumerate(self.taxa) if x not in excluded_taxa]
 
-        tx_str = "\t".join([x for x in line.split(":")[1].split() if
-                           x.split("|")[0] not in self.excluded_taxa])
+        if cols:
+            mat = self.counts if len(cols) == len(self.taxa) else \
+                self.counts[:, cols]
+            taxa_counts = mat.getnnz(axis=1)
+            copy_counts = mat.max(axis=1).toarray().ravel()
+        else:
+            taxa_counts = copy_counts = np.zeros(self.counts.shape[0],
+                                                 dtype=np.int32)
 
-        return new_line + tx_str
+        if excluded_taxa is self.excluded_taxa:
+            self._cluster_cache = (key, taxa_counts, copy_counts)
 
-    def _apply_filter(self, cl):
-        """
-        Sets or updates the basic group statistics, such as the number of
-        orthologs compliant with the gene copy and minimum taxa filters.
+        return taxa_counts, copy_counts
 
-        :param cl: dictionary. Contains the number of occurrences for each
-         taxon present in the ortholog cluster
-         (e.g. {"taxonA": 2, "taxonB": 1).
+    def _filter_masks(self):
+        """
+        Determines which ortholog clusters are compliant with each of the
+        ortholog filters, after removing the excluded taxa.
+        :return: tuple, with boolean arrays for the non empty clusters, the
+        clusters compliant with the gene copy filter and the clusters
+        compliant with the minimum taxa filter
         """
 
-        # First, remove excluded taxa from the cl object since this will
-        # impact all other filters
-        for tx in self.excluded_taxa:
-            cl.pop(tx, None)
-
-        if cl:
-
-            self.all_clusters += 1
-
-            extra_copies = max(cl.values())
-            if extra_copies > self.max_extra_copy:
-                self.max_extra_copy = extra_copies
+        taxa_counts, copy_counts = self._cluster_counts()
 
-            if extra_copies <= self.gene_threshold and self.gene_threshold and\
-                len(cl) >= self.species_threshold and  \
-                    self.species_threshold:
-                self.num_gene_compliant += 1
-                self.num_species_compliant += 1
-                self.all_compliant += 1
+        if self.gene_threshold:
+            gene = copy_counts <= self.gene_threshold
+        else:
+            gene = np.zeros(len(copy_counts), dtype=bool)
 
-            elif (extra_copies <= self.gene_threshold and
-                      self.gene_threshold) or self.gene_threshold == 0:
-                self.num_gene_compliant += 1
+        if self.species_threshold:
+            species = taxa_counts >= self.species_threshold
+        else:
+            species = np.zeros(len(taxa_counts), dtype=bool)
 
-            elif len(cl) >= self.species_threshold and \
-                    self.species_threshold:
-                self.num_species_compliant += 1
+        return taxa_counts > 0, gene, species
 
-    def _get_compliance(self, cl):
+    def compliance_mask(self):
         """
-        Determines whether an ortholog cluster is compliant with the specified
-        ortholog filters.
-        :param ccl: dictionary. Contains the number of occurrences for each
-         taxon present in the ortholog cluster
-         (e.g. {"taxonA": 2, "taxonB": 1).
-
-        :return: tuple. The first element refers to the gene copy filter
-        while the second refers to the minimum taxa filter. Values of 1
-        indicate that the ortholg cluster is compliant.
+        Determines whether each ortholog cluster is compliant with both
+        ortholog filters. When no filters are set, all non empty clusters
+        are compliant.
+        :return: boolean array, in the order of the groups generator
         """
 
-        for tx in self.excluded_taxa:
-            cl.pop(tx, None)
+        non_empty, gene, species = self._filter_masks()
 
-        if cl:
+        if not self.gene_threshold and not self.species_threshold:
+            return non_empty
 
-            cp = max(cl.values())
+        return non_empty & gene & species
 
-            if not self.gene_threshold and not self.species_threshold:
-                return 1, 1
+    def _update_stats(self):
+        """
+        Sets or updates the basic group statistics, such as the number of
+        orthologs compliant with the gene copy and minimum taxa filters.
+        Clusters compliant with the minimum taxa filter are only counted
+        as such when they are also compliant with the gene copy filter, or
+        when the gene copy filter is not set.
+        """
 
-            if cp <= self.gene_threshold and self.gene_threshold and\
-                len(cl) >= self.species_threshold and  \
-                    self.species_threshold:
-                return 1, 1
+        non_empty, gene, species = self._filter_masks()
 
-            elif (cp <= self.gene_threshold and self.gene_threshold) or \
-                    not self.gene_threshold:
-                return 1, 0
+        # A gene copy filter of 0 accepts all clusters
+        gene_pass = gene | (self.gene_threshold == 0)
 
-            elif (len(cl) >= self.species_threshold and
-                    self.species_threshold) or not self.species_threshold:
-                return 0, 1
+        self.all_clusters = int(non_empty.sum())
+        self.num_gene_compliant = int((non_empty & gene_pass).sum())
+        self.num_species_compliant = int((non_empty & species &
+                                          (gene | ~gene_pass)).sum())
+        self.all_compliant = int((non_empty & gene & species).sum())
+
+    def _remove_tx(self, line):
+        """
+        Given a group line, remove all references to the excluded taxa
+        :param line: raw group file line
+        """
 
-            else:
-                return 0, 0
+        new_line = "{}:".format(line.split(":")[0])
 
-    def _reset_counter(self):
+        tx_str = "\t".join([x for x in line.split(":")[1].split() if
+                           x.split("|")[0] not in self.excluded_taxa])
 
-        self.all_clusters = 0
-        self.num_gene_compliant = 0
-        self.num_species_compliant = 0
-        self.all_compliant = 0
+        return new_line + tx_str
 
     def _parse_groups(self, ns=None):
 
+        # Column of each taxon in the counts matrix
+        taxa_idx = {}
+        indptr = [0]
+        indices = []
+        data = []
+
         for cl in self.groups():
 
             if ns:
@@ -308,27 +321,36 @@ class GroupLight(object):
             # Retrieve the field containing the ortholog sequences
             sequence_field = cl.split(":")[1]
 
-            # Update species frequency list
+            # Update species frequency
             sp_freq = Counter((x.split("|")[0] for x in
                               sequence_field.split()))
 
-            self.species_frequency.append(sp_freq)
+            for tx, n in sp_freq.iteritems():
+                try:
+                    indices.append(taxa_idx[tx])
+                except KeyError:
+                    taxa_idx[tx] = len(self.taxa)
+                    indices.append(len(self.taxa))
+                    self.taxa.append(tx)
+                data.append(n)
 
-            # Update number of sequences
-            self.total_seqs += len(sequence_field)
+            indptr.append(len(indices))
 
-            # Update max number of extra copies
-            extra_copies = max(sp_freq.values())
-            if extra_copies > self.max_extra_copy:
-                self.max_extra_copy = max(sp_freq.values())
+        self.counts = csr_matrix((np.array(data, dtype=np.int32),
+                                  np.array(indices, dtype=np.int32),
+                                  np.array(indptr, dtype=np.int32)),
+                                 shape=(len(indptr) - 1, len(self.taxa)))
 
-            self.species_list.extend([x for x in sp_freq if x not in
-                                      self.species_list])
+        self.species_list = list(self.taxa)
 
-            # Apply filters, if any
-            # gene filter
-            if self.species_threshold and self.gene_threshold:
-                self._apply_filter(sp_freq)
+        # Update number of sequences and max number of extra copies
+        self.total_seqs = int(self.counts.sum())
+        if self.counts.nnz:
+            self.max_extra_copy = int(self.counts.data.max())
+
+        # Apply filters, if any
+        if self.species_threshold and self.gene_threshold:
+            self._update_stats()
 
     def exclude_taxa(self, taxa_list, update_stats=False):
         """
@@ -353,18 +375,14 @@ class GroupLight(object):
         self.excluded_taxa = taxa_list
 
         if update_stats:
-            self._reset_counter()
-            for cl in self.iter_species_frequency():
-                self._apply_filter(cl)
+            self._update_stats()
 
     def basic_group_statistics(self, update_stats=True):
 
         if update_stats:
-            self._reset_counter()
-            for cl in self.iter_species_frequency():
-                self._apply_filter(cl)
+            self._update_stats()
 
-        return len(self.species_frequency), self.total_seqs, \
+        return self.counts.shape[0], self.total_seqs, \
             self.num_gene_compliant, self.num_species_compliant, \
             self.all_compliant
 
@@ -405,14 +423,14 @@ class GroupLight(object):
             self._get_sp_proportion()
 
         if update_stats:
-            self._reset_counter()
-            for cl in self.iter_species_frequency():
-                self._apply_filter(cl)
+            self._update_stats()
 
     def retrieve_sequences(self, sqldb, protein_db, dest="./",
                              shared_namespace=None, outfile=None):
         """
-        :param sqldb: srting. Path to sqlite database file
+        :param sqldb: srting. Path to sqlite database file. Not used, since
+        the sequences are retrieved with the .fai index of protein_db, but
+        kept for compatibility
         :param protein_db: string. Path to protein database file
         :param dest: string. Directory where sequences will be exported
         :param shared_namespace: Namespace object to communicate with
@@ -433,49 +451,11 @@ class GroupLight(object):
             # Stores sequences that could not be retrieved
             shared_namespace.missed = shared_namespace.counter = 0
             shared_namespace.progress = 0
-            # Get number of lines of protein database
-            p = 0
-            with open(protein_db) as fh:
-                for p, _ in enumerate(fh):
-                    pass
-            shared_namespace.max_pb = shared_namespace.total = p + 1
-
-        # Connect to database
-        con = sqlite3.connect(sqldb)
-        c = con.cursor()
-
-        table_name = "".join([x for x in protein_db if x.isalnum()]).encode(
-            "utf8")
-
-        # Create table if it does not exist
-        if not c.execute("SELECT name FROM sqlite_master WHERE type='table' "
-                         "AND name='{}'".format(table_name)).fetchall():
-
-            c.execute("CREATE TABLE [{}] (seq_id text PRIMARY KEY, seq text)".
-                      format(table_name))
-
-            # Populate database
-            with open(protein_db) as ph:
-                seq = ""
-                for line in ph:
-                    # Kill switch
-                    if shared_namespace:
-                        if shared_namespace.stop:
-                            con.close()
-                            raise KillByUser("")
-                        shared_namespace.progress += 1
-                        shared_namespace.counter += 1
-
-                    if line.startswith(">"):
-                        seq_id = line.strip()[1:]
-                        if seq != "":
-                            c.execute("INSERT INTO [{}] VALUES (?, ?)".
-                                      format(table_name), (seq_id, seq))
-                        seq = ""
-                    else:
-                        seq += line.strip()
 
-            con.commit()
+        # The offsets of the sequences are stored in a .fai file next to the
+        # protein database, which is only built again when the database
+        # changes
+        protein_index = FastaIndex(protein_db, shared_namespace)
 
         if shared_namespace:
             shared_namespace.act = shared_namespace.msg = "Fetching sequences"
@@ -486,19 +466,19 @@ class GroupLight(object):
 
         # Set single output file, if option is set
         if outfile:
-            output_handle = open(join(dest, outfile), "w")
+            output_handle = open(join(dest, outfile), "w", 1024 ** 2)
 
         # Fetching sequences
-        for line, cl in zip(self.groups(), self.iter_species_frequency()):
+        for line, compliant in zip(self.groups(), self.compliance_mask()):
 
             # Kill switch
             if shared_namespace:
                 if shared_namespace.stop:
-                    con.close()
+                    protein_index.close()
                     raise KillByUser("")
 
             # Filter sequences
-            if self._get_compliance(cl) == (1, 1):
+            if compliant:
 
                 if shared_namespace:
                     shared_namespace.good += 1
@@ -510,44 +490,34 @@ class GroupLight(object):
                     line = self._remove_tx(line)
                 fields = line.split(":")
 
-                # Open file
-                if not outfile:
+                seq_ids = fields[-1].split()
+                # Sequences that could not be retrieved are skipped
+                records = [(x, y) for x, y in zip(
+                    seq_ids, protein_index.fetch(seq_ids)) if y is not None]
+
+                # If outfile is set, sequences are written to a single file
+                # for all groups. If not, each group is written to its own
+                # file, with the taxon names as headers
+                if outfile:
+                    output_handle.write("".join(
+                        ">{}\n{}\n".format(x, y) for x, y in records))
+                else:
                     cl_name = fields[0]
                     oname = join(dest, cl_name)
                     mname = join(dest, "header_correspondance", cl_name)
-                    output_handle = open(oname + ".fas", "w")
-                    map_handle = open(mname + "_headerMap.csv", "w")
-
-                seqs = fields[-1].split()
-                for i in seqs:
-                    # Query database
-                    c.execute("SELECT * FROM [{}] WHERE seq_id = ?".
-                              format(table_name), (i,))
-                    vals = c.fetchone()
-                    # Handles cases where the sequence could not be retrieved
-                    # If outfile is set, output_handle will be a single file
-                    # for all groups. If not, it will represent an individual
-                    # group file
-                    try:
-                        if not outfile:
-                            tx_name = vals[0].split("|")[0]
-                            output_handle.write(">{}\n{}\n".format(tx_name,
-                                                                   vals[1]))
-                            map_handle.write("{}; {}\n".format(vals[0],
-                                                               tx_name))
-                        else:
-                            output_handle.write(">{}\n{}\n".format(vals[0],
-                                                                   vals[1]))
-                    except TypeError:
-                        pass
-
-                if not outfile:
-                    output_handle.close()
+
+                    with open(oname + ".fas", "w") as fh:
+                        fh.write("".join(">{}\n{}\n".format(
+                            x.split("|")[0], y) for x, y in records))
+
+                    with open(mname + "_headerMap.csv", "w") as fh:
+                        fh.write("".join("{}; {}\n".format(
+                            x, x.split("|")[0]) for x, _ in records))
 
         if outfile:
             output_handle.close()
 
-        con.close()
+        protein_index.close()
 
     def export_filtered_group(self, output_file_name="filtered_groups",
                                  dest="./", shared_namespace=None):
@@ -559,8 +529,8 @@ class GroupLight(object):
 
         output_handle = open(os.path.join(dest, output_file_name), "w")
 
-        for p, (line, cl) in enumerate(zip(self.groups(),
-                                           self.iter_species_frequency())):
+        for p, (line, compliant) in enumerate(zip(self.groups(),
+                                                  self.compliance_mask())):
 
             if shared_namespace:
                 if shared_namespace.stop:
@@ -569,7 +539,7 @@ class GroupLight(object):
             if shared_namespace:
                 shared_namespace.progress = p
 
-            if self._get_compliance(cl) == (1, 1):
+            if compliant:
                 if shared_namespace:
                     shared_namespace.good += 1
                 if self.excluded_taxa:
@@ -580,24 +550,69 @@ class GroupLight(object):
 
         output_handle.close()
 
-    def bar_species_distribution(self, filt=False):
+    def _distribution(self, filt, copies=False):
+        """
+        Returns the sorted values and frequencies of the number of taxa (or
+        of the maximum number of gene copies) of the clusters
+        :param filt: Boolean, whether or not to use the filtered groups.
+        When False, excluded taxa are also taken into account
+        :param copies: Boolean, if True, the maximum number of gene copies
+        is used instead of the number of taxa
+        """
 
         if filt:
-            data = Counter((len(cl) for cl in self.iter_species_frequency() if
-                           self._get_compliance(cl) == (1, 1)))
+            taxa_counts, copy_counts = self._cluster_counts()
+            mask = self.compliance_mask()
+        else:
+            taxa_counts, copy_counts = self._cluster_counts([])
+            mask = taxa_counts > 0
+
+        vals = copy_counts if copies else taxa_counts
+        x_labels, data = np.unique(vals[mask], return_counts=True)
+
+        return x_labels.tolist(), data.tolist()
+
+    def _taxa_totals(self, filt, min_copies):
+        """
+        Returns the taxa and the number of clusters (or of gene copies) of
+        each taxon, sorted by decreasing number. Taxa with no clusters are
+        not returned.
+        :param filt: Boolean, whether or not to use the filtered groups.
+        :param min_copies: int. If 1, the number of clusters where each
+        taxon is present is returned. If larger, the sum of the gene copies
+        of each taxon is returned, only for clusters with at least
+        min_copies copies of the taxon
+        """
+
+        if filt:
+            mask = self.compliance_mask()
+        else:
+            mask = self._filter_masks()[0]
+
+        cols = [i for i, x in enumerate(self.taxa)
+                if x not in self.excluded_taxa]
+        mat = self.counts[np.flatnonzero(mask)][:, cols]
+
+        if min_copies == 1:
+            totals = mat.getnnz(axis=0)
         else:
-            data = Counter((len(cl) for cl in self.species_frequency))
+            mat.data[mat.data < min_copies] = 0
+            totals = np.asarray(mat.sum(axis=0)).ravel()
 
-        x_labels = [x for x in list(data)]
-        data = list(data.values())
+        order = sorted((i for i in xrange(len(cols)) if totals[i] > 0),
+                       key=lambda i: -totals[i])
+
+        return [self.taxa[cols[i]] for i in order], \
+            [int(totals[i]) for i in order]
+
+    def bar_species_distribution(self, filt=False):
+
+        x_labels, data = self._distribution(filt)
 
         # When data is empty, return an exception
         if not data:
             return {"data": None}
 
-        # Sort lists
-        x_labels = [list(x) for x in zip(*sorted(zip(x_labels, data)))][0]
-
         # Convert label to strings
         x_labels = [str(x) for x in x_labels]
 
@@ -618,23 +633,12 @@ class GroupLight(object):
         :param filt: Boolean, whether or not to use the filtered groups.
         """
 
-        if filt:
-            data = Counter((max(cl.values()) for cl in
-                            self.iter_species_frequency() if
-                            self._get_compliance(cl) == (1, 1)))
-        else:
-            data = Counter((max(cl.values()) for cl in self.species_frequency
-                           if cl))
-
-        x_labels = [x for x in list(data)]
-        data = list(data.values())
+        x_labels, data = self._distribution(filt, copies=True)
 
         # When data is empty, return an exception
         if not data:
             return {"data": None}
 
-        x_labels, data = (list(x) for x in zip(*sorted(zip(x_labels, data))))
-
         # Convert label to strings
         x_labels = [str(x) for x in x_labels]
 
@@ -654,29 +658,17 @@ class GroupLight(object):
         :return:
         """
 
-        data = Counter(dict((x, 0) for x in self.species_list))
-
-        self._reset_counter()
-
-        for cl in self.iter_species_frequency():
-
-            self._apply_filter(cl)
-            if filt:
-                data += Counter(dict((x, 1) for x, y in cl.items() if y > 0 and
-                           self._get_compliance(cl) == (1, 1)))
-            else:
-                data += Counter(dict((x, 1) for x, y in cl.items() if y > 0))
+        self._update_stats()
 
-        data = data.most_common()
+        x_labels, data = self._taxa_totals(filt, 1)
 
         # When data is empty, return an exception
         if not data:
             return {"data": None}
 
-        x_labels = [str(x[0]) for x in data]
-        data = [[x[1] for x in data], [self.all_clusters - x[1] if not
-                                      filt else self.all_compliant - x[1]
-                                      for x in data]]
+        x_labels = [str(x) for x in x_labels]
+        data = [data, [self.all_clusters - x if not filt else
+                       self.all_compliant - x for x in data]]
 
         lgd_list = ["Available data", "Missing data"]
         ax_names = [None, "Ortholog frequency"]
@@ -688,27 +680,16 @@ class GroupLight(object):
 
     def bar_genecopy_per_species(self, filt=False):
 
-        data = Counter(dict((x, 0) for x in self.species_list))
-
-        self._reset_counter()
-
-        for cl in self.iter_species_frequency():
+        self._update_stats()
 
-            self._apply_filter(cl)
-            if filt:
-                data += Counter(dict((x, y) for x, y in cl.items() if y > 1 and
-                           self._get_compliance(cl) == (1, 1)))
-            else:
-                data += Counter(dict((x, y) for x, y in cl.items() if y > 1))
-
-        data = data.most_common()
+        x_labels, data = self._taxa_totals(filt, 2)
 
         # When data is empty, return an exception
         if not data:
             return {"data": None}
 
-        x_labels = [str(x[0]) for x in data]
-        data = [[x[1] for x in data]]
+        x_labels = [str(x) for x in x_labels]
+        data = [data]
         ax_names = [None, "Gene copies"]
 
         return {"data": data,
@@ -1480,8 +1461,13 @@ class MultiGroups(object):
 class MultiGroupsLight(object):
     """
     Creates an object composed of multiple Group objects like MultiGroups.
-    However, instead of storing the groups in memory, these are shelved in
-    the disk
+    However, instead of storing the groups in memory, these are stored in a
+    single sqlite database in the disk (see _connect). The counts matrix of
+    each group is stored as three arrays that are only written when the
+    group is added, while the remaining attributes (filters, excluded taxa
+    and statistics) are stored separately, so that updating the filters
+    does not serialize the whole group. Groups are only loaded when they
+    are retrieved.
     """
 
     # The report calls available
@@ -1500,12 +1486,19 @@ class MultiGroupsLight(object):
         """
 
         self.db_path = db_path
+        self.db_file = os.path.join(db_path, "groups.db")
+
+        # Identifier of the rows of this object in the database, which may be
+        # shared by several objects (e.g. groups loaded at different times)
+        self.owner = "".join(random.choice(string.ascii_uppercase) for _ in
+                             range(15))
 
         # If a MultiGroups is initialized with duplicate Group objects, their
         # names will be stored in a list. If all Group objects are unique, the
         # list will remain empty
         self.duplicate_groups = []
 
+        # Maps the name of each group to its row in the database
         self.groups = {}
 
         self.groups_stats = {}
@@ -1566,16 +1559,125 @@ class MultiGroupsLight(object):
                     self.add_group(group_object)
 
     def __iter__(self):
-        for k, val in self.groups.items():
-            yield k, pickle.load(open(val, "rb"))
+        for k in self.groups.keys():
+            yield k, self.get_group(k)
+
+    def _connect(self):
+        """
+        Returns a connection to the groups database, which is created if
+        necessary. Connections are not kept as attributes, so that the
+        object can be passed between processes
+        """
+
+        con = sqlite3.connect(self.db_file, timeout=30)
+        con.execute("CREATE TABLE IF NOT EXISTS groups("
+                    "id INTEGER PRIMARY KEY,"
+                    "owner TEXT,"
+                    "state BLOB,"
+                    "n_rows INT,"
+                    "n_cols INT,"
+                    "indptr BLOB,"
+                    "indices BLOB,"
+                    "data BLOB,"
+                    "cache BLOB)")
+
+        return con
+
+    @staticmethod
+    def _group_state(group_obj):
+        """
+        Returns the serialized attributes of a group object, except the
+        counts matrix and the cluster cache, which are stored as arrays
+        :param group_obj: GroupLight object
+        """
+
+        state = dict((k, v) for k, v in group_obj.__dict__.items()
+                     if k not in ("counts", "_cluster_cache"))
+
+        return sqlite3.Binary(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _cache_state(group_obj):
+        """
+        Returns the cluster cache of a group object, with the taxa and
+        copy counts arrays as raw bytes, or None if it is not set
+        :param group_obj: GroupLight object
+        """
+
+        if not group_obj._cluster_cache:
+            return None
+
+        key, taxa_counts, copy_counts = group_obj._cluster_cache
+
+        return sqlite3.Binary(pickle.dumps(
+            (key, taxa_counts.astype(np.int32).tostring(),
+             copy_counts.astype(np.int32).tostring()),
+            pickle.HIGHEST_PROTOCOL))
+
+    def _save_state(self, con, group_obj, cache=True):
+        """
+        Updates the attributes of a group object in the database, without
+        writing its counts matrix
+        :param con: sqlite3 connection
+        :param group_obj: GroupLight object
+        :param cache: Boolean. Whether the cluster cache is also written
+        """
+
+        if cache:
+            con.execute("UPDATE groups SET state=?, cache=? WHERE id=?",
+                        (self._group_state(group_obj),
+                         self._cache_state(group_obj),
+                         self.groups[group_obj.name]))
+        else:
+            con.execute("UPDATE groups SET state=? WHERE id=?",
+                        (self._group_state(group_obj),
+                         self.groups[group_obj.name]))
+
+    def _load_group(self, con, row_id):
+        """
+        Creates a group object from its row in the database. The arrays of
+        the counts matrix are read directly from the stored bytes
+        :param con: sqlite3 connection
+        :param row_id: int, id of the row
+        """
+
+        row = con.execute("SELECT state, n_rows, n_cols, indptr, indices, "
+                          "data, cache FROM groups WHERE id=?",
+                          (row_id,)).fetchone()
+
+        state, n_rows, n_cols, indptr, indices, data, cache = row
+
+        group_obj = GroupLight.__new__(GroupLight)
+        group_obj.__dict__.update(pickle.loads(str(state)))
+
+        group_obj.counts = csr_matrix(
+            (np.frombuffer(data, dtype=np.int32),
+             np.frombuffer(indices, dtype=np.int32),
+             np.frombuffer(indptr, dtype=np.int32)),
+            shape=(n_rows, n_cols))
+
+        if cache is not None:
+            key, taxa_counts, copy_counts = pickle.loads(str(cache))
+            group_obj._cluster_cache = (
+                key, np.frombuffer(taxa_counts, dtype=np.int32),
+                np.frombuffer(copy_counts, dtype=np.int32))
+        else:
+            group_obj._cluster_cache = None
+
+        return group_obj
 
     def clear_groups(self):
         """
         Clears the current MultiGroupsLight object
         """
 
-        for f in self.groups.values():
-            os.remove(f)
+        con = self._connect()
+        try:
+            with con:
+                con.execute("DELETE FROM groups WHERE owner=?",
+                            (self.owner,))
+        finally:
+            con.close()
 
         self.duplicate_groups = []
         self.groups = {}
@@ -1593,11 +1695,28 @@ class MultiGroupsLight(object):
 
         # Check for duplicate groups
         if group_obj.name not in self.groups:
-            gpath = os.path.join(self.db_path,
-                    "".join(random.choice(string.ascii_uppercase) for _ in
-                            range(15)))
-            pickle.dump(group_obj, open(gpath, "wb"))
-            self.groups[group_obj.name] = gpath
+            counts = group_obj.counts
+
+            con = self._connect()
+            try:
+                with con:
+                    cur = con.execute(
+                        "INSERT INTO groups(owner, state, n_rows, n_cols, "
+                        "indptr, indices, data, cache) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (self.owner, self._group_state(group_obj),
+                         counts.shape[0], counts.shape[1],
+                         sqlite3.Binary(
+                             counts.indptr.astype(np.int32).tostring()),
+                         sqlite3.Binary(
+                             counts.indices.astype(np.int32).tostring()),
+                         sqlite3.Binary(
+                             counts.data.astype(np.int32).tostring()),
+                         self._cache_state(group_obj)))
+            finally:
+                con.close()
+
+            self.groups[group_obj.name] = cur.lastrowid
             self.filters[group_obj.name] = (1, len(group_obj.species_list), [])
             self.max_extra_copy[group_obj.name] = group_obj.max_extra_copy
             if len(group_obj.species_list) not in self.species_number:
@@ -1612,7 +1731,13 @@ class MultiGroupsLight(object):
         """
 
         if group_id in self.groups:
-            os.remove(self.groups[group_id])
+            con = self._connect()
+            try:
+                with con:
+                    con.execute("DELETE FROM groups WHERE id=?",
+                                (self.groups[group_id],))
+            finally:
+                con.close()
             del self.groups[group_id]
 
     def get_group(self, group_id):
@@ -1623,10 +1748,16 @@ class MultiGroupsLight(object):
         """
 
         try:
-            return pickle.load(open(self.groups[unicode(group_id)], "rb"))
+            row_id = self.groups[unicode(group_id)]
         except KeyError:
             return
 
+        con = self._connect()
+        try:
+            return self._load_group(con, row_id)
+        finally:
+            con.close()
+
     def add_multigroups(self, multigroup_obj):
         """
         Merges a MultiGroup object
@@ -1657,35 +1788,49 @@ class MultiGroupsLight(object):
         else:
             glist = self.groups
 
-        for group_name in glist:
-            # Get group object
-            group_obj = pickle.load(open(self.groups[group_name], "rb"))
+        con = self._connect()
 
-            # Define excluded taxa
-            group_obj.exclude_taxa(excluded_taxa, True)
+        try:
+            for group_name in glist:
+                # Get group object
+                group_obj = self._load_group(con, self.groups[group_name])
+                cluster_cache = group_obj._cluster_cache
 
-            # Define filters
-            gn_filter = gn_filter if not default else 1
-            sp_filter = sp_filter if not default else \
-                len(group_obj.species_list)
+                # Define excluded taxa
+                group_obj.exclude_taxa(excluded_taxa, True)
 
-            # Correct maximum filter values after excluding taxa
-            gn_filter = gn_filter if gn_filter <= group_obj.max_extra_copy \
-                else group_obj.max_extra_copy
-            sp_filter = sp_filter if sp_filter <= len(group_obj.species_list) \
-                else len(group_obj.species_list)
+                # Define filters
+                gn_filter = gn_filter if not default else 1
+                sp_filter = sp_filter if not default else \
+                    len(group_obj.species_list)
+
+                # Correct maximum filter values after excluding taxa
+                gn_filter = gn_filter if \
+                    gn_filter <= group_obj.max_extra_copy \
+                    else group_obj.max_extra_copy
+                sp_filter = sp_filter if \
+                    sp_filter <= len(group_obj.species_list) \
+                    else len(group_obj.species_list)
+
+                # Update Group object with new filters
+                group_obj.update_filters(gn_filter, sp_filter)
+                # Update group stats
 
-            # Update Group object with new filters
-            group_obj.update_filters(gn_filter, sp_filter)
-            # Update group stats
+                self.get_multigroup_statistics(group_obj)
+                # The cluster cache only changes with the excluded taxa
+                self._save_state(
+                    con, group_obj,
+                    group_obj._cluster_cache is not cluster_cache)
+                # Update filter map
 
-            self.get_multigroup_statistics(group_obj)
-            pickle.dump(group_obj, open(self.groups[group_name], "wb"))
-            # Update filter map
+                self.filters[group_name] = (gn_filter,
+                                            group_obj.species_threshold)
+                self.taxa_list[group_name] = group_obj.species_list
+                self.excluded_taxa[group_name] = group_obj.excluded_taxa
 
-            self.filters[group_name] = (gn_filter, group_obj.species_threshold)
-            self.taxa_list[group_name] = group_obj.species_list
-            self.excluded_taxa[group_name] = group_obj.excluded_taxa
+            con.commit()
+        finally:
+            con.close()
 
     def get_multigroup_statistics(self, group_obj):
         """
@@ -0,0 +1,235 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+"""
+This module provides random access to the sequences of a fasta file (e.g.
+the goodProteins database) through an offset index in the FAIDX format of
+samtools. The index is stored in a `.fai` file next to the fasta file, with
+one line per sequence and the tab separated columns:
+
+    name, sequence length, offset of the first residue, residues per line,
+    bytes per line
+
+The index is built in a single pass over the fasta file, and is only built
+again when the fasta file is modified. Unlike samtools, the name of each
+sequence is the complete header line (which is how sequences are referred
+to in the group files), and sequences whose lines have different lengths
+are also indexed, as a single line with all the bytes of the sequence.
+"""
+
+try:
+    from process.error_handling import KillByUser
+except ImportError:
+    from trifusion.process.error_handling import KillByUser
+
+import os
+import mmap
+from operator import itemgetter
+
+
+def build_fai(fasta_file, fai_file, shared_namespace=None):
+    """
+    Builds the FAIDX index of a fasta file
+
+    :param fasta_file: string, path to the fasta file
+    :param fai_file: string, path to the index file. If None, the index is
+    only returned
+    :param shared_namespace: Namespace object, for progress information
+    :return: dict, with the sequence names as keys and (offset, length,
+    line bases, line width) tuples as values
+    """
+
+    index = {}
+    # Index lines in file order
+    records = []
+
+    if shared_namespace:
+        shared_namespace.total = shared_namespace.max_pb = \
+            os.path.getsize(fasta_file)
+
+    def add_record(name, offset, length, lines):
+
+        if name is None or name in index:
+            return
+
+        # Lines of the sequence, without the last one, must have the same
+        # length as the first one
+        if lines and all(x == lines[0] for x in lines[1:-1]) and \
+                lines[-1][0] <= lines[0][0] and \
+                (len(lines) == 1 or lines[-1][0] > 0):
+            line_bases, line_width = lines[0]
+        else:
+            line_bases = length
+            line_width = sum(x[1] for x in lines)
+
+        index[name] = (offset, length, line_bases, line_width)
+        records.append((name, length, offset, line_bases, line_width))
+
+    with open(fasta_file, "rb") as fh:
+
+        name = None
+        offset = pos = length = 0
+        lines = []
+
+        for line in fh:
+
+            if line.startswith(">"):
+                add_record(name, offset, length, lines)
+
+                name = line[1:].strip()
+                offset = pos + len(line)
+                length = 0
+                lines = []
+
+                if shared_namespace and len(index) % 1000 == 0:
+                    if shared_namespace.stop:
+                        raise KillByUser("")
+                    shared_namespace.progress = shared_namespace.counter = pos
+
+            elif name is not None:
+                bases = len(line.rstrip("\r\n"))
+                lines.append((bases, len(line)))
+                length += bases
+
+            pos += len(line)
+
+        add_record(name, offset, length, lines)
+
+    if fai_file:
+        tmp_file = fai_file + ".tmp"
+        with open(tmp_file, "w") as fh:
+            fh.write("".join("{}\t{}\t{}\t{}\t{}\n".format(*x)
+                             for x in records))
+
+        if os.name == "nt" and os.path.exists(fai_file):
+            os.remove(fai_file)
+        os.rename(tmp_file, fai_file)
+
+    return index
+
+
+def read_fai(fai_file):
+    """
+    Reads a FAIDX index file
+
+    :param fai_file: string, path to the index file
+    :return: dict, with the same format as the one returned by build_fai
+    """
+
+    index = {}
+
+    with open(fai_file) as fh:
+        for line in fh:
+            name, length, offset, line_bases, line_width = \
+                line.rstrip("\n").split("\t")
+            index[name] = (int(offset), int(length), int(line_bases),
+                           int(line_width))
+
+    return index
+
+
+class FastaIndex(object):
+    """
+    Random access to the sequences of a fasta file, using its FAIDX index.
+    The fasta file is memory mapped, so that each sequence is retrieved
+    with a single slice
+
+    :param fasta_file: string, path to the fasta file
+    :param fai_file: string, path to the index file
+    :param index: dict, with the sequence names as keys and (offset,
+    length, line bases, line width) tuples as values
+    """
+
+    def __init__(self, fasta_file, shared_namespace=None):
+        """
+        :param fasta_file: string, path to the fasta file
+        :param shared_namespace: Namespace object, for progress information
+        while the index is built
+        """
+
+        self.fasta_file = fasta_file
+        self.fai_file = fasta_file + ".fai"
+
+        if os.path.exists(self.fai_file) and \
+                os.path.getmtime(self.fai_file) >= \
+                os.path.getmtime(fasta_file):
+            self.index = read_fai(self.fai_file)
+        else:
+            try:
+                self.index = build_fai(fasta_file, self.fai_file,
+                                       shared_namespace)
+            # The index is kept in memory when it cannot be written
+            except (IOError, OSError):
+                self.index = build_fai(fasta_file, None, shared_namespace)
+
+        self._fh = open(fasta_file, "rb")
+
+        # Empty files cannot be mapped
+        if os.path.getsize(fasta_file):
+            self._data = mmap.mmap(self._fh.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        else:
+            self._data = ""
+
+    def __contains__(self, name):
+
+        return name in self.index
+
+    def fetch(self, names):
+        """
+        Retrieves the sequences of a batch of names. Sequences are read in
+        the order of the fasta file
+
+        :param names: list, sequence names
+        :return: list, with the sequence of each name, or None for names
+        that are not in the index
+        """
+
+        seqs = [None] * len(names)
+
+        entries = sorted(((self.index[x], i) for i, x in enumerate(names)
+                          if x in self.index), key=itemgetter(0))
+
+        for (offset, length, line_bases, line_width), i in entries:
+
+            if line_bases:
+                nbytes = length // line_bases * line_width + \
+                    length % line_bases
+            else:
+                nbytes = 0
+
+            seq = self._data[offset:offset + nbytes]
+
+            if line_width != line_bases:
+                seq = seq.replace("\n", "").replace("\r", "")
+
+            seqs[i] = seq
+
+        return seqs
+
+    def close(self):
+
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._fh.close()
+
+
+__author__ = "Diogo N. Silva"
@@ -3,17 +3,41 @@
 
 import os
 import sqlite3 as lite
+from collections import deque
 from decimal import Decimal
+from multiprocessing import Pool
 
 try:
     from process.error_handling import KillByUser
+    from ortho.orthomclInstallSchema import createSimilarSequencesIndexes, \
+        has_integer_ids
 except ImportError:
     from trifusion.process.error_handling import KillByUser
+    from trifusion.ortho.orthomclInstallSchema import \
+        createSimilarSequencesIndexes, has_integer_ids
 
 
 VAR_LENGTH = 0
 VAR_TAXON = 1
-cur = None
+
+# Number of SimilarSequences rows inserted in each transaction
+insert_batch_size = 100000
+
+# Approximate size (in bytes) of the shards of the BLAST file that are
+# parsed independently. Progress information and user interruptions are
+# checked once per shard
+shard_size = 1 << 24
+
+# Number of shards queued or parsed per worker process. Limits the number
+# of parsed shards held in memory when the insertion of the rows is slower
+# than the parsing
+shards_per_job = 2
+
+# Genes of the fasta files and integer codes of the gene and taxon names
+# (when the database uses integer ids), shared by the worker processes
+# that parse the shards of the BLAST file
+_genes = None
+_ids = None
 
 """
 Read all fasta files from a folder, placing the genes present on those fasta
@@ -93,7 +117,7 @@ def get_taxon_and_length(subject, genes):
     return subject["queryLength"] < subject["subjectLength"]
 
 
-def print_previous_subject(subject, db):
+def similar_sequence_row(subject):
 
     non_overlap = non_overlapping_match(subject)
 
@@ -107,15 +131,23 @@ def print_previous_subject(subject, db):
     percent_match = '{0:.3g}'.format((float(non_overlap) /
                                       float(shorter_length) * 1000 + .5) / 10)
 
-    db.execute("INSERT OR IGNORE INTO SimilarSequences VALUES(?, ?, ?, ?, ?, ? ,?, ?)",
-                [subject["queryId"],
-                subject["subjectId"],
-                subject["queryTaxon"],
-                subject["subjectTaxon"],
-                float(subject["evalueMant"]),
-                int(subject["evalueExp"]),
-                float(percent_ident),
-                float(percent_match)])
+    return (subject["queryId"],
+            subject["subjectId"],
+            subject["queryTaxon"],
+            subject["subjectTaxon"],
+            float(subject["evalueMant"]),
+            int(subject["evalueExp"]),
+            float(percent_ident),
+            float(percent_match))
+
+
+def insert_batch(batch, db):
+
+    db.execute("BEGIN")
+    db.executemany("INSERT OR IGNORE INTO SimilarSequences "
+                   "VALUES(?, ?, ?, ?, ?, ? ,?, ?)",
+                   batch)
+    db.execute("COMMIT")
     
 
 def format_evalue(evalue):
@@ -172,87 +204,269 @@ def get_start_end(h):
     return start, end
 
 
-def orthomcl_blast_parser(blast_file, fasta_dir, db_dir, nm):
+def encode_ids(genes, db):
+    """
+    Stores the integer codes of the gene and taxon names in the SequenceIds
+    and TaxonIds tables. Codes are assigned in the sorted order of the
+    names
+
+    :param genes: dict, genes returned by get_genes
+    :param db: sqlite cursor
+    :return: tuple, with the dictionaries of gene and taxon codes
+    """
+
+    seq_ids = dict((x, i) for i, x in enumerate(sorted(genes)))
+    taxon_ids = dict((x, i) for i, x in enumerate(
+        sorted(set(x[VAR_TAXON] for x in genes.itervalues()))))
+
+    db.execute("BEGIN")
+    db.execute("DELETE FROM SequenceIds")
+    db.execute("DELETE FROM TaxonIds")
+    db.executemany("INSERT INTO SequenceIds VALUES(?, ?)",
+                   ((i, x) for x, i in seq_ids.iteritems()))
+    db.executemany("INSERT INTO TaxonIds VALUES(?, ?)",
+                   ((i, x) for x, i in taxon_ids.iteritems()))
+    db.execute("COMMIT")
+
+    return seq_ids, taxon_ids
+
+
+def get_shards(blast_file, size):
+    """
+    Splits the BLAST file into byte ranges of approximately `size` bytes.
+    Since the BLAST output is grouped by query, each range ends at the
+    start of a new query, so that all HSPs of a query/subject pair are in
+    the same range. As in parse_shard, the query id is the first
+    whitespace delimited field of each line (tabular BLAST output).
+
+    :param blast_file: string, path to the BLAST file
+    :param size: int, approximate size of each range
+    :return: list of (start, end) tuples
+    """
+
+    total = os.path.getsize(blast_file)
+    shards = []
+    start = 0
+
+    with open(blast_file, "rb") as fh:
+        while start < total:
+
+            end = start + size
+            if end >= total:
+                shards.append((start, total))
+                break
+
+            # Move to the start of the next complete line
+            fh.seek(end - 1)
+            fh.readline()
+            end = fh.tell()
+            line = fh.readline()
+            query_id = line.split(None, 1)[:1]
+
+            # Move to the first line of a different query
+            while line and line.split(None, 1)[:1] == query_id:
+                end = fh.tell()
+                line = fh.readline()
+
+            shards.append((start, end))
+            start = end
+
+    return shards
+
+
+def _init_worker(genes, ids=None):
+
+    global _genes, _ids
+    _genes = genes
+    _ids = ids
+
 
-    # create connection to DB
-    con = lite.connect(os.path.join(db_dir, "orthoDB.db"))
-    with con:
-        #global cur
+def parse_shard(args):
+    """
+    Parses a range of the BLAST file, returning the SimilarSequences rows
+    of each query/subject pair, in the order of the file. Uses the genes
+    set by _init_worker
+
+    :param args: tuple, with the path to the BLAST file and the start and
+    end of the range
+    :return: list of rows, with integer codes instead of names when _ids is
+    set
+    """
+
+    blast_file, start, end = args
+
+    with open(blast_file, "rb") as fh:
+        fh.seek(start)
+        lines = fh.read(end - start).splitlines()
+
+    prev_subjectid = ''
+    prev_queryid = ''
+    # hash to hold subject info
+    subject = {}
+    rows = []
+
+    for line in lines:
+
+        splitted = line.split()
+
+        # ignore empty lines
+        if not splitted:
+            continue
+
+        query_id = splitted[0]
+        subject_id = splitted[1]
+        percent_identity = splitted[2]
+        length = int(splitted[3])
+        query_start = splitted[6]
+        query_end = splitted[7]
+        subject_start = splitted[8]
+        subject_end = splitted[9]
+        evalue = splitted[10]
+
+        if query_id != prev_queryid or subject_id != prev_subjectid:
+
+            # store previous subject
+            if subject:
+                rows.append(similar_sequence_row(subject))
+
+            # initialize new one from first HSP
+            prev_subjectid = subject_id
+            prev_queryid = query_id
+
+            # from first hsp
+            tup = format_evalue(evalue)
+
+            subject = {"queryId": query_id}
+            subject["subjectId"] = subject_id
+            subject["queryShorter"] = get_taxon_and_length(subject, _genes)
+
+            subject["evalueMant"] = tup[0]
+            subject["evalueExp"] = tup[1]
+            subject["totalIdentities"] = 0
+            subject["totalLength"] = 0
+            subject["hspspans"] = []
+
+        # get additional info from subsequent HSPs
+        hspspan = (subject_start, subject_end)
+        if subject and subject["queryShorter"]:
+            hspspan = (query_start, query_end)
+        subject["hspspans"].append(hspspan)
+        subject["totalIdentities"] += float(percent_identity) * length
+        subject["totalLength"] += length
+
+    if subject:
+        rows.append(similar_sequence_row(subject))
+
+    if _ids:
+        seq_ids, taxon_ids = _ids
+        rows = [(seq_ids[x[0]], seq_ids[x[1]],
+                 taxon_ids[x[2]], taxon_ids[x[3]]) + x[4:] for x in rows]
+
+    return rows
+
+
+def imap_bounded(pool, func, iterable, size):
+    """
+    Ordered equivalent of pool.imap that keeps at most `size` tasks queued
+    or running in the pool. New tasks are only submitted as the results
+    are consumed, so that the results do not pile up in memory
+
+    :param pool: multiprocessing.Pool object
+    :param func: function applied to each element of iterable
+    :param iterable: iterable with the arguments of func
+    :param size: int, maximum number of tasks in flight
+    :return: generator of the results, in the order of iterable
+    """
+
+    pending = deque()
+
+    for args in iterable:
+        if len(pending) >= size:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (args,)))
+
+    while pending:
+        yield pending.popleft().get()
+
+
+def orthomcl_blast_parser(blast_file, fasta_dir, db_dir, nm, jobs=1):
+
+    # create connection to DB. Transactions are managed explicitly, with
+    # one transaction per batch of rows
+    con = lite.connect(os.path.join(db_dir, "orthoDB.db"),
+                       isolation_level=None)
+    pool = None
+    try:
         cur = con.cursor()
+        cur.execute("PRAGMA SYNCHRONOUS = OFF")
+
+        # The indexes of SimilarSequences are built after the load
+        cur.execute("DROP INDEX IF EXISTS ss_qtaxexp_ix")
+        cur.execute("DROP INDEX IF EXISTS ss_seqs_ix")
 
-        prev_subjectid = ''
-        prev_queryid = ''
-        # hash to hold subject info
-        subject = {}
+        # rows waiting to be inserted
+        batch = []
 
-        # Set progress information
+        # Set progress information. Progress is measured in bytes read
+        # from the BLAST file, so that it does not need to be read twice
         if nm:
             if nm.stop:
                 raise KillByUser("")
-            total = 0
-            for total, _ in enumerate(open(blast_file)):
-                pass
-            nm.total = total
+            nm.total = os.path.getsize(blast_file)
             nm.msg = None
             nm.counter = 0
 
         # parse fasta files
         genes = get_genes(fasta_dir)
-        blast_fh = open(blast_file, "r")
 
-        for line in blast_fh:
+        # With integer ids, the names of genes and taxa are encoded
+        # before the rows are inserted
+        ids = encode_ids(genes, cur) if has_integer_ids(cur) else None
+
+        shards = get_shards(blast_file, shard_size)
+        shard_args = [(blast_file, start, end) for start, end in shards]
+
+        # With multiple jobs, the shards are parsed by a pool of worker
+        # processes. The rows are retrieved in the order of the file and
+        # inserted by this process only. The number of shards in flight is
+        # bounded, so memory usage does not depend on the size of the file
+        if jobs > 1 and len(shards) > 1:
+            pool = Pool(jobs, initializer=_init_worker,
+                        initargs=(genes, ids))
+            rows_iter = imap_bounded(pool, parse_shard, shard_args,
+                                     jobs * shards_per_job)
+        else:
+            _init_worker(genes, ids)
+            rows_iter = (parse_shard(x) for x in shard_args)
+
+        for (start, end), rows in zip(shards, rows_iter):
 
             if nm:
                 if nm.stop:
                     raise KillByUser("")
-                nm.counter += 1
-
-            splitted = line.split()
-
-            query_id = splitted[0]
-            subject_id = splitted[1]
-            percent_identity = splitted[2]
-            length = int(splitted[3])
-            query_start = splitted[6]
-            query_end = splitted[7]
-            subject_start = splitted[8]
-            subject_end = splitted[9]
-            evalue = splitted[10]
-
-            if query_id != prev_queryid or subject_id != prev_subjectid:
-
-                # print previous subject
-                if subject:
-                    print_previous_subject(subject, cur)
-
-                # initialize new one from first HSP
-                prev_subjectid = subject_id
-                prev_queryid = query_id
-
-                # from first hsp
-                tup = format_evalue(evalue)
-
-                subject = {"queryId": query_id}
-                subject["subjectId"] = subject_id
-                subject["queryShorter"] = get_taxon_and_length(subject, genes)
-
-                subject["evalueMant"] = tup[0]
-                subject["evalueExp"] = tup[1]
-                subject["totalIdentities"] = 0
-                subject["totalLength"] = 0
-                subject["hspspans"] = []
-
-            # get additional info from subsequent HSPs
-            hspspan = (subject_start, subject_end)
-            if subject and subject["queryShorter"]:
-                hspspan = (query_start, query_end)
-            subject["hspspans"].append(hspspan)
-            subject["totalIdentities"] += float(percent_identity) * length
-            subject["totalLength"] += length
-
-        print_previous_subject(subject, cur)
-
-    con.close()
+                nm.counter = end
+
+            batch.extend(rows)
+
+            if len(batch) >= insert_batch_size:
+                insert_batch(batch, cur)
+                batch = []
+
+        insert_batch(batch, cur)
+
+        if nm:
+            nm.msg = "Building indexes"
+
+        cur.execute("BEGIN")
+        createSimilarSequencesIndexes(cur)
+        cur.execute("COMMIT")
+
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+        _init_worker(None)
+        con.close()
 
 
 # if __name__ == "__main__":
@@ -6,11 +6,27 @@ import os
 
 try:
     from process.error_handling import KillByUser
+    from ortho.orthomclInstallSchema import has_integer_ids
 except ImportError:
     from trifusion.process.error_handling import KillByUser
+    from trifusion.ortho.orthomclInstallSchema import has_integer_ids
 
 
-def printInparalogsFile (cur, filename, nm=None):
+def get_sequence_names(cur):
+    """
+    Returns the list of sequence names of a database with integer ids,
+    where the code of each name is its index
+
+    :param cur: sqlite cursor
+    :return: list of names
+    """
+
+    cur.execute("select name from SequenceIds order by id")
+
+    return [x[0] for x in cur]
+
+
+def printInparalogsFile (cur, filename, nm=None, seq_names=None):
 
     cur.execute("select taxon_id, sequence_id_a, sequence_id_b, normalized_score\
         from InParalog\
@@ -29,6 +45,9 @@ def printInparalogsFile (cur, filename, nm=None):
             if row is None:
                 break
 
+            if seq_names:
+                row = (row[0], seq_names[row[1]], seq_names[row[2]], row[3])
+
             file_fh.write("{}\t{}\t{}\n".format(row[1],
                                                 row[2],
                                                 str((float(row[3]) * 1000 + .5) / 1000)))
@@ -37,7 +56,7 @@ def printInparalogsFile (cur, filename, nm=None):
 ################################################################
 
 
-def printOrthologsFile (cur, filename, nm=None):
+def printOrthologsFile (cur, filename, nm=None, seq_names=None):
 
     cur.execute("select taxon_id_a, taxon_id_b, sequence_id_a, sequence_id_b, normalized_score\
         from Ortholog\
@@ -56,6 +75,9 @@ def printOrthologsFile (cur, filename, nm=None):
             if row is None:
                 break
 
+            if seq_names:
+                row = row[:2] + (seq_names[row[2]], seq_names[row[3]], row[4])
+
             file_fh.write("{}\t{}\t{}\n".format(row[2],
                                                 row[3],
                                                 str((float(row[4]) * 1000 + .5) / 1000)))
@@ -63,7 +85,7 @@ def printOrthologsFile (cur, filename, nm=None):
 ################################################################
 
 
-def printCoOrthologsFile (cur, filename, nm=None):
+def printCoOrthologsFile (cur, filename, nm=None, seq_names=None):
 
     cur.execute("select taxon_id_a, taxon_id_b, sequence_id_a, sequence_id_b, normalized_score\
         from CoOrtholog\
@@ -82,6 +104,9 @@ def printCoOrthologsFile (cur, filename, nm=None):
             if row is None:
                 break
 
+            if seq_names:
+                row = row[:2] + (seq_names[row[2]], seq_names[row[3]], row[4])
+
             file_fh.write("{}\t{}\t{}\n".format(row[2],
                                                 row[3],
                                                 str((float(row[4]) * 1000 + .5) / 1000)))
@@ -89,7 +114,7 @@ def printCoOrthologsFile (cur, filename, nm=None):
 ################################################################
 
 
-def printMclAbcFile (cur, filename, nm=None):
+def printMclAbcFile (cur, filename, nm=None, seq_names=None):
 
     cur.execute("select sequence_id_a, sequence_id_b, normalized_score\
         from InParalog\
@@ -113,6 +138,9 @@ def printMclAbcFile (cur, filename, nm=None):
             if row is None:
                 break
 
+            if seq_names:
+                row = (seq_names[row[0]], seq_names[row[1]], row[2])
+
             file_fh.write("{}\t{}\t{}\n".format(row[0],
                                                 row[1],
                                                 str((float(row[2]) * 1000 + .5) / 1000)))
@@ -133,32 +161,40 @@ def execute(db_dir, dest, nm=None):
 
         cur = con.cursor()
 
+        # Integer ids are translated back to the sequence names
+        seq_names = get_sequence_names(cur) if has_integer_ids(cur) \
+            else None
+
         if nm:
             if nm.stop:
                 raise KillByUser("")
             nm.counter = 1
 
         printOrthologsFile(cur, os.path.join(dest, "backstage_files",
-                                             "orthologs.txt"), nm=nm)
+                                             "orthologs.txt"), nm=nm,
+                           seq_names=seq_names)
         if nm:
             if nm.stop:
                 raise KillByUser("")
             nm.counter = 2
 
         printInparalogsFile(cur, os.path.join(dest, "backstage_files",
-                                              "inparalogs.txt"), nm=nm)
+                                              "inparalogs.txt"), nm=nm,
+                            seq_names=seq_names)
         if nm:
             if nm.stop:
                 raise KillByUser("")
             nm.counter = 3
         printCoOrthologsFile(cur, os.path.join(dest, "backstage_files",
-                                               "coorthologs.txt"), nm=nm)
+                                               "coorthologs.txt"), nm=nm,
+                             seq_names=seq_names)
         if nm:
             if nm.stop:
                 raise KillByUser("")
             nm.counter = 4
         printMclAbcFile(cur, os.path.join(dest, "backstage_files",
-                                          "mclInput"), nm=nm)
+                                          "mclInput"), nm=nm,
+                        seq_names=seq_names)
 
     con.close()
 
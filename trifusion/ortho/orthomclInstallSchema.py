@@ -4,43 +4,108 @@
 import sqlite3 as lite
 import os
 
+"""
+The sequence and taxon identifiers are stored as names by default. With
+integer_ids, they are stored as INTEGER codes instead, and the names of
+each code are kept in the SequenceIds and TaxonIds tables. The codes follow
+the sorted order of the names, so that comparisons and sorting of codes in
+orthomclPairs give the same results as with the names. The names are only
+retrieved when dumping the pairs files.
+"""
+
+SEQ_TYPE = "VARCHAR(60)"
+TAXON_TYPE = "VARCHAR(40)"
+
+##############################################################
+
+
+def id_types(integer_ids):
+
+    if integer_ids:
+        return "INTEGER", "INTEGER"
+
+    return SEQ_TYPE, TAXON_TYPE
+
 ##############################################################
 
 
-def createSimilarSequencesTable(cur):
+def has_integer_ids(cur):
+
+    cur.execute("SELECT name FROM sqlite_master\
+        WHERE type = 'table' AND name = 'SequenceIds'")
+
+    return cur.fetchone() is not None
+
+##############################################################
+
+
+def createIdTables(cur):
+
+    cur.execute("CREATE TABLE SequenceIds (\
+        ID INTEGER PRIMARY KEY,\
+        NAME TEXT)")
+
+    cur.execute("CREATE TABLE TaxonIds (\
+        ID INTEGER PRIMARY KEY,\
+        NAME TEXT)")
 
+##############################################################
+
+
+def createSimilarSequencesTable(cur, integer_ids=False):
+
+    seq_type, taxon_type = id_types(integer_ids)
+
+    # With integer ids, the rows are stored in the primary key b-tree,
+    # without a separate index for the primary key
     cur.execute("CREATE TABLE SimilarSequences (\
-        QUERY_ID VARCHAR(60),\
-        SUBJECT_ID VARCHAR(60),\
-        QUERY_TAXON_ID VARCHAR(40),\
-        SUBJECT_TAXON_ID VARCHAR(40),\
+        QUERY_ID %s,\
+        SUBJECT_ID %s,\
+        QUERY_TAXON_ID %s,\
+        SUBJECT_TAXON_ID %s,\
         EVALUE_MANT FLOAT,\
         EVALUE_EXP INT,\
         PERCENT_IDENTITY FLOAT,\
         PERCENT_MATCH FLOAT,\
         PRIMARY KEY(QUERY_ID, SUBJECT_ID)\
-        )")
+        )%s" % (seq_type, seq_type, taxon_type, taxon_type,
+                " WITHOUT ROWID" if integer_ids else ""))
+
+##############################################################
 
-    cur.execute("CREATE INDEX ss_qtaxexp_ix\
+
+def createSimilarSequencesIndexes(cur):
+
+    # These indexes are only created after SimilarSequences is loaded by
+    # orthomclBlastParser, since maintaining them during the load is
+    # much slower than building them at the end
+    cur.execute("CREATE INDEX IF NOT EXISTS ss_qtaxexp_ix\
         ON SimilarSequences(query_id, subject_taxon_id,\
         evalue_exp, evalue_mant,\
         query_taxon_id, subject_id)")
 
-    cur.execute("CREATE INDEX ss_seqs_ix\
+    # With integer ids, the primary key b-tree already contains all
+    # columns sorted by query_id and subject_id
+    if has_integer_ids(cur):
+        return
+
+    cur.execute("CREATE INDEX IF NOT EXISTS ss_seqs_ix\
         ON SimilarSequences(query_id, subject_id,\
         evalue_exp, evalue_mant, percent_match)")
 
 ##############################################################
 
 
-def createInParalogTable (cur):
+def createInParalogTable (cur, integer_ids=False):
+
+    seq_type, taxon_type = id_types(integer_ids)
 
     cur.execute("CREATE TABLE InParalog (\
-        SEQUENCE_ID_A VARCHAR(60),\
-        SEQUENCE_ID_B VARCHAR(60),\
-        TAXON_ID VARCHAR(40),\
+        SEQUENCE_ID_A %s,\
+        SEQUENCE_ID_B %s,\
+        TAXON_ID %s,\
         UNNORMALIZED_SCORE FLOAT,\
-        NORMALIZED_SCORE FLOAT)")
+        NORMALIZED_SCORE FLOAT)" % (seq_type, seq_type, taxon_type))
 
     cur.execute("CREATE INDEX inparalog_seqa_ix\
         ON InParalog(sequence_id_a)")
@@ -51,15 +116,18 @@ def createInParalogTable (cur):
 ##############################################################
 
 
-def createOrthologTable(cur):
+def createOrthologTable(cur, integer_ids=False):
+
+    seq_type, taxon_type = id_types(integer_ids)
 
     cur.execute("CREATE TABLE Ortholog (\
-        SEQUENCE_ID_A VARCHAR(60),\
-        SEQUENCE_ID_B VARCHAR(60),\
-        TAXON_ID_A VARCHAR(40),\
-        TAXON_ID_B VARCHAR(40),\
+        SEQUENCE_ID_A %s,\
+        SEQUENCE_ID_B %s,\
+        TAXON_ID_A %s,\
+        TAXON_ID_B %s,\
         UNNORMALIZED_SCORE FLOAT,\
-        NORMALIZED_SCORE FLOAT)")
+        NORMALIZED_SCORE FLOAT)" % (seq_type, seq_type, taxon_type,
+                                    taxon_type))
 
     cur.execute("CREATE INDEX ortholog_seq_a_ix\
         ON Ortholog(sequence_id_a)")
@@ -70,15 +138,18 @@ def createOrthologTable(cur):
 ##############################################################
 
 
-def createCoOrthologTable(cur):
+def createCoOrthologTable(cur, integer_ids=False):
+
+    seq_type, taxon_type = id_types(integer_ids)
 
     cur.execute("CREATE TABLE CoOrtholog (\
-        SEQUENCE_ID_A VARCHAR(60),\
-        SEQUENCE_ID_B VARCHAR(60),\
-        TAXON_ID_A VARCHAR(40),\
-        TAXON_ID_B VARCHAR(40),\
+        SEQUENCE_ID_A %s,\
+        SEQUENCE_ID_B %s,\
+        TAXON_ID_A %s,\
+        TAXON_ID_B %s,\
         UNNORMALIZED_SCORE FLOAT,\
-        NORMALIZED_SCORE FLOAT)")
+        NORMALIZED_SCORE FLOAT)" % (seq_type, seq_type, taxon_type,
+                                    taxon_type))
 
     cur.execute("CREATE INDEX coortholog_seq_a_ix\
         ON CoOrtholog(sequence_id_a)")
@@ -102,7 +173,7 @@ def createInterTaxonMatchView(cur):
 ##############################################################
 
 
-def execute(out_dir):
+def execute(out_dir, integer_ids=False):
 
     # Remove any previous DB
     if os.path.exists(os.path.join(out_dir, "orthoDB.db")):
@@ -116,10 +187,13 @@ def execute(out_dir):
 
         cur.execute("PRAGMA SYNCHRONOUS = OFF")
 
-        createSimilarSequencesTable(cur)
-        createInParalogTable(cur)
-        createOrthologTable(cur)
-        createCoOrthologTable(cur)
+        if integer_ids:
+            createIdTables(cur)
+
+        createSimilarSequencesTable(cur, integer_ids)
+        createInParalogTable(cur, integer_ids)
+        createOrthologTable(cur, integer_ids)
+        createCoOrthologTable(cur, integer_ids)
         createInterTaxonMatchView(cur)
 
     con.close()
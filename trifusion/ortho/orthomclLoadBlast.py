@@ -4,6 +4,12 @@
 import sqlite3 as lite
 import os
 
+try:
+    from ortho.orthomclInstallSchema import createSimilarSequencesIndexes
+except ImportError:
+    from trifusion.ortho.orthomclInstallSchema import \
+        createSimilarSequencesIndexes
+
 
 def execute(db_dir, similar_seqs_file):
     con = lite.connect(os.path.join(db_dir, "orthoDB.db"))
@@ -24,6 +30,8 @@ def execute(db_dir, similar_seqs_file):
                 cur.execute("INSERT INTO SimilarSequences VALUES(?, ?, ?, ?, "
                             "?, ? ,?, ?)", l)
 
+        createSimilarSequencesIndexes(cur)
+
     con.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+"""
+Stage manifest of the orthology pipeline. Each completed stage is recorded
+in a json file along with a key, which is the md5 hash of its parameters,
+the contents of its input files and the keys of the stages it depends on.
+When the pipeline is executed again, stages whose key did not change and
+whose output files still exist are skipped, so that changing, for instance,
+only the MCL inflation values does not repeat the search and the pairs
+steps. Since a stage is only recorded after it finishes, an interrupted
+execution resumes from the first stage that was not completed.
+
+The md5 digests of the input files are stored in the manifest along with
+their size and modification time, so that files are only hashed again when
+these change.
+"""
+
+import os
+import json
+import time
+import hashlib
+from os.path import abspath, basename, exists
+
+
+def file_digest(path):
+    """
+    Returns the md5 hex digest of the contents of a file
+
+    :param path: string, path to the file
+    """
+
+    md5 = hashlib.md5()
+
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 ** 2), ""):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+class StageManifest(object):
+    """
+    Records the completed stages of the orthology pipeline
+
+    :param path: string, path to the manifest file
+    :param stages: dict, with the name of each completed stage as key and a
+    dict with its key, parameters, outputs and completion time as value
+    :param files: dict, with the absolute path of each input file as key and
+    a list with its size, modification time and md5 digest as value
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        self.stages = {}
+        self.files = {}
+
+        if exists(path):
+            try:
+                with open(path) as fh:
+                    data = json.load(fh)
+                self.stages = data["stages"]
+                self.files = data["files"]
+            # A corrupted manifest is ignored, which results in all stages
+            # being executed
+            except (ValueError, KeyError, IOError):
+                pass
+
+    def save(self):
+        """
+        Writes the manifest to a temporary file, which then replaces the
+        manifest file
+        """
+
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as fh:
+            json.dump({"stages": self.stages, "files": self.files}, fh,
+                      indent=1, sort_keys=True)
+
+        # os.rename does not replace existing files in Windows
+        if os.name == "nt" and exists(self.path):
+            os.remove(self.path)
+
+        os.rename(tmp_path, self.path)
+
+    def clear(self):
+        """
+        Removes all stages from the manifest
+        """
+
+        self.stages = {}
+        self.save()
+
+    def digest(self, path):
+        """
+        Returns the md5 digest of an input file, or None if the file does
+        not exist
+
+        :param path: string, path to the file
+        """
+
+        path = abspath(path)
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        cached = self.files.get(path)
+        if cached and cached[:2] == [st.st_size, st.st_mtime]:
+            return cached[2]
+
+        digest = file_digest(path)
+        self.files[path] = [st.st_size, st.st_mtime, digest]
+
+        return digest
+
+    def stage_key(self, inputs=(), stages=(), params=None):
+        """
+        Returns the key of a stage
+
+        :param inputs: list, paths to the input files. Only the base name of
+        the files is used, so that the keys do not change when the output
+        directory is moved
+        :param stages: list, names of the stages that this stage depends on.
+        Each execution of these stages changes the key
+        :param params: json serializable object with the parameters of the
+        stage
+        """
+
+        md5 = hashlib.md5()
+        md5.update(json.dumps(params, sort_keys=True))
+
+        for path in sorted(inputs, key=basename):
+            md5.update("{}:{}\n".format(basename(path), self.digest(path)))
+
+        for name in stages:
+            entry = self.stages.get(name, {})
+            md5.update("{}:{}:{!r}\n".format(name, entry.get("key"),
+                                             entry.get("completed")))
+
+        return md5.hexdigest()
+
+    def is_complete(self, name, key):
+        """
+        Returns True if a stage was completed with the same key and all of
+        its outputs exist
+
+        :param name: string, name of the stage
+        :param key: string, key of the stage
+        """
+
+        entry = self.stages.get(name)
+
+        return entry is not None and entry["key"] == key and \
+            all(exists(x) for x in entry["outputs"])
+
+    def run(self, name, funcs, inputs=(), stages=(), params=None,
+            outputs=()):
+        """
+        Executes the functions of a stage, unless the stage is complete.
+        Returns True if the stage was executed
+
+        :param name: string, name of the stage
+        :param funcs: list, functions without arguments that are called in
+        order
+        :param inputs: list, paths to the input files (see stage_key)
+        :param stages: list, names of the stages that this stage depends on
+        :param params: json serializable object with the parameters of the
+        stage
+        :param outputs: list, paths to the files or directories created by
+        the stage
+        """
+
+        key = self.stage_key(inputs, stages, params)
+
+        if self.is_complete(name, key):
+            return False
+
+        self.start(name)
+
+        for func in funcs:
+            func()
+
+        self.finish(name, key, params, outputs)
+
+        return True
+
+    def start(self, name):
+        """
+        Removes the entry of a stage that is about to be executed, since its
+        outputs are no longer valid if the execution is interrupted
+
+        :param name: string, name of the stage
+        """
+
+        self.stages.pop(name, None)
+        self.save()
+
+    def finish(self, name, key, params=None, outputs=()):
+        """
+        Records a completed stage
+
+        :param name: string, name of the stage
+        :param key: string, key of the stage
+        :param params: json serializable object with the parameters of the
+        stage
+        :param outputs: list, paths to the files or directories created by
+        the stage
+        """
+
+        self.stages[name] = {"key": key,
+                             "params": params,
+                             "outputs": [abspath(x) for x in outputs],
+                             "completed": time.time()}
+        self.save()
+
+
+__author__ = "Diogo N. Silva"
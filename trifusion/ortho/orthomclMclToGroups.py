@@ -7,6 +7,76 @@ except ImportError:
     from trifusion.process.error_handling import KillByUser
 
 
+def abc_to_mci(abc_file, mci_file, tab_file):
+    """
+    Converts a graph in label (abc) format to the native matrix format of
+    mcl, so that it can be loaded once and shared by several mcl runs. The
+    labels of the nodes are written to a tab file, which is provided to mcl
+    with the -use-tab option to write the clusters with the labels.
+
+    The matrix is the same as the one loaded by the --abc option of mcl:
+    nodes are numbered in the order in which the labels first appear,
+    edges are mirrored, edges with more than one weight keep the largest,
+    and edges without weight have a weight of 1. The weights are written as
+    they appear in the abc file, so that mcl parses the same values
+
+    :param abc_file: string, path to the abc file (e.g. mclInput)
+    :param mci_file: string, path to the matrix file
+    :param tab_file: string, path to the tab file
+    """
+
+    labels = {}
+    # Edges of each node, as a dictionary with the neighbouring nodes as
+    # keys and (weight, weight string) tuples as values
+    edges = []
+
+    def add_edge(a, b, weight):
+        if b not in edges[a] or weight[0] > edges[a][b][0]:
+            edges[a][b] = weight
+
+    with open(tab_file, "w") as tab_fh, open(abc_file) as fh:
+
+        for line in fh:
+
+            fields = line.rstrip("\r\n").split("\t")
+
+            if not fields[0]:
+                continue
+
+            if len(fields) > 2:
+                weight = (float(fields[2]), fields[2])
+            else:
+                weight = (1., "1")
+
+            nodes = []
+            for label in fields[:2]:
+                try:
+                    nodes.append(labels[label])
+                except KeyError:
+                    labels[label] = len(edges)
+                    nodes.append(len(edges))
+                    edges.append({})
+                    tab_fh.write("{}\t{}\n".format(nodes[-1], label))
+
+            if len(nodes) == 1:
+                continue
+
+            add_edge(nodes[0], nodes[1], weight)
+            add_edge(nodes[1], nodes[0], weight)
+
+    with open(mci_file, "w") as fh:
+
+        fh.write("(mclheader\nmcltype matrix\ndimensions {0}x{0}\n)\n"
+                 "(mclmatrix\nbegin\n".format(len(edges)))
+
+        for i, node_edges in enumerate(edges):
+            fh.write("{} {} $\n".format(i, " ".join(
+                "{}:{}".format(j, node_edges[j][1])
+                for j in sorted(node_edges))))
+
+        fh.write(")\n")
+
+
 def mcl_to_groups(prefix, start_id, infile, outfile, nm=None):
 
     try:
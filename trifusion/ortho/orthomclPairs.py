@@ -132,11 +132,15 @@ def commonTempTables (cur):
         where evalue_mant != 0")
 
     tup = cur.fetchone()
-    minEvalueExp = tup[0] - 1
 
-    cur.execute("update SimilarSequences\
-        set evalue_exp = ?\
-        where evalue_exp = 0 and evalue_mant = 0", (minEvalueExp,))
+    # There is no minimum when SimilarSequences is empty or all evalues are
+    # 0. The evalues of 0 are kept in that case
+    if tup[0] is not None:
+        minEvalueExp = tup[0] - 1
+
+        cur.execute("update SimilarSequences\
+            set evalue_exp = ?\
+            where evalue_exp = 0 and evalue_mant = 0", (minEvalueExp,))
 
 ##########################################################################
 
@@ -430,9 +434,53 @@ def coorthologs (cur):
     normalizeOrthologsSub(cur, "Co", "CoOrtholog")
 
 
-def execute(db_dir, nm=None):
+def clearPairsTables(cur):
+    """
+    Removes the results and the temporary tables of a previous execution,
+    so that the pairs can be found again in the same database (e.g., after
+    an interrupted execution)
+
+    :param cur: sqlite cursor
+    """
+
+    cur.execute("select name from sqlite_master where type = 'table'\
+        and name not in ('SimilarSequences', 'InParalog', 'Ortholog',\
+        'CoOrtholog', 'SequenceIds', 'TaxonIds')\
+        and name not like 'sqlite_%'")
+
+    for table, in cur.fetchall():
+        cur.execute("drop table %s" % table)
+
+    for table in ["InParalog", "Ortholog", "CoOrtholog"]:
+        cur.execute("delete from %s" % table)
+
+
+def execute(db_dir, nm=None, engine="sql"):
+    """
+    Finds orthologs, in-paralogs and co-orthologs from the SimilarSequences
+    table.
+
+    :param db_dir: string, directory of the sqlite database
+    :param nm: Namespace object, for progress information
+    :param engine: string, "sql" to run the steps as sqlite statements, or
+    "pandas" to run them in memory (see orthomclPairsFrame)
+    """
+
     con = lite.connect(os.path.join(db_dir, "orthoDB.db"))
 
+    if engine == "pandas":
+        # pandas is only imported when this engine is used
+        try:
+            from ortho.orthomclPairsFrame import PairsFrame
+        except ImportError:
+            from trifusion.ortho.orthomclPairsFrame import PairsFrame
+
+        frame = PairsFrame()
+        steps = [frame.common_scores, frame.orthologs, frame.inparalogs,
+                 frame.coorthologs]
+    else:
+        steps = [commonTempTables, orthologs, inparalogs, coorthologs]
+
     with con:
 
         if nm:
@@ -446,7 +494,9 @@ def execute(db_dir, nm=None):
 
         cur = con.cursor()
 
-        for func in [commonTempTables, orthologs, inparalogs, coorthologs]:
+        clearPairsTables(cur)
+
+        for func in steps:
 
             if nm:
                 if nm.stop:
@@ -0,0 +1,441 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+"""
+In-memory engine for orthomclPairs. The SimilarSequences table is loaded
+into a pandas DataFrame once, and the orthologs, in-paralogs and
+co-orthologs are found with vectorized group-by and join operations,
+instead of the chain of CREATE TABLE AS SELECT statements of the sql
+engine. No intermediate tables are created, and the SimilarSequences table
+is not modified.
+
+Each step follows the corresponding statements of orthomclPairs (the names
+of the intermediate tables of the sql engine are given in the comments)
+and fills the Ortholog, InParalog and CoOrtholog tables with the same rows.
+Sequence and taxon identifiers are replaced by integer codes in the sorted
+order of the identifiers, so that comparisons between identifiers give the
+same results as in the sql engine.
+
+The normalized scores depend on the order in which the scores of each
+group are summed. The rows of each step are sorted in the same order as
+the rows produced by the query plans of sqlite, so that the averages (and
+the normalized scores) are also identical.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def pair_scores(mant_a, exp_a, mant_b, exp_b, cutoff):
+    """
+    Unnormalized scores of pairs of reciprocal hits. When the mantissa of
+    any of the hits is below `cutoff`, the score is the sum of the exponents
+    divided by -2, which is an integer division (truncated towards zero) in
+    the sql engine when the exponents are integers
+
+    :param mant_a: numpy array, evalue mantissas of the first hits
+    :param exp_a: numpy array, evalue exponents of the first hits
+    :param mant_b: numpy array, evalue mantissas of the second hits
+    :param exp_b: numpy array, evalue exponents of the second hits
+    :param cutoff: float, mantissa cutoff
+    :return: numpy array with the scores
+    """
+
+    if exp_a.dtype.kind == "i" and exp_b.dtype.kind == "i":
+        exp_scores = np.trunc((exp_a + exp_b) / -2.)
+    else:
+        exp_scores = (exp_a + exp_b) / -2.
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_scores = (np.log10(mant_a * mant_b) + exp_a + exp_b) / -2.
+
+    return np.where((mant_a < cutoff) | (mant_b < cutoff), exp_scores,
+                    log_scores)
+
+
+def reciprocal_hits_of(pairs, hits):
+    """
+    Finds the hits in both directions for each pair of sequences
+
+    :param pairs: DataFrame with the query_id and subject_id columns
+    :param hits: DataFrame with query_id, subject_id, evalue_exp and
+    evalue_mant columns, and unique (query_id, subject_id) pairs
+    :return: DataFrame with the columns of the query -> subject hits, and
+    the evalue columns of the subject -> query hits (evalue_exp_b and
+    evalue_mant_b)
+    """
+
+    second = hits[["query_id", "subject_id", "evalue_exp", "evalue_mant"]]
+    second.columns = ["subject_id", "query_id", "evalue_exp_b",
+                      "evalue_mant_b"]
+
+    return pairs.merge(hits, on=["query_id", "subject_id"]).merge(
+        second, on=["query_id", "subject_id"])
+
+
+def reciprocal_hits(hits):
+    """
+    Finds the pairs of hits where a hits b and b hits a, for a < b
+
+    :param hits: DataFrame with query_id, subject_id, evalue_exp and
+    evalue_mant columns, and unique (query_id, subject_id) pairs
+    :return: DataFrame with the columns of the a -> b hits, and the evalue
+    columns of the b -> a hits (evalue_exp_b and evalue_mant_b)
+    """
+
+    first = hits[hits.query_id.values < hits.subject_id.values]
+
+    return reciprocal_hits_of(first[["query_id", "subject_id"]], hits)
+
+
+def normalize_orthologs(temp):
+    """
+    Normalizes the scores of orthologs or co-orthologs by the average score
+    of each pair of taxa (OrthologTaxon and OrthologAvgScore tables)
+
+    :param temp: DataFrame with the OrthologTemp (or CoOrthologTemp) rows
+    :return: DataFrame with the normalized_score column added
+    """
+
+    smaller = np.minimum(temp.taxon_id_a.values, temp.taxon_id_b.values)
+    bigger = np.maximum(temp.taxon_id_a.values, temp.taxon_id_b.values)
+
+    avg = temp.unnormalized_score.groupby([smaller, bigger]).transform(
+        "mean")
+    temp["normalized_score"] = temp.unnormalized_score.values / avg.values
+
+    return temp
+
+
+def two_way(pairs):
+    """
+    Returns the unique pairs of sequences in both orientations
+    (InParalog2Way and Ortholog2Way tables)
+
+    :param pairs: DataFrame with the sequence_id_a and sequence_id_b columns
+    :return: DataFrame with the a and b columns
+    """
+
+    a = np.concatenate([pairs.sequence_id_a.values,
+                        pairs.sequence_id_b.values])
+    b = np.concatenate([pairs.sequence_id_b.values,
+                        pairs.sequence_id_a.values])
+
+    return pd.DataFrame({"a": a, "b": b}).drop_duplicates()
+
+
+class PairsFrame(object):
+    """
+    Finds orthologs, in-paralogs and co-orthologs from the SimilarSequences
+    table, in the same steps as the sql engine. Each step method receives
+    the database cursor, so that they can be called in the loop of
+    orthomclPairs.execute
+
+    :param seq_ids: numpy array with the identifier of each sequence code
+    :param taxon_ids: numpy array with the identifier of each taxon code
+    :param hits: DataFrame with the SimilarSequences rows
+    :param good_hits: DataFrame with the SimilarSequences rows with
+    evalue_exp <= -5 and percent_match >= 50
+    :param best_query_taxon: DataFrame with the BestQueryTaxonScore rows
+    :param ortholog: DataFrame with the Ortholog rows
+    :param inparalog: DataFrame with the InParalog rows
+    """
+
+    def __init__(self):
+
+        self.seq_ids = None
+        self.taxon_ids = None
+        self.hits = None
+        self.good_hits = None
+        self.best_query_taxon = None
+        self.ortholog = None
+        self.inparalog = None
+
+    def load(self, cur):
+        """
+        Loads the SimilarSequences table, replacing the identifiers with
+        integer codes
+
+        :param cur: sqlite cursor
+        """
+
+        # Identifiers are retrieved as byte strings, which are faster to
+        # create than unicode objects and have the same order as in sqlite
+        con = cur.connection
+        text_factory = con.text_factory
+        con.text_factory = str
+
+        try:
+            cur.execute("select query_id, subject_id, query_taxon_id,\
+                subject_taxon_id, evalue_mant, evalue_exp, percent_match\
+                from SimilarSequences")
+            rows = cur.fetchall()
+        finally:
+            con.text_factory = text_factory
+
+        # The type of the exponents determines whether the scores of the
+        # sql engine use integer divisions
+        exp_type = np.int64 if rows and isinstance(rows[0][5], (int, long)) \
+            else np.float64
+        id_type = np.int64 if rows and isinstance(rows[0][0], (int, long)) \
+            else object
+
+        # Converting the rows to a structured array with known types is
+        # much faster than letting pandas infer the type of each column
+        hits = pd.DataFrame(np.array(rows, dtype=[
+            ("query_id", id_type), ("subject_id", id_type),
+            ("query_taxon_id", id_type), ("subject_taxon_id", id_type),
+            ("evalue_mant", np.float64), ("evalue_exp", exp_type),
+            ("percent_match", np.float64)]))
+        del rows
+
+        n = len(hits)
+
+        codes, seq_ids = pd.factorize(np.concatenate(
+            [hits.query_id.values, hits.subject_id.values]), sort=True)
+        hits["query_id"] = codes[:n]
+        hits["subject_id"] = codes[n:]
+
+        codes, taxon_ids = pd.factorize(np.concatenate(
+            [hits.query_taxon_id.values, hits.subject_taxon_id.values]),
+            sort=True)
+        hits["query_taxon_id"] = codes[:n]
+        hits["subject_taxon_id"] = codes[n:]
+
+        self.seq_ids = np.asarray(seq_ids)
+        self.taxon_ids = np.asarray(taxon_ids)
+        self.hits = hits
+
+    def insert(self, cur, table, rows, columns, taxon_columns):
+        """
+        Inserts rows into one of the Ortholog, InParalog and CoOrtholog
+        tables, translating the codes back to identifiers
+
+        :param cur: sqlite cursor
+        :param table: string, name of the table
+        :param rows: DataFrame with the rows
+        :param columns: list, columns of the table
+        :param taxon_columns: list, columns with taxon codes
+        """
+
+        values = []
+        for col in columns:
+            if col.startswith("sequence_id"):
+                values.append(self.seq_ids[rows[col].values].tolist())
+            elif col in taxon_columns:
+                values.append(self.taxon_ids[rows[col].values].tolist())
+            else:
+                values.append(rows[col].values.tolist())
+
+        cur.executemany("insert into %s (%s) values (%s)" % (
+            table, ", ".join(columns), ", ".join(["?"] * len(columns))),
+            zip(*values))
+
+    def common_scores(self, cur):
+        """
+        Same as commonTempTables
+
+        :param cur: sqlite cursor
+        """
+
+        self.load(cur)
+        hits = self.hits
+
+        # Exponent of the evalues of 0, which is set in SimilarSequences by
+        # the sql engine. As in the sql engine, the exponents are kept when
+        # there are no evalues other than 0
+        mant = hits.evalue_mant.values
+        exp = hits.evalue_exp.values
+        if (mant != 0).any():
+            min_exp = exp[mant != 0].min() - 1
+            hits.loc[(exp == 0) & (mant == 0), "evalue_exp"] = min_exp
+
+        self.good_hits = hits[(hits.evalue_exp.values <= -5) &
+                              (hits.percent_match.values >= 50)]
+
+        # BestQueryTaxonScore: lowest evalue of each query for each of the
+        # other taxa (InterTaxonMatch)
+        inter = hits[hits.query_taxon_id.values !=
+                     hits.subject_taxon_id.values]
+        self.best_query_taxon = inter.sort_values(
+            ["query_id", "subject_taxon_id", "evalue_exp",
+             "evalue_mant"]).drop_duplicates(
+            ["query_id", "subject_taxon_id"])[
+            ["query_id", "subject_taxon_id", "evalue_exp", "evalue_mant"]]
+
+    def orthologs(self, cur):
+        """
+        Same as orthomclPairs.orthologs
+
+        :param cur: sqlite cursor
+        """
+
+        hits = self.good_hits
+
+        # BestHit
+        best = hits[hits.query_taxon_id.values !=
+                    hits.subject_taxon_id.values].merge(
+            self.best_query_taxon, on=["query_id", "subject_taxon_id"],
+            suffixes=("", "_cutoff"))
+        best = best[(best.evalue_mant.values < 0.01) |
+                    ((best.evalue_exp.values ==
+                      best.evalue_exp_cutoff.values) &
+                     (best.evalue_mant.values ==
+                      best.evalue_mant_cutoff.values))]
+
+        # OrthologTemp, in the order of the scan of BestQueryTaxonScore
+        # and ss_qtaxexp_ix
+        pairs = reciprocal_hits(best.sort_values(
+            ["query_id", "subject_taxon_id", "evalue_exp", "evalue_mant",
+             "subject_id"]))
+        temp = pd.DataFrame({
+            "sequence_id_a": pairs.query_id.values,
+            "sequence_id_b": pairs.subject_id.values,
+            "taxon_id_a": pairs.query_taxon_id.values,
+            "taxon_id_b": pairs.subject_taxon_id.values,
+            "unnormalized_score": pair_scores(
+                pairs.evalue_mant.values, pairs.evalue_exp.values,
+                pairs.evalue_mant_b.values, pairs.evalue_exp_b.values,
+                0.01)})
+
+        self.ortholog = normalize_orthologs(temp)
+
+        self.insert(cur, "Ortholog", self.ortholog,
+                    ["sequence_id_a", "sequence_id_b", "taxon_id_a",
+                     "taxon_id_b", "unnormalized_score", "normalized_score"],
+                    ["taxon_id_a", "taxon_id_b"])
+
+    def inparalogs(self, cur):
+        """
+        Same as orthomclPairs.inparalogs
+
+        :param cur: sqlite cursor
+        """
+
+        hits = self.good_hits
+
+        # BestInterTaxonScore
+        best_inter = self.best_query_taxon.sort_values(
+            ["query_id", "evalue_exp", "evalue_mant"]).drop_duplicates(
+            "query_id")[["query_id", "evalue_exp", "evalue_mant"]]
+
+        # BetterHit, from queries with and without hits to other taxa
+        same = hits[hits.query_taxon_id.values ==
+                    hits.subject_taxon_id.values]
+
+        better = same[same.query_id.values !=
+                      same.subject_id.values].merge(
+            best_inter, on="query_id", suffixes=("", "_cutoff"))
+        better = better[
+            (better.evalue_mant.values < 0.001) |
+            (better.evalue_exp.values < better.evalue_exp_cutoff.values) |
+            ((better.evalue_exp.values == better.evalue_exp_cutoff.values) &
+             (better.evalue_mant.values <=
+              better.evalue_mant_cutoff.values))]
+
+        no_inter = same[~np.in1d(same.query_id.values,
+                                 best_inter.query_id.values)]
+
+        columns = ["query_id", "subject_id", "query_taxon_id", "evalue_exp",
+                   "evalue_mant"]
+        better = pd.concat([better[columns], no_inter[columns]])
+
+        # InParalogTemp, in the order of the BetterHit union
+        pairs = reciprocal_hits(better.sort_values(["query_id",
+                                                    "subject_id"]))
+        temp = pd.DataFrame({
+            "sequence_id_a": pairs.query_id.values,
+            "sequence_id_b": pairs.subject_id.values,
+            "taxon_id": pairs.query_taxon_id.values,
+            "unnormalized_score": pair_scores(
+                pairs.evalue_mant.values, pairs.evalue_exp.values,
+                pairs.evalue_mant_b.values, pairs.evalue_exp_b.values,
+                0.01)})
+
+        # InParalogAvgScore. The average of each taxon only includes the
+        # in-paralogs of sequences with orthologs (InplgOrthTaxonAvg),
+        # unless there are none (InParalogTaxonAvg)
+        ortholog_ids = np.concatenate([
+            self.ortholog.sequence_id_a.values,
+            self.ortholog.sequence_id_b.values])
+        in_ortholog = np.in1d(temp.sequence_id_a.values, ortholog_ids) | \
+            np.in1d(temp.sequence_id_b.values, ortholog_ids)
+
+        scores = temp.unnormalized_score
+        avg = scores.groupby(temp.taxon_id.values).mean()
+        avg_ortholog = scores[in_ortholog].groupby(
+            temp.taxon_id.values[in_ortholog]).mean()
+        avg.loc[avg_ortholog.index] = avg_ortholog
+
+        temp["normalized_score"] = scores.values / \
+            avg.loc[temp.taxon_id.values].values
+
+        self.inparalog = temp
+
+        self.insert(cur, "InParalog", self.inparalog,
+                    ["sequence_id_a", "sequence_id_b", "taxon_id",
+                     "unnormalized_score", "normalized_score"],
+                    ["taxon_id"])
+
+    def coorthologs(self, cur):
+        """
+        Same as orthomclPairs.coorthologs
+
+        :param cur: sqlite cursor
+        """
+
+        inparalog = two_way(self.inparalog)
+        ortholog = two_way(self.ortholog)
+
+        # InParalogOrtholog
+        inplg_orth = inparalog.merge(
+            ortholog.rename(columns={"a": "b", "b": "c"}), on="b")[
+            ["a", "c"]].drop_duplicates()
+        inplg_orth.columns = ["a", "b"]
+
+        # InplgOrthoInplg, from the InParalogOrtholog pairs
+        inplg_orth_inplg = inplg_orth.merge(
+            inparalog.rename(columns={"a": "b", "b": "c"}), on="b")[
+            ["a", "c"]]
+        inplg_orth_inplg.columns = ["a", "b"]
+
+        # CoOrthologCandidate, excluding orthologs (CoOrthNotOrtholog). The
+        # candidates are in the order of the first occurrence of each pair
+        # in the (sorted) union
+        candidate = pd.concat([inplg_orth, inplg_orth_inplg])\
+            .drop_duplicates().sort_values(["a", "b"])
+        a = np.minimum(candidate.a.values, candidate.b.values)
+        b = np.maximum(candidate.a.values, candidate.b.values)
+        candidate = pd.DataFrame({"query_id": a, "subject_id": b},
+                                 columns=["query_id", "subject_id"])\
+            .drop_duplicates()
+        candidate = candidate.merge(
+            self.ortholog[["sequence_id_a", "sequence_id_b"]].rename(
+                columns={"sequence_id_a": "query_id",
+                         "sequence_id_b": "subject_id"}),
+            how="left", indicator=True)
+        candidate = candidate[candidate._merge.values == "left_only"][
+            ["query_id", "subject_id"]]
+
+        # CoOrthologTemp, with the hits in both directions
+        hits = self.good_hits[["query_id", "subject_id", "query_taxon_id",
+                               "subject_taxon_id", "evalue_exp",
+                               "evalue_mant"]]
+        pairs = reciprocal_hits_of(candidate, hits)
+        temp = pd.DataFrame({
+            "sequence_id_a": pairs.query_id.values,
+            "sequence_id_b": pairs.subject_id.values,
+            "taxon_id_a": pairs.query_taxon_id.values,
+            "taxon_id_b": pairs.subject_taxon_id.values,
+            "unnormalized_score": pair_scores(
+                pairs.evalue_mant.values, pairs.evalue_exp.values,
+                pairs.evalue_mant_b.values, pairs.evalue_exp_b.values,
+                0.00001)})
+
+        self.insert(cur, "CoOrtholog", normalize_orthologs(temp),
+                    ["sequence_id_a", "sequence_id_b", "taxon_id_a",
+                     "taxon_id_b", "unnormalized_score", "normalized_score"],
+                    ["taxon_id_a", "taxon_id_b"])
+
+
+__author__ = "Fernando Alves and Diogo N. Silva"
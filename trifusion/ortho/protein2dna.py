@@ -25,15 +25,24 @@ corresponding nucleotide sequences. Since the conversion from protein to DNA
 cannot be made without knowing the nucleotide sequence, this module contains
 functions that compile and store DNA sequences, convert them into amino acid
 sequences and then tries to match them to the original protein sequences.
+
+Protein sequences that are identical to a translated DNA sequence are matched
+through a hash of the translated sequences (see create_hash_db). Only the
+remaining protein sequences are searched with USEARCH.
 """
 
 try:
     from process.error_handling import KillByUser
+    from ortho.fasta_index import FastaIndex
 except ImportError:
     from trifusion.process.error_handling import KillByUser
+    from trifusion.ortho.fasta_index import FastaIndex
 
 from os.path import join
+from multiprocessing import Pool
+import numpy as np
 import subprocess
+import hashlib
 import os
 
 dna_map = {
@@ -54,36 +63,204 @@ dna_map = {
     'TAC': 'Y', 'TAT': 'Y', 'TAA': '', 'TAG': '',
     'TGC': 'C', 'TGT': 'C', 'TGA': '', 'TGG': 'W'}
 
+# Lookup table with the code (0 to 3) of each nucleotide byte. Other
+# characters, such as missing data, have the code 4
+base_codes = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    base_codes[ord(_b)] = base_codes[ord(_b.lower())] = _i
+
+# Lookup table with the amino acid byte of each codon, indexed by the codes of
+# its nucleotides (in base 5). Stop codons and codons with other characters
+# are 0, and are removed from the translation
+codon_table = np.zeros(125, dtype=np.uint8)
+for _codon, _aa in dna_map.items():
+    if _aa:
+        codon_table[base_codes[ord(_codon[0])] * 25 +
+                    base_codes[ord(_codon[1])] * 5 +
+                    base_codes[ord(_codon[2])]] = ord(_aa)
+
 
 def translate(sequence):
     """
-    Translates a DNA string into an amino acid sequence
+    Translates a DNA string into an amino acid sequence. All codons are
+    translated at once with the base_codes and codon_table lookup tables
     :param sequence: string. DNA sequence
     :return: String. Protein sequence
     """
 
-    sequence = sequence.lower().replace("-", "")
-    aa_sequence = ""
+    sequence = sequence.replace("-", "")
+    # Incomplete codons are ignored
+    sequence = sequence[:len(sequence) // 3 * 3]
+
+    codes = base_codes[np.frombuffer(sequence, dtype=np.uint8)].reshape(-1, 3)
+    aa = codon_table[codes[:, 0] * 25 + codes[:, 1] * 5 + codes[:, 2]]
 
-    for i in range(0, len(sequence), 3):
-        codon = sequence[i:i + 3]
+    return aa[aa != 0].tostring()
 
-        # Check if codon is multiple of 3. If not, place an X (missing data)
-        if len(codon) == 3:
-            # Check if there is missing data on the codon. If so, place an X
-            if "n" in codon:
-                aa = ""
+
+def read_cds_file(cds_file):
+    """
+    Returns the sequences of a cds file
+    :param cds_file: string. Path to the cds file
+    :return: List of (header, sequence) tuples. Spaces in the headers are
+    replaced with ";;"
+    """
+
+    records = []
+    header = None
+    seq = []
+
+    with open(cds_file) as handle:
+        for line in handle:
+            if line.startswith(">"):
+                if header is not None:
+                    records.append((header, "".join(seq)))
+
+                header = line.strip()[1:].replace(" ", ";;")
+                seq = []
             else:
-                try:
-                    aa = dna_map[codon.upper()]
-                except KeyError:
-                    aa = ""
-        else:
-            aa = ""
+                seq.append(line.strip())
+
+    if header is not None:
+        records.append((header, "".join(seq)))
+
+    return records
+
+
+def sequence_hash(aa_seq):
+    """
+    Returns the hash used to match protein sequences with translated DNA
+    sequences. Stop characters are removed and the sequence is in upper
+    case, since stop codons are not translated
+    :param aa_seq: string. Protein sequence
+    """
+
+    return hashlib.md5(aa_seq.replace("*", "").upper()).digest()
+
+
+def hash_cds_file(cds_file):
+    """
+    Translates the sequences of a cds file and returns them with the hash of
+    their translation. Sequences with an empty translation are not hashed
+    :param cds_file: string. Path to the cds file
+    :return: List of (header, DNA sequence, hash) tuples
+    """
+
+    records = []
+
+    for header, seq in read_cds_file(cds_file):
+        aa_seq = translate(seq)
+        records.append((header, seq,
+                        sequence_hash(aa_seq) if aa_seq else None))
+
+    return records
+
+
+def create_hash_db(f_list, ns=None, jobs=1):
+    """
+    Creates the dictionary databases used to match protein sequences with
+    their DNA sequences, without writing any file. The cds files are
+    translated in parallel when jobs is higher than 1
+    :param f_list: List, containing the file names of the transcript files
+    :param ns: Namespace object, for progress information
+    :param jobs: int. Number of worker processes
+    :return: Tuple, with a dictionary with the DNA sequence of each
+    transcript header and a dictionary with the transcript header of each
+    translation hash. When several transcripts have the same translation,
+    the first one is used
+    """
+
+    id_db = {}
+    hash_db = {}
+
+    if ns:
+        if ns.stop:
+            raise KillByUser("")
+
+        ns.progress = 0
+        ns.max_pb = len(f_list)
+
+    if jobs > 1 and len(f_list) > 1:
+        pool = Pool(min(jobs, len(f_list)))
+        records_iter = pool.imap(hash_cds_file, f_list)
+    else:
+        pool = None
+        records_iter = (hash_cds_file(f) for f in f_list)
+
+    try:
+        for records in records_iter:
+
+            if ns:
+                if ns.stop:
+                    raise KillByUser("")
+                ns.progress += 1
+
+            for header, seq, seq_hash in records:
+                id_db[header] = seq
+                if seq_hash is not None and seq_hash not in hash_db:
+                    hash_db[seq_hash] = header
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    return id_db, hash_db
+
+
+def group_headers(group_obj):
+    """
+    Returns the sequence headers of the clusters of a GroupLight object that
+    are compliant with its filters, without the excluded taxa
+    :param group_obj: GroupLight object
+    """
+
+    headers = []
+
+    for line, compliant in zip(group_obj.groups(),
+                               group_obj.compliance_mask()):
+        if compliant:
+            headers.extend(group_obj._remove_tx(line).split(":")[-1].split())
 
-        aa_sequence += aa
+    return headers
 
-    return aa_sequence
+
+def hash_pairs(headers, protein_db, hash_db, ns=None):
+    """
+    Matches protein sequences with the transcripts whose translation is
+    identical, using the hashes of create_hash_db
+    :param headers: List, with the headers of the protein sequences
+    :param protein_db: string. Path to the protein database file
+    :param hash_db: dictionary, with the transcript header of each
+    translation hash
+    :param ns: Namespace object, for progress information
+    :return: Tuple, with a dictionary with the transcript header of each
+    matched protein header, and a dictionary with the sequence of the
+    protein headers that were not matched. Headers that are not in the
+    protein database are not included in either
+    """
+
+    pair_db = {}
+    unmatched = {}
+
+    index = FastaIndex(protein_db, ns)
+
+    try:
+        if ns:
+            if ns.stop:
+                raise KillByUser("")
+
+        for h, seq in zip(headers, index.fetch(headers)):
+            if seq is None:
+                continue
+
+            try:
+                pair_db[h] = hash_db[sequence_hash(seq)]
+            except KeyError:
+                unmatched[h] = seq
+    finally:
+        index.close()
+
+    return pair_db, unmatched
 
 
 def create_db(f_list, dest="./", ns=None):
@@ -108,31 +285,15 @@ def create_db(f_list, dest="./", ns=None):
         ns.max_pb = len(f_list)
 
     for f in f_list:
-        handle = open(f)
-        seq = ""
-        header = ""
 
         if ns:
             if ns.stop:
                 raise KillByUser("")
             ns.progress += 1
 
-        for line in handle:
-
-            if ns:
-                if ns.stop:
-                    raise KillByUser("")
-
-            if line.startswith(">"):
-                if seq != "":
-                    aa_seq = translate(seq)
-                    output_handle.write(">%s\n%s\n" % (header, aa_seq))
-                    id_dic[header] = seq
-
-                header = line.strip()[1:].replace(" ", ";;")
-                seq = ""
-            else:
-                seq += line.strip()
+        for header, seq in read_cds_file(f):
+            output_handle.write(">%s\n%s\n" % (header, translate(seq)))
+            id_dic[header] = seq
 
     output_handle.close()
 
@@ -251,14 +412,14 @@ def convert_protein_file(pairs, group_obj, id_db, output_dir, shared_ns):
     # Create handle for file storing bad sequence headers.
     bad_file = open(join(output_dir, "missed_sequences.log"), "w")
 
-    for line, cl in zip(group_obj.groups(),
-                        group_obj.iter_species_frequency()):
+    for line, compliant in zip(group_obj.groups(),
+                               group_obj.compliance_mask()):
 
         if shared_ns:
             if shared_ns.stop:
                 raise KillByUser("")
 
-        if group_obj._get_compliance(cl) == (1, 1):
+        if compliant:
 
             line = group_obj._remove_tx(line)
 
@@ -279,10 +440,21 @@ def convert_protein_file(pairs, group_obj, id_db, output_dir, shared_ns):
 
 
 def convert_group(sqldb, cds_file_list, protein_db, group_sequences,
-                usearch_bin, output_dir, shared_namespace=None):
+                usearch_bin, output_dir, shared_namespace=None, jobs=1):
     """
     Convenience function that wraps all required operations to convert protein
-    to nucleotide files from a Group object
+    to nucleotide files from a Group object. Protein sequences are first
+    matched with the translated transcripts through their hash, and USEARCH is
+    only executed for the protein sequences without an identical translation
+    :param sqldb: string. Not used, kept for compatibility
+    :param cds_file_list: List, with the paths to the cds files
+    :param protein_db: string. Path to the protein database file
+    :param group_sequences: GroupLight object
+    :param usearch_bin: string. Path to the USEARCH executable. If empty, the
+    protein sequences without an identical translation are missed
+    :param output_dir: string. Directory of the nucleotide files
+    :param shared_namespace: Namespace object, for progress information
+    :param jobs: int. Number of worker processes translating the cds files
     """
 
     if shared_namespace:
@@ -290,49 +462,60 @@ def convert_group(sqldb, cds_file_list, protein_db, group_sequences,
         shared_namespace.missed = 0
         shared_namespace.good = 0
     # Create database
-    id_db = create_db(cds_file_list, output_dir, shared_namespace)
+    id_db, hash_db = create_hash_db(cds_file_list, shared_namespace, jobs)
 
     if shared_namespace:
-        shared_namespace.act = "Creating query"
+        shared_namespace.act = "Matching sequences"
 
         # Kill switch
         if shared_namespace.stop:
             raise KillByUser("")
 
-    # Create query for USEARCH
-    group_sequences.retrieve_sequences(sqldb, protein_db, output_dir,
-                                       outfile="query.fas",
-                                       shared_namespace=shared_namespace)
+    pair_db, unmatched = hash_pairs(group_headers(group_sequences),
+                                    protein_db, hash_db, shared_namespace)
 
-    if shared_namespace:
-        # Kill switch
-        if shared_namespace.stop:
-            raise KillByUser("")
+    if unmatched and usearch_bin:
 
-    # Execute search
-    if shared_namespace:
-        shared_namespace.act = "Performing search"
-    pair_search(usearch_bin, output_dir)
+        # Execute search for the remaining sequences
+        if shared_namespace:
+            shared_namespace.act = "Performing search"
 
-    if shared_namespace:
-        # Kill switch
-        if shared_namespace.stop:
-            raise KillByUser("")
+        temp_files = [join(output_dir, "query.fas"),
+                      join(output_dir, "transcripts.fas"),
+                      join(output_dir, "pairs.out")]
 
-    pair_db = get_pairs(output_dir, ns=shared_namespace)
-    # Convert files
+        with open(temp_files[0], "w") as fh:
+            for h, seq in unmatched.iteritems():
+                fh.write(">%s\n%s\n" % (h, seq))
+
+        with open(temp_files[1], "w") as fh:
+            for header, seq in id_db.iteritems():
+                fh.write(">%s\n%s\n" % (header, translate(seq)))
+
+        if shared_namespace:
+            # Kill switch
+            if shared_namespace.stop:
+                raise KillByUser("")
+
+        pair_search(usearch_bin, output_dir)
+
+        if shared_namespace:
+            # Kill switch
+            if shared_namespace.stop:
+                raise KillByUser("")
+
+        if os.path.exists(temp_files[2]):
+            pair_db.update(get_pairs(output_dir, ns=shared_namespace))
+
+        # Remove temporary files
+        for f in temp_files:
+            if os.path.exists(f):
+                os.remove(f)
 
+    # Convert files
     if shared_namespace:
         shared_namespace.act = "Converting to nucleotide"
     convert_protein_file(pair_db, group_sequences, id_db, output_dir,
                          shared_namespace)
 
-    # Remove temporary files
-    temp_files = [join(output_dir, "query.fas"),
-                  join(output_dir, "transcripts.fas"),
-                  join(output_dir, "pairs.out")]
-
-    for f in temp_files:
-        os.remove(f)
-
 __author__ = "Diogo N. Silva"
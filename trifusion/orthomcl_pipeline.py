@@ -33,6 +33,7 @@ with warnings.catch_warnings():
     import shutil
     import traceback
     import argparse
+    from functools import partial
     from os.path import abspath, join, basename
 
     try:
@@ -44,6 +45,7 @@ with warnings.catch_warnings():
         import ortho.orthomclFilterFasta as FilterFasta
         import ortho.orthomclBlastParser as BlastParser
         import ortho.orthomclMclToGroups as MclGroups
+        from ortho.orthomclManifest import StageManifest
         from ortho.error_handling import *
         from process.error_handling import KillByUser
         from __init__ import __version__
@@ -56,20 +58,23 @@ with warnings.catch_warnings():
         import trifusion.ortho.orthomclFilterFasta as FilterFasta
         import trifusion.ortho.orthomclBlastParser as BlastParser
         import trifusion.ortho.orthomclMclToGroups as MclGroups
+        from trifusion.ortho.orthomclManifest import StageManifest
         from trifusion.ortho.error_handling import *
         from trifusion.process.error_handling import KillByUser
         from trifusion import __version__
 
 
-def install_schema(db_dir):
+def install_schema(db_dir, integer_ids=False):
     """
     Install the schema for the mySQL database
 
     :param db_dir: string, directory for the sqlite database
+    :param integer_ids: boolean, if True, sequence and taxon identifiers are
+    stored as integer codes
     """
 
     print_col("Creating sqlite database", GREEN, 1)
-    install_sqlite.execute(db_dir)
+    install_sqlite.execute(db_dir, integer_ids=integer_ids)
 
 
 def check_unique_field(proteome_file, verbose=False, nm=None):
@@ -275,7 +280,7 @@ def allvsall_usearch(goodproteins, evalue, dest, cpus, usearch_outfile,
         _ = subprocess.Popen(usearch_cmd).wait()
 
 
-def blast_parser(usearch_ouput, dest, db_dir, nm):
+def blast_parser(usearch_ouput, dest, db_dir, nm, cpus=1):
 
     print_col("Parsing BLAST output", GREEN, 1)
 
@@ -283,14 +288,15 @@ def blast_parser(usearch_ouput, dest, db_dir, nm):
         join(dest, "backstage_files", usearch_ouput),
         join(dest, "backstage_files", "compliantFasta"),
         db_dir,
-        nm)
+        nm,
+        jobs=int(cpus))
 
 
-def pairs(db_dir, nm=None):
+def pairs(db_dir, nm=None, engine="sql"):
 
     print_col("Finding pairs for orthoMCL", GREEN, 1)
 
-    make_pairs_sqlite.execute(db_dir, nm=nm)
+    make_pairs_sqlite.execute(db_dir, nm=nm, engine=engine)
 
 
 def dump_pairs(db_dir, dest, nm=None):
@@ -301,31 +307,79 @@ def dump_pairs(db_dir, dest, nm=None):
     dump_pairs_sqlite.execute(db_dir, dest, nm=nm)
 
 
-def mcl(inflation_list, dest, mcl_file="mcl", nm=None):
+def mcl(inflation_list, dest, mcl_file="mcl", nm=None, cpus=1,
+        callback=None):
+    """
+    Runs mcl for each inflation value. The mclInput file is converted once
+    to the native matrix format of mcl, which is shared by all runs, and up
+    to `cpus` runs are executed concurrently. The remaining CPUs are split
+    between the expansion threads of each run
+
+    :param inflation_list: list, inflation values (strings)
+    :param dest: string, output directory
+    :param mcl_file: string, path to the mcl executable
+    :param nm: Namespace object, for progress information
+    :param cpus: int, number of CPUs
+    :param callback: function called with each inflation value as soon as
+    its run finishes (e.g., to dump the groups)
+    """
 
     print_col("Running mcl algorithm", GREEN, 1)
     mcl_input = join(dest, "backstage_files", "mclInput")
     mcl_output = join(dest, "backstage_files", "mclOutput_")
 
-    for val in inflation_list:
+    if not inflation_list:
+        return
 
-        mcl_cmd = [mcl_file,
-                   mcl_input,
-                   "--abc",
-                   "-I",
-                   val,
-                   "-o",
-                   mcl_output + val.replace(".", "")]
+    mci_file = mcl_input + ".mci"
+    tab_file = mcl_input + ".tab"
+    MclGroups.abc_to_mci(mcl_input, mci_file, tab_file)
 
-        if nm:
-            # The subprocess.Popen handler cannot be passed directly in Windows
-            # due to pickling issues. So I pass the pid of the process instead.
-            subp = subprocess.Popen(mcl_cmd)
-            nm.subp = subp.pid
-            subp.wait()
-            nm.subp = None
-        else:
-            _ = subprocess.Popen(mcl_cmd).wait()
+    cpus = max(int(cpus), 1)
+    jobs = min(cpus, len(inflation_list))
+    threads = cpus // jobs
+
+    pending = list(inflation_list)
+    running = {}
+
+    try:
+        while pending or running:
+
+            if nm:
+                if nm.stop:
+                    raise KillByUser("")
+
+            while pending and len(running) < jobs:
+                val = pending.pop(0)
+                mcl_cmd = [mcl_file,
+                           mci_file,
+                           "-use-tab",
+                           tab_file,
+                           "-I",
+                           val,
+                           "-te",
+                           str(threads),
+                           "-o",
+                           mcl_output + val.replace(".", "")]
+                running[val] = subprocess.Popen(mcl_cmd)
+
+            finished = [x for x, subp in running.items()
+                        if subp.poll() is not None]
+
+            for val in finished:
+                del running[val]
+                if callback:
+                    callback(val)
+
+            if not finished:
+                time.sleep(.05)
+
+    finally:
+        # Runs are terminated when the execution is cancelled or fails,
+        # since there is no single subprocess to kill
+        for subp in running.values():
+            if subp.poll() is None:
+                subp.terminate()
 
 
 def mcl_groups(inflation_list, mcl_prefix, start_id, group_file, dest,
@@ -399,6 +453,76 @@ def export_filtered_groups(inflation_list, group_prefix, gene_t, sp_t, sqldb,
     return stats_storage, groups_obj
 
 
+def run_stage(manifest, name, funcs, inputs=(), stages=(), params=None,
+              outputs=()):
+    """
+    Executes a stage of the pipeline, unless it was already completed with
+    the same inputs and parameters (see StageManifest.run)
+
+    :param manifest: StageManifest object
+    :param name: string, name of the stage
+    :param funcs: list, functions without arguments that are called in order
+    """
+
+    if not manifest.run(name, funcs, inputs, stages, params, outputs):
+        print_col("Skipping stage {} (inputs and parameters did not "
+                  "change)".format(name), YELLOW, 1)
+
+
+def run_mcl_stages(manifest, inflation_list, mcl_prefix, start_id,
+                   group_file, dest, mcl_file="mcl", cpus=1):
+    """
+    Executes mcl and dumps the groups of each inflation value as a separate
+    stage, so that adding a value only executes mcl for that value. The
+    runs of the values that are not complete are executed concurrently, and
+    their groups are dumped as soon as each run finishes
+
+    :param manifest: StageManifest object
+    :param inflation_list: list, inflation values (strings)
+    :param dest: string, output directory
+    """
+
+    int_dir = join(dest, "backstage_files")
+    results_dir = join(dest, "Orthology_results")
+    mcl_input = join(int_dir, "mclInput")
+
+    mcl_stages = {}
+    for val in inflation_list:
+        name = "mcl_" + val
+        params = [val, mcl_prefix, start_id]
+        key = manifest.stage_key([mcl_input], params=params)
+        outputs = [join(int_dir, "mclOutput_" + val.replace(".", "")),
+                   join(results_dir, group_file + "_" + str(val) + ".txt")]
+
+        if manifest.is_complete(name, key):
+            print_col("Skipping stage {} (inputs and parameters did "
+                      "not change)".format(name), YELLOW, 1)
+        else:
+            manifest.start(name)
+            mcl_stages[val] = (name, key, params, outputs)
+
+    def finish_mcl(val):
+        mcl_groups([val], mcl_prefix, start_id, group_file, dest)
+        manifest.finish(*mcl_stages[val])
+
+    mcl([x for x in inflation_list if x in mcl_stages], dest,
+        mcl_file=mcl_file, cpus=cpus, callback=finish_mcl)
+
+
+def list_files(dir_path):
+    """
+    Returns the paths to the files of a directory, or an empty list if the
+    directory does not exist
+
+    :param dir_path: string, path to the directory
+    """
+
+    if not os.path.exists(dir_path):
+        return []
+
+    return [join(dir_path, x) for x in os.listdir(dir_path)]
+
+
 def check_bin_path(bin_path, program):
 
     prog = {"usearch": "usearch",
@@ -530,8 +654,27 @@ def main():
     # Miscellaneous options
     misc_options = parser.add_argument_group("Miscellaneous options")
     misc_options.add_argument("-np", dest="cpus", default=1, help="Number of "
-                              "CPUs to be used during search operation ("
+                              "CPUs to be used during search operation, "
+                              "BLAST output parsing and MCL runs ("
                               "default is '%(default)s')")
+    misc_options.add_argument("--integer-ids", dest="integer_ids",
+                              action="store_const", const=True,
+                              help="Store sequence and taxon identifiers as "
+                              "integer codes in the sqlite database. This "
+                              "reduces the size of the database and speeds up "
+                              "the search for pairs in large data sets")
+    misc_options.add_argument("--pairs-engine", dest="pairs_engine",
+                              choices=["sql", "pandas"], default="sql",
+                              help="Engine used to find the pairs of "
+                              "orthologs, in-paralogs and co-orthologs. The "
+                              "'pandas' engine loads the similarity table "
+                              "into memory (default is '%(default)s')")
+    misc_options.add_argument("--force", dest="force",
+                              action="store_const", const=True,
+                              help="Execute all stages of the pipeline, "
+                              "instead of skipping the stages that were "
+                              "completed in a previous run with the same "
+                              "inputs and parameters")
     misc_options.add_argument("-v", "--version", dest="version",
                               action="store_const", const=True,
                               help="Displays software version")
@@ -605,39 +748,71 @@ def main():
         if not os.path.exists(int_dir):
             os.makedirs(int_dir)
 
-        if arg.normal:
-            install_schema(tmp_dir)
-            adjust_fasta(proteome_files, output_dir)
-            filter_fasta(min_length, max_percent_stop, database_name,
-                         output_dir)
-            allvsall_usearch(database_name, evalue_cutoff, output_dir, cpus,
-                             usearch_out_name, usearch_bin=usearch_bin)
-            blast_parser(usearch_out_name, output_dir, tmp_dir, None)
-            pairs(tmp_dir)
-            dump_pairs(tmp_dir, output_dir)
-            mcl(inflation, output_dir, mcl_file=mcl_bin)
-            mcl_groups(inflation, prefix, start_id, groups_file, output_dir)
-            export_filtered_groups(inflation, groups_file, max_gn, min_sp,
-                                   sql_path, database_name, tmp_dir,
-                                   output_dir)
-
-        elif arg.adjust:
-            adjust_fasta(proteome_files, output_dir)
-
-        elif arg.no_adjust:
-            install_schema(tmp_dir)
-            filter_fasta(min_length, max_percent_stop, database_name,
-                         output_dir)
-            allvsall_usearch(database_name, evalue_cutoff, output_dir, cpus,
-                             usearch_out_name, usearch_bin=usearch_bin)
-            blast_parser(usearch_out_name, output_dir, tmp_dir, None)
-            pairs(tmp_dir)
-            dump_pairs(tmp_dir, output_dir)
-            mcl(inflation, output_dir, mcl_file=mcl_bin)
-            mcl_groups(inflation, prefix, start_id, groups_file, output_dir)
-            export_filtered_groups(inflation, groups_file, max_gn, min_sp,
-                                   sql_path, database_name, tmp_dir,
-                                   output_dir)
+        # Completed stages are recorded in the manifest, so that they are
+        # skipped when the pipeline is executed again. The orthoMCL database
+        # is kept with the intermediate files, so that an interrupted run
+        # can resume from the pairs stage
+        manifest = StageManifest(join(int_dir, "pipeline_manifest.json"))
+        if arg.force:
+            manifest.clear()
+
+        cf_dir = join(int_dir, "compliantFasta")
+        usearch_out = join(int_dir, usearch_out_name)
+        mcl_input = join(int_dir, "mclInput")
+        results_dir = join(output_dir, "Orthology_results")
+
+        if arg.normal or arg.adjust:
+            run_stage(manifest, "adjust_fasta",
+                      [partial(adjust_fasta, proteome_files, output_dir)],
+                      inputs=proteome_files, outputs=[cf_dir])
+
+        if arg.normal or arg.no_adjust:
+            run_stage(manifest, "filter_fasta",
+                      [partial(filter_fasta, min_length, max_percent_stop,
+                               database_name, output_dir)],
+                      inputs=list_files(cf_dir),
+                      params=[min_length, max_percent_stop],
+                      outputs=[database_name])
+            run_stage(manifest, "allvsall_usearch",
+                      [partial(allvsall_usearch, database_name,
+                               evalue_cutoff, output_dir, cpus,
+                               usearch_out_name, usearch_bin=usearch_bin)],
+                      inputs=[database_name], params=[str(evalue_cutoff)],
+                      outputs=[usearch_out])
+            run_stage(manifest, "blast_parser",
+                      [partial(install_schema, int_dir,
+                               integer_ids=arg.integer_ids),
+                       partial(blast_parser, usearch_out_name, output_dir,
+                               int_dir, None, cpus=cpus)],
+                      inputs=[usearch_out] + list_files(cf_dir),
+                      params=[bool(arg.integer_ids)],
+                      outputs=[join(int_dir, "orthoDB.db")])
+            run_stage(manifest, "pairs",
+                      [partial(pairs, int_dir, engine=arg.pairs_engine)],
+                      stages=["blast_parser"],
+                      outputs=[join(int_dir, "orthoDB.db")])
+            run_stage(manifest, "dump_pairs",
+                      [partial(dump_pairs, int_dir, output_dir)],
+                      stages=["pairs"],
+                      outputs=[mcl_input] + [
+                          join(int_dir, x) for x in ["orthologs.txt",
+                                                     "inparalogs.txt",
+                                                     "coorthologs.txt"]])
+
+            run_mcl_stages(manifest, inflation, prefix, start_id,
+                           groups_file, output_dir, mcl_file=mcl_bin,
+                           cpus=cpus)
+
+            run_stage(manifest, "export_filtered_groups",
+                      [partial(export_filtered_groups, inflation,
+                               groups_file, max_gn, min_sp, sql_path,
+                               database_name, tmp_dir, output_dir)],
+                      inputs=[database_name] + [
+                          join(results_dir, groups_file + "_" + str(x) +
+                               ".txt") for x in inflation],
+                      params=[max_gn, min_sp],
+                      outputs=[join(results_dir, "Inflation%s" % x)
+                               for x in inflation])
 
         print_col("OrthoMCL pipeline execution successfully completed in %s "
                   "seconds" % (round(time.time() - start_time, 2)), GREEN, 1)
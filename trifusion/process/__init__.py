@@ -24,6 +24,12 @@ Contains several methods and function that are inherited or used by
 :class:`~trifusion.process.sequence.AlignmentList` objects, as well as by
 the TriSeq and TriStats CLI programs.
 
+:mod:`~trifusion.process.cache`
+~~~~~
+Contains the :class:`~trifusion.process.cache.ParseCache` class, a
+persistent cache of parsed alignment files used by TriSeq and TriStats to
+skip the parsing of unchanged input files.
+
 :mod:`~trifusion.process.data`
 ~~~~
 Contains the :class:`~trifusion.process.data.Partitions`  class, used by
@@ -31,10 +37,35 @@ Contains the :class:`~trifusion.process.data.Partitions`  class, used by
 :class:`~trifusion.process.sequence.AlignmentList`
 classes to handle partitions in the alignments.
 
+:mod:`~trifusion.process.database`
+~~~~~~~~
+Contains the :class:`~trifusion.process.database.ConnectionPool` class,
+which manages the sqlite connections of
+:class:`~trifusion.process.sequence.AlignmentList` objects and allows
+concurrent read-only queries from different threads.
+
 :mod:`~trifusion.process.error_handling`
 ~~~~~~~~~~~~~~
 Contains custom made Exception sub-classes.
 
+:mod:`~trifusion.process.matrix`
+~~~~~~
+Contains the :class:`~trifusion.process.matrix.ColumnMatrix` class, which
+provides vectorized column statistics for the alignment data stored as
+numpy arrays.
+
+:mod:`~trifusion.process.packing`
+~~~~~~~
+Contains the functions that pack nucleotide sequences with 4-bit codes for
+storage in the sqlite database, and unpack them into strings or numpy
+arrays.
+
+:mod:`~trifusion.process.pipeline`
+~~~~~~~~
+Contains the :class:`~trifusion.process.pipeline.OperationPipeline` class,
+which fuses chains of alignment operations into as few passes over the
+alignment data as possible.
+
 :mod:`~trifusion.process.sequence`
 ~~~~~~~~
 Contains the :class:`~trifusion.process.sequence.Alignment`  and
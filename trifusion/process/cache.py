@@ -0,0 +1,286 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+"""
+Persistent cache of parsed alignment files.
+
+TriSeq and TriStats start each execution with an empty database, so that
+all input files are parsed again even when they did not change. The
+:class:`ParseCache` stores the data of each parsed file (sequence rows,
+`taxa_idx`, `sequence_code`, partitions, etc.) in a sqlite database that
+persists between executions. When an :class:`~trifusion.process.sequence.
+Alignment` is created with a cache, parsing is skipped whenever the file
+has an entry in the cache::
+
+    cache = ParseCache()
+    aln_list = AlignmentList(["file1.fas", "file2.fas"], cache=cache)
+
+Entries are identified by the absolute path of the file, and are valid while
+the size and modification time of the file are the same. When these
+change, the content hash (md5) of the file is compared with the stored one,
+so that files whose content did not change (e.g. copied or touched files)
+are still loaded from the cache.
+
+The total size of the cache is limited by `max_size`. When the limit is
+exceeded, the least recently used entries are removed.
+
+The cache database is stored in `default_cache_dir`, unless another
+directory is provided when creating the :class:`ParseCache` or set in the
+`TRIFUSION_CACHE_DIR` environment variable.
+"""
+
+import os
+import time
+import zlib
+import pickle
+import sqlite3
+import hashlib
+from os.path import join, abspath, expanduser
+
+default_cache_dir = join(expanduser("~"), ".trifusion", "cache")
+
+# Default size limit of the cache (in bytes)
+default_max_size = 1024 ** 3
+
+# Version of the cached data. Entries from other versions are ignored, so
+# this must be increased whenever the parsers or the format of the parsed
+# data change
+cache_version = 1
+
+
+def file_digest(path):
+    """Returns the md5 hex digest of the contents of a file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    _ : str
+        Hex digest.
+    """
+
+    md5 = hashlib.md5()
+
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 ** 2), ""):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+class ParseCache(object):
+    """Persistent cache of parsed alignment files.
+
+    The connection to the cache database is only open during each
+    operation, so that `ParseCache` objects can be copied and pickled
+    along with the `AlignmentList` that uses them. Errors reading or
+    writing the cache are ignored and simply result in the files being
+    parsed.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory of the cache database. Defaults to the value of the
+        `TRIFUSION_CACHE_DIR` environment variable or, when it is not set,
+        to `default_cache_dir`.
+    max_size : int, optional
+        Maximum size of the cached data (in bytes). Defaults to
+        `default_max_size`.
+
+    Attributes
+    ----------
+    cache_dir : str
+        Directory of the cache database.
+    db_path : str
+        Path to the cache database.
+    max_size : int
+        Maximum size of the cached data (in bytes).
+    """
+
+    def __init__(self, cache_dir=None, max_size=default_max_size):
+
+        self.cache_dir = cache_dir or os.environ.get(
+            "TRIFUSION_CACHE_DIR") or default_cache_dir
+
+        self.db_path = join(self.cache_dir, "parse_cache.db")
+
+        self.max_size = max_size
+
+    def _connect(self):
+        """Returns a connection to the cache database, which is created if
+        necessary"""
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        con = sqlite3.connect(self.db_path, timeout=30)
+
+        # Space of evicted entries is returned to the file system. Only
+        # applies when the database is created
+        con.execute("PRAGMA auto_vacuum = FULL")
+        con.execute("CREATE TABLE IF NOT EXISTS entries("
+                    "path TEXT PRIMARY KEY,"
+                    "input_path TEXT,"
+                    "size INT,"
+                    "mtime REAL,"
+                    "digest TEXT,"
+                    "version INT,"
+                    "data BLOB,"
+                    "nbytes INT,"
+                    "last_used REAL)")
+
+        return con
+
+    def _lookup(self, con, path):
+        """Returns the (size, mtime, digest) of the valid entry for `path`,
+        or None"""
+
+        res = con.execute(
+            "SELECT input_path, size, mtime, digest FROM entries "
+            "WHERE path=? AND version=?",
+            (abspath(path), cache_version)).fetchone()
+
+        # Partitions of the cached data refer to the file by the path
+        # provided when it was parsed
+        if not res or res[0] != path:
+            return None
+
+        st = os.stat(path)
+
+        if (res[1], res[2]) != (st.st_size, st.st_mtime):
+            if res[1] != st.st_size or file_digest(path) != res[3]:
+                return None
+
+        return st.st_size, st.st_mtime
+
+    def __contains__(self, path):
+
+        try:
+            con = self._connect()
+            try:
+                return self._lookup(con, path) is not None
+            finally:
+                con.close()
+        except (sqlite3.Error, OSError, IOError):
+            return False
+
+    def get(self, path):
+        """Returns the parsed data of an alignment file.
+
+        Parameters
+        ----------
+        path : str
+            Path to the alignment file.
+
+        Returns
+        -------
+        parsed_data : dict
+            Dictionary with the same format as the one returned by
+            :func:`~trifusion.process.sequence.parse_alignment_file`. None
+            if there is no valid entry for the file.
+        """
+
+        try:
+            con = self._connect()
+            try:
+                stat = self._lookup(con, path)
+                if not stat:
+                    return None
+
+                data = con.execute(
+                    "SELECT data FROM entries WHERE path=?",
+                    (abspath(path),)).fetchone()[0]
+
+                con.execute(
+                    "UPDATE entries SET size=?, mtime=?, last_used=? "
+                    "WHERE path=?", stat + (time.time(), abspath(path)))
+                con.commit()
+            finally:
+                con.close()
+
+            return pickle.loads(zlib.decompress(data))
+
+        except (sqlite3.Error, OSError, IOError, zlib.error,
+                pickle.UnpicklingError):
+            return None
+
+    def put(self, path, parsed_data):
+        """Stores the parsed data of an alignment file.
+
+        Least recently used entries are removed when the size of the cache
+        exceeds `max_size`.
+
+        Parameters
+        ----------
+        path : str
+            Path to the alignment file.
+        parsed_data : dict
+            Dictionary with the same format as the one returned by
+            :func:`~trifusion.process.sequence.parse_alignment_file`.
+        """
+
+        data = zlib.compress(pickle.dumps(parsed_data, 2), 1)
+
+        if len(data) > self.max_size:
+            return
+
+        try:
+            st = os.stat(path)
+
+            con = self._connect()
+            try:
+                con.execute(
+                    "INSERT OR REPLACE INTO entries VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (abspath(path), path, st.st_size, st.st_mtime,
+                     file_digest(path), cache_version, sqlite3.Binary(data),
+                     len(data), time.time()))
+                self._evict(con)
+                con.commit()
+            finally:
+                con.close()
+
+        except (sqlite3.Error, OSError, IOError):
+            pass
+
+    def _evict(self, con):
+        """Removes the least recently used entries until the size of the
+        cache is below `max_size`"""
+
+        total = con.execute("SELECT TOTAL(nbytes) FROM entries").fetchone()[0]
+
+        for path, nbytes in con.execute(
+                "SELECT path, nbytes FROM entries "
+                "ORDER BY last_used").fetchall():
+
+            if total <= self.max_size:
+                break
+
+            con.execute("DELETE FROM entries WHERE path=?", (path,))
+            total -= nbytes
+
+    def clear(self):
+        """Removes all entries from the cache"""
+
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
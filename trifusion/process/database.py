@@ -0,0 +1,224 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+"""
+Connection management for the sqlite database of
+:class:`~trifusion.process.sequence.AlignmentList` objects.
+
+The :class:`ConnectionPool` sets the database in WAL (write-ahead log)
+journal mode, which allows readers and the writer to access the database at
+the same time. A single writer connection is shared by all threads and is
+used for every statement that modifies the database, while holding the
+`write_lock` of the pool. Read-only queries,
+such as the ones issued by the data generators, use a separate read
+connection for each thread. This way, independent read operations (e.g.
+the statistics plots and the gene table refresh in TriFusion) can run
+in parallel without serializing on a single lock::
+
+    pool = ConnectionPool("sequence.db")
+    cur = pool.cursor()
+    for taxon, seq in cur.execute("SELECT taxon, seq FROM alignment_data"):
+        pass
+    cur.close()
+
+All connections of the pool have the functions of
+:mod:`~trifusion.process.packing` registered, so that packed sequences
+can be handled in SQL queries.
+"""
+
+import sqlite3
+import threading
+
+try:
+    from process.packing import register_functions
+except ImportError:
+    from trifusion.process.packing import register_functions
+
+
+class ConnectionPool(object):
+    """Pool of sqlite connections to a single database.
+
+    Parameters
+    ----------
+    db_path : str, optional
+        Path to the sqlite database file. When not provided (or when the
+        database is in memory), all queries use the writer connection.
+    con : sqlite3.Connection, optional
+        Existing connection that will be used as the writer. If not
+        provided, a new connection to `db_path` is created.
+    timeout : float
+        Timeout (in seconds) that the connections wait for a lock on the
+        database before raising an error.
+    packed : bool
+        If True, DNA sequences are stored in packed form (see
+        :mod:`~trifusion.process.packing`).
+
+    Attributes
+    ----------
+    db_path : str
+        Path to the sqlite database file.
+    writer : sqlite3.Connection
+        Connection used to modify the database.
+    write_lock : threading.RLock
+        Lock that must be held for the whole duration of any operation
+        that uses the `writer` connection. Pending changes are only
+        committed by :meth:`sync` when no other thread holds this lock.
+    packed : bool
+        True when DNA sequences are stored in packed form.
+    """
+
+    def __init__(self, db_path=None, con=None, timeout=5.0, packed=False):
+
+        self.db_path = db_path
+
+        self.timeout = timeout
+
+        self.packed = packed
+
+        if con is None and db_path:
+            con = sqlite3.connect(db_path, check_same_thread=False,
+                                  timeout=timeout)
+
+        if con is not None:
+            register_functions(con)
+
+        self.writer = con
+
+        self.write_lock = threading.RLock()
+
+        self.wal = False
+        """
+        True when the database is in WAL mode. Otherwise, readers would
+        block the writer, so the writer connection is used for all queries.
+        """
+
+        if self.writer is not None and db_path and db_path != ":memory:":
+            self.wal = self.writer.execute(
+                "PRAGMA journal_mode=WAL").fetchone()[0] == "wal"
+
+        self._local = threading.local()
+        """
+        Thread local storage for the read connection of each thread.
+        """
+
+        self._readers = []
+        """
+        List with the read connections of all threads. Only used to close
+        them when the pool is closed.
+        """
+
+        self._readers_lock = threading.Lock()
+
+        self._changes = 0
+        """
+        Value of `writer.total_changes` at the last commit.
+        """
+
+    def __deepcopy__(self, memo):
+        # Copies of the objects that use this pool (e.g. the AlignmentList
+        # copies of TriFusion's background tasks) share the same connections
+        return self
+
+    def reader(self):
+        """Returns the read connection of the calling thread.
+
+        The connection is created on the first call of each thread.
+
+        Returns
+        -------
+        con : sqlite3.Connection
+            Read connection. This is the `writer` connection when the
+            database is not in WAL mode.
+        """
+
+        if not self.wal:
+            return self.writer
+
+        con = getattr(self._local, "con", None)
+
+        if con is None:
+            con = sqlite3.connect(self.db_path, check_same_thread=False,
+                                  timeout=self.timeout)
+            register_functions(con)
+            self._local.con = con
+
+            with self._readers_lock:
+                self._readers.append(con)
+
+        return con
+
+    def sync(self):
+        """Commits pending changes of the writer connection.
+
+        Changes become visible to the read connections only after being
+        committed. Committing is skipped when there are no changes since
+        the last commit, so that active statements of the writer are not
+        reset needlessly.
+
+        Committing is also skipped when another thread holds the
+        `write_lock`, since that thread is in the middle of an operation
+        with the writer. In that case, the readers see the data of the
+        last commit. The thread holding the lock can still sync, so that
+        its own read cursors see the changes it has made.
+        """
+
+        if not self.wal:
+            return
+
+        if not self.write_lock.acquire(False):
+            return
+
+        try:
+            if self.writer.total_changes != self._changes:
+                self.writer.commit()
+                self._changes = self.writer.total_changes
+        finally:
+            self.write_lock.release()
+
+    def cursor(self):
+        """Returns a new Cursor object for read-only queries.
+
+        Pending changes of the writer are committed first (see
+        :meth:`sync`), so that the cursor sees all data written so far. The cursor should be closed
+        when no longer needed.
+
+        Returns
+        -------
+        cur : sqlite3.Cursor
+            Cursor of the read connection of the calling thread.
+        """
+
+        self.sync()
+
+        return self.reader().cursor()
+
+    def close(self):
+        """Commits pending changes and closes all connections."""
+
+        with self._readers_lock:
+            for con in self._readers:
+                con.close()
+            self._readers = []
+
+        self._local = threading.local()
+
+        if self.writer is not None:
+            self.writer.commit()
+            self.writer.close()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+"""
+Column-wise operations on alignment matrices.
+
+The :class:`ColumnMatrix` stores the sequence data of a single alignment
+as a 2-D `uint8` numpy array with shape (taxa, sites), where each
+character is represented by its byte value. This allows column based
+statistics (number of gaps, missing data, distinct states and parsimony
+informative sites) to be computed with vectorized array operations instead
+of iterating over each column as a python tuple.
+
+:class:`ColumnMatrix` objects are usually created by the
+:meth:`~trifusion.process.sequence.AlignmentList.iter_matrices` generator::
+
+    for mat, aln_idx in aln_list.iter_matrices():
+        variable_sites = mat.variable().sum()
+
+Pairwise comparisons between all sequences of an alignment are also
+vectorized (see :meth:`ColumnMatrix.pairwise_similarity`). The number of
+identical sites of every pair of taxa is computed with a matrix product of
+the one-hot encoding of each character state, over blocks of columns, so
+that the memory used does not depend on the length of the alignment.
+
+The per taxon and per site features of an alignment that are required by
+the TriStats plots are summarized by :meth:`ColumnMatrix.profile`, and the
+profiles of all alignments are gathered into a :class:`FeatureCube`, with
+arrays of shape (alignments, taxa) from where the plot data is derived.
+"""
+
+import numpy as np
+from collections import namedtuple
+
+try:
+    from process.packing import is_packed, unpack_array
+except ImportError:
+    from trifusion.process.packing import is_packed, unpack_array
+
+# Number of columns processed at a time by ColumnMatrix.pairwise_similarity.
+# The intermediate arrays use <number of taxa> * pairwise_block_size * 4 bytes
+pairwise_block_size = 4096
+
+AlignmentProfile = namedtuple("AlignmentProfile", [
+    "taxa", "nsites", "missing", "symbols", "counts", "segregating",
+    "informative", "derived", "sites"])
+"""
+Features of a single alignment, as returned by `ColumnMatrix.profile`.
+
+taxa : list
+    Taxon names of the rows of `counts`.
+nsites : int
+    Number of columns of the alignment.
+missing : str
+    Missing data symbol of the alignment.
+symbols : str
+    Characters present in the alignment, including gaps and missing data.
+counts : numpy.ndarray
+    2-D array with shape (taxa, symbols) with the number of occurrences of
+    each symbol in each sequence.
+segregating : int
+    Number of variable columns.
+informative : int
+    Number of parsimony informative columns.
+derived : numpy.ndarray
+    Number of derived alleles in each bi-allelic column.
+sites : numpy.ndarray
+    Number of sequences with data in each bi-allelic column.
+"""
+
+
+def seq_matrix(seqs):
+    """Converts a list of sequence strings into a 2-D uint8 array.
+
+    Parameters
+    ----------
+    seqs : list
+        List of sequence strings with the same length. Packed sequences
+        retrieved from the database (see :mod:`~trifusion.process.packing`)
+        are also accepted.
+
+    Returns
+    -------
+    _ : numpy.ndarray
+        Array of `uint8` with shape (len(seqs), <sequence length>).
+    """
+
+    if any(is_packed(x) for x in seqs):
+        return np.vstack([
+            unpack_array(x) if is_packed(x) else seq_matrix([x])[0]
+            for x in seqs])
+
+    data = "".join(seqs)
+
+    # Sequences retrieved from the database are unicode objects. Non ascii
+    # characters are replaced by a single byte so that the length of each
+    # sequence is preserved
+    if isinstance(data, unicode):
+        data = data.encode("ascii", "replace")
+
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(seqs), -1)
+
+
+class ColumnMatrix(object):
+    """Vectorized column statistics for a single alignment.
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray
+        2-D `uint8` array with shape (taxa, sites).
+    missing : str
+        Missing data symbol of the alignment (e.g. "n" or "x").
+    gap : str
+        Gap symbol of the alignment (default is "-").
+
+    Attributes
+    ----------
+    matrix : numpy.ndarray
+        2-D `uint8` array with shape (taxa, sites).
+    missing : int
+        Byte value of the missing data symbol.
+    gap : int
+        Byte value of the gap symbol.
+    """
+
+    def __init__(self, matrix, missing, gap="-"):
+
+        self.matrix = matrix
+
+        self.missing = ord(missing)
+
+        self.gap = ord(gap)
+
+        self._state_counts = None
+        """
+        Cached 2-D array with the number of occurrences of each character
+        state (excluding gaps and missing data) per column. Only built when
+        required by `state_counts`.
+        """
+
+    @classmethod
+    def from_sequences(cls, seqs, missing, gap="-"):
+        """Creates a `ColumnMatrix` from a list of sequence strings.
+
+        Parameters
+        ----------
+        seqs : list
+            List of sequence strings with the same length.
+        missing : str
+            Missing data symbol of the alignment.
+        gap : str
+            Gap symbol of the alignment (default is "-").
+
+        Returns
+        -------
+        _ : ColumnMatrix
+        """
+
+        return cls(seq_matrix(seqs), missing, gap)
+
+    @property
+    def ntaxa(self):
+        return self.matrix.shape[0]
+
+    @property
+    def nsites(self):
+        return self.matrix.shape[1]
+
+    def gap_count(self):
+        """Returns the number of gaps in each column."""
+
+        return (self.matrix == self.gap).sum(axis=0)
+
+    def missing_count(self):
+        """Returns the number of missing data characters in each column."""
+
+        return (self.matrix == self.missing).sum(axis=0)
+
+    def state_counts(self):
+        """Returns the number of occurrences of each state per column.
+
+        Gaps and missing data are not considered character states.
+
+        Returns
+        -------
+        _ : numpy.ndarray
+            2-D array with shape (<number of states>, sites).
+        """
+
+        if self._state_counts is None:
+
+            states = [x for x in np.unique(self.matrix)
+                      if x not in (self.gap, self.missing)]
+
+            if states:
+                self._state_counts = np.vstack(
+                    [(self.matrix == x).sum(axis=0) for x in states])
+            else:
+                self._state_counts = np.zeros((0, self.nsites), dtype=int)
+
+        return self._state_counts
+
+    def state_count(self):
+        """Returns the number of distinct states in each column."""
+
+        return (self.state_counts() > 0).sum(axis=0)
+
+    def variable(self):
+        """Returns a boolean array flagging variable columns."""
+
+        return self.state_count() > 1
+
+    def informative(self):
+        """Returns a boolean array flagging parsimony informative columns.
+
+        A column is informative when at least two of its states are present
+        in two or more taxa.
+        """
+
+        return (self.state_counts() >= 2).sum(axis=0) >= 2
+
+    def row_counts(self):
+        """Returns the number of occurrences of each byte value per row.
+
+        Returns
+        -------
+        _ : numpy.ndarray
+            2-D array with shape (taxa, 256).
+        """
+
+        offsets = np.arange(self.ntaxa, dtype=np.int64)[:, None] * 256
+
+        return np.bincount((self.matrix + offsets).ravel(),
+                           minlength=self.ntaxa * 256).reshape(-1, 256)
+
+    def biallelic_counts(self):
+        """Returns the allele counts of the bi-allelic columns.
+
+        The derived allele is the least frequent of the two states.
+
+        Returns
+        -------
+        derived : numpy.ndarray
+            Number of derived alleles in each bi-allelic column.
+        sites : numpy.ndarray
+            Number of sequences with data in each bi-allelic column.
+        """
+
+        counts = self.state_counts()
+        counts = counts[:, (counts > 0).sum(axis=0) == 2]
+
+        sites = counts.sum(axis=0)
+
+        return sites - counts.max(axis=0), sites
+
+    def profile(self, taxa):
+        """Returns the features of the alignment.
+
+        Parameters
+        ----------
+        taxa : list
+            Taxon names in the same order as the rows of the matrix.
+
+        Returns
+        -------
+        _ : AlignmentProfile
+        """
+
+        counts = self.row_counts()
+        symbols = np.flatnonzero(counts.sum(axis=0))
+
+        derived, sites = self.biallelic_counts()
+
+        return AlignmentProfile(
+            list(taxa), self.nsites, chr(self.missing),
+            "".join(chr(x) for x in symbols), counts[:, symbols],
+            int(self.variable().sum()), int(self.informative().sum()),
+            derived, sites)
+
+    def compress(self, mask):
+        """Returns the sequences with only the columns selected by `mask`.
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            Boolean array with one element per column.
+
+        Returns
+        -------
+        _ : list
+            List of sequence strings.
+        """
+
+        filtered = np.ascontiguousarray(self.matrix[:, mask])
+
+        return [x.tostring() for x in filtered]
+
+    def pairwise_similarity(self, block_size=None):
+        """Returns the pairwise identity and effective length matrices.
+
+        For each pair of taxa, counts the number of sites where both
+        sequences have the same character state, and the number of sites
+        where neither sequence has gaps or missing data (the effective
+        length of the comparison).
+
+        Parameters
+        ----------
+        block_size : int, optional
+            Number of columns processed at a time. Defaults to
+            `pairwise_block_size`.
+
+        Returns
+        -------
+        sim : numpy.ndarray
+            2-D integer array with shape (taxa, taxa) with the number of
+            identical sites.
+        ef_len : numpy.ndarray
+            2-D integer array with shape (taxa, taxa) with the effective
+            length.
+        """
+
+        block_size = block_size if block_size else pairwise_block_size
+
+        sim = np.zeros((self.ntaxa, self.ntaxa), dtype=np.int64)
+        ef_len = np.zeros((self.ntaxa, self.ntaxa), dtype=np.int64)
+
+        for start in xrange(0, self.nsites, block_size):
+
+            block = self.matrix[:, start:start + block_size]
+
+            # The products are computed with float32 arrays, which use the
+            # BLAS routines. Counts are exact since they cannot be larger
+            # than the block size
+            valid = ((block != self.gap) &
+                     (block != self.missing)).astype(np.float32)
+            ef_len += np.dot(valid, valid.T).astype(np.int64)
+
+            for state in np.unique(block):
+
+                if state in (self.gap, self.missing):
+                    continue
+
+                onehot = (block == state).astype(np.float32)
+                sim += np.dot(onehot, onehot.T).astype(np.int64)
+
+        return sim, ef_len
+
+
+class FeatureCube(object):
+    """Per alignment and per taxon features of a set of alignments.
+
+    Gathers the :data:`AlignmentProfile` of each alignment into arrays with
+    one row per alignment and, for the per taxon features, one column per
+    taxon. Taxa that are absent from an alignment have zero counts and are
+    flagged as False in `present`.
+
+    Parameters
+    ----------
+    taxa : list
+        Taxon names, in the order of the columns of the per taxon arrays.
+        Profile taxa that are not in this list are ignored.
+    profiles : collections.OrderedDict
+        Maps the `aln_idx` of each alignment to its `AlignmentProfile`.
+    gap : str
+        Gap symbol of the alignments (default is "-").
+
+    Attributes
+    ----------
+    aln_idx : list
+        Index of the alignment of each row.
+    nsites : numpy.ndarray
+        Number of columns of each alignment.
+    present : numpy.ndarray
+        Boolean array with shape (alignments, taxa).
+    gaps : numpy.ndarray
+        Number of gaps, with shape (alignments, taxa).
+    missing : numpy.ndarray
+        Number of missing data characters, with shape (alignments, taxa).
+    chars : list
+        Character states found in the alignments, excluding gaps and
+        missing data.
+    composition : numpy.ndarray
+        Number of occurrences of each character state, with shape
+        (alignments, taxa, chars).
+    segregating : numpy.ndarray
+        Number of variable columns of each alignment.
+    informative : numpy.ndarray
+        Number of parsimony informative columns of each alignment.
+    derived : list
+        Number of derived alleles in the bi-allelic columns of each
+        alignment.
+    sites : list
+        Number of sequences with data in the bi-allelic columns of each
+        alignment.
+    """
+
+    def __init__(self, taxa, profiles, gap="-"):
+
+        self.taxa = list(taxa)
+        self.aln_idx = list(profiles)
+
+        self.chars = sorted(set(
+            x for p in profiles.values() for x in p.symbols
+            if x not in (gap, p.missing)))
+
+        taxa_pos = dict((x, y) for y, x in enumerate(self.taxa))
+        char_pos = dict((x, y) for y, x in enumerate(self.chars))
+
+        shape = (len(self.aln_idx), len(self.taxa))
+
+        self.nsites = np.array([p.nsites for p in profiles.values()],
+                               dtype=int)
+        self.present = np.zeros(shape, dtype=bool)
+        self.gaps = np.zeros(shape, dtype=int)
+        self.missing = np.zeros(shape, dtype=int)
+        self.composition = np.zeros(shape + (len(self.chars),), dtype=int)
+
+        for i, p in enumerate(profiles.values()):
+
+            rows = np.array([taxa_pos.get(x, -1) for x in p.taxa], dtype=int)
+            counts = p.counts[rows >= 0]
+            rows = rows[rows >= 0]
+
+            self.present[i, rows] = True
+
+            for j, symbol in enumerate(p.symbols):
+                if symbol == gap:
+                    self.gaps[i, rows] = counts[:, j]
+                elif symbol == p.missing:
+                    self.missing[i, rows] = counts[:, j]
+                else:
+                    self.composition[i, rows, char_pos[symbol]] = \
+                        counts[:, j]
+
+        self.segregating = np.array(
+            [p.segregating for p in profiles.values()], dtype=int)
+        self.informative = np.array(
+            [p.informative for p in profiles.values()], dtype=int)
+
+        self.derived = [p.derived for p in profiles.values()]
+        self.sites = [p.sites for p in profiles.values()]
+
+    @property
+    def length(self):
+        """Effective length of each sequence, excluding gaps and missing
+        data, with shape (alignments, taxa)."""
+
+        return self.composition.sum(axis=2)
+
+    def per_taxon(self, values):
+        """Returns the values of each taxon in the alignments where it is
+        present.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Array with shape (alignments, taxa).
+
+        Returns
+        -------
+        _ : list
+            List with one array per taxon, in the order of `taxa`.
+        """
+
+        return [values[self.present[:, x], x] for x in xrange(len(self.taxa))]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+"""
+Packed storage of nucleotide sequences in the sqlite database.
+
+When packed storage is enabled (see the `packed` argument of
+:class:`~trifusion.process.sequence.AlignmentList`), DNA sequences are
+stored in the `seq` column of the master table as `BLOB` values with two
+sites per byte (4-bit codes), instead of `TEXT` values with one site per
+byte. The 16 codes cover the lower case IUPAC nucleotide symbols, gaps and
+missing data (see `alphabet`). Sequences with any other character are
+stored as `TEXT`, so both types may coexist in the same table.
+
+The first byte of a packed sequence is 1 when the sequence length is odd
+and 0 otherwise. The remaining bytes contain the codes of two consecutive
+sites, with the first site in the four high bits::
+
+    >>> str(pack_sequence("acgtn"))
+    '\\x01\\x01#@'
+    >>> unpack_sequence(pack_sequence("acgtn"))
+    'acgtn'
+
+Values retrieved from the database should always go through
+:func:`unpack_sequence` (or :func:`unpack_array`), which leave `TEXT`
+values unchanged.
+"""
+
+import sqlite3
+
+import numpy as np
+
+# Symbols of the 4-bit codes. The code of each symbol is its index. "v"
+# (A/C/G) is the only IUPAC nucleotide symbol that is left out, since
+# gaps and both missing data symbols take three of the 16 codes
+alphabet = "acgtn-?rykmswbdh"
+
+# Array with the code of each byte value. Bytes outside the alphabet have
+# code 255
+encode_table = np.full(256, 255, dtype=np.uint8)
+encode_table[np.frombuffer(alphabet, dtype=np.uint8)] = np.arange(
+    len(alphabet), dtype=np.uint8)
+
+# Array with the byte value of each code
+decode_table = np.frombuffer(alphabet, dtype=np.uint8)
+
+
+def is_packed(data):
+    """Returns True if `data` is a packed sequence retrieved from the
+    database"""
+
+    return isinstance(data, buffer)
+
+
+def pack_sequence(seq):
+    """Packs a sequence string with 4-bit codes.
+
+    Parameters
+    ----------
+    seq : str
+        Sequence string (lower case).
+
+    Returns
+    -------
+    _ : buffer or str
+        Packed sequence, ready to be inserted into the database as a
+        `BLOB`. If `seq` is empty or contains characters outside `alphabet`,
+        it is returned unchanged.
+    """
+
+    if isinstance(seq, unicode):
+        try:
+            seq = seq.encode("ascii")
+        except UnicodeEncodeError:
+            return seq
+
+    codes = encode_table[np.frombuffer(seq, dtype=np.uint8)]
+
+    if not codes.size or codes.max() > 15:
+        return seq
+
+    odd = codes.size % 2
+
+    if odd:
+        codes = np.append(codes, np.uint8(0))
+
+    packed = (codes[0::2] << 4) | codes[1::2]
+
+    return sqlite3.Binary(chr(odd) + packed.tostring())
+
+
+def _unpack_codes(packed):
+    """Returns the array of 4-bit codes from an array of packed bytes"""
+
+    codes = np.empty(packed.size * 2, dtype=np.uint8)
+    codes[0::2] = packed >> 4
+    codes[1::2] = packed & 15
+
+    return codes
+
+
+def unpack_array(data):
+    """Unpacks a sequence into a numpy array.
+
+    Parameters
+    ----------
+    data : buffer
+        Packed sequence.
+
+    Returns
+    -------
+    _ : numpy.ndarray
+        1-D `uint8` array with the byte value of each site.
+    """
+
+    codes = _unpack_codes(np.frombuffer(data, dtype=np.uint8, offset=1))
+
+    if data[0] == "\x01":
+        codes = codes[:-1]
+
+    return decode_table[codes]
+
+
+def unpack_sequence(data):
+    """Returns the sequence string of a value from the `seq` column.
+
+    Parameters
+    ----------
+    data : buffer or str
+        Packed sequence or sequence string.
+
+    Returns
+    -------
+    _ : str
+        Sequence string. Values that are not packed are returned
+        unchanged.
+    """
+
+    if isinstance(data, buffer):
+        return unpack_array(data).tostring()
+
+    return data
+
+
+def substr_sequence(data, start, length):
+    """Same as the sqlite `substr` function, for packed sequences.
+
+    Only the bytes that contain the requested sites are unpacked. This
+    function is registered in the database connections as `seq_substr`.
+
+    Parameters
+    ----------
+    data : buffer or unicode
+        Packed sequence or sequence string.
+    start : int
+        Position (1-based) of the first site, as in `substr`.
+    length : int
+        Number of sites.
+
+    Returns
+    -------
+    _ : str
+        Sequence string with the requested sites.
+    """
+
+    # Same boundaries as `substr`, where position 0 is before the first
+    # site
+    first = max(start - 1, 0)
+    last = max(start - 1 + length, 0)
+
+    if not isinstance(data, buffer):
+        return data[first:last]
+
+    size = (len(data) - 1) * 2 - (data[0] == "\x01")
+    last = min(last, size)
+
+    if first >= last:
+        return ""
+
+    packed = np.frombuffer(data, dtype=np.uint8, offset=1 + first // 2,
+                           count=(last + 1) // 2 - first // 2)
+    codes = _unpack_codes(packed)[first % 2:first % 2 + last - first]
+
+    return decode_table[codes].tostring()
+
+
+def register_functions(con):
+    """Registers the sqlite functions for packed sequences in `con`.
+
+    Parameters
+    ----------
+    con : sqlite3.Connection
+        Database connection.
+    """
+
+    con.create_function("seq_substr", 3, substr_sequence)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+"""
+Planner for chains of :class:`~trifusion.process.sequence.AlignmentList`
+operations.
+
+Each operation that modifies the alignment data reads the complete input
+table and writes a complete temporary table. However, several of these
+operations only need the data of one alignment at a time, and can be
+expressed as kernels (see :meth:`~trifusion.process.sequence.AlignmentList.
+_run_kernels`). The :class:`OperationPipeline` collects the operations of a
+TriSeq or TriFusion execution and fuses consecutive kernel operations into
+a single pass over the data. The remaining operations, which need a global
+view of the data or change the set of alignments (e.g. concatenation or
+the alignment filters), are executed as usual, in their original order::
+
+    pipeline = OperationPipeline(aln_list, use_main_table=True)
+    pipeline.add("filter_codon_positions", [True, True, False])
+    pipeline.add("filter_missing_data", [25, 50])
+    pipeline.add("collapse", kwargs={"dest": "output"})
+    pipeline.add("consensus", ["IUPAC"])
+    # Two passes: the first three operations, and the consensus
+    pipeline.run()
+"""
+
+try:
+    from process.error_handling import KillByUser
+except ImportError:
+    from trifusion.process.error_handling import KillByUser
+
+import inspect
+
+# Operations that can be fused, mapped to the `AlignmentList` method that
+# returns their kernels. The kernel methods receive the same arguments as the
+# operations, except the table, progress and `use_main_table` arguments
+kernel_methods = {
+    "filter_codon_positions": "_codon_kernels",
+    "filter_missing_data": "_missing_data_kernels",
+    "collapse": "_collapse_kernels",
+    "code_gaps": "_gaps_kernels"
+}
+
+
+def accepted_kwargs(func, **kwargs):
+    """Returns the keyword arguments that are accepted by a function.
+
+    Parameters
+    ----------
+    func : function
+        Function or bound method.
+    kwargs : dict
+        Candidate keyword arguments.
+
+    Returns
+    -------
+    _ : dict
+        Keyword arguments of `kwargs` that are arguments of `func`.
+    """
+
+    args = inspect.getargspec(func).args
+
+    return dict((k, v) for k, v in kwargs.items() if k in args)
+
+
+class OperationPipeline(object):
+    """Chain of `AlignmentList` operations executed in the fewest passes.
+
+    Parameters
+    ----------
+    aln_list : trifusion.process.sequence.AlignmentList
+        `AlignmentList` object where the operations are executed.
+    table_in : str, optional
+        Name of database table containing the alignment data that is used
+        by the first operation.
+    table_out : str, optional
+        Name of database table where the alignment data is inserted by all
+        operations. It is also the input table of all operations after the
+        first.
+    use_main_table : bool
+        If True, `table_in` and `table_out` are ignored and the master table
+        is used by all operations (as in TriSeq).
+    ns : multiprocesssing.Manager.Namespace
+        A Namespace object used to communicate with the main thread
+        in TriFusion.
+    pbar : ProgressBar
+        A ProgressBar object used to log the progress of TriSeq execution.
+
+    Attributes
+    ----------
+    steps : list
+        List of (name, args, kwargs, label) tuples with the operations in
+        the order they were added. For operations added with `add_call`,
+        `name` is the function.
+    """
+
+    def __init__(self, aln_list, table_in=None, table_out=None,
+                 use_main_table=False, ns=None, pbar=None):
+
+        self.aln_list = aln_list
+        self.table_in = table_in
+        self.table_out = table_out
+        self.use_main_table = use_main_table
+        self.ns = ns
+        self.pbar = pbar
+
+        self.steps = []
+
+    def add(self, name, args=None, kwargs=None, label=None):
+        """Adds an `AlignmentList` operation to the pipeline.
+
+        Parameters
+        ----------
+        name : str
+            Name of the `AlignmentList` method.
+        args : list, optional
+            Positional arguments of the method.
+        kwargs : dict, optional
+            Keyword arguments of the method. The table, progress and
+            `use_main_table` arguments are set by the pipeline.
+        label : str, optional
+            Label of the operation that is provided to the `callback` of
+            `run` when the operation starts.
+        """
+
+        self.steps.append((name, args or [], kwargs or {}, label))
+
+    def add_call(self, func, label=None):
+        """Adds a function to the pipeline.
+
+        The function is called with the `AlignmentList` object as its only
+        argument, and is never fused with other operations.
+
+        Parameters
+        ----------
+        func : function
+            Function to be called.
+        label : str, optional
+            Label of the operation (see `add`).
+        """
+
+        self.steps.append((func, [], {}, label))
+
+    def plan(self):
+        """Groups the operations into passes over the alignment data.
+
+        Consecutive operations that have kernels are grouped in the same
+        pass, while all other operations get a pass of their own.
+
+        Returns
+        -------
+        passes : list
+            List of lists of steps (see the `steps` attribute).
+        """
+
+        passes = []
+
+        for step in self.steps:
+            if passes and step[0] in kernel_methods and \
+                    passes[-1][-1][0] in kernel_methods:
+                passes[-1].append(step)
+            else:
+                passes.append([step])
+
+        return passes
+
+    def _tables(self, first):
+        """Returns the input and output tables of a pass.
+
+        Parameters
+        ----------
+        first : bool
+            Whether this is the first pass.
+        """
+
+        if self.use_main_table:
+            return self.aln_list.master_table, self.aln_list.master_table
+
+        if first or not self.table_out:
+            return self.table_in, self.table_out
+
+        return self.table_out, self.table_out
+
+    def run(self, callback=None, finished=None):
+        """Executes the operations.
+
+        Parameters
+        ----------
+        callback : function, optional
+            Function called at the beginning of each pass with the list of
+            labels of its operations.
+        finished : function, optional
+            Function called at the end of each pass with the list of labels
+            of its operations.
+        """
+
+        for p, steps in enumerate(self.plan()):
+
+            if self.ns:
+                if self.ns.stop:
+                    raise KillByUser("")
+
+            if callback:
+                callback([x[3] for x in steps])
+
+            table_in, table_out = self._tables(p == 0)
+
+            name, args, kwargs, _ = steps[0]
+
+            if callable(name):
+                name(self.aln_list)
+
+            elif name in kernel_methods:
+                kernels = []
+                for name, args, kwargs, _ in steps:
+                    method = getattr(self.aln_list, kernel_methods[name])
+                    kwargs = dict(kwargs, **accepted_kwargs(method,
+                                                            ns=self.ns))
+                    kernels.extend(method(*args, **kwargs))
+
+                self.aln_list._run_kernels(kernels, table_in, table_out,
+                                           self.ns, self.pbar)
+
+            else:
+                method = getattr(self.aln_list, name)
+                kwargs = dict(accepted_kwargs(method, table_in=table_in,
+                                              table_out=table_out,
+                                              ns=self.ns, pbar=self.pbar),
+                              **kwargs)
+                method(*args, **kwargs)
+
+            if finished:
+                finished([x[3] for x in steps])
@@ -62,6 +62,12 @@ create the new parsing method, using the same `_read_<format>` notation and
 add it to the `parsing_methods` dictionary in
 :meth:`~.Alignment.read_alignment`.
 
+Fasta and phylip files are first parsed by the memory mapped tokenizers of
+:mod:`~trifusion.process.tokenizer` (:meth:`~.Alignment._read_fasta_fast`
+and :meth:`~.Alignment._read_phylip_fast`). Unusual inputs fall back to the
+line based parsers above. This can be disabled by setting the module
+variable `fast_parsing` to False.
+
 New parsers must insert alignment data into a table in the sqlite database.
 This table is automatically created when the :class:`.Alignment` object
 is instantiated, and its name is stored in the :attr:`~.Alignment.table_name`
@@ -283,6 +289,13 @@ To add a new output format writer, simply create the method using the
 `_write_<format>` notation and include it in the `write_methods` dictionary,
 along with the extension in the `format_ext` variable.
 
+The fasta, phylip, nexus and stockholm formats are the exception. Their
+writers are all implemented by the
+:meth:`~.AlignmentList._write_streams` method, which reads the sequence
+data only once and writes each row to the files of all requested formats.
+When more than one of these formats is requested, `write_to_file` calls
+this method once for all of them.
+
 `AlignmentList` class
 ---------------------
 
@@ -517,6 +530,17 @@ the header for the table of that plot.
 The allowed plot instructions depend on the plot function that will be used
 and not all of them need to be specified.
 
+Plot data methods that only need per alignment and per taxon summaries
+(gaps, missing data, sequence size, character composition, segregating and
+informative sites, or the derived alleles of bi-allelic sites) should not
+scan the alignment data themselves. Instead, they derive their data from
+the :class:`~trifusion.process.matrix.FeatureCube` returned by
+`_get_feature_cube`, which is computed in a single pass and stored in the
+database, so that it is shared by all plots::
+
+    cube = self._get_feature_cube(ns=ns)
+    data = cube.segregating.tolist()
+
 .. _here: https://github.com/ODiogoSilva/TriFusion/wiki/
           Add-Statistics-plot-analysis
 
@@ -668,12 +692,15 @@ import itertools
 import re
 import os
 import pickle
+import hashlib
 import sys
+import time
 from os.path import join, basename, splitext, exists
-from itertools import compress
-from threading import Lock
+from StringIO import StringIO
+from multiprocessing import Pool
 import functools
 import sqlite3
+import copy
 
 # TriFusion imports
 
@@ -683,6 +710,11 @@ try:
         iupac_rev, iupac_conv, Base
     from process.data import Partitions
     from process.data import PartitionException
+    from process.matrix import ColumnMatrix, AlignmentProfile, FeatureCube
+    from process.database import ConnectionPool
+    from process.packing import pack_sequence, unpack_sequence
+    from process.tokenizer import UnusualInput, map_file, fasta_records, \
+        phylip_records
     from process.error_handling import DuplicateTaxa, KillByUser, \
         InvalidSequenceType, InputError, EmptyAlignment, \
         MultipleSequenceTypes, SingleAlignment
@@ -692,6 +724,12 @@ except ImportError:
         iupac_rev, iupac_conv, Base
     from trifusion.process.data import Partitions
     from trifusion.process.data import PartitionException
+    from trifusion.process.matrix import ColumnMatrix, AlignmentProfile, \
+        FeatureCube
+    from trifusion.process.database import ConnectionPool
+    from trifusion.process.packing import pack_sequence, unpack_sequence
+    from trifusion.process.tokenizer import UnusualInput, map_file, \
+        fasta_records, phylip_records
     from trifusion.process.error_handling import DuplicateTaxa, KillByUser, \
         InvalidSequenceType, InputError, EmptyAlignment, \
         MultipleSequenceTypes, SingleAlignment
@@ -708,146 +746,26 @@ except ImportError:
 # used to make the triage of files to either the Alignment or SequenceSet
 # classes
 
-# Lock mechanism to prevent concurrent access to sqlite database
-lock = Lock()
-
-
-class LookupDatabase(object):
-    """Decorator handling hash lookup table with pre-calculated values.
-
-    This decorator class is used to decorate class methods that calculate
-    pairwise sequence similarity. To ensure proper functionality, the
-    decorated method should be called first with a single "connect" argument
-    and after finishing all calculations, with a single "disconnect" argument.
-    These special method callings are necessary to setup and close the
-    database storing the calculated values, respectively.
-
-    Parameters
-    ----------
-    func : function
-        Decorated function
-    
-    Attributes
-    ----------
-    func : function
-        Decorated function
-    con : None or sqlite.Connection
-        Connection object of the sqlite database
-    c : None or sqlite.Cursor
-        Cursor object of the sqlite database
-    
-    Notes
-    -----
-    The `con` and `c` attributes are initialized when the decorated function
-    is called with the single "connect" argument
-    (e.g. decorated_func("connect")). When the decorated function is called
-    with the single "disconnect" argument (e.g. decorated_func("disconnect")),
-    the database changes are committed, the sqlite Connection is closed and
-    the Cursor is reset.
-    """
-
-    def __init__(self, func):
-
-        self.func = func
-        self.con = None
-        self.c = None
-
-    def __call__(self, *args):
-        """Wraps the call of `func`.
-        
-        When the decorated method is called, this code is wrapped around
-        its execution. It accepts an arbitrary number of positional arguments
-        but is is currently designed to decorate the `_get_similarity`
-        method of the `AlignmentList` class. There are three expected calling
-        modes:
-        
-            1. decorated_func("connect") : Initializes the Connection and
-            Cursor objects of the database
-            2. decorated_func(seq1, seq2, locus_lenght) : The typical main
-            execution of the method, providing the sequence1 and sequence2
-            strings along with the integer with their lenght
-            3. decorated_func("disconnect") : Commits changes to database
-            and closes Connection and Cursor objects.
-        
-        The path of this sqlite database is automatically obtained from
-        the `AlignmentList` attribute `sql_path`. We use the path to the
-        same directory, but with a different name for the database, "pw.db".
-        
-        Parameters
-        ----------
-        args : list
-            List of positional arguments for decorated method
-        
-        Notes
-        -----
-        When the decorated method is called normally (i.e., not with a
-        "connect" or "disconnect" argument"), it first creates an hash
-        of the argument list (excluding `self`). This hash is used to query
-        the database to check if a value for that combination of sequence
-        strings and sequence length has already been calculated. If yes,
-        the result is immediately  returned without executing the decorated
-        method. If no, the method is executed to perform calculations. The
-        result of this calculation is then stored in the database and the
-        result is returned.
-
-        """
-
-        c_args = args[1:3]
-
-        # Initialize database connection.
-        if c_args[0] == "connect":
-
-            # Get path to database based on the AlignmentList db
-            tmp_dir = os.path.dirname(args[0].sql_path)
-
-            self.con = sqlite3.connect(join(tmp_dir, "pw.db"))
-            self.c = self.con.cursor()
-            self.c.execute("PRAGMA synchronous = OFF")
-
-            # Create table, if it does not yet exist
-            if not self.c.execute("SELECT name FROM sqlite_master WHERE type="
-                                  "'table' AND name='pw_table'").fetchall():
-                self.c.execute("CREATE TABLE pw_table (hash integer"
-                               ", seq_len integer"
-                               ", val float, "
-                               "effective_len float,"
-                               "PRIMARY KEY (hash, seq_len))")
-
-            return
-
-        elif c_args[0] == "disconnect":
-
-            self.con.commit()
-            self.con.close()
-            self.c = None
-
-            return
-
-        if self.c:
-
-            h = hash(c_args)
-            self.c.execute("SELECT * FROM pw_table WHERE hash = ?"
-                           " AND seq_len = ?", (h, args[-2]))
-            vals = self.c.fetchone()
-            if vals:
-                return vals[2], vals[3]
-            else:
-                value = self.func(*args)
-                h = hash(c_args)
-                self.c.execute("INSERT INTO pw_table VALUES (?, ?, ?, ?)",
-                               (h, args[-2], value[0], value[1]))
-                return value
+# Approximate amount of sequence data (in bytes) that the Alignment parsers
+# keep in memory before flushing the buffered rows into the database. Setting
+# it to 0 flushes every row as soon as it is parsed.
+insert_buffer_size = 32 * 1024 ** 2
 
-        else:
-            return self.func(*args)
+# Size (in bytes) of the write buffer of each output file. Several output
+# files are written at the same time by `AlignmentList.write_to_file`, so
+# a larger buffer than the default one avoids interleaving small writes to
+# each of them
+write_buffer_size = 1024 ** 2
 
-    def __repr__(self):
-        """ Return the function's docstring. """
-        return self.func.__doc__
+# When True, fasta and phylip files are parsed with the memory mapped
+# tokenizers. Inputs that these do not support are parsed by the line
+# based parsers.
+fast_parsing = True
 
-    def __get__(self, obj, objtype):
-        """ Support instance methods """
-        return functools.partial(self.__call__, obj)
+# Characters deleted from a sequence to find the candidate missing data
+# symbols in a single pass (see Alignment._eval_missing_symbol)
+missing_delete = "".join([chr(x) for x in xrange(256)
+                          if chr(x) not in "?nx"])
 
 
 def check_data(func):
@@ -1142,6 +1060,34 @@ def setup_intable(func):
     return wrapper
 
 
+def hold_write_lock(func):
+    """Decorator that holds the write lock of the database connections.
+
+    Decorates methods of the `Alignment` and `AlignmentList` objects that
+    use the writer connection (the `cur` and `con` attributes). The
+    `write_lock` of the
+    :class:`~trifusion.process.database.ConnectionPool` in the `pool`
+    attribute is held during the whole execution of the method. This
+    prevents other threads from using the writer connection, or
+    committing it when a read cursor is requested, in the middle of the
+    operation. Since the lock is reentrant, decorated methods can call
+    each other.
+
+    Parameters
+    ----------
+    func : function
+        Decorated function
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        with args[0].pool.write_lock:
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
 class AlignmentException(Exception):
     """ Generic Alignment object exception. """
     pass
@@ -1217,6 +1163,14 @@ class Alignment(Base):
         to their index in the sqlite database table. This option should only
         be used when `input_alignment` is a database table name. Otherwise,
         it is automatically set during alignment parsing.
+    parsed_data : dict, optional
+        Dictionary with the result of parsing `input_alignment` in a
+        separate process, as returned by :func:`parse_alignment_file`. When
+        provided, the alignment file is not parsed again and its data is
+        inserted directly into the database.
+    cache : trifusion.process.cache.ParseCache, optional
+        If provided, the parsed data of `input_alignment` is retrieved from
+        this cache when available, and stored in it otherwise.
     
     Attributes
     ----------
@@ -1289,11 +1243,24 @@ class Alignment(Base):
     def __init__(self, input_alignment, input_format=None, partitions=None,
                  locus_length=None, sequence_code=None,
                  taxa_idx=None, sql_cursor=None, sql_con=None,
-                 db_idx=None, ignore_db_check=False, temp_dir=""):
+                 db_idx=None, ignore_db_check=False, temp_dir="",
+                 parsed_data=None, pool=None, cache=None):
 
         self.cur = sql_cursor
         self.con = sql_con
 
+        self.cache = cache
+        """
+        ParseCache object used by `read_alignment`, or None.
+        """
+
+        self.pool = pool if pool else ConnectionPool(con=sql_con)
+        """
+        ConnectionPool object of the database. Read-only queries use
+        the `cursor` method of the pool, while the `cur` and `con` attributes
+        are used to modify the database.
+        """
+
         if isinstance(partitions, Partitions):
             self._partitions = partitions
         else:
@@ -1393,7 +1360,24 @@ class Alignment(Base):
 
         self.temp_dir = temp_dir if temp_dir else "."
 
-        if not ignore_db_check:
+        self._insert_buffer = []
+        """
+        List of (txId, taxon, seq, aln_idx) tuples that have been parsed
+        but not yet inserted into the database. Rows are accumulated
+        by `_insert_data` and written in bulk by `_flush_data`.
+        """
+
+        self._insert_buffer_bytes = 0
+        """
+        Approximate size of the sequence data stored in `_insert_buffer`.
+        """
+
+        if parsed_data:
+            # The alignment file has already been parsed by a worker
+            # process. Only its data needs to be set and stored
+            self._load_parsed_data(parsed_data)
+
+        elif not ignore_db_check:
 
             # Get alignment format and code. Sequence code is a tuple of
             # (DNA, N) or (Protein, X)
@@ -1442,12 +1426,18 @@ class Alignment(Base):
             sequence string.
         """
 
-        for tx, seq in self.cur.execute(
-                "SELECT taxon,seq from alignment_data WHERE aln_idx=?",
-                (self.db_idx,)):
-            if tx not in self.shelved_taxa:
-                yield tx, seq
+        cur = self.pool.cursor()
+
+        try:
+            for tx, seq in cur.execute(
+                    "SELECT taxon,seq from alignment_data WHERE aln_idx=?",
+                    (self.db_idx,)):
+                if tx not in self.shelved_taxa:
+                    yield tx, unpack_sequence(seq)
+        finally:
+            cur.close()
 
+    @hold_write_lock
     def _create_table(self, table_name, index=None, cur=None):
         """Creates a new table in the database.
         
@@ -1492,6 +1482,7 @@ class Alignment(Base):
 
         self.input_format = input_format
 
+    @hold_write_lock
     def store_aux_data(self, tx_idx=None, partitions_obj=None):
 
         if not self.temp_dir:
@@ -1508,11 +1499,26 @@ class Alignment(Base):
         self._partitions = None
         self._taxa_idx = None
 
+    @hold_write_lock
     def rm_aux_data(self):
 
         self.cur.execute("DELETE FROM aux WHERE aln_idx=?", (self.db_idx,))
 
+    @hold_write_lock
+    def rm_stats_data(self):
+        """Removes the stored statistics of the alignment.
+
+        Must be called when the alignment data in the master table changes.
+        See :meth:`AlignmentList._get_alignment_stats` and
+        :meth:`AlignmentList._get_feature_cube`.
+        """
+
+        for table in ["aux_stats", "aux_features"]:
+            self.cur.execute("DELETE FROM {} WHERE aln_idx=?".format(table),
+                             (self.db_idx,))
+
     @property
+    @hold_write_lock
     def partitions(self):
 
         cur = self.con.cursor()
@@ -1526,6 +1532,7 @@ class Alignment(Base):
         return part
 
     @partitions.setter
+    @hold_write_lock
     def partitions(self, partitions_obj):
 
         cur = self.con.cursor()
@@ -1533,6 +1540,7 @@ class Alignment(Base):
                     (str(partitions_obj.__dict__), self.db_idx,))
 
     @property
+    @hold_write_lock
     def taxa_idx(self):
 
         cur = self.con.cursor()
@@ -1542,6 +1550,7 @@ class Alignment(Base):
         return eval(res)
 
     @taxa_idx.setter
+    @hold_write_lock
     def taxa_idx(self, tx_idx):
 
         cur = self.con.cursor()
@@ -1756,19 +1765,20 @@ class Alignment(Base):
 
         table_name = table_name if table_name else self.master_table
 
+        # Each generator uses its own Cursor from the read connection of
+        # the current thread, so that several generators can be consumed
+        # at the same time
+        cur = self.pool.cursor()
+
         try:
-            # Locking mechanism necessary to avoid concurrency issues when
-            # accessing the database. This ensures that only one Cursor
-            # object is querying the database at any given time
-            lock.acquire(True)
-            for tx, seq in self.cur.execute(
+            for tx, seq in cur.execute(
                     "SELECT taxon,seq "
                     "FROM [{}] "
                     "WHERE aln_idx=?".format(table_name), (self.db_idx, )):
                 if tx not in self.shelved_taxa:
-                    yield seq
+                    yield unpack_sequence(seq)
         finally:
-            lock.release()
+            cur.close()
 
     def iter_alignment(self, table_name):
         """Generator for (taxon, sequence) tuples.
@@ -1811,19 +1821,17 @@ class Alignment(Base):
 
         table_name = table_name if table_name else self.master_table
 
+        cur = self.pool.cursor()
+
         try:
-            # Locking mechanism necessary to avoid concurrency issues when
-            # accessing the database. This ensures that only one Cursor
-            # object is querying the database at any given time
-            lock.acquire(True)
-            for tx, seq in self.cur.execute(
+            for tx, seq in cur.execute(
                     "SELECT taxon, seq "
                     "FROM [{}] "
                     "WHERE aln_idx=?".format(table_name), (self.db_idx,)):
                 if tx not in self.shelved_taxa:
-                    yield tx, seq
+                    yield tx, unpack_sequence(seq)
         finally:
-            lock.release()
+            cur.close()
 
     def get_sequence(self, taxon, table_name=None, ignore_shelved=False):
         """Returns the sequence string for a given taxon.
@@ -1870,32 +1878,30 @@ class Alignment(Base):
 
         taxon = unicode(taxon)
 
+        cur = self.pool.cursor()
+
         try:
-            # Locking mechanism necessary to avoid concurrency issues when
-            # accessing the database. This ensures that only one Cursor
-            # object is querying the database at any given time
-            lock.acquire(True)
             try:
                 if ignore_shelved:
-                    seq = self.cur.execute(
+                    seq = cur.execute(
                         "SELECT seq "
                         "FROM [{}] "
                         "WHERE taxon=? "
                         "AND aln_idx=?".format(table_name),
                         (taxon, self.db_idx)).fetchone()[0]
-                    return seq
+                    return unpack_sequence(seq)
                 elif taxon not in self.shelved_taxa:
-                    seq = self.cur.execute(
+                    seq = cur.execute(
                         "SELECT seq "
                         "FROM [{}] "
                         "WHERE taxon=? "
                         "AND aln_idx=?".format(table_name),
                         (taxon, self.db_idx)).fetchone()[0]
-                    return seq
+                    return unpack_sequence(seq)
             except TypeError:
                 raise KeyError
         finally:
-            lock.release()
+            cur.close()
 
     def shelve_taxa(self, lst):
         """Shelves taxa from `Alignment` methods.
@@ -1916,35 +1922,140 @@ class Alignment(Base):
         self.shelved_taxa = [x for x in lst if x in self.taxa_idx]
 
     def _insert_data(self, txId, taxon, seq):
-        """
+        """Buffers a new row for the master table.
+
+        Rows are not inserted immediately. Instead, they are stored in the
+        `_insert_buffer` attribute and written to the database in bulk by
+        `_flush_data` when the buffered sequence data exceeds
+        `insert_buffer_size`, or when the parsing of the alignment file
+        is finished in `read_alignment`.
 
         Parameters
         ----------
-        txId
-        taxon
-        seq
+        txId : int
+            Index of the taxon in the alignment.
+        taxon : str
+            Taxon name.
+        seq : str
+            Sequence string.
+
+        See Also
+        --------
+        _flush_data
+        """
+
+        try:
+            taxon = unicode(taxon)
+        except UnicodeDecodeError:
+            reload(sys)
+            sys.setdefaultencoding("utf8")
+            taxon = unicode(taxon)
+
+        self._insert_buffer.append((txId, taxon, seq, self.db_idx))
+        self._insert_buffer_bytes += len(seq)
+
+        if self._insert_buffer_bytes >= insert_buffer_size:
+            self._flush_data()
+
+    def _get_parsed_data(self):
+        """Returns the data set during the parsing of the alignment.
+
+        This is the counterpart of `_load_parsed_data`.
 
         Returns
         -------
+        parsed_data : dict
+            Dictionary with the parsed rows (`rows`) and the `input_format`,
+            `sequence_code`, `locus_length`, `taxa_idx`, `partitions` and
+            `e` attributes of the alignment. Rows are only returned when no
+            exception was raised during parsing.
+        """
+
+        parsed_data = {
+            "input_format": getattr(self, "input_format", None),
+            "sequence_code": self.sequence_code,
+            "locus_length": self.locus_length,
+            # Converting to OrderedDict preserves the iteration order of the
+            # taxa, which is not guaranteed for unpickled dictionaries
+            "taxa_idx": OrderedDict(self._taxa_idx),
+            "partitions": self._partitions,
+            "e": self.e,
+            "rows": []
+        }
+
+        if not self.e:
+            cur = self.pool.cursor()
+            try:
+                parsed_data["rows"] = [
+                    (txId, taxon, unpack_sequence(seq)) for txId, taxon, seq
+                    in cur.execute("SELECT txId, taxon, seq "
+                                   "FROM alignment_data "
+                                   "WHERE aln_idx=?", (self.db_idx,))]
+            finally:
+                cur.close()
+
+        return parsed_data
+
+    def _load_parsed_data(self, parsed_data):
+        """Sets the alignment from data parsed in another process.
+
+        Sets the attributes that are usually defined during alignment
+        parsing and inserts the parsed rows into the master table, using
+        the `db_idx` of the current object.
 
+        Parameters
+        ----------
+        parsed_data : dict
+            Dictionary returned by :func:`parse_alignment_file`.
+
+        See Also
+        --------
+        parse_alignment_file
         """
-        try:
 
-            lock.acquire(True)
+        self.input_format = parsed_data["input_format"]
+        self.sequence_code = parsed_data["sequence_code"]
+        self.locus_length = parsed_data["locus_length"]
+        self._taxa_idx = parsed_data["taxa_idx"]
+        self._partitions = parsed_data["partitions"]
+        self.e = parsed_data["e"]
 
-            try:
-                taxon = unicode(taxon)
-            except UnicodeDecodeError:
-                reload(sys)
-                sys.setdefaultencoding("utf8")
-                taxon = unicode(taxon)
+        for txId, taxon, seq in parsed_data["rows"]:
+            self._insert_data(txId, taxon, seq)
+
+        self._flush_data()
+
+    def _flush_data(self):
+        """Inserts all buffered rows into the master table.
+
+        All rows stored in `_insert_buffer` are written with a single
+        `executemany` call, which runs within the current transaction of
+        the database connection. The buffer is emptied afterwards.
+
+        DNA sequences are packed before insertion when the `pool` uses
+        packed storage (see :mod:`~trifusion.process.packing`).
+
+        See Also
+        --------
+        _insert_data
+        """
+
+        if not self._insert_buffer:
+            return
+
+        if self.pool.packed and self.sequence_code and \
+                self.sequence_code[0] == "DNA":
+            self._insert_buffer = [
+                (txId, taxon, pack_sequence(seq), aln_idx)
+                for txId, taxon, seq, aln_idx in self._insert_buffer]
 
-            self.cur.execute(
+        with self.pool.write_lock:
+            self.cur.executemany(
                 "INSERT INTO alignment_data VALUES (?, ?, ?, ?)",
-                (txId, taxon, seq, self.db_idx))
+                self._insert_buffer)
 
-        finally:
-            lock.release()
+        self._insert_buffer = []
+        self._insert_buffer_bytes = 0
 
     def _read_interleave_phylip(self, ntaxa):
         """ Alignment parser for interleave phylip format.
@@ -2154,13 +2265,19 @@ class Alignment(Base):
 
         if not self.sequence_code[1]:
 
-            if sequence.count("?"):
+            if isinstance(sequence, unicode):
+                sequence = sequence.encode("ascii", "replace")
+
+            # Keep only the candidate symbols, in a single pass
+            symbols = set(sequence.translate(None, missing_delete))
+
+            if "?" in symbols:
                 self.sequence_code[1] = "?"
 
-            elif sequence.count("n") and self.sequence_code[0] == "DNA":
+            elif "n" in symbols and self.sequence_code[0] == "DNA":
                 self.sequence_code[1] = "n"
 
-            elif sequence.count("x") and self.sequence_code[0] == "Protein":
+            elif "x" in symbols and self.sequence_code[0] == "Protein":
                 self.sequence_code[1] = "x"
 
     def _read_phylip(self):
@@ -2268,6 +2385,111 @@ class Alignment(Base):
         if len(set(size_list)) > 1:
             self.e = AlignmentUnequalLength()
 
+    def _read_phylip_fast(self):
+        """Memory mapped parser for phylip format.
+
+        Same as `_read_phylip`, but the file is parsed by
+        :func:`~trifusion.process.tokenizer.phylip_records`. Interleave
+        files are parsed in a single pass.
+
+        Raises
+        ------
+        UnusualInput
+            If the file is not supported by the tokenizer. In this case,
+            no data has been stored.
+
+        See Also
+        --------
+        read_alignment
+        """
+
+        buf = map_file(self.path)
+
+        # Variable storing the lenght of each sequence
+        size_list = []
+
+        try:
+            taxa_num, self.locus_length, records = phylip_records(buf)
+            self._partitions.set_length(self.locus_length)
+
+            for c, (taxa, seq) in enumerate(records):
+
+                taxa = self.rm_illegal(taxa)
+
+                self._taxa_idx[taxa] = c
+
+                # Evaluate missing data symbol if undefined
+                self._eval_missing_symbol(seq)
+
+                self._insert_data(c, taxa, seq)
+
+                size_list.append(len(seq))
+
+        finally:
+            buf.close()
+
+        # Updating _partitions object
+        self._partitions.add_partition(self.name, self.locus_length,
+                                       file_name=self.path,
+                                       seq_type=self.sequence_code[0])
+
+        # Checks the size consistency of the alignment
+        if len(set(size_list)) > 1:
+            self.e = AlignmentUnequalLength()
+
+    def _read_fasta_fast(self):
+        """Memory mapped parser for fasta format.
+
+        Same as `_read_fasta`, but the file is parsed by
+        :func:`~trifusion.process.tokenizer.fasta_records`.
+
+        Raises
+        ------
+        UnusualInput
+            If the file is not supported by the tokenizer. In this case,
+            no data has been stored.
+
+        See Also
+        --------
+        read_alignment
+        """
+
+        buf = map_file(self.path)
+
+        # Variable storing the lenght of each sequence
+        size_list = []
+
+        try:
+            for idx, (taxa, seq) in enumerate(fasta_records(buf)):
+
+                taxa = self.rm_illegal(taxa)
+
+                # Evaluate missing data symbol if undefined
+                self._eval_missing_symbol(seq)
+
+                self._insert_data(idx, taxa, seq)
+
+                self._taxa_idx[taxa] = idx
+
+                if not self.locus_length:
+                    self.locus_length = len(seq)
+
+                size_list.append(len(seq))
+
+        finally:
+            buf.close()
+
+        self._partitions.set_length(self.locus_length)
+
+        # Updating _partitions object
+        self._partitions.add_partition(self.name, self.locus_length,
+                                       file_name=self.path,
+                                       seq_type=self.sequence_code[0])
+
+        # Checks the size consistency of the alignment
+        if len(set(size_list)) > 1:
+            self.e = AlignmentUnequalLength()
+
     def _read_fasta(self):
         """Alignment parser for fasta format.
 
@@ -2344,6 +2566,7 @@ class Alignment(Base):
         if len(set(size_list)) > 1:
             self.e = AlignmentUnequalLength()
 
+    @hold_write_lock
     def _read_loci(self):
         """Alignment parser for pyRAD and ipyrad loci format.
 
@@ -2435,12 +2658,18 @@ class Alignment(Base):
 
         fh.close()
 
-        # Add temp table to master table
-        self.cur.execute(
-            "INSERT INTO alignment_data (txId, taxon, seq, aln_idx) "
-            "SELECT txId, taxon, GROUP_CONCAT(seq, ''), {} "
-            "FROM [{}] "
-            "GROUP BY txId".format(self.db_idx, temp_table))
+        # Add the concatenated loci of each taxon to the master table.
+        # The rows are buffered with _insert_data, so that they are packed
+        # like the rows of the other parsers. A separate cursor is used
+        # because _flush_data executes on self.cur
+        loci_cur = self.cur.connection.cursor()
+        for txId, taxon, seq in loci_cur.execute(
+                "SELECT txId, taxon, GROUP_CONCAT(seq, '') "
+                "FROM [{}] "
+                "GROUP BY txId".format(temp_table)):
+            self._insert_data(txId, taxon, str(seq))
+        loci_cur.close()
+        self._flush_data()
 
         self.cur.execute("DROP TABLE [{}]".format(temp_table))
 
@@ -2682,8 +2911,19 @@ class Alignment(Base):
         it calls the specific method that parses that alignment format.
         After the execution of this method, all attributes of the class will
         be set and the full range of methods can be applied.
+
+        If the `cache` attribute is set, the parsed data is loaded from the
+        cache when the file is unchanged since it was last parsed, and
+        stored in the cache otherwise.
         """
 
+        if self.cache:
+            parsed_data = self.cache.get(self.path)
+            if parsed_data and \
+                    parsed_data["input_format"] == self.input_format:
+                self._load_parsed_data(parsed_data)
+                return
+
         parsing_methods = {
             "phylip": self._read_phylip,
             "fasta": self._read_fasta,
@@ -2692,7 +2932,21 @@ class Alignment(Base):
             "stockholm": self._read_stockholm
         }
 
-        parsing_methods[self.input_format]()
+        fast_methods = {
+            "phylip": self._read_phylip_fast,
+            "fasta": self._read_fasta_fast
+        }
+
+        if fast_parsing and self.input_format in fast_methods:
+            try:
+                fast_methods[self.input_format]()
+            except UnusualInput:
+                parsing_methods[self.input_format]()
+        else:
+            parsing_methods[self.input_format]()
+
+        # Write any rows that are still buffered by the parsers
+        self._flush_data()
 
         # If the missing data symbol could not be evaluated during alignment
         # parsing, set the defaults
@@ -2706,12 +2960,18 @@ class Alignment(Base):
                                    " the alignment: {}".format(
                 "; ".join(duplicate_taxa)))
 
+        if self.cache:
+            self.cache.put(self.path, self._get_parsed_data())
+
+    @hold_write_lock
     def remove_alignment(self):
         """Removes data from current alignment from the database"""
 
         self.cur.execute(
             "DELETE FROM alignment_data WHERE aln_idx=?", (self.db_idx,))
+        self.rm_stats_data()
 
+    @hold_write_lock
     def remove_taxa(self, taxa_list_file, mode="remove"):
         """ Removes taxa from the `Alignment` object.
 
@@ -2777,6 +3037,9 @@ class Alignment(Base):
         if mode == "inverse":
             inverse(taxa_list)
 
+        self.rm_stats_data()
+
+    @hold_write_lock
     def change_taxon_name(self, old_name, new_name):
         """Changes the name of a particular taxon.
 
@@ -2798,6 +3061,8 @@ class Alignment(Base):
             # Change in taxa_index
             tx_idx[new_name] = tx_idx[old_name]
             del tx_idx[old_name]
+            # The stored features are identified by taxon name
+            self.rm_stats_data()
 
         self.taxa_idx = tx_idx
 
@@ -2845,55 +3110,278 @@ class Alignment(Base):
             self.partitions = partitions
 
 
-class AlignmentList(Base):
-    """Main interface for groups of `Alignment` objects.
-
-    The `AlignmentList` class can be seen as a group of `Alignment` objects
-    that is treated as a single cohesive data set. It is the main class
-    used to perform alignment operations on TriFusion and TriSeq programs,
-    even when there is only a single alignment.
-
-    An instance can be created by simply providing a list of paths to
-    alignment files, which can be empty (and alignments added later). It
-    is recommended that the path to the sqlite database be specified
-    via the `sql_db` argument, but this is optional.
+def parse_alignment_file(args):
+    """Parses an alignment file into a private in-memory database.
 
-    Individual alignment files can be provided when instantiating the class
-    or added later, and each is processed and stored as an `Alignment` object.
-    The `AlignmentList` object provides attributes that are relative to the
-    global data set. For instance, each `Alignment` object may have their
-    individual and unique list of taxa, but the corresponding attribute in the
-    `AlignmentList` object contains the list of all taxa that are found
-    in the `Alignment` object list.
-    
-    Several methods of the `Alignment` class are also present in this class
-    with the same usage (e.g. `collapse`). These are basically wrappers that
-    apply the method to all `Alignment` objects and may have some
-    modifications adapted to multiple alignments.
-    
-    Other methods are exclusive and desgined to deal with multiple alignments,
-    such as concatenation (`concatenate`), filter by taxa (`filter_by_taxa`),
-    etc.
+    This function is meant to be executed by the worker processes of
+    :meth:`AlignmentList.add_alignment_files`. The alignment is parsed
+    with the regular :class:`.Alignment` parsers, but the sequence data is
+    stored in an in-memory database that is not shared with other
+    processes. The parsed rows and the attributes set during parsing are
+    then returned, so that they can be inserted in the main database by
+    a single process.
 
-    Plotting methods are exclusive to `AlignmentList`, even the
-    ones that are focused on single alignments. In this case, the
-    `Alignment` object can be specified and processed individually directly
-    from this class.
+    When a parse cache is provided, the data is retrieved from the cache
+    if the file has a valid entry. Otherwise, the file is parsed and its
+    data is stored in the cache.
 
     Parameters
     ----------
-    alignment_list : list
-        List with paths to alignment files. Can be empty.
-    sql_db : str, optional
-        Path where the sqlite3 database will be created.
-    db_cur : sqlite3.Cursor, optional
-        Provide a database Cursor object in conjunction with the Connection
-        object (`db_con`) to connect to an existing database.
-    db_con : sqlite3.Connection, optional
+    args : tuple
+        Tuple with (<path to alignment file>, <temporary directory>,
+        <ParseCache object or None>).
+
+    Returns
+    -------
+    parsed_data : dict
+        Dictionary with the parsed rows (`rows`) and the `input_format`,
+        `sequence_code`, `locus_length`, `taxa_idx`, `partitions` and `e`
+        attributes of the alignment. Rows are only returned when no
+        exception was raised during parsing.
+    """
+
+    aln_path, temp_dir, cache = args
+
+    if cache:
+        parsed_data = cache.get(aln_path)
+        if parsed_data:
+            return parsed_data
+
+    con = sqlite3.connect(":memory:")
+    cur = con.cursor()
+    cur.execute("CREATE TABLE alignment_data("
+                "txId INT,"
+                "taxon TEXT,"
+                "seq TEXT,"
+                "aln_idx INT)")
+
+    aln_obj = Alignment(aln_path, sql_cursor=cur, sql_con=con, db_idx=0,
+                        temp_dir=temp_dir)
+
+    parsed_data = aln_obj._get_parsed_data()
+
+    con.close()
+
+    if cache and parsed_data["input_format"]:
+        cache.put(aln_path, parsed_data)
+
+    return parsed_data
+
+
+def format_sequence(fmt, taxon, seq, locus_length, options):
+    """Returns the text of a sequence in an output format.
+
+    Parameters
+    ----------
+    fmt : {"fasta", "phylip", "nexus", "stockholm"}
+        Output format. The phylip and nexus formats are sequential.
+    taxon : str
+        Taxon name.
+    seq : str
+        Sequence string.
+    locus_length : int
+        Length of the alignment.
+    options : dict
+        Formatting options of :meth:`AlignmentList.write_to_file`
+        (`ld_hat`, `interleave`, `tx_space_phy`, `cut_space_phy`,
+        `tx_space_nex` and `cut_space_nex`).
+
+    Returns
+    -------
+    _ : str
+        Lines of the sequence.
+    """
+
+    if fmt == "fasta":
+        if options["ld_hat"]:
+            # Truncate sequence name to 30 characters
+            txt = ">%s\n" % (taxon[:30])
+            # Limit each sequence line to 2000 characters
+            if len(seq) > 2000:
+                txt += "".join("%s\n" % (seq[i:i + 2000])
+                               for i in range(0, len(seq), 2000))
+            return txt
+        elif options["interleave"]:
+            lines = [">{}\n".format(taxon)]
+            counter = 0
+            for i in range(90, locus_length, 90):
+                lines.append("{}\n".format(seq[counter:i]))
+                counter = i
+
+            lines.append("{}\n".format(seq[counter:]))
+            return "".join(lines)
+        else:
+            return ">{}\n{}\n".format(taxon, seq)
+
+    elif fmt == "phylip":
+        return "{} {}\n".format(
+            taxon[:options["cut_space_phy"]].ljust(options["tx_space_phy"]),
+            seq)
+
+    elif fmt == "nexus":
+        return "{} {}\n".format(
+            taxon[:options["cut_space_nex"]].ljust(options["tx_space_nex"]),
+            seq)
+
+    else:
+        return "{}\t{}\n".format(taxon, seq)
+
+
+def format_interleave_block(fmt, taxon, seq, write_tx, options):
+    """Returns the text of a sequence block in an interleave format.
+
+    Parameters
+    ----------
+    fmt : {"phylip", "nexus"}
+        Output format.
+    taxon : str
+        Taxon name.
+    seq : str
+        Sequence string of the block.
+    write_tx : bool
+        Whether this is the first block of the matrix. In the phylip
+        format, taxon names are only written in the first block.
+    options : dict
+        Formatting options (see `format_sequence`).
+
+    Returns
+    -------
+    _ : str
+        Line of the block.
+    """
+
+    if fmt == "nexus":
+        return "{} {}\n".format(
+            taxon[:options["cut_space_nex"]].ljust(options["tx_space_nex"]),
+            seq)
+    elif write_tx:
+        return "{} {}\n".format(
+            taxon[:options["cut_space_phy"]].ljust(options["tx_space_phy"]),
+            seq)
+    else:
+        return "{}\n".format(seq)
+
+
+def write_output_file(args):
+    """Renders and writes the output file of a single alignment.
+
+    This function is meant to be executed by the worker processes of
+    :meth:`AlignmentList._write_files`. The header and trailer of the file
+    are rendered by the main process, since they depend on the `Alignment`
+    and `Partitions` objects, while the sequences are rendered and written
+    here.
+
+    Parameters
+    ----------
+    args : tuple
+        Tuple with (<output file>, <output format>, <header>, <list of
+        (taxon, seq) tuples>, <trailer>, <alignment length>, <formatting
+        options>).
+
+    Returns
+    -------
+    output_file : str
+        Path of the written file.
+    """
+
+    output_file, fmt, header, rows, trailer, locus_length, options = args
+
+    if options["upper_case"]:
+        rows = [(taxon, seq.upper()) for taxon, seq in rows]
+
+    with open(output_file, "w", write_buffer_size) as fh:
+
+        fh.write(header)
+
+        if options["interleave"] and fmt in ["phylip", "nexus"]:
+
+            # Same blocks, and in the same order, as the ones retrieved
+            # from the `.interleavedata` table
+            blocks = sorted(
+                (x[2], i, x[0], x[1])
+                for i, (taxon, seq) in enumerate(rows)
+                for x in AlignmentList._interleave_rows(taxon, seq, 0,
+                                                        locus_length))
+
+            write_tx = True
+            prev = 90
+            for p, _, taxon, seq in blocks:
+                if p != prev:
+                    fh.write("\n")
+                    prev = p
+                    write_tx = False
+                fh.write(format_interleave_block(fmt, taxon, seq, write_tx,
+                                                 options))
+
+        else:
+            fh.write("".join(format_sequence(fmt, taxon, seq, locus_length,
+                                             options)
+                             for taxon, seq in rows))
+
+        fh.write(trailer)
+
+    return output_file
+
+
+class AlignmentList(Base):
+    """Main interface for groups of `Alignment` objects.
+
+    The `AlignmentList` class can be seen as a group of `Alignment` objects
+    that is treated as a single cohesive data set. It is the main class
+    used to perform alignment operations on TriFusion and TriSeq programs,
+    even when there is only a single alignment.
+
+    An instance can be created by simply providing a list of paths to
+    alignment files, which can be empty (and alignments added later). It
+    is recommended that the path to the sqlite database be specified
+    via the `sql_db` argument, but this is optional.
+
+    Individual alignment files can be provided when instantiating the class
+    or added later, and each is processed and stored as an `Alignment` object.
+    The `AlignmentList` object provides attributes that are relative to the
+    global data set. For instance, each `Alignment` object may have their
+    individual and unique list of taxa, but the corresponding attribute in the
+    `AlignmentList` object contains the list of all taxa that are found
+    in the `Alignment` object list.
+    
+    Several methods of the `Alignment` class are also present in this class
+    with the same usage (e.g. `collapse`). These are basically wrappers that
+    apply the method to all `Alignment` objects and may have some
+    modifications adapted to multiple alignments.
+    
+    Other methods are exclusive and desgined to deal with multiple alignments,
+    such as concatenation (`concatenate`), filter by taxa (`filter_by_taxa`),
+    etc.
+
+    Plotting methods are exclusive to `AlignmentList`, even the
+    ones that are focused on single alignments. In this case, the
+    `Alignment` object can be specified and processed individually directly
+    from this class.
+
+    Parameters
+    ----------
+    alignment_list : list
+        List with paths to alignment files. Can be empty.
+    sql_db : str, optional
+        Path where the sqlite3 database will be created.
+    db_cur : sqlite3.Cursor, optional
+        Provide a database Cursor object in conjunction with the Connection
+        object (`db_con`) to connect to an existing database.
+    db_con : sqlite3.Connection, optional
         Provide a database Connection object in conjunction with the Cursor
         object (`db_cur`) to connect to an existing database.
     pbar : ProgressBar, optional
         A ProgressBar object used to log the progress of TriSeq execution.
+    jobs : int, optional
+        Number of worker processes used to parse the alignment files
+        (default is 1). See :meth:`add_alignment_files`.
+    packed : bool, optional
+        If True, DNA sequences are stored in packed form (4 bits per
+        site) in the database, which roughly halves its size (default is
+        False). See :mod:`~trifusion.process.packing`.
+    cache : trifusion.process.cache.ParseCache, optional
+        Persistent cache of parsed alignment files. Files that did not
+        change since they were added to the cache are not parsed again.
 
     Attributes
     ----------
@@ -2951,7 +3439,7 @@ class AlignmentList(Base):
     """
 
     def __init__(self, alignment_list, sql_db=None, db_cur=None, db_con=None,
-                 pbar=None):
+                 pbar=None, jobs=1, packed=False, cache=None):
 
         # Create connection and cursor for sqlite database
         # If `db_cur` and `db_con` are both provided, setup the database
@@ -2983,11 +3471,29 @@ class AlignmentList(Base):
         """Name of the table with the taxa_idx and partitions information
         for each Alignment object"""
 
+        self.cache = cache
+        """
+        ParseCache object with the parsed data of alignment files, or None.
+        """
+
+        self.packed = packed
+        """
+        If True, DNA sequences are stored in packed form in the master table
+        (see :mod:`~trifusion.process.packing`).
+        """
+
         if not db_cur and not db_con:
-            self.con = sqlite3.connect(self.sql_path, check_same_thread=False,
-                                       timeout=0.0)
+            self.pool = ConnectionPool(self.sql_path, packed=packed)
+            self.con = self.pool.writer
             self.cur = self.con.cursor()
             self.cur.execute("PRAGMA synchronous = OFF")
+        else:
+            self.pool = ConnectionPool(con=self.con, packed=packed)
+        """
+        ConnectionPool object with the database connections. Read-only
+        queries use a Cursor from `pool.cursor()`, which allows concurrent
+        reads from different threads.
+        """
 
         if not self._table_exists(self.master_table):
             # Add master table for sequence data
@@ -2998,6 +3504,12 @@ class AlignmentList(Base):
         if not self._table_exists("aux"):
             self._create_aux_table()
 
+        if not self._table_exists("aux_stats"):
+            self._create_stats_table()
+
+        if not self._table_exists("aux_features"):
+            self._create_features_table()
+
         self.alignments = OrderedDict()
         """
         Stores the "active" `Alignment` objects for the current
@@ -3023,6 +3535,12 @@ class AlignmentList(Base):
         List with shelved alignment idx.
         """
 
+        self._shared_alignments = False
+        """
+        True when the `Alignment` objects are shared with another
+        `AlignmentList` object (see `view`).
+        """
+
         self._idx = 1
 
         self.bad_alignments = []
@@ -3122,7 +3640,7 @@ class AlignmentList(Base):
         # if type(alignment_list[0]) is str:
         if alignment_list:
 
-            self.add_alignment_files(alignment_list, pbar=pbar)
+            self.add_alignment_files(alignment_list, pbar=pbar, jobs=jobs)
 
     def __iter__(self):
         """Iterator behavior for `AlignmentList`
@@ -3136,14 +3654,21 @@ class AlignmentList(Base):
         """
         return iter(self.alignments.values())
 
-    def iter_alignments(self, table_name=None, include_txid=False):
+    def iter_alignments(self, table_name=None, include_txid=False,
+                        aln_idx_list=None, unpack=True):
 
         table_name = table_name if table_name else self.master_table
 
+        # Restrict the query to a subset of the active alignments
+        if aln_idx_list is None:
+            aln_idx_list = self.alignment_idx
+
+        cur = self.pool.cursor()
+
         # Check if table exists and is not empty. In any of these conditions,
         # fallback to the master table
         try:
-            if not self.cur.execute(
+            if not cur.execute(
                     "SELECT * FROM {}".format(table_name)).fetchone():
                 table_name = self.master_table
         except sqlite3.OperationalError:
@@ -3151,34 +3676,37 @@ class AlignmentList(Base):
 
         try:
 
-            lock.acquire(True)
-
-            for txId, taxon, seq, aln_idx in self.cur.execute(
+            for txId, taxon, seq, aln_idx in cur.execute(
                     "SELECT txId, taxon, seq, aln_idx "
                     "FROM [{}] "
                     "WHERE aln_idx NOT IN ({}) AND "
                     "aln_idx IN ({})".format(
                         table_name,
                         ", ".join([str(x) for x in self.shelved_idx]),
-                        ", ".join([str(x) for x in self.alignment_idx]))):
+                        ", ".join([str(x) for x in aln_idx_list]))):
                 if taxon not in self.shelved_taxa:
+                    # Packed sequences are only kept as such on request
+                    if unpack:
+                        seq = unpack_sequence(seq)
                     if include_txid:
                         yield txId, taxon, seq, aln_idx
                     else:
                         yield taxon, seq, aln_idx
 
         finally:
-            lock.release()
+            cur.close()
 
     def iter_columns(self, table_name=None, aln_idx=None, include_taxa=False,
                      group_by=None):
 
         table_name = table_name if table_name else self.master_table
 
+        cur = self.pool.cursor()
+
         # Check if table exists and is not empty. In any of these conditions,
         # fallback to the master table
         try:
-            if not self.cur.execute(
+            if not cur.execute(
                     "SELECT * FROM [{}]".format(table_name)).fetchone():
                 table_name = self.master_table
         except sqlite3.OperationalError as e:
@@ -3186,11 +3714,13 @@ class AlignmentList(Base):
 
         try:
 
-            lock.acquire(True)
+            # Packed sequences require the `seq_substr` function, which is
+            # slower than the builtin `substr` for text values
+            substr = "seq_substr" if self.pool.packed else "substr"
 
             query = "SELECT " \
                     "{tx} " \
-                    "GROUP_CONCAT(substr(seq, {pos}, 100000)), " \
+                    "GROUP_CONCAT({substr}(seq, {pos}, 100000)), " \
                     "{idx} " \
                     "FROM [{tb}] " \
                     "WHERE {cond} " \
@@ -3216,8 +3746,9 @@ class AlignmentList(Base):
             for p in xrange(0, self.size, 100000):
                 if include_taxa:
                     for res in ((z, x.split(","), y) for z, x, y in
-                                self.cur.execute(
+                                cur.execute(
                                     query.format(pos=p,
+                                                 substr=substr,
                                                  tb=table_name,
                                                  cond=cond,
                                                  cond_tx=cond_tx,
@@ -3226,8 +3757,9 @@ class AlignmentList(Base):
                         for col in itertools.izip(*res[1]):
                             yield res[0].split(","), col, res[2]
                 else:
-                    for res in ((x.split(","), y) for x, y in self.cur.execute(
+                    for res in ((x.split(","), y) for x, y in cur.execute(
                             query.format(pos=p,
+                                         substr=substr,
                                          tb=table_name,
                                          cond=cond,
                                          cond_tx=cond_tx,
@@ -3237,7 +3769,70 @@ class AlignmentList(Base):
                             yield col, res[1]
 
         finally:
-            lock.release()
+            cur.close()
+
+    def iter_matrices(self, table_name=None, include_taxa=False,
+                      aln_idx_list=None):
+        """Generator over the sequence matrix of each active alignment.
+
+        Retrieves the data of each active alignment and yields it as a
+        :class:`~trifusion.process.matrix.ColumnMatrix` object, which
+        provides vectorized column statistics. Contrary to `iter_columns`,
+        the whole alignment is loaded into memory as a 2-D array of bytes.
+
+        Parameters
+        ----------
+        table_name : str, optional
+            Name of the database table from where the data is retrieved.
+            Falls back to the master table if it does not exist or is empty.
+        include_taxa : bool, optional
+            If True, also yields the list of (txId, taxon) tuples in the
+            same order as the rows of the matrix (default is False).
+        aln_idx_list : list, optional
+            If provided, only the alignments with these `aln_idx` are
+            retrieved.
+
+        Yields
+        ------
+        taxa : list
+            List of (txId, taxon) tuples. Only provided when `include_taxa`
+            is True.
+        mat : trifusion.process.matrix.ColumnMatrix
+            Matrix with the sequence data of the alignment.
+        aln_idx : int
+            Index of the alignment in the database.
+        """
+
+        def get_matrix():
+            aln = self.alignment_idx[prev_idx]
+            mat = ColumnMatrix.from_sequences(seqs, aln.sequence_code[1],
+                                              self.gap_symbol)
+            if include_taxa:
+                return taxa, mat, prev_idx
+            else:
+                return mat, prev_idx
+
+        prev_idx = None
+        taxa, seqs = [], []
+
+        # Packed sequences are unpacked directly into the matrix
+        for txId, taxon, seq, aln_idx in self.iter_alignments(
+                table_name, include_txid=True, aln_idx_list=aln_idx_list,
+                unpack=False):
+
+            if aln_idx != prev_idx:
+
+                if seqs:
+                    yield get_matrix()
+
+                taxa, seqs = [], []
+                prev_idx = aln_idx
+
+            taxa.append((txId, taxon))
+            seqs.append(seq)
+
+        if seqs:
+            yield get_matrix()
 
     def _create_aux_table(self, cur=None):
         """Creates an auxiliary table in the database
@@ -3258,20 +3853,16 @@ class AlignmentList(Base):
 
         cur.execute("CREATE INDEX aux_idx ON aux(aln_idx)")
 
-    def _create_table(self, table_name, index=None, cur=None, add_cols=None):
-        """Creates a new table in the database.
+    def _create_stats_table(self, cur=None):
+        """Creates the auxiliary table with per alignment statistics.
 
-        Convenience method that creates a new table in the sqlite database.
-        It accepts a custom Cursor object, which overrides the `cur`
-        attribute. Optionally, an index can also be specified.
+        Each row stores the statistics of one alignment (`aln_idx`) for
+        a given database table (`table_name`) and set of shelved taxa
+        (`shelved`, see `_shelved_key`). These are calculated and stored
+        by `_get_alignment_stats`.
 
         Parameters
         ----------
-        table_name : str
-            Name of the table to be created.
-        index : list, optional
-            Provide a list with [<name of index>, <columns to be indexed>].
-            (e.g., ["concindex", "txId"]).
         cur : sqlite3.Cursor, optional
             Custom Cursor object used to query the database.
         """
@@ -3279,102 +3870,390 @@ class AlignmentList(Base):
         if not cur:
             cur = self.cur
 
-        if add_cols:
-            cols = "".join([", " + x for x in add_cols])
-        else:
-            cols = ""
-
-        cur.execute("CREATE TABLE [{}]("
-                    "txId INT, "
-                    "taxon TEXT, "
-                    "seq TEXT, "
-                    "aln_idx INT"
-                    "{})".format(table_name, cols))
+        cur.execute("CREATE TABLE aux_stats("
+                    "aln_idx INT,"
+                    "table_name TEXT,"
+                    "shelved TEXT,"
+                    "taxa INT,"
+                    "var INT,"
+                    "inf INT,"
+                    "gap INT,"
+                    "missing INT)")
+
+        cur.execute("CREATE INDEX aux_stats_idx ON "
+                    "aux_stats(table_name, aln_idx)")
+
+    def _create_features_table(self, cur=None):
+        """Creates the auxiliary table with per alignment features.
+
+        Each row stores the :class:`~trifusion.process.matrix.
+        AlignmentProfile` of one alignment (`aln_idx`) for a given database
+        table (`table_name`) and set of shelved taxa (`shelved`, see
+        `_shelved_key`). Array fields are stored as `int32` blobs. These are
+        calculated and stored by `_get_feature_cube`.
 
-        if index:
-            cur.execute("CREATE INDEX {} ON [{}]({})".format(
-                index[0], table_name, index[1]))
+        Parameters
+        ----------
+        cur : sqlite3.Cursor, optional
+            Custom Cursor object used to query the database.
+        """
 
-    def _table_exists(self, table_name, cur=None):
-        """ Checks if a table exists in the database.
+        if not cur:
+            cur = self.cur
 
-        Convenience method that checks if a table exists in the database.
-        It accepts a custom Cursor object, which overrides the `cur`
-        attribute.
+        cur.execute("CREATE TABLE aux_features("
+                    "aln_idx INT,"
+                    "table_name TEXT,"
+                    "shelved TEXT,"
+                    "taxa TEXT,"
+                    "nsites INT,"
+                    "missing TEXT,"
+                    "symbols TEXT,"
+                    "counts BLOB,"
+                    "seg INT,"
+                    "inf INT,"
+                    "derived BLOB,"
+                    "sites BLOB)")
+
+        cur.execute("CREATE INDEX aux_features_idx ON "
+                    "aux_features(table_name, aln_idx)")
+
+    @hold_write_lock
+    def _invalidate_stats(self, table_name=None, aln_idx=None):
+        """Removes stored alignment statistics.
+
+        Must be called whenever the data of a table is modified, so that
+        the statistics are calculated again the next time they are
+        requested.
 
         Parameters
         ----------
-        table_name : str
-            Name of the table.
-        cur: sqlite3.Cursor, optional
-            Custom Cursor object used to query the database.
+        table_name : str, optional
+            Remove only the statistics of this table.
+        aln_idx : int, optional
+            Remove only the statistics of the alignment with this index.
+        """
 
-        Returns
-        -------
-        res : list
-            List with the results of a query for 'table' type with
-            `db_idx` name. Is empty when the table does not exist.
+        conditions = []
+        values = []
 
-        Notes
-        -----
-        This returns a list that will contain one item if the table exists
-        in the database. If it doesn't exist, returns an empty list.
-        Therefore, this can be used simply like::
+        if table_name:
+            conditions.append("table_name=?")
+            values.append(table_name)
+        if aln_idx is not None:
+            conditions.append("aln_idx=?")
+            values.append(aln_idx)
 
-            if self._table_exists("my_table"):
-                 # Do stuff
+        for table in ["aux_stats", "aux_features"]:
+            query = "DELETE FROM {}".format(table)
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+
+            self.cur.execute(query, values)
+
+    def _shelved_key(self):
+        """Returns a string identifying the current set of shelved taxa.
+
+        Since shelved taxa are ignored when retrieving alignment data, the
+        statistics of an alignment depend on them.
+
+        Returns
+        -------
+        _ : str
+            MD5 digest of the sorted shelved taxa names.
         """
 
-        if not cur:
-            cur = self.cur
+        shelved = u"\n".join(sorted(unicode(x) for x in self.shelved_taxa))
 
-        return cur.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND"
-            " name='{}'".format(table_name)).fetchall()
+        return hashlib.md5(shelved.encode("utf-8")).hexdigest()
 
-    def _get_idx(self, aln_path):
-        """Returns the `align_idx` for a given `aln_path`.
+    def _get_alignment_stats(self, table_name=None, ns=None):
+        """Returns the statistics of each active alignment.
 
-        Returns the alignment identifier number in the sqlite database
-        (`aln_idx`) for a given alignment path (`aln_path`).
+        Statistics are retrieved from the `aux_stats` table. Only the
+        active alignments without stored statistics for `table_name` and
+        the current shelved taxa are scanned, in a single pass of
+        `iter_matrices`, and their results are stored for future calls.
 
         Parameters
         ----------
-        aln_path
+        table_name : str, optional
+            Name of the database table with the alignment data (default
+            is the master table).
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion.
 
         Returns
         -------
-
+        stats : dict
+            Maps the `aln_idx` of each active alignment with data to a tuple
+            with (<taxa>, <variable sites>, <informative sites>,
+            <columns with gaps>, <columns with missing data>).
         """
 
-        try:
-            idx = [idx for idx, path in self.alignment_idx.items() if
-                   path == aln_path][0]
-        except IndexError:
-            idx = None
+        table_name = table_name if table_name else self.master_table
+        shelved_key = self._shelved_key()
 
-        return idx
+        active_idx = [x for x in self.alignment_idx
+                      if x not in self.shelved_idx]
+        active_set = set(active_idx)
 
-    @staticmethod
-    def _check_killswitch(ns):
+        cur = self.pool.cursor()
+        stats = dict((x[0], x[1:]) for x in cur.execute(
+            "SELECT aln_idx, taxa, var, inf, gap, missing FROM aux_stats "
+            "WHERE table_name=? AND shelved=?", (table_name, shelved_key))
+            if x[0] in active_set)
+        cur.close()
 
-        if ns:
-            if ns.stop:
-                raise KillByUser("")
+        missing_idx = [x for x in active_idx if x not in stats]
 
-    def _set_pipes(self, ns=None, pbar=None, total=None, msg=None,
-                   ignore_sa=False):
-        """Setup of progress indicators for both GUI and CLI task executions.
+        if missing_idx:
 
-        This handles the setup of the objects responsible for updating
-        the progress of task's execution of both TriFusion (GUI) and
-        TriSeq (CLI). At the beginning of any given task, these objects
-        can be initialized by providing either the Namespace object (`ns`)
-        in the case of TriFusion, or the ProgressBar object (`pbar`), in
-        the case of TriSeq. Along with one of these objects, the expected
-        `total` of the progress should also be provided. The `ns` and
-        `pbar` objects are updated at each iteration of a given task,
-        and the `total` is used to get a measure of the progress.
+            new_rows = []
+
+            for c, (mat, aln_idx) in enumerate(self.iter_matrices(
+                    table_name, aln_idx_list=missing_idx)):
+
+                self._update_pipes(ns, None, value=c + 1)
+
+                aln = self.alignment_idx[aln_idx]
+
+                stats[aln_idx] = (
+                    len(aln.taxa_idx),
+                    int(mat.variable().sum()),
+                    int(mat.informative().sum()),
+                    int(np.count_nonzero(mat.gap_count())),
+                    int(np.count_nonzero(mat.missing_count())))
+
+                new_rows.append((aln_idx, table_name, shelved_key) +
+                                stats[aln_idx])
+
+            # Statistics may be computed by concurrent threads. Use a
+            # separate Cursor of the writer connection
+            with self.pool.write_lock:
+                self.con.executemany(
+                    "INSERT INTO aux_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    new_rows)
+
+        return stats
+
+    def _get_feature_cube(self, table_name=None, ns=None):
+        """Returns the per alignment and per taxon features of the data set.
+
+        The :class:`~trifusion.process.matrix.AlignmentProfile` of each
+        active alignment is retrieved from the `aux_features` table. As
+        with `_get_alignment_stats`, only the active alignments without
+        stored features for `table_name` and the current shelved taxa are
+        scanned, in a single pass of `iter_matrices`. Since the features are
+        stored in the database, they are shared by all plot methods and by
+        all copies of the `AlignmentList` that use the same database.
+
+        Parameters
+        ----------
+        table_name : str, optional
+            Name of the database table with the alignment data (default
+            is the master table).
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion.
+
+        Returns
+        -------
+        _ : trifusion.process.matrix.FeatureCube
+            Features of the active alignments with data, with one column
+            per taxon in `taxa_names`.
+        """
+
+        def to_blob(array):
+            return sqlite3.Binary(np.asarray(array, dtype=np.int32).tostring())
+
+        def from_blob(blob):
+            return np.frombuffer(bytes(blob), dtype=np.int32).astype(int)
+
+        table_name = table_name if table_name else self.master_table
+        shelved_key = self._shelved_key()
+
+        active_idx = [x for x in self.alignment_idx
+                      if x not in self.shelved_idx]
+        active_set = set(active_idx)
+
+        profiles = {}
+
+        cur = self.pool.cursor()
+        for (aln_idx, taxa, nsites, missing, symbols, counts, seg, inf,
+             derived, sites) in cur.execute(
+                "SELECT aln_idx, taxa, nsites, missing, symbols, counts, seg, "
+                "inf, derived, sites FROM aux_features "
+                "WHERE table_name=? AND shelved=?", (table_name, shelved_key)):
+
+            if aln_idx in active_set:
+                taxa = taxa.split("\n") if taxa else []
+                profiles[aln_idx] = AlignmentProfile(
+                    taxa, nsites, str(missing), str(symbols),
+                    from_blob(counts).reshape(len(taxa), len(symbols)),
+                    seg, inf, from_blob(derived), from_blob(sites))
+        cur.close()
+
+        missing_idx = [x for x in active_idx if x not in profiles]
+
+        if missing_idx:
+
+            new_profiles = {}
+
+            for c, (taxa, mat, aln_idx) in enumerate(self.iter_matrices(
+                    table_name, include_taxa=True,
+                    aln_idx_list=missing_idx)):
+
+                self._update_pipes(ns, None, value=c + 1)
+                self._check_killswitch(ns)
+
+                new_profiles[aln_idx] = mat.profile([tx for _, tx in taxa])
+
+            new_rows = []
+
+            for aln_idx in missing_idx:
+                # Alignments without active taxa are stored with an empty
+                # profile, so that they are not scanned again
+                p = new_profiles.get(aln_idx, AlignmentProfile(
+                    [], 0, "", "", [], 0, 0, [], []))
+
+                new_rows.append((aln_idx, table_name, shelved_key,
+                                 u"\n".join(p.taxa), p.nsites, p.missing,
+                                 p.symbols, to_blob(p.counts), p.segregating,
+                                 p.informative, to_blob(p.derived),
+                                 to_blob(p.sites)))
+
+            # Features may be computed by concurrent threads. Use a
+            # separate Cursor of the writer connection
+            with self.pool.write_lock:
+                self.con.executemany(
+                    "INSERT INTO aux_features VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", new_rows)
+
+            profiles.update(new_profiles)
+
+        return FeatureCube(self.taxa_names, OrderedDict(
+            (x, profiles[x]) for x in active_idx
+            if x in profiles and profiles[x].taxa), self.gap_symbol)
+
+    def _create_table(self, table_name, index=None, cur=None, add_cols=None):
+        """Creates a new table in the database.
+
+        Convenience method that creates a new table in the sqlite database.
+        It accepts a custom Cursor object, which overrides the `cur`
+        attribute. Optionally, an index can also be specified.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table to be created.
+        index : list, optional
+            Provide a list with [<name of index>, <columns to be indexed>].
+            (e.g., ["concindex", "txId"]).
+        cur : sqlite3.Cursor, optional
+            Custom Cursor object used to query the database.
+        """
+
+        if not cur:
+            cur = self.cur
+
+        if add_cols:
+            cols = "".join([", " + x for x in add_cols])
+        else:
+            cols = ""
+
+        cur.execute("CREATE TABLE [{}]("
+                    "txId INT, "
+                    "taxon TEXT, "
+                    "seq TEXT, "
+                    "aln_idx INT"
+                    "{})".format(table_name, cols))
+
+        if index:
+            cur.execute("CREATE INDEX {} ON [{}]({})".format(
+                index[0], table_name, index[1]))
+
+    def _table_exists(self, table_name, cur=None):
+        """ Checks if a table exists in the database.
+
+        Convenience method that checks if a table exists in the database.
+        It accepts a custom Cursor object, which overrides the `cur`
+        attribute.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table.
+        cur: sqlite3.Cursor, optional
+            Custom Cursor object used to query the database.
+
+        Returns
+        -------
+        res : list
+            List with the results of a query for 'table' type with
+            `db_idx` name. Is empty when the table does not exist.
+
+        Notes
+        -----
+        This returns a list that will contain one item if the table exists
+        in the database. If it doesn't exist, returns an empty list.
+        Therefore, this can be used simply like::
+
+            if self._table_exists("my_table"):
+                 # Do stuff
+        """
+
+        if not cur:
+            cur = self.cur
+
+        return cur.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND"
+            " name='{}'".format(table_name)).fetchall()
+
+    def _get_idx(self, aln_path):
+        """Returns the `align_idx` for a given `aln_path`.
+
+        Returns the alignment identifier number in the sqlite database
+        (`aln_idx`) for a given alignment path (`aln_path`).
+
+        Parameters
+        ----------
+        aln_path
+
+        Returns
+        -------
+
+        """
+
+        try:
+            idx = [idx for idx, path in self.alignment_idx.items() if
+                   path == aln_path][0]
+        except IndexError:
+            idx = None
+
+        return idx
+
+    @staticmethod
+    def _check_killswitch(ns):
+
+        if ns:
+            if ns.stop:
+                raise KillByUser("")
+
+    def _set_pipes(self, ns=None, pbar=None, total=None, msg=None,
+                   ignore_sa=False):
+        """Setup of progress indicators for both GUI and CLI task executions.
+
+        This handles the setup of the objects responsible for updating
+        the progress of task's execution of both TriFusion (GUI) and
+        TriSeq (CLI). At the beginning of any given task, these objects
+        can be initialized by providing either the Namespace object (`ns`)
+        in the case of TriFusion, or the ProgressBar object (`pbar`), in
+        the case of TriSeq. Along with one of these objects, the expected
+        `total` of the progress should also be provided. The `ns` and
+        `pbar` objects are updated at each iteration of a given task,
+        and the `total` is used to get a measure of the progress.
 
         Optionally, a message can be also provided for the Namespace object
         that will be used by TriFusion.
@@ -3517,13 +4396,13 @@ class AlignmentList(Base):
 
     def close_database(self):
 
-        self.con.commit()
-        self.con.close()
-        self.con = self.cur = None
+        self.pool.close()
+        self.con = self.cur = self.pool = None
 
         for aln in self.all_alignments.values():
             aln.cur = None
             aln.con = None
+            aln.pool = None
 
     def resume_database(self):
         """Reconnects to the sqlite database.
@@ -3534,15 +4413,16 @@ class AlignmentList(Base):
         *all* (even the shelved ones) `Alignment` objects.
         """
 
-        self.con = sqlite3.connect(self.sql_path, check_same_thread=False,
-                                   timeout=0.0)
+        self.pool = ConnectionPool(self.sql_path, packed=self.packed)
+        self.con = self.pool.writer
         self.cur = self.con.cursor()
 
         for aln in self.all_alignments.values():
             aln.cur = self.cur
             aln.con = self.con
+            aln.pool = self.pool
 
-    def set_database_connections(self, cur, con):
+    def set_database_connections(self, cur, con, pool=None):
         """Provides Connection and Cursor to `Alignment` objects.
 
         Sets the database connections manually for *all* (even the
@@ -3554,14 +4434,24 @@ class AlignmentList(Base):
             Provide a database Cursor object.
         con : sqlite3.Connection
             Provide a database Connection object.
+        pool : trifusion.process.database.ConnectionPool, optional
+            Provide a ConnectionPool object. If not provided, the current
+            `pool` is kept if its writer is `con`. Otherwise, a new pool
+            is created for `con`.
         """
 
         self.cur = cur
         self.con = con
 
+        if pool:
+            self.pool = pool
+        elif not self.pool or self.pool.writer is not con:
+            self.pool = ConnectionPool(con=con, packed=self.packed)
+
         for aln in self.all_alignments.values():
             aln.cur = cur
             aln.con = con
+            aln.pool = self.pool
 
     def get_tables(self):
         """Return list with `db_idx` of *all* `Alignment` objects.
@@ -3576,12 +4466,14 @@ class AlignmentList(Base):
         return [x.table_name for x in
                 self.all_alignments.values()]
 
+    @hold_write_lock
     def remove_aux_tables(self):
 
         self.cur.execute(
             "DELETE FROM aux WHERE aln_idx NOT IN ({})".format(
                 ", ".join([str(x) for x in xrange(self._idx + 1)])))
 
+    @hold_write_lock
     def remove_tables(self, preserve_tables=None, trash_tables=None):
         """Drops tables from the database.
 
@@ -3603,7 +4495,8 @@ class AlignmentList(Base):
             Takes precedence over `preserve_tables` if both are provided.
         """
 
-        preserved_tables = ["alignment_data", "aux"]
+        preserved_tables = ["alignment_data", "aux", "aux_stats",
+                            "aux_features"]
 
         tables = self.cur.execute(
             "SELECT name FROM sqlite_master WHERE type='table';").fetchall()
@@ -3611,6 +4504,7 @@ class AlignmentList(Base):
         for tb in [x[0] for x in tables if x[0] not in preserved_tables]:
             self.cur.execute("DROP TABLE [{}]".format(tb))
 
+    @hold_write_lock
     def clear_alignments(self):
         """Clears all attributes and data from the `AlignmentList` object."""
 
@@ -3621,6 +4515,7 @@ class AlignmentList(Base):
 
         self.cur.execute("DELETE FROM [{}]".format(self.master_table))
         self.cur.execute("DELETE FROM aux")
+        self._invalidate_stats()
 
         # Remove temporary json auxiliary files from Alignment objects
         for aln in self.all_alignments.values():
@@ -3788,9 +4683,71 @@ class AlignmentList(Base):
                     except ValueError:
                         pass
 
+        # The shelved taxa of views must not change the Alignment objects
+        # of the original AlignmentList
+        if self._shared_alignments and (
+                self.shelved_taxa or
+                any(x.shelved_taxa for x in self.alignments.values())):
+            self._unshare_alignments()
+
         # Update individual Alignment objects
         for aln_obj in self.alignments.values():
-            aln_obj.shelve_taxa(self.shelved_taxa)
+            # Nothing changes when no taxa are shelved
+            if self.shelved_taxa or aln_obj.shelved_taxa:
+                aln_obj.shelve_taxa(self.shelved_taxa)
+
+    def view(self):
+        """Returns a lightweight copy of the `AlignmentList` object.
+
+        The view shares the `Alignment` objects, partitions, summary gene
+        table and database connections with the original object, but has
+        its own set of active alignments and taxa. Therefore, it can be
+        used instead of `copy.deepcopy` to apply the active file and taxa
+        sets before retrieving statistics, without changing the original
+        object and without copying each `Alignment` object. The
+        `Alignment` objects are only copied when the shelved taxa of the
+        view require changing them (see `update_taxa_names`).
+
+        Returns
+        -------
+        aln_view : AlignmentList
+            View of the `AlignmentList` object.
+        """
+
+        aln_view = copy.copy(self)
+
+        # Containers that are modified in place when the active alignments
+        # and taxa change
+        aln_view.alignments = OrderedDict(self.alignments)
+        aln_view.all_alignments = OrderedDict(self.all_alignments)
+        aln_view.alignment_idx = OrderedDict(self.alignment_idx)
+        aln_view.shelved_idx = list(self.shelved_idx)
+        aln_view.taxa_names = list(self.taxa_names)
+        aln_view.shelved_taxa = list(self.shelved_taxa)
+        aln_view.summary_stats = dict(self.summary_stats)
+
+        aln_view._shared_alignments = True
+
+        return aln_view
+
+    def _unshare_alignments(self):
+        """Replaces the shared `Alignment` objects of a view by copies.
+
+        The copies are shallow, so that only the attributes of the
+        `Alignment` objects (e.g. `shelved_taxa`) are independent.
+        """
+
+        copies = {}
+
+        for attr in ["alignments", "all_alignments", "alignment_idx"]:
+            container = OrderedDict()
+            for k, v in getattr(self, attr).items():
+                if id(v) not in copies:
+                    copies[id(v)] = copy.copy(v)
+                container[k] = copies[id(v)]
+            setattr(self, attr, container)
+
+        self._shared_alignments = False
 
     def format_list(self, aln_list=None, include_missing=False):
         """Returns list of unique sequence types from `Alignment` objects.
@@ -3896,6 +4853,7 @@ class AlignmentList(Base):
 
         self.size = self.partitions.counter
 
+    @hold_write_lock
     def add_alignments(self, alignment_obj_list, ignore_paths=False):
         """Add a list of `Alignment` objects to the current `AlignmentList`.
 
@@ -3955,7 +4913,7 @@ class AlignmentList(Base):
         self.taxa_names = self._get_taxa_list()
 
     def add_alignment_files(self, file_name_list, pbar=None,
-                            ns=None):
+                            ns=None, jobs=1):
         """Adds a list of alignment files to the current `AlignmentList`.
 
         Adds a list of alignment paths to the current `AlignmentList`. Each
@@ -3973,6 +4931,12 @@ class AlignmentList(Base):
             in TriFusion.
         pbar : ProgressBar
             A ProgressBar object used to log the progress of TriSeq execution.
+        jobs : int
+            Number of worker processes used to parse the alignment files
+            (default is 1). When larger than 1, the files are parsed in
+            parallel by :func:`parse_alignment_file` and the parsed data is
+            inserted into the database by the current process, in the same
+            order as `file_name_list`.
         """
 
         # Check for duplicates among current file list
@@ -3991,58 +4955,103 @@ class AlignmentList(Base):
         if pbar:
             pbar.max_value = len(file_name_list)
 
-        for p, aln_path in enumerate(file_name_list):
+        temp_dir = os.path.dirname(self.sql_path)
+
+        # When using multiple jobs, the alignment files are parsed by a
+        # pool of worker processes. The results are retrieved in the
+        # original order, so that the database index of each alignment is
+        # the same as in the sequential loading. Otherwise, each file is
+        # parsed in this process when creating the Alignment object. In
+        # both cases, the parse cache is looked up only once per file (by
+        # the worker or by the Alignment object)
+        if jobs > 1 and len(file_name_list) > 1:
+            pool = Pool(jobs)
+            parsed_iter = pool.imap(
+                parse_alignment_file,
+                [(x, temp_dir, self.cache) for x in file_name_list])
+        else:
+            pool = None
+
+        try:
+            for p, aln_path in enumerate(file_name_list):
 
-            # Progress bar update for command line version
-            if pbar:
-                pbar.update(p + 1)
+                parsed_data = next(parsed_iter) if pool else None
 
-            if ns:
-                ns.progress += 1
-                ns.m = "Processing file {}".format(
-                    basename(aln_path))
+                # Progress bar update for command line version
+                if pbar:
+                    pbar.update(p + 1)
 
-                if ns.stop:
-                    raise KillByUser("Child thread killed by user")
+                if ns:
+                    ns.progress += 1
+                    ns.m = "Processing file {}".format(
+                        basename(aln_path))
 
-            aln_obj = Alignment(aln_path, sql_cursor=self.cur,
-                                db_idx=self._idx, sql_con=self.con,
-                                temp_dir=os.path.dirname(self.sql_path))
+                    if ns.stop:
+                        raise KillByUser("Child thread killed by user")
 
-            if aln_obj.e:
-                aln_obj.remove_alignment()
+                aln_obj = Alignment(aln_path, sql_cursor=self.cur,
+                                    db_idx=self._idx, sql_con=self.con,
+                                    pool=self.pool,
+                                    temp_dir=temp_dir,
+                                    parsed_data=parsed_data,
+                                    cache=self.cache)
 
-            if isinstance(aln_obj.e, InputError):
-                self.bad_alignments.append(aln_obj.path)
-            elif isinstance(aln_obj.e, AlignmentUnequalLength):
-                self.non_alignments.append(aln_obj.path)
-            elif isinstance(aln_obj.e, EmptyAlignment):
-                self.bad_alignments.append(aln_obj.path)
-            else:
+                self._add_alignment_obj(aln_obj)
 
-                # Get seq code
-                if aln_obj.sequence_code[0] not in self.sequence_code:
-                    self.sequence_code.append(aln_obj.sequence_code[0])
-                # Check for multiple sequence types. If True,
-                # raise Exception
-                # elif self.sequence_code[0] != aln_obj.sequence_code[0]:
-                #     raise MultipleSequenceTypes("Multiple sequence "
-                #         "types detected: {} and {}".format(
-                #             self.sequence_code[0],
-                #             aln_obj.sequence_code[0]))
-
-                self.taxa_names.extend([x for x in aln_obj._taxa_idx.keys()
-                                        if x not in self.taxa_names])
-                self.set_partition_from_alignment(aln_obj,
-                                                  use_private_attr=True)
-
-                aln_obj.store_aux_data()
-
-                self.all_alignments[aln_obj.path] = aln_obj
-                self.alignments[aln_obj.path] = aln_obj
-                self.path_list.append(aln_obj.path)
-                self.alignment_idx[self._idx] = aln_obj
-                self._idx += 1
+        finally:
+            if pool:
+                pool.terminate()
+                pool.join()
+
+    @hold_write_lock
+    def _add_alignment_obj(self, aln_obj):
+        """Adds a newly parsed `Alignment` object to `AlignmentList`.
+
+        Checks the exceptions raised during the parsing of `aln_obj`,
+        stores the path of the offending alignments in the
+        `bad_alignments` or `non_alignments` attributes and adds the
+        remaining alignments to the `AlignmentList` object.
+
+        Parameters
+        ----------
+        aln_obj : trifusion.process.sequence.Alignment
+            `Alignment` object.
+        """
+
+        if aln_obj.e:
+            aln_obj.remove_alignment()
+
+        if isinstance(aln_obj.e, InputError):
+            self.bad_alignments.append(aln_obj.path)
+        elif isinstance(aln_obj.e, AlignmentUnequalLength):
+            self.non_alignments.append(aln_obj.path)
+        elif isinstance(aln_obj.e, EmptyAlignment):
+            self.bad_alignments.append(aln_obj.path)
+        else:
+
+            # Get seq code
+            if aln_obj.sequence_code[0] not in self.sequence_code:
+                self.sequence_code.append(aln_obj.sequence_code[0])
+            # Check for multiple sequence types. If True,
+            # raise Exception
+            # elif self.sequence_code[0] != aln_obj.sequence_code[0]:
+            #     raise MultipleSequenceTypes("Multiple sequence "
+            #         "types detected: {} and {}".format(
+            #             self.sequence_code[0],
+            #             aln_obj.sequence_code[0]))
+
+            self.taxa_names.extend([x for x in aln_obj._taxa_idx.keys()
+                                    if x not in self.taxa_names])
+            self.set_partition_from_alignment(aln_obj,
+                                              use_private_attr=True)
+
+            aln_obj.store_aux_data()
+
+            self.all_alignments[aln_obj.path] = aln_obj
+            self.alignments[aln_obj.path] = aln_obj
+            self.path_list.append(aln_obj.path)
+            self.alignment_idx[self._idx] = aln_obj
+            self._idx += 1
 
     def retrieve_alignment(self, name):
         """Return `Alignment` object with a given `name`.
@@ -4094,6 +5103,7 @@ class AlignmentList(Base):
 
         output_handle.close()
 
+    @hold_write_lock
     def concatenate(self, table_in="", table_out="", ns=None, pbar=None):
         """Concatenates alignments into a single `Alignment` object.
 
@@ -4219,6 +5229,7 @@ class AlignmentList(Base):
         table_out = table_out if table_out else self.master_table
         if self._table_exists(table_out):
             self.cur.execute("DROP TABLE [{}]".format(table_out))
+        self._invalidate_stats(table_out)
         self._create_table(table_out, index=["conc_idx", "aln_idx"])
 
         # Reset progress information for next loop
@@ -4231,6 +5242,7 @@ class AlignmentList(Base):
         # an index (for performance and memory reasons). While seqs are
         # grouped by txId, the GROUP_CONCAT() method is used to return
         # concatenated strings.
+        conc_cur = self.pool.cursor()
         for p, (idx, tx, seq, aln_idx) in enumerate(conc_cur.execute(
                 "SELECT txId, taxon, GROUP_CONCAT(seq, ''), aln_idx "
                 "FROM [{}] "
@@ -4264,7 +5276,8 @@ class AlignmentList(Base):
                         sequence_code=seq_type,
                         locus_length=locus_length,
                         db_idx=self._idx,
-                        temp_dir=os.path.dirname(self.sql_path))
+                        temp_dir=os.path.dirname(self.sql_path),
+                        pool=self.pool)
 
         # Reset alignment_idx attribute to reflect the single concatenated
         # alignment
@@ -4284,51 +5297,282 @@ class AlignmentList(Base):
         shelved_alns = [self.alignment_idx[x].path for x in self.shelved_idx]
         self.partitions.remove_partition(file_list=shelved_alns)
 
-    def filter_min_taxa(self, min_taxa, ns=None, pbar=None):
-        """Filters `alignments` by minimum taxa proportion.
+    @hold_write_lock
+    def concatenate_to_file(self, output_format, output_file, table_in="",
+                            ns=None, pbar=None, **kwargs):
+        """Streams the concatenation of the active alignments to files.
 
-        Filters `Alignment` objects based on a minimum taxa representation
-        threshold. Alignments with less that the specified minimum taxa
-        percentage will be moved to the `filtered_alignments` attribute.
+        Alternative to :meth:`concatenate` followed by :meth:`write_to_file`
+        for large data sets. The concatenated matrix is never stored in the
+        database. Instead, the segments of `table_in` are streamed in a single
+        query, ordered by taxon and then by the position of each alignment in
+        the `alignments_range` of the `partitions` attribute. Each segment is
+        written straight to every output file, so memory usage depends only on the largest
+        single segment and not on the length of the concatenated matrix.
+        Absent taxa are filled with missing data.
 
-        NOTE: Since this filtering is meant to be performed when executing
-        the process operations, it will permanently change the AlignmentList
-        object, which means both self.alignments and self._partitions. Not doing
-        so and removing/adding the _partitions would create a great deal of
-        conflicts that can be easily avoided by simply copying the
-        AlignmentList object and modifying this object for the process
-        execution
+        Only the sequential variants of the fasta, phylip and nexus formats
+        are supported.
 
         Parameters
         ----------
-        min_taxa : int
-            Percentage of minimum allowed taxa representation (e.g. 50).
+        output_format : list
+            List with the output formats to generate. Options are:
+            {"fasta", "phylip", "nexus"}.
+        output_file : str
+            Name of the output file, without extension.
+        table_in : string
+            Name of database table containing the alignment data that is
+            used for this operation.
         ns : multiprocesssing.Manager.Namespace
             A Namespace object used to communicate with the main thread
             in TriFusion.
         pbar : ProgressBar
             A ProgressBar object used to log the progress of TriSeq execution.
+        kwargs
+            Formatting options of :meth:`write_to_file` (`tx_space_phy`,
+            `cut_space_phy`, `phy_truncate_names`, `partition_file`,
+            `model_phylip`, `tx_space_nex`, `cut_space_nex`, `gap`,
+            `use_charset`, `use_nexus_models`, `outgroup_list`,
+            `output_dir`, `upper_case`).
+
+        Returns
+        -------
+        concatenated_alignment : trifusion.process.sequence.Alignment
+            `Alignment` object with the attributes of the concatenated
+            alignment. Its sequence data is not stored in the database.
+            None if there are no active alignments.
+
+        Raises
+        ------
+        ValueError
+            If an unsupported output format is provided.
         """
 
-        self._set_pipes(ns, pbar, total=len(self.alignments))
+        unsupported = [x for x in output_format
+                       if x not in ["fasta", "phylip", "nexus"]]
+        if unsupported:
+            raise ValueError("Output format(s) not supported for streamed "
+                             "concatenation: {}".format(
+                                ", ".join(unsupported)))
 
-        self.filtered_alignments["By minimum taxa"] = 0
+        tx_space_phy = kwargs.get("tx_space_phy", 40)
+        cut_space_phy = kwargs.get("cut_space_phy", 39)
+        partition_file = kwargs.get("partition_file", None)
+        model_phylip = kwargs.get("model_phylip", None)
+        tx_space_nex = kwargs.get("tx_space_nex", 40)
+        cut_space_nex = kwargs.get("cut_space_nex", 39)
+        gap = kwargs.get("gap", "-")
+        use_charset = kwargs.get("use_charset", True)
+        use_nexus_models = kwargs.get("use_nexus_models", True)
+        outgroup_list = kwargs.get("outgroup_list", None)
+        output_dir = kwargs.get("output_dir", None)
+        upper_case = kwargs.get("upper_case", None)
 
-        filtered_alns = []
-        active_alns = []
+        if kwargs.get("phy_truncate_names", False):
+            cut_space_phy = 10
 
-        for p, (k, aln_obj) in enumerate(list(self.alignments.items())):
+        if output_dir:
+            output_file = join(output_dir, output_file)
+            if not exists(output_dir):
+                os.makedirs(output_dir)
 
-            self._update_pipes(
-                ns, pbar, value=p + 1, msg="Evaluating file {}".format(
-                    basename(aln_obj.name)))
+        # Same checks as in iter_alignments. Fallback to the master table
+        # when table_in does not exist or is empty
+        table_in = table_in if table_in else self.master_table
+        try:
+            if not self.cur.execute(
+                    "SELECT * FROM [{}]".format(table_in)).fetchone():
+                table_in = self.master_table
+        except sqlite3.OperationalError:
+            table_in = self.master_table
 
-            if len(aln_obj.taxa_idx) < \
-                    (float(min_taxa) / 100.) * len(self.taxa_names):
-                filtered_alns.append(aln_obj.path)
-                self.filtered_alignments["By minimum taxa"] += 1
-            else:
-                active_alns.append(aln_obj.path)
+        self._correct_partitions()
+
+        # Active alignments sorted according to their position in the
+        # concatenated matrix
+        aln_list = sorted(
+            self.alignments.values(),
+            key=lambda x: self.partitions.alignments_range.get(
+                x.path, [0])[0])
+
+        if not aln_list:
+            return
+
+        taxa_list = [x for x in self.taxa_names if x not in self.shelved_taxa]
+        taxa_idx = OrderedDict((tx, idx) for idx, tx in enumerate(taxa_list))
+
+        if len(self.sequence_code) > 1:
+            seq_type = ["mixed"]
+        else:
+            seq_type = [aln_list[0].sequence_code[0]]
+
+        # This Alignment object has no sequence data. It only provides the
+        # attributes used by the header and partition writers. Its aux data
+        # is removed at the end, so the next free index can be used without
+        # reserving it in _idx
+        aln = Alignment("concatenation", sql_cursor=self.cur,
+                        sql_con=self.con, taxa_idx=taxa_idx,
+                        ignore_db_check=True, partitions=self.partitions,
+                        sequence_code=seq_type,
+                        locus_length=sum([x.locus_length for x in aln_list]),
+                        db_idx=self._idx + 1,
+                        temp_dir=os.path.dirname(self.sql_path),
+                        pool=self.pool)
+
+        # Segments are looked up by alignment and taxon. Indexing these
+        # columns avoids a full table scan per segment.
+        self.cur.execute("CREATE INDEX IF NOT EXISTS [.streamindex] "
+                         "ON [{}](aln_idx, taxon)".format(table_in))
+
+        handles = OrderedDict()
+
+        # The output order of taxa and alignments is stored in temporary
+        # tables, so that a single query can return the segments already
+        # sorted by taxon and alignment position.
+        cur = self.con.cursor()
+        cur.execute("CREATE TEMP TABLE [.streamtaxa]("
+                    "pos INTEGER PRIMARY KEY, taxon TEXT)")
+        cur.executemany("INSERT INTO [.streamtaxa] VALUES (?, ?)",
+                        enumerate(taxa_list))
+        cur.execute("CREATE TEMP TABLE [.streamalns]("
+                    "pos INTEGER PRIMARY KEY, aln_idx INT)")
+        cur.executemany("INSERT INTO [.streamalns] VALUES (?, ?)",
+                        ((p, x.db_idx) for p, x in enumerate(aln_list)))
+
+        try:
+
+            for fmt in output_format:
+                fh, of = self._setup_newfile(
+                    None, None, None, None,
+                    output_file + self.format_ext[fmt], ns)
+
+                # File is set to skip
+                if not fh:
+                    continue
+
+                handles[fmt] = fh
+
+                if fmt == "phylip":
+                    self._write_phylip_partitions(aln, partition_file,
+                                                  of, model_phylip)
+                    fh.write("{} {}\n".format(len(taxa_list),
+                                              aln.locus_length))
+                elif fmt == "nexus":
+                    self._write_nexus_header(aln, fh, gap, False)
+
+            self._set_pipes(ns, pbar, total=len(taxa_list))
+
+            # The CROSS JOIN keeps the taxa table as the outer loop, so the
+            # rows come out in the requested order without a sort
+            rows = cur.execute(
+                "SELECT t.pos, a.pos, s.seq FROM [.streamtaxa] AS t "
+                "CROSS JOIN [.streamalns] AS a "
+                "JOIN [{}] AS s ON s.aln_idx=a.aln_idx AND s.taxon=t.taxon "
+                "ORDER BY t.pos, a.pos".format(table_in))
+            row = next(rows, None)
+
+            for p, taxon in enumerate(taxa_list):
+
+                self._update_pipes(ns, pbar, value=p + 1,
+                                   msg="Concatenating taxon {}".format(taxon))
+
+                for fmt, fh in handles.items():
+                    if fmt == "fasta":
+                        fh.write(">{}\n".format(taxon))
+                    elif fmt == "phylip":
+                        fh.write("{} ".format(
+                            taxon[:cut_space_phy].ljust(tx_space_phy)))
+                    else:
+                        fh.write("{} ".format(
+                            taxon[:cut_space_nex].ljust(tx_space_nex)))
+
+                for q, aln_obj in enumerate(aln_list):
+
+                    # Alignments without a row for this taxon are filled
+                    # with missing data
+                    if row and row[:2] == (p, q):
+                        seq = unpack_sequence(row[2])
+                        row = next(rows, None)
+                    else:
+                        seq = aln_obj.sequence_code[1] * aln_obj.locus_length
+
+                    if upper_case:
+                        seq = seq.upper()
+
+                    for fh in handles.values():
+                        fh.write(seq)
+
+                for fh in handles.values():
+                    fh.write("\n")
+
+            if "nexus" in handles:
+                handles["nexus"].write(";\n\tend;")
+                self._write_nexus_partitions(aln, use_charset,
+                                             handles["nexus"],
+                                             aln.partitions,
+                                             use_nexus_models,
+                                             outgroup_list)
+
+        finally:
+            for fh in handles.values():
+                fh.close()
+
+            cur.execute("DROP TABLE IF EXISTS [.streamtaxa]")
+            cur.execute("DROP TABLE IF EXISTS [.streamalns]")
+            cur.close()
+            self.cur.execute("DROP INDEX IF EXISTS [.streamindex]")
+            aln.rm_aux_data()
+
+        self._reset_pipes(ns)
+
+        return aln
+
+    def filter_min_taxa(self, min_taxa, ns=None, pbar=None):
+        """Filters `alignments` by minimum taxa proportion.
+
+        Filters `Alignment` objects based on a minimum taxa representation
+        threshold. Alignments with less that the specified minimum taxa
+        percentage will be moved to the `filtered_alignments` attribute.
+
+        NOTE: Since this filtering is meant to be performed when executing
+        the process operations, it will permanently change the AlignmentList
+        object, which means both self.alignments and self._partitions. Not doing
+        so and removing/adding the _partitions would create a great deal of
+        conflicts that can be easily avoided by simply copying the
+        AlignmentList object and modifying this object for the process
+        execution
+
+        Parameters
+        ----------
+        min_taxa : int
+            Percentage of minimum allowed taxa representation (e.g. 50).
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion.
+        pbar : ProgressBar
+            A ProgressBar object used to log the progress of TriSeq execution.
+        """
+
+        self._set_pipes(ns, pbar, total=len(self.alignments))
+
+        self.filtered_alignments["By minimum taxa"] = 0
+
+        filtered_alns = []
+        active_alns = []
+
+        for p, (k, aln_obj) in enumerate(list(self.alignments.items())):
+
+            self._update_pipes(
+                ns, pbar, value=p + 1, msg="Evaluating file {}".format(
+                    basename(aln_obj.name)))
+
+            if len(aln_obj.taxa_idx) < \
+                    (float(min_taxa) / 100.) * len(self.taxa_names):
+                filtered_alns.append(aln_obj.path)
+                self.filtered_alignments["By minimum taxa"] += 1
+            else:
+                active_alns.append(aln_obj.path)
 
         # Remove all _partitions at once. Much performance, such speed, wow.
         self.partitions.remove_partition(file_list=filtered_alns)
@@ -4423,303 +5667,273 @@ class AlignmentList(Base):
 
         self._reset_pipes(ns)
 
-    def filter_codon_positions(self, position_list, table_in=None,
-                               table_out=None, ns=None, pbar=None):
-        """Filters codon positions in each `Alignment` object.
+    def _iter_alignment_rows(self, table_name=None):
+        """Generator over the rows of each active alignment.
 
-        This wraps the execution of `filter_codon_positions` method for
-        each `Alignment` object in the `alignments` attribute.
+        Parameters
+        ----------
+        table_name : str, optional
+            Name of the database table from where the data is retrieved.
+            Falls back to the master table if it does not exist or is empty.
+
+        Yields
+        ------
+        aln_idx : int
+            Index of the alignment in the database.
+        rows : list
+            List of (txId, taxon, seq) tuples of the alignment.
+        """
+
+        prev_idx = None
+        rows = []
+
+        for txId, taxon, seq, aln_idx in self.iter_alignments(
+                table_name, include_txid=True):
+
+            if aln_idx != prev_idx:
+
+                if rows:
+                    yield prev_idx, rows
+
+                rows = []
+                prev_idx = aln_idx
+
+            rows.append((txId, taxon, seq))
+
+        if rows:
+            yield prev_idx, rows
+
+    @hold_write_lock
+    def _run_kernels(self, kernels, table_in=None, table_out=None, ns=None,
+                     pbar=None):
+        """Applies a chain of alignment kernels in a single pass.
+
+        A kernel is a function that receives an `Alignment` object and the
+        list of its (txId, taxon, seq) rows and returns the modified rows,
+        updating the `Alignment` attributes (e.g. `locus_length`) as
+        needed. Since kernels only need the data of one alignment at a
+        time, any number of them can be applied while the data of
+        `table_in` is read once, and the final rows are written to a
+        single temporary table that replaces `table_out`.
 
         Parameters
         ----------
-        position_list : list
-            List of three bool elements that correspond to each codon position.
-            Ex. [True, True, True] will save all positions while
-            [True, True, False] will exclude the third codon position
+        kernels : list
+            List of (kernel, set_partitions) tuples, applied in order. When
+            `set_partitions` is True, the kernel changes the length of the
+            alignments, and the `partitions` attribute is set from the
+            length of each alignment after the last of such kernels.
         table_in : string
             Name of database table containing the alignment data that is
             used for this operation.
         table_out : string
-            Name of database table where the final alignment will be inserted
-            (default is "filter").
-        use_main_table : bool
-            If True, both `table_in` and `table_out` are ignore and the main
-            table `Alignment.db_idx` is used as the input and output
-            table (default is False).
+            Name of database table where the final alignment will be
+            inserted (default is the master table).
         ns : multiprocesssing.Manager.Namespace
             A Namespace object used to communicate with the main thread
             in TriFusion.
         pbar : ProgressBar
-            A ProgressBar object used to log the progress of TriSeq execution.
+            A ProgressBar object used to log the progress of TriSeq
+            execution.
 
         See Also
         --------
-        Alignment.filter_codon_positions
+        trifusion.process.pipeline.OperationPipeline
         """
 
-        def index(length, pos):
-            """
-            index generator
-            """
-            for _ in range(0, length, 3):
-                for j in pos:
-                    if j:
-                        yield 1
-                    else:
-                        yield 0
+        table_out = table_out if table_out else self.master_table
 
-        # Create temporary table
-        temp_table = ".codonfilter"
-        self._create_table(temp_table)
+        # Index of the last kernel that changes the partitions
+        part_idx = max([i for i, (_, x) in enumerate(kernels) if x] or [-1])
+        part_size = 0
+
+        if part_idx != -1:
+            self.partitions = Partitions()
 
         # Set progress pipes
         self._set_pipes(ns, pbar, total=len(self.alignments))
-        c = 1
 
-        # Reset _partitions
-        self.partitions = Partitions()
-
-        # Create out table if does not exist
-        if not self._table_exists(table_out):
-            self._create_table(table_out)
+        # Create temporary table
+        temp_table = ".pipeline"
+        self._create_table(temp_table)
 
-        # Set temporary cursor to perform database changes while querying
+        # Create temporary cursor to edit database while querying
         temp_cur = self.con.cursor()
 
-        # Defining empty alignment object
-        aln_obj = None
-
-        prev_idx = ""
-        for txId, taxon, seq, aln_idx in self.iter_alignments(
-                table_in, include_txid=True):
+        for p, (aln_idx, rows) in enumerate(
+                self._iter_alignment_rows(table_in)):
 
-            # This happens when the alignment changes during the iteration.
-            if aln_idx != prev_idx:
+            aln = self.alignment_idx[aln_idx]
 
-                # Update the partition size of the last alignment
-                if prev_idx:
-                    aln_obj.locus_length = len(final_seq)
-                    self.set_partition_from_alignment(aln_obj)
-
-                aln_obj = self.alignment_idx[aln_idx]
+            self._update_pipes(ns, pbar, value=p + 1,
+                               msg="Processing file {}".format(aln.name))
 
-                # Update progress
-                self._update_pipes(ns, pbar, value=c,
-                                   msg="Filtering file {}".format(
-                                       aln_obj.name))
-                c += 1
+            for i, (kernel, _) in enumerate(kernels):
 
-                prev_idx = aln_idx
+                rows = kernel(aln, rows)
 
-            # Use itertools.compress to remove positions of the string
-            # based on position list
-            final_seq = "".join(list(itertools.compress(
-                seq, index(aln_obj.locus_length, position_list))))
+                if i == part_idx:
+                    self.set_partition_from_alignment(aln)
+                    part_size += aln.locus_length
 
-            # Add data to
-            temp_cur.execute(
+            temp_cur.executemany(
                 "INSERT INTO [{}] VALUES (?, ?, ?, ?)".format(temp_table),
-                (txId, taxon, final_seq, aln_idx))
+                [(txId, taxon, seq, aln_idx) for txId, taxon, seq in rows])
+
+        if part_idx != -1:
+            self.size = part_size
 
-        # Perform partition correction on the last loop element
-        if aln_obj:
-            aln_obj.locus_length = len(final_seq)
-            self.set_partition_from_alignment(aln_obj)
-        
         # If a previous table_out exist, replace with this new one
         if self._table_exists(table_out):
             self.cur.execute("DROP TABLE [{}];".format(table_out))
 
-        # Replace table_out with collapsed table
         self.cur.execute("ALTER TABLE [{}] RENAME TO [{}]".format(
             temp_table, table_out))
+        self._invalidate_stats(table_out)
 
         self._reset_pipes(ns)
 
-    def _filter_terminals(self, table_in, table_out, ns=None):
-        """
+    @staticmethod
+    def _codon_kernels(position_list):
+        """Returns the kernels of `filter_codon_positions`.
 
         Parameters
         ----------
-        table_in
-        table_out
-        ns
+        position_list : list
+            List of three bool elements that correspond to each codon
+            position.
 
         Returns
         -------
-
+        _ : list
+            List of (kernel, set_partitions) tuples (see `_run_kernels`).
         """
 
-        # Set progress pipes
-        self._set_pipes(ns, None, total=len(self.alignments))
-
-        # Create temporary table
-        temp_table = ".filterterminals"
-        self._create_table(temp_table)
-
-        # Create temporary cursor to edit database while querying
-        temp_cur = self.con.cursor()
-
-        prev_idx = ""
-        c = 1
-        for txId, taxon, seq, aln_idx in self.iter_alignments(
-                table_in, include_txid=True):
-
-            # This happens when the alignment changes during the iteration
-            if aln_idx != prev_idx:
+        def kernel(aln, rows):
 
-                # Update progress
-                self._update_pipes(ns, None, value=c,
-                                   msg="Filtering terminals")
-                c += 1
+            # Mask with one element per site of the alignment
+            mask = list(position_list) * ((aln.locus_length + 2) // 3)
 
-                prev_idx = aln_idx
+            rows = [(txId, taxon, "".join(itertools.compress(seq, mask)))
+                    for txId, taxon, seq in rows]
 
-                aln = self.alignment_idx[aln_idx]
+            aln.locus_length = len(rows[-1][2])
 
-            # Condition where the sequence only has gaps
-            if not seq.strip("-"):
-                seq = aln.sequence_code[1] * len(seq)
-                temp_cur.execute(
-                    "INSERT INTO [{}] VALUES (?, ?, ?, ?)".format(
-                        temp_table), (txId, taxon, seq, aln_idx))
+            return rows
 
-                continue
+        return [(kernel, True)]
 
-            seq = list(seq)
-            counter, reverse_counter = 0, -1
+    def _missing_data_kernels(self, gap_threshold, missing_threshold,
+                              terminals=True):
+        """Returns the kernels of `filter_missing_data`.
 
-            while seq[counter] == "-":
-                seq[counter] = aln.sequence_code[1]
-                counter += 1
-
-            while seq[reverse_counter] == "-":
-                seq[reverse_counter] = aln.sequence_code[1]
-                reverse_counter -= 1
-
-            temp_cur.execute(
-                "INSERT INTO [{}] VALUES (?, ?, ?, ?)".format(temp_table),
-                (txId, taxon, "".join(seq), aln_idx))
-
-        # Check if input and output tables are the same. If they are,
-        # drop the old table and replace with this new one
-        if self._table_exists(table_out):
-            self.cur.execute("DROP TABLE [{}]".format(table_out))
+        The first kernel replaces the gaps at the ends of each sequence
+        with missing data, and the second removes the columns above the
+        gap and missing data thresholds.
 
-        self.cur.execute("ALTER TABLE [{}] "
-                         "RENAME TO [{}]".format(temp_table, table_out))
-
-    def _filter_columns(self, gap_threshold, missing_threshold, table_in,
-                        table_out, ns=None, pbar=None):
-
-        # Create pipes
-        self._set_pipes(ns, pbar, total=self.size)
+        Parameters
+        ----------
+        gap_threshold : int
+            Integer between 0 and 100 defining the percentage above which
+            a column with that gap percentage is removed.
+        missing_threshold : int
+            Integer between 0 and 100 defining the percentage above which
+            a column with that gap+missing percentage is removed.
+        terminals : bool
+            If False, only the columns are filtered.
 
-        # Create temporary table
-        temp_table = ".filtercolumns"
-        self._create_table(temp_table)
+        Returns
+        -------
+        _ : list
+            List of (kernel, set_partitions) tuples (see `_run_kernels`).
+        """
 
-        # Stores the binary lists that will be used to compress the final
-        # sequences
-        filtered_res = {}
+        def filter_terminals(aln, rows):
 
-        # Create temporary cursor to edit database while querying
-        temp_cur = self.con.cursor()
+            missing = aln.sequence_code[1]
+            filtered = []
 
-        aln_obj = None
+            for txId, taxon, seq in rows:
 
-        prev_idx = ""
-        for p, (column, aln_idx) in enumerate(self.iter_columns(table_in)):
+                # Condition where the sequence only has gaps
+                if not seq.strip("-"):
+                    seq = missing * len(seq)
+                else:
+                    start = len(seq) - len(seq.lstrip("-"))
+                    end = len(seq.rstrip("-"))
+                    seq = missing * start + seq[start:end] + \
+                        missing * (len(seq) - end)
 
-            # This happes when the alignment changes during the iteration
-            if aln_idx != prev_idx:
+                filtered.append((txId, taxon, seq))
 
-                # Add the binary list from the previous alignment
-                if prev_idx:
-                    filtered_res[prev_idx] = filtered_cols
-                
-                aln_obj = self.alignment_idx[aln_idx]
-                taxa_number = len(aln_obj.taxa_idx)
+            return filtered
 
-                # Reset binary list for next alignment
-                filtered_cols = []
+        def filter_columns(aln, rows):
 
-                prev_idx = aln_idx
+            taxa_number = len(aln.taxa_idx)
 
-                # Update progress
-                self._update_pipes(ns, pbar, value=p + 1, 
-                                   msg="Filtering columns")
+            mat = ColumnMatrix.from_sequences([x[2] for x in rows],
+                                              aln.sequence_code[1],
+                                              self.gap_symbol)
 
-            cadd = column.count
-            
-            # Calculating metrics
-            gap_proportion = (float(cadd("-")) /
-                              taxa_number) * float(100)
-            missing_proportion = (float(cadd(aln_obj.sequence_code[1])) /
-                                  taxa_number) * float(100)
+            # Calculating metrics for all columns
+            gap_proportion = (mat.gap_count() /
+                              float(taxa_number)) * float(100)
+            missing_proportion = (mat.missing_count() /
+                                  float(taxa_number)) * float(100)
             total_missing_proportion = gap_proportion + missing_proportion
 
-            if gap_proportion <= gap_threshold and \
-                    total_missing_proportion <= missing_threshold:
-
-                filtered_cols.append(1)
-
-            else:
-                filtered_cols.append(0)
-
-        # Add binary list from last alignment
-        if aln_obj:
-            filtered_res[aln_idx] = filtered_cols
-
-        self._set_pipes(ns, pbar, total=len(self.alignments))
-        c = 1
-
-        aln_obj = None
-
-        # Now we compress the sequences with the binary lists from the
-        # previous iteration
-        prev_idx = ""
-        for p, (txId, taxon, seq, aln_idx) in enumerate(
-                self.iter_alignments(table_in, include_txid=True)):
-
-            if prev_idx != aln_idx:
-
-                if prev_idx:
-                    # Update partition size
-                    aln_obj.locus_length = len(final_seq)
-                    self.set_partition_from_alignment(aln_obj)
-
-                self._update_pipes(ns, pbar, value=c,
-                                   msg="Compressing sequences")
-                c += 1
+            filtered_cols = (gap_proportion <= gap_threshold) & \
+                (total_missing_proportion <= missing_threshold)
 
-                aln_obj = self.alignment_idx[aln_idx]
+            aln.locus_length = int(filtered_cols.sum())
 
-                prev_idx = aln_idx
+            # Compress the sequences with the boolean array of the
+            # columns that passed the filter
+            return [(txId, taxon, seq) for (txId, taxon, _), seq in
+                    zip(rows, mat.compress(filtered_cols))]
 
-            final_seq = "".join(compress(seq, filtered_res[aln_idx]))
+        if terminals:
+            return [(filter_terminals, False), (filter_columns, True)]
+        else:
+            return [(filter_columns, True)]
 
-            temp_cur.execute(
-                "INSERT INTO [{}] VALUES (?, ?, ?, ?)".format(temp_table),
-                (txId, taxon, final_seq, aln_idx))
+    def filter_codon_positions(self, position_list, table_in=None,
+                               table_out=None, ns=None, pbar=None):
+        """Filters codon positions in each `Alignment` object.
 
-        if aln_obj:
-            aln_obj.locus_length = len(final_seq)
-            self.set_partition_from_alignment(aln_obj)
-            
-        # Update size
-        self.size = sum((x.locus_length for x in self.alignments.values()))
+        This wraps the execution of `filter_codon_positions` method for
+        each `Alignment` object in the `alignments` attribute.
 
-        # Check if input and output tables are the same. If they are,
-        # it means that the output table already exists and is being
-        # updated
-        if self._table_exists(table_out):
-            self.cur.execute("DROP TABLE [{}];".format(table_out))
+        Parameters
+        ----------
+        position_list : list
+            List of three bool elements that correspond to each codon position.
+            Ex. [True, True, True] will save all positions while
+            [True, True, False] will exclude the third codon position
+        table_in : string
+            Name of database table containing the alignment data that is
+            used for this operation.
+        table_out : string
+            Name of database table where the final alignment will be inserted
+            (default is the master table).
+        use_main_table : bool
+            If True, both `table_in` and `table_out` are ignore and the main
+            table `Alignment.db_idx` is used as the input and output
+            table (default is False).
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion.
+        pbar : ProgressBar
+            A ProgressBar object used to log the progress of TriSeq execution.
 
-        self.cur.execute("ALTER TABLE [{}] RENAME TO [{}]".format(
-            temp_table, table_out))
+        See Also
+        --------
+        Alignment.filter_codon_positions
+        """
 
-        self._reset_pipes(ns)
+        self._run_kernels(self._codon_kernels(position_list), table_in,
+                          table_out, ns, pbar)
 
     def filter_missing_data(self, gap_threshold, missing_threshold,
                             table_in=None, table_out=None, ns=None,
@@ -4742,7 +5956,7 @@ class AlignmentList(Base):
             used for this operation.
         table_out : string
             Name of database table where the final alignment will be inserted
-            (default is "filter").
+            (default is the master table).
         use_main_table : bool
             If True, both `table_in` and `table_out` are ignore and the main
             table `Alignment.db_idx` is used as the input and output
@@ -4761,15 +5975,13 @@ class AlignmentList(Base):
         if use_main_table:
             table_in = table_out = self.master_table
 
-        # Reset _partitions
-        self.partitions = Partitions()
-
-        self._filter_terminals(table_in, table_out, ns)
-
-        self._filter_columns(gap_threshold, missing_threshold,
-                             table_in, table_out, ns)
-
-        self._reset_pipes(ns)
+        # The columns are filtered from the data of `table_in`, so that the
+        # filtered terminals are only used when it is also the output table
+        self._run_kernels(
+            self._missing_data_kernels(
+                gap_threshold, missing_threshold,
+                terminals=bool(table_in) and table_in == table_out),
+            table_in, table_out, ns, pbar)
 
     def filter_segregating_sites(self, min_val, max_val, table_in=None,
                                  ns=None, pbar=None):
@@ -4809,81 +6021,17 @@ class AlignmentList(Base):
         # Stores the active Alignment.path after the fileter
         active_alns = []
 
-        prev_idx = ""
-        c = 1
-        res = None
-        collect = False
-        for column, aln_idx in self.iter_columns(table_in):
-
-            # This happens when the alignment changes during the iteration.
-            if prev_idx != aln_idx:
+        for c, (mat, aln_idx) in enumerate(self.iter_matrices(table_in)):
 
-                aln = self.alignment_idx[aln_idx]
-
-                missing_symbols = [aln.sequence_code[1], "-"]
-
-                if prev_idx:
-                    # Get the range result from the previous alignment
-                    # Collect the result if collect has not been flagged
-                    # (which means the alignment processing reached the
-                    # end of the sequence) OR when the collect AND result
-                    # are not None, which means that the early collect
-                    # was set in the last nucleotide
-                    if not collect or (collect and res):
-                        res = self._test_range(s, min_val, max_val)
-                        if res == "save":
-                            active_alns.append(
-                                self.alignment_idx[prev_idx].path)
+            self._update_pipes(ns, pbar, value=c + 1,
+                               msg="Filtering file {}".format(
+                                   self.alignment_idx[aln_idx].name))
 
-                        res = False
+            # Number of columns with more than one state, ignoring gaps
+            # and missing data
+            s = int(mat.variable().sum())
 
-                    collect = False
-
-                # Reset variable sites counter
-                s = 0
-
-                # Update progress
-                self._update_pipes(ns, pbar, value=c,
-                                   msg="Filtering file {}".format(
-                                       self.alignment_idx[aln_idx].name))
-
-                prev_idx = aln_idx
-
-                c += 1
-
-            # The collect flag is set to True when the result of the
-            # current alignment is known before finishing it.
-            if collect:
-                # Save the result for the current alignment
-                if res == "save":
-                    active_alns.append(self.alignment_idx[aln_idx].path)
-
-                res = False
-                continue
-
-            v = len([x for x in set(column) if x not in missing_symbols])
-
-            # Skip column without variation
-            if v == 1:
-                continue
-
-            if v > 1:
-                s += 1
-
-            # Add these tests so that the method may exit earlier if the
-            # conditions are met, precluding the analysis of the entire
-            # alignment
-            if min_val and v >= min_val and max_val is None:
-                res = "save"
-                collect = True
-
-            if max_val and v > max_val:
-                res = "shelve"
-                collect = True
-
-        if not collect or (collect and res):
-            res = self._test_range(s, min_val, max_val)
-            if res == "save":
+            if self._test_range(s, min_val, max_val) == "save":
                 active_alns.append(self.alignment_idx[aln_idx].path)
 
         self.filtered_alignments["By variable sites"] = \
@@ -4964,78 +6112,17 @@ class AlignmentList(Base):
         # Stores the active Alignment.path after the fileter
         active_alns = []
 
-        prev_idx = ""
-        c = 1
-        res = None
-        collect = False
-        for column, aln_idx in self.iter_columns(table_in):
-
-            # This happens when the alignment changes during the iteration.
-            if prev_idx != aln_idx:
-
-                aln = self.alignment_idx[aln_idx]
-
-                missing_symbols = [aln.sequence_code[1], "-"]
-
-                if prev_idx:
-                    # Get the range result from the previous alignment
-                    if not collect or (collect and res):
-                        res = self._test_range(s, min_val, max_val)
-                        if res == "save":
-                            active_alns.append(
-                                self.alignment_idx[prev_idx].path)
-
-                        res = False
-                    
-                    collect = False
-
-                # Reset informative sites counter
-                s = 0
-                
-                self._update_pipes(ns, pbar, value=c,
-                                   msg="Filtering file {}".format(
-                                       self.alignment_idx[aln_idx].name))
-                c += 1
-
-                prev_idx = aln_idx
-
-            # The collect flag is set to True when the result of the
-            # current alignment is known before finishing it.
-            if collect:
-                # Save the result for the current alignment
-                if res == "save":
-                    active_alns.append(self.alignment_idx[aln_idx].path)
+        for c, (mat, aln_idx) in enumerate(self.iter_matrices(table_in)):
 
-                res = False
-                continue
+            self._update_pipes(ns, pbar, value=c + 1,
+                               msg="Filtering file {}".format(
+                                   self.alignment_idx[aln_idx].name))
 
-            column = Counter(column)
+            # Number of columns with at least two states present in two or
+            # more taxa
+            s = int(mat.informative().sum())
 
-            # Skip columns without variation
-            if len(column) == 1:
-                continue
-
-            # Remove missing data
-            for sym in missing_symbols:
-                del column[sym]
-
-            if len([x for x in column.values() if x >= 2]) >= 2:
-                s += 1
-
-            # Add these tests so that the method may exit earlier if the
-            # conditions are met, precluding the analysis of the entire
-            # alignment
-            if min_val and s >= min_val and max_val is None:
-                res = "save"
-                collect = True
-
-            if max_val and s > max_val:
-                res = "shelve"
-                collect = True
-
-        if not collect or (collect and res):
-            res = self._test_range(s, min_val, max_val)
-            if res == "save":
+            if self._test_range(s, min_val, max_val) == "save":
                 active_alns.append(self.alignment_idx[aln_idx].path)
 
         self.filtered_alignments["By informative sites"] = \
@@ -5238,34 +6325,41 @@ class AlignmentList(Base):
         Alignment.code_gaps
         """
 
-        def gap_listing(sequence):
-            """ Function that parses a sequence string and returns the
-            position of indel events. The returned list is composed of
-            tuples with the span of each indel """
+        if use_main_table:
+            table_in = table_out = self.master_table
 
-            gap = "-+"
-            gap_list = []
+        self._run_kernels(self._gaps_kernels(ns), table_in, table_out, ns,
+                          pbar)
 
-            for gobj in re.finditer(gap, sequence):
-                
-                gap_list.append((gobj.start(), gobj.end()))
-            
-            return gap_list
+    def _gaps_kernels(self, ns=None):
+        """Returns the kernels of `code_gaps`.
+
+        Parameters
+        ----------
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion.
 
-        def gap_binary_generator(sequence, gap_list, ns):
+        Returns
+        -------
+        _ : list
+            List of (kernel, set_partitions) tuples (see `_run_kernels`).
+        """
+
+        def gap_binary_generator(sequence, gap_list):
             """ This function contains the algorithm to construct the binary
              state block for the indel events """
 
             binary_states = []
 
-            for span in gap_list:
+            self._check_killswitch(ns)
 
-                self._check_killswitch(ns)
+            for span in gap_list:
 
                 substr = sequence[span[0]:span[1]]
 
                 # Check if the entire span is only gaps
-                if set(substr) == {"-"}:
+                if not substr.strip("-"):
 
                     if span[0] < 0:
                         prev = "n"
@@ -5293,87 +6387,32 @@ class AlignmentList(Base):
 
             return sequence
 
-        if use_main_table:
-            table_in = table_out = self.master_table
-
-        # Set progress pipes
-        self._set_pipes(ns, pbar, total=len(self.alignments))
-
-        # Storage of gaps positions for each alignment
-        master_gaps = {}
-
-        # Get the complete gap positions for each alignment and store it in
-        # the master_gaps dict
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments(table_in):
-
-            if prev_idx != aln_idx:
-
-                if prev_idx:
-                    master_gaps[prev_idx] = complete_gap_list
-
-                complete_gap_list = []
-
-                prev_idx = aln_idx
-
-            current_list = gap_listing(seq)
-            complete_gap_list += [gap for gap in current_list if gap not in
-                                  complete_gap_list]
-
-        if aln_idx:
-            master_gaps[aln_idx] = complete_gap_list
-
-        # Create temporary table
-        temp_table = ".codegaps"
-        self._create_table(temp_table)
-        c = 1
-
-        # Create temporary cursor for database
-        temp_cur = self.con.cursor()
-
-        prev_idx = ""
-        for txId, taxon, seq, aln_idx in self.iter_alignments(
-                table_in, include_txid=True):
-
-            if prev_idx != aln_idx:
-
-                if prev_idx:
-                    if len(master_gaps[prev_idx]):
-                        aln_obj.restriction_range = "{}-{}".format(
-                            int(aln_obj.locus_length) + 1,
-                            len(master_gaps[prev_idx]) +
-                            int(aln_obj.locus_length))
-                        aln_obj.locus_length += len(master_gaps[prev_idx])
+        def kernel(aln, rows):
 
-                aln_obj = self.alignment_idx[aln_idx]
+            # Span of all indel events in the alignment, in the order in
+            # which they are found
+            gap_list = []
+            gap_set = set()
 
-                self._update_pipes(ns, pbar, value=c)
-                c += 1
+            for _, _, seq in rows:
+                for gobj in re.finditer("-+", seq):
+                    span = (gobj.start(), gobj.end())
+                    if span not in gap_set:
+                        gap_set.add(span)
+                        gap_list.append(span)
 
-                prev_idx = aln_idx
+            rows = [(txId, taxon, gap_binary_generator(seq, gap_list))
+                    for txId, taxon, seq in rows]
 
-            final_seq = gap_binary_generator(seq, master_gaps[aln_idx], ns)
+            if gap_list:
+                aln.restriction_range = "{}-{}".format(
+                    int(aln.locus_length) + 1,
+                    len(gap_list) + int(aln.locus_length))
+                aln.locus_length += len(gap_list)
 
-            temp_cur.execute(
-                "INSERT INTO [.codegaps] VALUES (?, ?, ?, ?)",
-                (txId, taxon, final_seq, aln_idx))
+            return rows
 
-        if prev_idx:
-            if len(master_gaps[aln_idx]):
-                aln_obj.restriction_range = "{}-{}".format(
-                    int(aln_obj.locus_length) + 1,
-                    len(master_gaps[aln_idx]) +
-                    int(aln_obj.locus_length))
-                aln_obj.locus_length += len(master_gaps[prev_idx])
-
-        if self._table_exists(table_out):
-            self.cur.execute("DROP TABLE [{}];".format(table_out))
-
-        # Replace table_out with collapsed table
-        self.cur.execute("ALTER TABLE [.codegaps] RENAME TO [{}]".format(
-            table_out))
-
-        self._reset_pipes(ns)
+        return [(kernel, False)]
 
     @staticmethod
     def write_loci_correspondence(hap_dict, output_file, dest="./"):
@@ -5449,92 +6488,65 @@ class AlignmentList(Base):
         if use_main_table:
             table_out = table_in = self.master_table
 
-        # Set progress pipes
-        self._set_pipes(ns, pbar, total=len(self.alignments))
-        c = 1
-
-        # Create temporary table
-        temp_table = ".collapsed"
-        self._create_table(temp_table)
-
-        # Set temporary cursor to perform database changes while querying
-        temp_cur = self.con.cursor()
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments(table_in):
+        self._run_kernels(
+            self._collapse_kernels(write_haplotypes, haplotypes_file, dest,
+                                   conversion_suffix, haplotype_name),
+            table_in, table_out, ns, pbar)
 
-            # This happens when the alignment changes during the iteration.
-            if aln_idx != prev_idx:
+    def _collapse_kernels(self, write_haplotypes=True, haplotypes_file=None,
+                          dest=".", conversion_suffix="",
+                          haplotype_name="Hap"):
+        """Returns the kernels of `collapse`.
 
-                self._update_pipes(ns, pbar, value=c)
-                c += 1
+        See `collapse` for the description of the parameters.
 
-                if prev_idx:
-                    # Write the haplotypes file for the previous alignment
-                    if write_haplotypes:
-                        if not haplotypes_file:
-                            hf = aln_obj.sname + conversion_suffix
-                        else:
-                            hf = haplotypes_file
+        Returns
+        -------
+        _ : list
+            List of (kernel, set_partitions) tuples (see `_run_kernels`).
+        """
 
-                        self.write_loci_correspondence(hap_dic, hf, dest)
+        def kernel(aln, rows):
 
-                aln_obj = self.alignment_idx[aln_idx]
+            # Maps each sequence to its haplotype
+            haplotypes = {}
 
-                # Dict that will store the hashes of each sequence. It will
-                # be used to check if the current sequence has already been
-                # processed. The value will be the haplotype
-                hash_list = {}
+            # hap_dic will store the haplotype name as key and a list of
+            # the taxa with the same sequence as a list value
+            hap_dic = {}
 
-                # hap_dic will store the haplotype name as key and a list of
-                # the taxa with the same sequence as a list value
-                hap_dic = {}
-                hap_counter = 0
+            collapsed = []
 
-                prev_idx = aln_idx
+            for _, taxon, seq in rows:
 
-            cur_hash = hash(seq)
-            
-            if cur_hash not in hash_list:
+                if seq not in haplotypes:
 
-                # Create name for new haplotype and update other haplotype
-                # related variables
-                haplotype = "{}_{}".format(haplotype_name, hap_counter + 1)
-                hash_list[cur_hash] = haplotype
-                hap_dic[haplotype] = [taxon]
+                    # Create name for new haplotype
+                    haplotype = "{}_{}".format(haplotype_name,
+                                               len(collapsed) + 1)
+                    haplotypes[seq] = haplotype
+                    hap_dic[haplotype] = [taxon]
 
-                # Add data to table
-                temp_cur.execute(
-                    "INSERT INTO [.collapsed] VALUES (?, ?, ?, ?)",
-                    (hap_counter, unicode(haplotype), seq, aln_idx))
-
-                hap_counter += 1
+                    collapsed.append((len(collapsed), unicode(haplotype),
+                                      seq))
 
-            else:
+                else:
 
-                hap_dic[hash_list[cur_hash]].append(taxon)
+                    hap_dic[haplotypes[seq]].append(taxon)
 
-        # Write haplotypes for the last alignment
-        if aln_obj:
             if write_haplotypes:
                 if not haplotypes_file:
-                    hf = aln_obj.sname + conversion_suffix
+                    hf = aln.sname + conversion_suffix
                 else:
                     hf = haplotypes_file
-                self.write_loci_correspondence(hap_dic, hf, dest)
 
-        # The collapse operation is special in the sense that the former taxon
-        # names are no longer valid. Therefore, we drop the previous table and
-        # populate a new one with the collapsed data
-        if self._table_exists(table_out):
-            self.cur.execute("DROP TABLE [{}];".format(table_out))
+                self.write_loci_correspondence(hap_dic, hf, dest)
 
-        # Replace table_out with collapsed table
-        self.cur.execute("ALTER TABLE [.collapsed] RENAME TO [{}]".format(
-            table_out))
+            return collapsed
 
-        self._reset_pipes(ns)
+        return [(kernel, False)]
 
+    @hold_write_lock
     def consensus(self, consensus_type, single_file=False, table_in=None,
                   table_out=None, use_main_table=False, ns=None,
                   pbar=None):
@@ -5607,7 +6619,8 @@ class AlignmentList(Base):
                     sequence_code=self.sequence_code,
                     locus_length=seq_len,
                     db_idx=self._idx,
-                    temp_dir=os.path.dirname(self.sql_path))
+                    temp_dir=os.path.dirname(self.sql_path),
+                    pool=self.pool)
                 idx_storage[fidx] = aln
                 aln_storage[aln_name] = aln
 
@@ -5778,6 +6791,7 @@ class AlignmentList(Base):
         self.cur.execute(
             "ALTER TABLE [{}] RENAME TO [{}]".format(
                 temp_table, table_out))
+        self._invalidate_stats(table_out)
 
         if single_file:
             self.size = size[0]
@@ -5788,7 +6802,8 @@ class AlignmentList(Base):
                             sequence_code=self.sequence_code,
                             locus_length=self.size,
                             db_idx=self._idx,
-                            temp_dir=os.path.dirname(self.sql_path))
+                            temp_dir=os.path.dirname(self.sql_path),
+                            pool=self.pool)
             self.alignment_idx = OrderedDict()
             self.alignment_idx[1] = aln
             self.taxa_names = taxa_idx.keys()
@@ -5800,6 +6815,7 @@ class AlignmentList(Base):
 
         self._reset_pipes(ns)
 
+    @hold_write_lock
     def reverse_concatenate(self, aln_name=None, table_in=None,
                             table_out=None, pbar=None, ns=None):
         """Reverse a concatenated file according to the _partitions.
@@ -5838,7 +6854,8 @@ class AlignmentList(Base):
                                     partitions=part,
                                     ignore_db_check=True,
                                     db_idx=self._idx,
-                                    temp_dir=os.path.dirname(self.sql_path))
+                                    temp_dir=os.path.dirname(self.sql_path),
+                                    pool=self.pool)
 
             return current_aln
 
@@ -5925,6 +6942,7 @@ class AlignmentList(Base):
 
         if self._table_exists(table_out):
             self.cur.execute("DROP TABLE [{}];".format(table_out))
+        self._invalidate_stats(table_out)
 
         self._create_table(table_out, index=("finalrevindex", "aln_idx"))
         self.cur.execute(
@@ -6000,8 +7018,9 @@ class AlignmentList(Base):
 
         return part_map
 
-    def _get_interleave_data(self, table_name=None, ns=None,
-                             pbar=None):
+    @hold_write_lock
+    def _create_interleave_table(self):
+        """Creates (or empties) the `.interleavedata` table."""
 
         if self.cur.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' AND"
@@ -6009,14 +7028,58 @@ class AlignmentList(Base):
 
             self.cur.execute("DELETE FROM [.interleavedata]")
 
-        else:
-            self.cur.execute("CREATE TABLE [.interleavedata]("
-                             "taxon TEXT,"
-                             "seq TEXT,"
-                             "slice INT,"
-                             "aln_idx INT)")
-            self.cur.execute("CREATE INDEX interindex ON "
-                            "[.interleavedata](aln_idx, slice)")
+        else:
+            self.cur.execute("CREATE TABLE [.interleavedata]("
+                             "taxon TEXT,"
+                             "seq TEXT,"
+                             "slice INT,"
+                             "aln_idx INT)")
+            self.cur.execute("CREATE INDEX interindex ON "
+                            "[.interleavedata](aln_idx, slice)")
+
+    @staticmethod
+    def _interleave_rows(taxon, seq, aln_idx, locus_length):
+        """Returns the `.interleavedata` rows of a sequence.
+
+        Parameters
+        ----------
+        taxon : str
+            Taxon name.
+        seq : str
+            Sequence string.
+        aln_idx : int
+            Index of the alignment of the sequence.
+        locus_length : int
+            Length of the alignment.
+
+        Returns
+        -------
+        rows : list
+            List of (taxon, seq, slice, aln_idx) tuples, with slices of
+            90 characters.
+        """
+
+        rows = []
+        counter = 0
+
+        for i in xrange(90, locus_length, 90):
+            rows.append((taxon, seq[counter:i], i, aln_idx))
+            counter = i
+
+        try:
+            if locus_length % 90:
+                i += 1
+                rows.append((taxon, seq[counter:], i, aln_idx))
+        except UnboundLocalError:
+            rows.append((taxon, seq, 0, aln_idx))
+
+        return rows
+
+    @hold_write_lock
+    def _get_interleave_data(self, table_name=None, ns=None,
+                             pbar=None):
+
+        self._create_interleave_table()
 
         temp_cur = self.con.cursor()
 
@@ -6035,30 +7098,18 @@ class AlignmentList(Base):
                                    msg="Creating interleave data for file "
                                        "{}".format(aln_obj.name))
                 c += 1
-                
-            counter = 0
-
-            for i in xrange(90, aln_obj.locus_length, 90):
-
-                temp_cur.execute("INSERT INTO [.interleavedata] VALUES "
-                                 " (?, ?, ?, ?)", (taxon, seq[counter:i], i,
-                                                   aln_idx))
-                counter = i
 
-            try:
-                if aln_obj.locus_length % 90:
-                    i += 1
-                    temp_cur.execute("INSERT INTO [.interleavedata] VALUES "
-                                     " (?, ?, ?, ?)",
-                                     (taxon, seq[counter:], i, aln_idx))
-            except UnboundLocalError:
-                temp_cur.execute("INSERT INTO [.interleavedata] VALUES "
-                                 " (?, ?, ?, ?)", (taxon, seq, 0, aln_idx))
+            temp_cur.executemany("INSERT INTO [.interleavedata] VALUES "
+                                 "(?, ?, ?, ?)",
+                                 self._interleave_rows(
+                                     taxon, seq, aln_idx,
+                                     aln_obj.locus_length))
 
         self._reset_pipes(ns)
 
         return True
 
+    @hold_write_lock
     def _get_partition_data(self, table_name, ns=None, pbar=None,
                             overide_table=False, seq_types=None):
         """
@@ -6223,12 +7274,22 @@ class AlignmentList(Base):
 
         aln.partitions = self.partitions
 
-    def _setup_newfile(self, fh, aln_file, output_dir, suffix, output_file,
-                       ns):
+    def _output_path(self, aln_file, output_dir, suffix, output_file):
+        """Returns the path of an output file.
 
-        # Close previous file object, if exists
-        if fh:
-            fh.close()
+        Parameters
+        ----------
+        aln_file : int
+            Index of the alignment that is written to the file.
+        output_dir : str
+            Directory of the output file, which is created if it does not
+            exist. Only used with `suffix`.
+        suffix : str
+            Suffix that is appended to the short name of the alignment to
+            get the output file, when `output_file` is not provided.
+        output_file : str
+            Path of the output file.
+        """
 
         # Get path/file name of alignment/partition
         if suffix and not output_file:
@@ -6237,111 +7298,430 @@ class AlignmentList(Base):
                 output_file = join(output_dir, output_file)
                 if not exists(output_dir):
                     os.makedirs(output_dir)
-        else:
-            output_file = output_file
 
-        if exists(output_file):
+        return output_file
 
-            # File exists, issue a warning through the appropriate pipe
-            if ns:
+    def _resolve_overwrites(self, paths, ns):
+        """Asks whether each existing output file is to be overwritten.
+
+        In TriFusion, a dialog is issued through the `ns` object for each
+        existing file, unless the user chose to apply the previous option
+        to all files. The decisions are all taken before any file is
+        written.
+
+        Parameters
+        ----------
+        paths : list
+            Paths of the output files.
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion. Without it, existing files are overwritten.
+
+        Returns
+        -------
+        skip : set
+            Paths of the files that are to be skipped.
+        """
+
+        skip = set()
+
+        if not ns:
+            return skip
+
+        decision = None
+
+        for path in paths:
+
+            if exists(path):
+
+                # File exists, issue a warning through the appropriate pipe
                 if not ns.apply_all:
-                    ns.file_dialog = output_file
+                    ns.file_dialog = path
                     while not ns.status:
-                        pass
+                        self._check_killswitch(ns)
+                        time.sleep(.05)
+                    decision = ns.status
+                elif ns.status:
+                    decision = ns.status
+
+                # When the dialog has been close, check if the file is to be
+                # skipped or overwritten
+                if decision == "skip":
+                    skip.add(path)
+
+            # Reset pipes
+            ns.status = None
 
-            # When the dialog has been close, check if the file is to be
-            # skipped or overwritten
-            if ns:
-                if ns.status == "skip":
-                    ns.status = None
-                    return None, None
+        return skip
 
-        # Reset pipes, if any
-        if ns:
-            ns.status = None
+    def _setup_newfile(self, fh, aln_file, output_dir, suffix, output_file,
+                       ns):
+
+        # Close previous file object, if exists
+        if fh:
+            fh.close()
+
+        output_file = self._output_path(aln_file, output_dir, suffix,
+                                        output_file)
+
+        if self._resolve_overwrites([output_file], ns):
+            return None, None
 
         # Return new file object
-        fh = open(output_file, "w")
+        fh = open(output_file, "w", write_buffer_size)
 
         return fh, output_file
 
-    def _write_fasta(self, suffix, output_file, **kwargs):
+    def _output_header(self, fmt, aln_obj, output_file, **kwargs):
+        """Returns the header and trailer of an output file.
+
+        Parameters
+        ----------
+        fmt : {"fasta", "phylip", "nexus", "stockholm"}
+            Output format.
+        aln_obj : trifusion.process.sequence.Alignment
+            `Alignment` object that is written to the file.
+        output_file : str
+            Path of the output file. In the phylip format, the partition
+            file is written next to it.
+        kwargs
+            Keyword arguments of `write_to_file`.
+
+        Returns
+        -------
+        header : str
+            Text written before the sequences.
+        trailer : str
+            Text written after the sequences.
+        """
+
+        header = trailer = ""
+
+        # If LD HAT sub format has been specificed, write the first
+        # line containing the number of sequences, sites and
+        # genotype phase
+        if fmt == "fasta" and kwargs.get("ld_hat", False):
+            header = "{} {} {}\n".format(
+                len(aln_obj.taxa_idx), aln_obj.locus_length, "2")
+
+        elif fmt == "phylip":
+            self._write_phylip_partitions(aln_obj,
+                                          kwargs.get("partition_file", None),
+                                          output_file,
+                                          kwargs.get("model_phylip", None))
+            header = "{} {}\n".format(
+                len(aln_obj.taxa_idx) - len(aln_obj.shelved_taxa),
+                aln_obj.locus_length)
+
+        elif fmt == "nexus":
+            header_fh = StringIO()
+            self._write_nexus_header(aln_obj, header_fh,
+                                     kwargs.get("gap", "-"),
+                                     kwargs.get("interleave", False))
+            header = header_fh.getvalue()
+
+            parts_fh = StringIO()
+            self._write_nexus_partitions(aln_obj,
+                                         kwargs.get("use_charset", True),
+                                         parts_fh,
+                                         aln_obj.partitions,
+                                         kwargs.get("use_nexus_models", True),
+                                         kwargs.get("outgroup_list", None))
+            trailer = ";\n\tend;" + parts_fh.getvalue()
+
+        elif fmt == "stockholm":
+            header = "# STOCKHOLM V1.0\n"
+            trailer = "//\n"
+
+        return header, trailer
+
+    @hold_write_lock
+    def _write_streams(self, outputs, **kwargs):
+        """Writes the fasta, phylip, nexus and stockholm formats.
+
+        The sequence data is read once and each row is written to the
+        files of all requested formats. The headers and partition blocks of
+        each file are computed when the file is opened. In the interleave
+        variants of the phylip and nexus formats, the sequences are written
+        in blocks of 90 characters from the `.interleavedata` table, which
+        is also populated in the same scan of the data if it does not exist
+        yet. In that case, the data is read twice, regardless of the number
+        of formats.
+
+        Whether existing output files are overwritten is decided for all
+        files before the writing starts (see `_resolve_overwrites`). When
+        each alignment is written to its own files and more than one job
+        is requested, the files are written by `_write_files` instead.
+
+        Parameters
+        ----------
+        outputs : OrderedDict
+            Maps each output format to its (suffix, output_file) tuple (see
+            `_output_path`).
+        kwargs
+            Keyword arguments of `write_to_file`.
+        """
 
-        ld_hat = kwargs.get("ld_hat", False)
+        # Get relevant keyword arguments
         interleave = kwargs.get("interleave", False)
-        output_dir = kwargs.pop("output_dir", None)
-        table_name = kwargs.get("table_name", self.master_table)
+        phy_truncate_names = kwargs.get("phy_truncate_names", False)
+        table_name = kwargs.get("table_name", None)
+        output_dir = kwargs.get("output_dir", None)
         ns = kwargs.get("ns_pipe", None)
         pbar = kwargs.get("pbar", None)
         upper_case = kwargs.get("upper_case", None)
+        jobs = kwargs.get("jobs", 1)
+
+        options = {
+            "ld_hat": kwargs.get("ld_hat", False),
+            "interleave": interleave,
+            "upper_case": upper_case,
+            "tx_space_phy": kwargs.get("tx_space_phy", 40),
+            "cut_space_phy": kwargs.get("cut_space_phy", 39),
+            "tx_space_nex": kwargs.get("tx_space_nex", 40),
+            "cut_space_nex": kwargs.get("cut_space_nex", 39)
+        }
 
-        # File object that will be used to write sequence data
-        fh = None
+        # Change taxa space if phy_truncate_names option is set to True
+        if phy_truncate_names:
+            options["cut_space_phy"] = 10
 
-        # Stores the string of the last file
-        prev_file = ""
+        # Output file of each active alignment and format
+        active_idx = [x for x in self.alignment_idx
+                      if x not in self.shelved_idx]
+        paths = OrderedDict(
+            ((aln_idx, fmt), self._output_path(aln_idx, output_dir, *val))
+            for aln_idx in active_idx for fmt, val in outputs.items())
 
-        self._set_pipes(ns, pbar, total=len(self.alignments), ignore_sa=True)
-        c = 1
-        
-        for taxon, seq, aln_idx in self.iter_alignments(table_name):
+        skip = self._resolve_overwrites(
+            list(OrderedDict.fromkeys(paths.values())), ns)
 
-            # Convert sequence data to upper case if option is specified
-            if upper_case:
-                seq = seq.upper()
+        if jobs > 1 and len(active_idx) > 1 and \
+                not any(x[1] for x in outputs.values()):
+            return self._write_files(paths, skip, options, **kwargs)
 
-            if aln_idx != prev_file:
-                prev_file = aln_idx
-                fh, _ = self._setup_newfile(
-                    fh, aln_idx, output_dir, suffix, output_file, ns)
+        # Formats written from the complete sequences and formats written
+        # from the interleave data
+        row_formats = [x for x in outputs if not interleave or
+                       x in ["fasta", "stockholm"]]
+        slice_formats = [x for x in outputs if x not in row_formats]
 
-                # Get Alignment object containing info of the current alignment
-                aln_obj = self.alignment_idx[aln_idx]
+        build_slices = slice_formats and not self.interleave_data
+        if build_slices:
+            self._create_interleave_table()
 
-                self._update_pipes(ns, pbar, value=c, ignore_sa=True,
-                                   msg="Writing Fasta file "
-                                       "{}".format(aln_obj.name))
-                c += 1
+        # File objects of the current alignment for each format, and the
+        # strings that are written when these files are closed
+        handles = OrderedDict()
+        trailers = {}
 
-                # If fh is set to None, the current file is set to skip
-                if not fh:
+        def close_files():
+
+            for fmt, fh in handles.items():
+                fh.write(trailers[fmt])
+                fh.close()
+
+            handles.clear()
+            trailers.clear()
+
+        def open_files(aln_idx, formats):
+
+            close_files()
+
+            aln_obj = self.alignment_idx[aln_idx]
+
+            for fmt in formats:
+
+                of = paths[(aln_idx, fmt)]
+
+                # File is set to skip
+                if of in skip:
                     continue
 
-                # Do stuff at the beginning of the file, before inserting
-                # Sequence data
+                fh = open(of, "w", write_buffer_size)
+                handles[fmt] = fh
 
-                # If LD HAT sub format has been specificed, write the first
-                # line containing the number of sequences, sites and
-                # genotype phase
-                if ld_hat:
-                    fh.write("{} {} {}\n".format(
-                        len(aln_obj.taxa_idx), aln_obj.locus_length, "2"))
+                header, trailers[fmt] = self._output_header(fmt, aln_obj, of,
+                                                            **kwargs)
+                fh.write(header)
 
-            # Skip row if fh is not set (skipping files)
-            if not fh:
-                continue
+            return aln_obj
 
-            if ld_hat:
-                # Truncate sequence name to 30 characters
-                fh.write(">%s\n" % (taxon[:30]))
-                # Limit each sequence line to 2000 characters
-                if len(seq) > 2000:
-                    for i in range(0, len(seq), 2000):
-                        fh.write("%s\n" % (seq[i:i + 2000]))
-            elif interleave:
-                fh.write(">{}\n".format(taxon))
-                counter = 0
-                for i in range(90, aln_obj.locus_length, 90):
-                    fh.write("{}\n".format(seq[counter:i]))
-                    counter = i
-
-                fh.write("{}\n".format(seq[counter:]))
-            else:
-                fh.write(">{}\n{}\n".format(taxon, seq))
+        temp_cur = self.con.cursor()
 
-        # When all files are skipeed, fh remains None
-        if fh:
-            fh.close()
+        try:
+
+            if row_formats or build_slices:
+
+                self._set_pipes(ns, pbar, total=len(self.alignments),
+                                ignore_sa=True)
+                c = 1
+
+                prev_file = ""
+                for taxon, seq, aln_idx in self.iter_alignments(table_name):
+
+                    if aln_idx != prev_file:
+                        prev_file = aln_idx
+                        aln_obj = open_files(aln_idx, row_formats)
+
+                        self._update_pipes(ns, pbar, value=c, ignore_sa=True,
+                                           msg="Writing file {}".format(
+                                               aln_obj.name))
+                        c += 1
+
+                    if build_slices:
+                        temp_cur.executemany(
+                            "INSERT INTO [.interleavedata] VALUES "
+                            "(?, ?, ?, ?)",
+                            self._interleave_rows(taxon, seq, aln_idx,
+                                                  aln_obj.locus_length))
+
+                    # Convert sequence data to upper case if option is
+                    # specified
+                    if upper_case:
+                        seq = seq.upper()
+
+                    for fmt, fh in handles.items():
+                        fh.write(format_sequence(fmt, taxon, seq,
+                                                 aln_obj.locus_length,
+                                                 options))
+
+                close_files()
+
+                if build_slices:
+                    self.interleave_data = True
+
+            if slice_formats:
+
+                self._set_pipes(ns, pbar, total=len(self.alignments),
+                                ignore_sa=True)
+                c = 1
+
+                prev_file = ""
+                for taxon, seq, p, aln_idx in self.pool.cursor().execute(
+                        "SELECT taxon, seq, slice, aln_idx "
+                        "FROM [.interleavedata] "
+                        "ORDER BY aln_idx, slice"):
+
+                    if upper_case:
+                        seq = seq.upper()
+
+                    if aln_idx != prev_file:
+                        prev_file = aln_idx
+                        aln_obj = open_files(aln_idx, slice_formats)
+
+                        self._update_pipes(ns, pbar, value=c, ignore_sa=True,
+                                           msg="Writing file {}".format(
+                                               aln_obj.name))
+                        c += 1
+
+                        # The taxa names are only written in the first
+                        # block of the phylip format
+                        write_tx = True
+                        prev = 90
+
+                    if p != prev:
+                        for fh in handles.values():
+                            fh.write("\n")
+                        prev = p
+                        write_tx = False
+
+                    for fmt, fh in handles.items():
+                        fh.write(format_interleave_block(fmt, taxon, seq,
+                                                         write_tx, options))
+
+                close_files()
+
+        finally:
+            # Files are only closed here when the writing was interrupted
+            for fh in handles.values():
+                fh.close()
+            temp_cur.close()
+
+        self._reset_pipes(ns)
+
+    def _write_files(self, paths, skip, options, **kwargs):
+        """Writes the output files of each alignment in parallel.
+
+        The sequence data is read once by this process, and the files of
+        each alignment are rendered and written by a pool of `jobs` worker
+        processes (see `write_output_file`). The alignments are sent to the
+        workers in batches, and the files are written in the same order as
+        in `_write_streams`.
+
+        Parameters
+        ----------
+        paths : OrderedDict
+            Maps (alignment index, format) tuples to output files.
+        skip : set
+            Output files that are not written.
+        options : dict
+            Formatting options (see `format_sequence`).
+        kwargs
+            Keyword arguments of `write_to_file`, including the number of
+            worker processes (`jobs`).
+        """
+
+        table_name = kwargs.get("table_name", None)
+        jobs = kwargs.get("jobs", 1)
+        ns = kwargs.get("ns_pipe", None)
+        pbar = kwargs.get("pbar", None)
+
+        formats = OrderedDict((fmt, None) for _, fmt in paths).keys()
+
+        # Number of alignments that are sent to the workers at once
+        batch_size = jobs * 50
+
+        def iter_tasks():
+
+            for aln_idx, rows in self._iter_alignment_rows(table_name):
+
+                aln_obj = self.alignment_idx[aln_idx]
+                rows = [(taxon, seq) for _, taxon, seq in rows]
+
+                for fmt in formats:
+
+                    of = paths[(aln_idx, fmt)]
+
+                    if of in skip:
+                        continue
+
+                    header, trailer = self._output_header(fmt, aln_obj, of,
+                                                          **kwargs)
+
+                    yield (of, fmt, header, rows, trailer,
+                           aln_obj.locus_length, options)
+
+        self._set_pipes(ns, pbar, total=len(paths) - len(skip),
+                        ignore_sa=True)
+        c = 1
+
+        pool = Pool(jobs)
+
+        try:
+            tasks = iter_tasks()
+            while True:
+                batch = list(itertools.islice(tasks, batch_size))
+
+                if not batch:
+                    break
+
+                for of in pool.imap(write_output_file, batch):
+                    self._update_pipes(ns, pbar, value=c, ignore_sa=True,
+                                       msg="Writing file {}".format(
+                                           basename(of)))
+                    c += 1
+
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self._reset_pipes(ns)
+
+    def _write_fasta(self, suffix, output_file, **kwargs):
+
+        self._write_streams(OrderedDict([("fasta", (suffix, output_file))]),
+                            **kwargs)
 
     def _write_phylip_partitions(self, aln_obj, partition_file,
                                  output_file, model_phylip):
@@ -6391,157 +7771,34 @@ class AlignmentList(Base):
 
                         # Get model for codon partitions
                         try:
-                            model = models[name][1][p]
-                        # If a model was not set for the current codon 
-                        # partition, fall back to the sequence type
-                        except IndexError:
-                            model = None
-
-                        model = model if model else \
-                            self.partitions.get_sequence_type(name)
-
-                        partition_file.write(
-                            "{}, {}_{} = {}\n".format(
-                                model, name, str(p), rg))
-
-                else:
-                    # Get model
-                    model = models[name][1][0]
-                    model = model if model else \
-                        self.partitions.get_sequence_type(name)
-                    partition_file.write(
-                        "{}, {} = {}-{}\n".format(
-                            model, name, lrange[0][0] + 1, lrange[0][1] + 1))
-
-            partition_file.close()
-
-    def _write_phylip(self, suffix, output_file, **kwargs):
-
-        # Get relevant keyword arguments
-        interleave = kwargs.get("interleave", False)
-        tx_space_phy = kwargs.get("tx_space_phy", 40)
-        cut_space_phy = kwargs.get("cut_space_phy", 39)
-        phy_truncate_names = kwargs.get("phy_truncate_names", False)
-        partition_file = kwargs.get("partition_file", None)
-        model_phylip = kwargs.get("model_phylip", None)
-        table_name = kwargs.get("table_name", None)
-        ns = kwargs.get("ns_pipe", None)
-        pbar = kwargs.get("pbar", None)
-        output_dir = kwargs.get("output_dir", None)
-        upper_case = kwargs.get("upper_case", None)
-
-        # File object that will be used to write sequence data
-        fh = None
-
-        # Stores the string of the last file
-        prev_file = ""
-
-        # Change taxa space if phy_truncate_names option is set to True
-        if phy_truncate_names:
-            cut_space_phy = 10
-
-        if interleave:
-
-            if not self.interleave_data:
-                self.interleave_data = self._get_interleave_data(
-                        table_name, ns, pbar)
-
-            self._set_pipes(ns, pbar, total=len(self.alignments))
-            c = 1
-
-            for taxon, seq, p, aln_idx in self.cur.execute(
-                "SELECT taxon, seq, slice, aln_idx from [.interleavedata] "
-                "ORDER BY aln_idx, slice"):
-                
-                if upper_case:
-                    seq = seq.upper()
-
-                if prev_file != aln_idx:
-                    fh, of = self._setup_newfile(
-                        fh, aln_idx, output_dir, suffix, output_file, ns)
-                    prev_file = aln_idx
-
-                    aln_obj = self.alignment_idx[aln_idx]
-                    
-                    self._update_pipes(ns, pbar, value=c,
-                                       msg="Writing Phylip file "
-                                           "{}".format(aln_obj.name))
-                    c += 1
-
-                    if not fh:
-                        continue
-                    
-                    self._write_phylip_partitions(aln_obj, partition_file,
-                                                  of, model_phylip)
-
-                    fh.write("{} {}\n".format(
-                        len(aln_obj.taxa_idx) - len(aln_obj.shelved_taxa),
-                        aln_obj.locus_length))
-
-                    write_tx = True
-                    prev = 90
-
-                if not fh:
-                    continue
-
-                if p != prev:
-                    fh.write("\n")
-                    prev = p
-                    write_tx = False
-
-                if write_tx:
-                    fh.write("{} {}\n".format(
-                        taxon[:cut_space_phy].ljust(tx_space_phy),
-                        seq))
-                else:
-                    fh.write("{}\n".format(seq))
-
-        else:
-
-            self._set_pipes(ns, pbar, total=len(self.alignments))
-            c = 1
-
-            for taxon, seq, aln_idx in self.iter_alignments(table_name):
-                
-                if upper_case:
-                    seq = seq.upper()
-
-                if aln_idx != prev_file:
-                    prev_file = aln_idx
-                    fh, of = self._setup_newfile(
-                        fh, aln_idx, output_dir, suffix, output_file, ns)
-
-                    if not fh:
-                        continue
-
-                    aln_obj = self.alignment_idx[aln_idx]
-
-                    self._update_pipes(ns, pbar, value=c,
-                                       msg="Writing Phylip file "
-                                           "{}".format(aln_obj.name))
-                    c += 1
+                            model = models[name][1][p]
+                        # If a model was not set for the current codon 
+                        # partition, fall back to the sequence type
+                        except IndexError:
+                            model = None
 
-                    self._write_phylip_partitions(aln_obj, partition_file,
-                                                  of, model_phylip)
+                        model = model if model else \
+                            self.partitions.get_sequence_type(name)
 
-                    # Get Alignment object containing info of the current
-                    # alignment
-                    aln_obj = self.alignment_idx[aln_idx]
+                        partition_file.write(
+                            "{}, {}_{} = {}\n".format(
+                                model, name, str(p), rg))
 
-                    fh.write("{} {}\n".format(
-                        len(aln_obj.taxa_idx) - len(aln_obj.shelved_taxa),
-                        aln_obj.locus_length))
+                else:
+                    # Get model
+                    model = models[name][1][0]
+                    model = model if model else \
+                        self.partitions.get_sequence_type(name)
+                    partition_file.write(
+                        "{}, {} = {}-{}\n".format(
+                            model, name, lrange[0][0] + 1, lrange[0][1] + 1))
 
-                if not fh:
-                    continue
+            partition_file.close()
 
-                fh.write("{} {}\n".format(
-                    taxon[:cut_space_phy].ljust(tx_space_phy),
-                    seq))
+    def _write_phylip(self, suffix, output_file, **kwargs):
 
-        # When all files are skipeed, fh remains None
-        if fh:
-            fh.close()
+        self._write_streams(OrderedDict([("phylip", (suffix, output_file))]),
+                            **kwargs)
 
     def _write_nexus_partitions(self, aln_obj, use_charset, fh,
                                 aln_parts, use_nexus_models,
@@ -6703,144 +7960,9 @@ class AlignmentList(Base):
 
     def _write_nexus(self, suffix, output_file, **kwargs):
 
-        # Get relevant keyword arguments
-        interleave = kwargs.get("interleave", False)
-        tx_space_nex = kwargs.get("tx_space_nex", 40)
-        cut_space_nex = kwargs.get("cut_space_nex", 39)
-        gap = kwargs.get("gap", "-")
-        use_charset = kwargs.get("use_charset", True)
-        use_nexus_models = kwargs.get("use_nexus_models", True)
-        outgroup_list = kwargs.get("outgroup_list", None)
-        table_name = kwargs.get("table_name", None)
-        output_dir = kwargs.get("output_dir", None)
-        ns = kwargs.get("ns_pipe", None)
-        pbar = kwargs.get("pbar", None)
-        upper_case = kwargs.get("upper_case", None)
-
-        # File object that will be used to write sequence data
-        fh = None
-
-        # Stores the string of the last file
-        prev_file = ""
-
-        if interleave:
-
-            if not self.interleave_data:
-                self.interleave_data = self._get_interleave_data(
-                        table_name, ns, pbar)
-
-            self._set_pipes(ns, pbar, total=len(self.alignments))
-            c = 1
-
-            for taxon, seq, p, aln_idx in self.cur.execute(
-                    "SELECT taxon, seq, slice, aln_idx "
-                    "FROM [.interleavedata] "
-                    "ORDER BY aln_idx, slice"):
-
-                if upper_case:
-                    seq = seq.upper()
-
-                if aln_idx != prev_file:
-
-                    if fh:
-                        fh.write(";\n\tend;")
-
-                        self._write_nexus_partitions(aln_obj, use_charset, fh,
-                                                     aln_parts,
-                                                     use_nexus_models,
-                                                     outgroup_list)
-
-                    prev_file = aln_idx
-                    fh, of = self._setup_newfile(
-                        fh, aln_idx, output_dir, suffix, output_file, ns)
-
-                    if not fh:
-                        continue
-
-                    aln_obj = self.alignment_idx[aln_idx]
-                    aln_parts = aln_obj.partitions
-
-                    self._update_pipes(ns, pbar, value=c,
-                                       msg="Writing Nexus file "
-                                           "{}".format(aln_obj.name))
-                    c += 1
-
-                    self._write_nexus_header(aln_obj, fh, gap, interleave)
-
-                    prev = 90
-
-                if not fh:
-                    continue
-
-                if p != prev:
-                    fh.write("\n")
-                    prev = p
-
-                fh.write("{} {}\n".format(
-                    taxon[:cut_space_nex].ljust(tx_space_nex),
-                    seq))
-
-            if fh:
-                fh.write(";\n\tend;")
-                self._write_nexus_partitions(aln_obj, use_charset, fh,
-                                             aln_parts,
-                                             use_nexus_models,
-                                             outgroup_list)
-
-        else:
-
-            self._set_pipes(ns, pbar, total=len(self.alignments))
-            c = 1
-
-            for taxon, seq, aln_idx in self.iter_alignments(table_name):
-
-                if upper_case:
-                    seq = seq.upper()
-
-                if aln_idx != prev_file:
-
-                    if fh:
-                        fh.write(";\n\tend;")
-
-                        self._write_nexus_partitions(aln_obj, use_charset, fh,
-                                                     aln_parts,
-                                                     use_nexus_models,
-                                                     outgroup_list)
-
-                    prev_file = aln_idx
-                    fh, of = self._setup_newfile(
-                        fh, aln_idx, output_dir, suffix, output_file, ns)
-
-                    if not fh:
-                        continue
-
-                    aln_obj = self.alignment_idx[aln_idx]
-                    aln_parts = aln_obj.partitions
-
-                    self._update_pipes(ns, pbar, value=c,
-                                       msg="Writing Nexus file "
-                                           "{}".format(aln_obj.name))
-                    c += 1
-
-                    self._write_nexus_header(aln_obj, fh, gap, interleave)
-
-                if not fh:
-                    continue
-
-                fh.write("{} {}\n".format(taxon[:cut_space_nex].ljust(
-                    tx_space_nex), seq))
+        self._write_streams(OrderedDict([("nexus", (suffix, output_file))]),
+                            **kwargs)
 
-            if fh:
-                fh.write(";\n\tend;")
-                self._write_nexus_partitions(aln_obj, use_charset, fh,
-                                             aln_parts,
-                                             use_nexus_models,
-                                             outgroup_list)
-
-        # When all files are skiped, fh remains None
-        if fh:
-            fh.close()
-    
     def _write_snapp(self, suffix, output_file, **kwargs):
         
         ns = kwargs.get("ns_pipe", None)
@@ -6937,48 +8059,8 @@ class AlignmentList(Base):
 
     def _write_stockholm(self, suffix, output_file, **kwargs):
 
-        table_name = kwargs.get("table_name", None)
-        ns = kwargs.get("ns_pipe", None)
-        output_dir = kwargs.get("output_dir", None)
-        pbar = kwargs.get("pbar", None)
-        upper_case = kwargs.get("upper_case", None)
-
-        # File object that will be used to write sequence data
-        fh = None
-
-        # Stores the string of the last file
-        prev_file = ""
-
-        self._set_pipes(ns, pbar, total=len(self.alignments))
-        c = 1
-
-        for taxon, seq, aln_idx in self.iter_alignments(table_name):
-
-            if upper_case:
-                seq = seq.upper()
-
-            if aln_idx != prev_file:
-
-                if fh:
-                    fh.write("//\n")
-
-                prev_file = aln_idx
-                fh, _ = self._setup_newfile(
-                    fh, aln_idx, output_dir, suffix, output_file, ns)
-
-                aln_obj = self.alignment_idx[aln_idx]
-                self._update_pipes(ns, pbar, value=c,
-                                   msg="Writing Stockholm file "
-                                       "{}".format(aln_obj.name))
-                c += 1
-
-                fh.write("# STOCKHOLM V1.0\n")
-
-            fh.write("{}\t{}\n".format(taxon, seq))
-
-        # When all files are skipeed, fh remains None
-        if fh:
-            fh.close()
+        self._write_streams(OrderedDict([("stockholm", (suffix, output_file))]),
+                            **kwargs)
 
     def _write_gphocs(self, suffix, output_file, **kwargs):
 
@@ -7004,7 +8086,7 @@ class AlignmentList(Base):
         # Stores the string of the last file
         prev_idx = ""
         prev_part = ""
-        for taxon, seq, pname, pidx, aln_idx in self.cur.execute(
+        for taxon, seq, pname, pidx, aln_idx in self.pool.cursor().execute(
                 "SELECT taxon, seq, part_name, part, aln_idx "
                 "FROM [.partitiondata] "
                 "ORDER BY aln_idx, part"):
@@ -7087,7 +8169,7 @@ class AlignmentList(Base):
         # Stores the string of the last file
         prev_idx = ""
         prev_part = ""
-        for taxon, seq, pname, pidx, aln_idx in self.cur.execute(
+        for taxon, seq, pname, pidx, aln_idx in self.pool.cursor().execute(
                 "SELECT taxon, seq, part_name, part, aln_idx "
                 "FROM [.partitiondata] "
                 "ORDER BY aln_idx, part"):
@@ -7165,7 +8247,7 @@ class AlignmentList(Base):
         # Stores the string of the last file
         prev_idx = ""
         prev_part = ""
-        for taxon, seq, pname, pidx, aln_idx in self.cur.execute(
+        for taxon, seq, pname, pidx, aln_idx in self.pool.cursor().execute(
                 "SELECT taxon, seq, part_name, part, aln_idx "
                 "FROM [.partitiondata] "
                 "ORDER BY aln_idx, part"):
@@ -7280,6 +8362,10 @@ class AlignmentList(Base):
         upper_case : bool
             If True, sequence data will be written in upper case. Default is
             lower case
+        jobs : int
+            Number of processes used to write the fasta, phylip, nexus and
+            stockholm files when each alignment is written to its own files
+            (default is 1).
         """
 
         output_file = kwargs.pop("output_file", None)
@@ -7306,6 +8392,10 @@ class AlignmentList(Base):
             self.partition_data = self._get_partition_data(
                 table_name, overide_table=True, seq_types=seq_types)
 
+        # The fasta, phylip, nexus and stockholm formats are written
+        # together, in a single scan of the data
+        streams = OrderedDict()
+
         for fmt in output_format:
 
             filename = None
@@ -7317,7 +8407,13 @@ class AlignmentList(Base):
                 suffix = conversion_suffix + output_suffix + \
                     self.format_ext[fmt]
 
-            write_methods[fmt](suffix, filename, **kwargs)
+            if fmt in ["fasta", "phylip", "nexus", "stockholm"]:
+                streams[fmt] = (suffix, filename)
+            else:
+                write_methods[fmt](suffix, filename, **kwargs)
+
+        if streams:
+            self._write_streams(streams, **kwargs)
 
     def get_gene_table_stats(self, active_alignments=None, sortby=None,
                              ascending=True):
@@ -7381,7 +8477,10 @@ class AlignmentList(Base):
     def get_summary_stats(self, active_alignments=None, ns=None):
         """Calculates summary statistics for the 'active' alignments.
 
-        Creates/Updates summary statistics for the active alignments.
+        Creates/Updates summary statistics for the active alignments. The
+        statistics of each alignment are stored in the database the first
+        time they are calculated (see `_get_alignment_stats`), so that
+        subsequent calls only need to aggregate them.
 
         Parameters
         ----------
@@ -7400,38 +8499,12 @@ class AlignmentList(Base):
             List with overall summary statistics for creating .csv tables.
         """
 
-        def add_data():
-            # Get values for current alignment for average calculations
-            self.summary_stats["avg_gaps"].append(cur_gap)
-            self.summary_stats["avg_missing"].append(cur_missing)
-            self.summary_stats["avg_var"].append(cur_var)
-            self.summary_stats["avg_inf"].append(cur_inf)
-
-            if not any(self.summary_gene_table["genes"] == aln.name):
-                # Get row information for current gene in dict format
-                row_info = (aln.name,
-                            aln.locus_length,
-                            len(aln.taxa_idx),
-                            cur_var,
-                            cur_inf,
-                            cur_gap,
-                            cur_missing)
-                # Create DataFrame from dict
-                row_dt = pd.DataFrame(
-                    [row_info], index=[c],
-                    columns=self.summary_gene_table.columns)
-                # Add row DF to main DF
-                self.summary_gene_table = pd.concat(
-                    [self.summary_gene_table,
-                     row_dt])
-
         # Update active alignments if they changed since last update
         if active_alignments and \
                 active_alignments != list(self.alignments.keys()):
             self.update_active_alignments(active_alignments)
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = -1
 
         # Set table header for summary_stats
         table = [["Genes", "Taxa", "Alignment length", "Gaps",
@@ -7451,62 +8524,42 @@ class AlignmentList(Base):
         # Get number of taxa
         self.summary_stats["taxa"] = len(self.taxa_names)
 
-        # Get statistics that require iteration over alignments
-        prev_idx = ""
-        for col, aln_idx in self.iter_columns():
-
-            self._check_killswitch(ns)
+        # Get the statistics of each active alignment. Only alignments
+        # whose statistics were not previously stored in the database are
+        # scanned
+        aln_stats = self._get_alignment_stats(ns=ns)
 
-            if prev_idx != aln_idx:
+        gene_rows = []
+        for aln_idx in sorted(aln_stats):
 
-                if prev_idx:
-                    add_data()
+            self._check_killswitch(ns)
 
-                self._update_pipes(ns, None, value=c)
-                c += 1
+            aln = self.alignment_idx[aln_idx]
+            taxa, cur_var, cur_inf, cur_gap, cur_missing = aln_stats[aln_idx]
 
-                # Get current alignment
-                aln = self.alignment_idx[aln_idx]
-                self.summary_stats["seq_len"] += aln.locus_length
+            self.summary_stats["seq_len"] += aln.locus_length
+            self.summary_stats["missing"] += cur_missing
+            self.summary_stats["gaps"] += cur_gap
+            self.summary_stats["variable"] += cur_var
+            self.summary_stats["informative"] += cur_inf
 
-                cur_gap, cur_missing = 0, 0
-                cur_var, cur_inf = 0, 0
+            # Get values for current alignment for average calculations
+            self.summary_stats["avg_gaps"].append(cur_gap)
+            self.summary_stats["avg_missing"].append(cur_missing)
+            self.summary_stats["avg_var"].append(cur_var)
+            self.summary_stats["avg_inf"].append(cur_inf)
 
-                prev_idx = aln_idx
+            gene_rows.append((aln.name, aln.locus_length, taxa, cur_var,
+                              cur_inf, cur_gap, cur_missing))
 
-                if ns:
-                    if ns.stop:
-                        raise KillByUser("")
-
-            col = Counter(col)
-
-            # Get missing data and gaps
-            if aln.sequence_code[1] in col:
-                self.summary_stats["missing"] += 1
-                cur_missing += 1
-            if self.gap_symbol in col:
-                self.summary_stats["gaps"] += 1
-                cur_gap += 1
-
-            # Get variability information
-            # Filter missing data
-            for i in [aln.sequence_code[1], self.gap_symbol]:
-                del col[i]
-
-            # If it's only missing data, ignore
-            if col:
-                # Get variable sites
-                if len(col) > 1:
-                    self.summary_stats["variable"] += 1
-                    cur_var += 1
-
-                # If any of the remaining sites is present in more than two
-                # taxa score the site as informative
-                if len([x for x in col.values() if x >= 2]) >= 2:
-                    self.summary_stats["informative"] += 1
-                    cur_inf += 1
-        if aln_idx:
-            add_data()
+        # Replace the rows of the active alignments in the gene table with
+        # a single concatenation
+        active_names = [x.name for x in self.alignments.values()]
+        gene_table = pd.DataFrame(gene_rows,
+                                  columns=self.summary_gene_table.columns)
+        self.summary_gene_table = pd.concat(
+            [self.summary_gene_table[~self.summary_gene_table["genes"].isin(
+                active_names)], gene_table], ignore_index=True)
 
         # Get average values
         for k in ["avg_gaps", "avg_missing", "avg_var", "avg_inf"]:
@@ -7593,59 +8646,20 @@ class AlignmentList(Base):
             "table_header": list with headers of table.
         """
 
-        def add_data():
-            data_storage["Gaps"].append(np.mean(gaps_g))
-            data_storage["Missing data"].append(np.mean(missing_g))
-            data_storage["Data"].append(np.mean(data_g))
-
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        legend = ["Gaps", "Missing data", "Data"]
-
-        data_storage = OrderedDict((x, []) for x in legend)
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
-                
-                if prev_idx:
-                    # Add data to taxa missing in the current alignment
-                    missing = (x for x in self.taxa_names
-                               if x not in aln.taxa_idx)
-                    for _ in missing:
-                        gaps_g.append(0)
-                        missing_g.append(1)
-                        data_g.append(0)
-
-                    add_data()
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                # Get alignment object
-                aln = self.alignment_idx[aln_idx]
 
-                gaps_g, missing_g, data_g = [], [], []
+        cube = self._get_feature_cube(ns=ns)
 
-                prev_idx = aln_idx
+        legend = ["Gaps", "Missing data", "Data"]
 
-            # Get gaps
-            gaps = float(seq.count("-"))
-            gaps_g.append(gaps / float(aln.locus_length))
-            # Get missing data
-            missing = float(seq.count(aln.sequence_code[1]))
-            missing_g.append(missing / float(aln.locus_length))
-            # Get actual data
-            actual_data = (float(aln.locus_length) - gaps - missing) / \
-                float(aln.locus_length)
-            data_g.append(actual_data)
+        nsites = cube.nsites[:, None].astype(float)
 
-        if aln_idx:
-            add_data()
+        # Taxa missing from an alignment only contribute missing data
+        gaps = cube.gaps / nsites
+        missing = np.where(cube.present, cube.missing / nsites, 1.)
+        actual_data = cube.length / nsites
 
-        data = [x for x in data_storage.values()]
+        data = [x.mean(axis=1).tolist() for x in [gaps, missing, actual_data]]
 
         return {"data": data,
                 "title": "Distribution of missing data",
@@ -7684,64 +8698,28 @@ class AlignmentList(Base):
             "normalize_factor": int, factor to use in normalization
         """
 
-        # Data for a stacked bar plot. First element for gaps, second for
-        # missing, third for actual data
-        data_storage = OrderedDict((taxon, [0, 0, 0]) for taxon in
-                                   self.taxa_names)
-        total_len = 0
-
-        legend = ["Gaps", "Missing", "Data"]
-
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
 
-                if prev_idx:
-                    # Add data to taxa missing in the current alignment
-                    missing = (x for x in self.taxa_names
-                               if x not in aln.taxa_idx)
-                    for tx in missing:
-                        data_storage[tx][1] += aln.locus_length
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
-                total_len += aln.locus_length
+        cube = self._get_feature_cube(ns=ns)
 
-                prev_idx = aln_idx
+        legend = ["Gaps", "Missing", "Data"]
 
-            # Get gaps
-            gaps = seq.count("-")
-            data_storage[taxon][0] += gaps
-            # Get missing
-            missing = seq.count(aln.sequence_code[1])
-            data_storage[taxon][1] += missing
-            # Get actual data
-            actual_data = aln.locus_length - gaps - missing
-            data_storage[taxon][2] += actual_data
+        # The complete length of the alignments where a taxon is missing
+        # is counted as missing data
+        missing = cube.missing + np.where(cube.present, 0,
+                                          cube.nsites[:, None])
 
-        if prev_idx:
-            # Add data to taxa missing in the current alignment
-            missing = (x for x in self.taxa_names
-                       if x not in aln.taxa_idx)
-            for tx in missing:
-                data_storage[tx][1] += aln.locus_length
+        # Data for a stacked bar plot. First element for gaps, second for
+        # missing, third for actual data
+        data_storage = OrderedDict(zip(self.taxa_names, zip(
+            cube.gaps.sum(axis=0), missing.sum(axis=0),
+            cube.length.sum(axis=0))))
 
         data_storage = OrderedDict(sorted(data_storage.items(),
                                           key=lambda x: x[1][1] + x[1][0],
                                           reverse=True))
 
-        data = np.array([[float(x[0]) for x in
-                          data_storage.values()],
-                         [float(x[1]) for x in
-                          data_storage.values()],
-                         [float(x[2]) for x in
-                          data_storage.values()]])
+        data = np.array(data_storage.values(), dtype=float).T
 
         return {"data": data,
                 "title": "Distribution of missing data per species",
@@ -7751,7 +8729,7 @@ class AlignmentList(Base):
                 "table_header": ["Taxon", "Gaps", "%", "Missing", "%", "Data",
                                  "%"],
                 "normalize": True,
-                "normalize_factor": total_len}
+                "normalize_factor": int(cube.nsites.sum())}
 
     @check_data
     def missing_genes_per_species(self, ns=None):
@@ -7866,25 +8844,13 @@ class AlignmentList(Base):
             "title": str with title
         """
 
-        data_storage = OrderedDict((taxon, []) for taxon in self.taxa_names)
-
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
 
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
-
-                prev_idx = aln_idx
+        cube = self._get_feature_cube(ns=ns)
 
-            data_storage[taxon].append(
-                len(seq.replace("-", "").replace(aln.sequence_code[1], "")))
+        data_storage = OrderedDict(
+            (taxon, x.tolist()) for taxon, x in
+            zip(self.taxa_names, cube.per_taxon(cube.length)))
 
         # Adapt y-axis label according to sequence code
         if len(self.sequence_code) > 1:
@@ -8103,25 +9069,14 @@ class AlignmentList(Base):
             "table_header": list with headers of table,
         """
 
-        data_storage = Counter()
-
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        prev_idx = ""
-        for _, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
 
-                prev_idx = aln_idx
+        cube = self._get_feature_cube(ns=ns)
+        aln = self.alignment_idx[cube.aln_idx[-1]]
 
-            data_storage += Counter(
-                seq.replace("-", "").replace(aln.sequence_code[1], ""))
+        data_storage = Counter(dict(
+            (x, y) for x, y in zip(cube.chars,
+                                   cube.composition.sum(axis=(0, 1))) if y))
 
         # Determine total number of characters
         chars = float(sum(data_storage.values()))
@@ -8171,94 +9126,113 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
 
-        data_storage = OrderedDict((x, Counter()) for x in self.taxa_names)
+        cube = self._get_feature_cube(ns=ns)
+        aln = self.alignment_idx[cube.aln_idx[-1]]
 
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
+        legend = dna_chars if aln.sequence_code[0] == "DNA" else \
+            list(aminoacid_table.keys())
 
-            if prev_idx != aln_idx:
+        # Character counts of each taxon, with shape (legend, taxa)
+        composition = cube.composition.sum(axis=0)
+        counts = np.array([composition[:, cube.chars.index(x)]
+                           if x in cube.chars else
+                           np.zeros(len(cube.taxa), dtype=int)
+                           for x in legend], dtype=float)
 
-                self._update_pipes(ns, None, value=c)
-                c += 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            data = counts / counts.sum(axis=0)
 
-                aln = self.alignment_idx[aln_idx]
+        title = "Nucleotide proportions" if aln.sequence_code[0] == "DNA" \
+            else "Amino acid proportions"
 
-                prev_idx = aln_idx
+        ax_ylabel = "Nucleotide" if aln.sequence_code[0] == "DNA" \
+            else "Amino acid"
+
+        return {"data": data,
+                "title": title,
+                "labels": list(cube.taxa),
+                "legend": legend,
+                "ax_names": ["Taxa", ax_ylabel],
+                "table_header": ["Taxon"] + legend}
 
-            data_storage[taxon] += Counter(
-                seq.replace("-", ""). replace(aln.sequence_code[1], ""))
+    def _iter_pairwise_similarity(self, ns=None, include_taxa=False):
+        """Generator over the pairwise comparisons of each active alignment.
 
-        legend = dna_chars if aln.sequence_code[0] == "DNA" else \
-            list(aminoacid_table.keys())
+        The identity and effective length of all pairs of sequences in each
+        alignment are calculated at once by
+        :meth:`~trifusion.process.matrix.ColumnMatrix.pairwise_similarity`.
+        The effective length ignores the sites with gaps or missing data.
+
+        Parameters
+        ----------
+        ns : multiprocesssing.Manager.Namespace
+            A Namespace object used to communicate with the main thread
+            in TriFusion.
+        include_taxa : bool
+            If True, also yields the taxon names of each pair.
+
+        Yields
+        ------
+        pairs : tuple
+            Tuple of (tx1, tx2) arrays with the taxon names of each pair,
+            in the same order as `itertools.combinations`. Only provided
+            when `include_taxa` is True.
+        sim : numpy.ndarray
+            Number of identical sites of each pair.
+        ef_len : numpy.ndarray
+            Effective length of each pair.
+        aln_idx : int
+            Index of the alignment in the database.
+        """
 
-        data = [[] for _ in legend]
+        self._set_pipes(ns, None, total=len(self.alignments))
 
-        for p, char in enumerate(legend):
-            for c in data_storage.values():
-                chars = float(sum([x for y, x in c.items() if y in legend]))
-                data[p].append(float(c[char]) / chars)
+        for c, (taxa, mat, aln_idx) in enumerate(
+                self.iter_matrices(include_taxa=True)):
 
-        data = np.array(data)
+            self._update_pipes(ns, None, value=c + 1)
+            self._check_killswitch(ns)
 
-        title = "Nucleotide proportions" if aln.sequence_code[0] == "DNA" \
-            else "Amino acid proportions"
+            sim, ef_len = mat.pairwise_similarity()
 
-        ax_ylabel = "Nucleotide" if aln.sequence_code[0] == "DNA" \
-            else "Amino acid"
+            idx = np.triu_indices(mat.ntaxa, 1)
 
-        return {"data": data,
-                "title": title,
-                "labels": list(data_storage.keys()),
-                "legend": legend,
-                "ax_names": ["Taxa", ax_ylabel],
-                "table_header": ["Taxon"] + legend}
+            if include_taxa:
+                names = np.array([tx for _, tx in taxa], dtype=object)
+                yield (names[idx[0]], names[idx[1]]), sim[idx], \
+                    ef_len[idx], aln_idx
+            else:
+                yield sim[idx], ef_len[idx], aln_idx
 
-    @LookupDatabase
-    def _get_similarity(self, seq1=None, seq2=None, aln_len=None, aln=None):
-        """Gets the similarity between two strings and the effective length.
+    def _pairwise_taxa_matrix(self, pairs, values, matrix, counts):
+        """Adds pairwise values to a matrix indexed by taxa position.
 
-        Compares two sequences and calculates the number of similarities.
-        This comparison ignores columns with missing data, so the final
-        sequence length that is actually compared has to be adjusted.
+        Each pair of taxa is stored in the upper triangle of `matrix`,
+        according to the position of the taxa in `taxa_names`.
 
         Parameters
         ----------
-        seq1, seq2 : str
-            Sequence strings.
-        aln_len : int
-            Original lenght of `seq1` and `seq2`.
-
-        Returns
-        -------
-        sim : float
-            Number of pairwise similarities.
-        ef_len : float
-            Effective sequence length, without missing data.
-
-        Notes
-        -----
-        To avoid performing the calculations between identical string pairs,
-        this method is decorated with a class that stores the calculation
-        result of new string pairs in a database, and fetches that result
-        when the same string pair appears later on.
+        pairs : tuple
+            Tuple of (tx1, tx2) arrays with the taxon names of each pair.
+        values : numpy.ndarray
+            Value of each pair.
+        matrix : numpy.ndarray
+            2-D array with shape (taxa, taxa) where `values` are added.
+        counts : numpy.ndarray
+            2-D array with shape (taxa, taxa) with the number of values
+            added to each cell.
         """
 
-        seq1 = np.array(list(seq1))
-        seq2 = np.array(list(seq2))
+        taxa_pos = dict((x, y) for y, x in enumerate(self.taxa_names))
 
-        ef_len_ = (seq1 != aln.sequence_code[1]) & \
-            (seq1 != self.gap_symbol) & \
-            (seq2 != aln.sequence_code[1]) & \
-            (seq2 != self.gap_symbol)
+        pos1 = np.array([taxa_pos[x] for x in pairs[0]], dtype=int)
+        pos2 = np.array([taxa_pos[x] for x in pairs[1]], dtype=int)
 
-        sim_ = (seq1 == seq2) & ef_len_
+        row, col = np.minimum(pos1, pos2), np.maximum(pos1, pos2)
 
-        sim = np.count_nonzero(sim_)
-        ef_len = np.count_nonzero(ef_len_)
-
-        return float(sim), float(ef_len)
+        matrix[row, col] += values
+        counts[row, col] += 1
 
     @check_data
     def sequence_similarity(self, ns=None):
@@ -8278,35 +9252,20 @@ class AlignmentList(Base):
             "ax_names": 2 element list with axis labels [x, y]
         """
 
-        self._get_similarity("connect")
-
-        data = []
-
-        self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        for aln in self.alignments.values():
-
-            self._update_pipes(ns, None, value=c)
-            c += 1
-
-            aln_similarities = []
-
-            for seq1, seq2 in itertools.combinations(aln.iter_sequences(), 2):
-
-                self._check_killswitch(ns)
+        data = {}
 
-                sim, total_len = self._get_similarity(seq1, seq2,
-                                                      aln.locus_length,
-                                                      aln)
+        for sim, ef_len, aln_idx in self._iter_pairwise_similarity(ns):
 
-                if total_len:
-                    aln_similarities.append(sim / total_len)
+            # Pairs without any valid site in common are ignored
+            mask = ef_len > 0
 
-            if aln_similarities:
-                data.append(np.mean(aln_similarities) * 100)
+            if mask.any():
+                data[aln_idx] = np.mean(
+                    sim[mask] / ef_len[mask].astype(float)) * 100
 
-        self._get_similarity("disconnect")
+        # Keep the order of the alignments
+        data = [data[x.db_idx] for x in self.alignments.values()
+                if x.db_idx in data]
 
         return {"data": data,
                 "ax_names": ["Similarity (%)", "Frequency"]}
@@ -8331,45 +9290,28 @@ class AlignmentList(Base):
             "color_label": str, label for colorbar
         """
 
-        self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        self._get_similarity("connect")
-
-        # Create matrix for parwise comparisons
-        data = [np.empty((len(self.taxa_names), 0)).tolist() for _ in
-                range(len(self.taxa_names))]
-
-        taxa_pos = OrderedDict((x, y) for y, x in enumerate(self.taxa_names))
-
-        for aln in self.alignments.values():
-
-            self._update_pipes(ns, None, value=c)
-            c += 1
+        ntaxa = len(self.taxa_names)
 
-            for tx1, tx2 in itertools.combinations(taxa_pos.keys(), 2):
+        # Create matrices for the sum and number of pairwise comparisons
+        data = np.zeros((ntaxa, ntaxa))
+        counts = np.zeros((ntaxa, ntaxa), dtype=int)
 
-                self._check_killswitch(ns)
+        for pairs, sim, ef_len, _ in self._iter_pairwise_similarity(
+                ns, include_taxa=True):
 
-                try:
-                    seq1, seq2 = aln.get_sequence(tx1), aln.get_sequence(tx2)
-                except KeyError:
-                    continue
+            mask = ef_len > 0
 
-                sim, l = self._get_similarity(seq1, seq2, aln.locus_length,
-                                              aln)
-                if l:
-                    data[taxa_pos[tx1]][taxa_pos[tx2]].append(sim / l)
+            self._pairwise_taxa_matrix(
+                (pairs[0][mask], pairs[1][mask]),
+                sim[mask] / ef_len[mask].astype(float), data, counts)
 
-        data = np.array([[np.mean(y) if y else 0. for y in x] for x in data])
+        data = np.where(counts, data / np.maximum(counts, 1), 0.)
         mask = np.tri(data.shape[0], k=0)
         data = np.ma.array(data, mask=mask)
 
-        self._get_similarity("disconnect")
-
         return {"data": data,
                 "color_label": "Pairwise sequence similarity",
-                "labels": list(taxa_pos)}
+                "labels": list(self.taxa_names)}
 
     @check_data
     def sequence_similarity_gene(self, gene_name, window_size, ns=None):
@@ -8411,33 +9353,29 @@ class AlignmentList(Base):
             step = int(window_size)
 
         data = []
+
+        mat = ColumnMatrix.from_sequences(list(aln_obj.iter_sequences()),
+                                          aln_obj.sequence_code[1],
+                                          self.gap_symbol)
+        pairs = np.triu_indices(mat.ntaxa, 1)
         
         self._set_pipes(ns, None, total=aln_obj.locus_length, ignore_sa=True)
 
         for i in range(0, aln_obj.locus_length, step):
 
             self._update_pipes(ns, None, value=i)
+            self._check_killswitch(ns)
 
-            window_similarities = []
-
-            seqs = np.array([[y for y in x[i:i + step]] for x in
-                             aln_obj.iter_sequences()])
-
-            for seq1, seq2 in itertools.combinations(seqs, 2):
-
-                self._check_killswitch(ns)
-
-                s, t = self._get_similarity("".join(seq1), "".join(seq2),
-                                            step, aln_obj)
-                if t:
-                    sim = s / t
-                else:
-                    sim = 0
-
-                window_similarities.append(sim * 100)
+            window = ColumnMatrix(mat.matrix[:, i:i + step],
+                                  aln_obj.sequence_code[1], self.gap_symbol)
+            sim, ef_len = window.pairwise_similarity()
+            sim, ef_len = sim[pairs], ef_len[pairs]
 
-            if window_similarities:
-                data.append(np.mean(window_similarities))
+            if sim.size:
+                # Pairs without valid sites have a similarity of 0
+                data.append(np.mean(np.where(
+                    ef_len, sim / np.maximum(ef_len, 1).astype(float),
+                    0.) * 100))
 
         return {"data": data,
                 "title": "Sequence similarity sliding window for gene\n %s"
@@ -8471,47 +9409,17 @@ class AlignmentList(Base):
 
             "real_bin_num":
         """
-        
-        def add_data():
-            if proportions:
-                data.append(
-                    float(segregating_sites / float(aln.locus_length)))
-            else:
-                data.append(segregating_sites)
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        data = []
-
-        prev_idx = ""
-        for column, aln_idx in self.iter_columns():
-
-            if prev_idx != aln_idx:
-                
-                if prev_idx:
-                    add_data()
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
-
-                segregating_sites = 0
-
-                prev_idx = aln_idx
 
-            # Remove gaps and missing characters
-            column = set([x for x in column if x != aln.sequence_code[1]
-                          and x != self.gap_symbol])
-
-            if len(column) > 1:
-                segregating_sites += 1
+        cube = self._get_feature_cube(ns=ns)
 
         if proportions:
+            data = (cube.segregating / cube.nsites.astype(float)).tolist()
             ax_names = ["Segregating sites", "Percentage"]
             real_bin = False
         else:
+            data = cube.segregating.tolist()
             ax_names = ["Segregating sites", "Frequency"]
             real_bin = True
 
@@ -8542,48 +9450,23 @@ class AlignmentList(Base):
             "color_label": str, label for colorbar
         """
 
-        self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        self._get_similarity("connect")
-
-        # Create matrix for parwise comparisons
-        data = [np.empty((len(self.taxa_names), 0)).tolist() for _ in
-                range(len(self.taxa_names))]
-
-        taxa_pos = OrderedDict((x, y) for y, x in enumerate(self.taxa_names))
-
-        for aln in self.alignments.values():
-
-            self._update_pipes(ns, None, value=c)
-            c += 1
-
-            for tx1, tx2 in itertools.combinations(taxa_pos.keys(), 2):
-
-                self._check_killswitch(ns)
+        ntaxa = len(self.taxa_names)
 
-                try:
-                    seq1, seq2 = aln.get_sequence(tx1), aln.get_sequence(tx2)
-                except KeyError:
-                    continue
+        # Create matrices for the sum and number of pairwise comparisons
+        data = np.zeros((ntaxa, ntaxa))
+        counts = np.zeros((ntaxa, ntaxa), dtype=int)
 
-                s, t = self._get_similarity(seq1, seq2, aln.locus_length,
-                                            aln)
-                if t:
-                    aln_diff = t - s
-                else:
-                    aln_diff = 0
+        for pairs, sim, ef_len, _ in self._iter_pairwise_similarity(
+                ns, include_taxa=True):
 
-                data[taxa_pos[tx1]][taxa_pos[tx2]].append(aln_diff)
+            self._pairwise_taxa_matrix(pairs, ef_len - sim, data, counts)
 
-        data = np.array([[np.mean(y) if y else 0. for y in x] for x in data])
+        data = np.where(counts, data / np.maximum(counts, 1), 0.)
         mask = np.tri(data.shape[0], k=0)
         data = np.ma.array(data, mask=mask)
 
-        self._get_similarity("disconnect")
-
         return {"data": data,
-                "labels": list(taxa_pos),
+                "labels": list(self.taxa_names),
                 "color_label": "Segregating sites"}
 
     @check_data
@@ -8684,41 +9567,10 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 0
 
-        data_length = []
-        data_inf = []
+        cube = self._get_feature_cube(ns=ns)
 
-        prev_idx = ""
-        for column, aln_idx in self.iter_columns():
-
-            if prev_idx != aln_idx:
-
-                if prev_idx:
-                    data_length.append(aln.locus_length)
-                    data_inf.append(informative_sites)
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
-                informative_sites = 0
-
-                missing_symbols = [aln.sequence_code[1], self.gap_symbol]
-
-                prev_idx = aln_idx
-
-            column = Counter(column)
-            for sym in missing_symbols:
-                del column[sym]
-
-            if len(column) > 1:
-                # Remove most common and check the length of the remaining
-                del column[column.most_common()[0][0]]
-                if sum(column.values()) > 1:
-                    informative_sites += 1
-
-        return {"data": [data_length, data_inf],
+        return {"data": [cube.nsites.tolist(), cube.informative.tolist()],
                 "title": "Correlation between alignment length and number of "
                          "variable sites",
                 "ax_names": ["Alignment length", "Informative sites"],
@@ -8759,39 +9611,20 @@ class AlignmentList(Base):
         if len(self.sequence_code) > 1 and self.sequence_code[0] != "DNA":
             return {"exception": InvalidSequenceType}
 
-        data = []
-        missing_symbols = [self.sequence_code[0], self.gap_symbol]
-
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 0
-
-        prev_idx = ""
-        for column, aln_idx in self.iter_columns():
-
-            if prev_idx != aln_idx:
 
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                prev_idx = aln_idx
-
-            column = Counter(column)
+        cube = self._get_feature_cube(ns=ns)
 
-            for sym in missing_symbols:
-                del column[sym]
-            # Get length
-            col_len = sum(column.values())
+        # Number of derived alleles and of sequences with data of all
+        # bi-allelic SNPs
+        empty = [np.zeros(0, dtype=int)]
+        derived = np.concatenate(empty + cube.derived)
+        sites = np.concatenate(empty + cube.sites)
 
-            # Consider only bi-allelic SNPs
-            if len(column) == 2:
-                # Remove most common and check the length of the remaining
-                del column[column.most_common()[0][0]]
-                # Append number of derived alleles
-                if proportions:
-                    data.append(float(sum(column.values())) /
-                                float(col_len))
-                else:
-                    data.append(sum(column.values()))
+        if proportions:
+            data = (derived / sites.astype(float)).tolist()
+        else:
+            data = derived.tolist()
 
         return {"data": data,
                 "title": "Allele frequency spectrum",
@@ -9013,41 +9846,15 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        data_labels = []
-        data_points = []
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
-
-                if prev_idx:
-                    m_data = float(gn_data) / float(total_len)
-                    data_points.append(m_data)
-                    data_labels.append(aln.sname)
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
 
-                aln = self.alignment_idx[aln_idx]
-
-                total_len = aln.locus_length * len(aln.taxa_idx)
-                gn_data = 0
-
-                prev_idx = aln_idx
+        cube = self._get_feature_cube(ns=ns)
+        alns = [self.alignment_idx[x] for x in cube.aln_idx]
 
-            gn_data += seq.count(aln.sequence_code[1]) + \
-                seq.count(self.gap_symbol)
+        total_len = np.array([aln.locus_length * len(aln.taxa_idx)
+                              for aln in alns], dtype=float)
 
-        if prev_idx:
-            m_data = float(gn_data) / float(total_len)
-            data_points.append(m_data)
-            data_labels.append(aln.sname)
-
-        data_points = np.asarray(data_points)
-        data_labels = np.asarray(data_labels)
+        data_points = (cube.missing + cube.gaps).sum(axis=1) / total_len
+        data_labels = np.asarray([aln.sname for aln in alns])
 
         # Get outliers
         outliers_points = data_points[self._mad_based_outlier(data_points)]
@@ -9094,40 +9901,15 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        data = dict((tx, []) for tx in self.taxa_names)
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
 
-                aln = self.alignment_idx[aln_idx]
-                total_len = aln.locus_length
-                
-                prev_idx = aln_idx
+        cube = self._get_feature_cube(ns=ns)
 
-            m_data = float(seq.count(aln.sequence_code[1]) +
-                           seq.count(self.gap_symbol)) / float(total_len)
-            data[taxon].append(m_data)
+        m_data = (cube.missing + cube.gaps) / \
+            cube.nsites[:, None].astype(float)
 
         # Get average for each taxon
-        for tx, vals in data.items():
-            data[tx] = np.mean(vals)
-
-        # Prepara data for plotting
-        data_points = []
-        data_labels = []
-        for tx, vals in data.items():
-            data_points.append(vals)
-            data_labels.append(tx)
-
-        data_points = np.asarray(data_points)
-        data_labels = np.asarray(data_labels)
+        data_points = np.asarray([np.mean(x) for x in cube.per_taxon(m_data)])
+        data_labels = np.asarray(cube.taxa)
 
         # Get outliers
         outliers_points = data_points[self._mad_based_outlier(data_points)]
@@ -9170,46 +9952,13 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        data_points = []
-        data_labels = []
-
-        prev_idx = ""
-        for column, aln_idx in self.iter_columns():
-
-            if prev_idx != aln_idx:
-
-                if prev_idx:
-                    # Get proportion of segregating sites for current alignment
-                    data_points.append(float(segregating_sites) /
-                                       float(aln.locus_length))
-                    data_labels.append(aln.name)
-
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
-
-                missing_symbols = [aln.sequence_code[1], self.gap_symbol]
-
-                segregating_sites = 0
-                
-                prev_idx = aln_idx
 
-            column = list(x for x in set(column) if x not in missing_symbols)
+        cube = self._get_feature_cube(ns=ns)
 
-            if len(column) > 1:
-                segregating_sites += 1
-
-        if prev_idx:
-            # Get proportion of segregating sites for current alignment
-            data_points.append(float(segregating_sites) /
-                               float(aln.locus_length))
-            data_labels.append(aln.name)
-
-        data_points = np.asarray(data_points)
-        data_labels = np.asarray(data_labels)
+        # Proportion of segregating sites of each alignment
+        data_points = cube.segregating / cube.nsites.astype(float)
+        data_labels = np.asarray([self.alignment_idx[x].name
+                                  for x in cube.aln_idx])
 
         # Get outliers
         outliers_points = data_points[self._mad_based_outlier(data_points)]
@@ -9250,40 +9999,27 @@ class AlignmentList(Base):
             "outliers_labels": list of outlier labels
         """
 
-        self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        self._get_similarity("connect")
-
-        data = OrderedDict((tx, []) for tx in self.taxa_names)
-
-        for aln in self.alignments.values():
-
-            self._update_pipes(ns, None, value=c)
-            c += 1
-
-            for tx1, tx2 in itertools.combinations(data.keys(), 2):
-
-                self._check_killswitch(ns)
+        taxa_pos = dict((x, y) for y, x in enumerate(self.taxa_names))
 
-                try:
-                    seq1, seq2 = aln.get_sequence(tx1), aln.get_sequence(tx2)
-                except KeyError:
-                    continue
+        # Sum and number of the pairwise comparisons of each taxon
+        totals = np.zeros(len(self.taxa_names))
+        counts = np.zeros(len(self.taxa_names), dtype=int)
 
-                s, t_len = self._get_similarity(seq1, seq2, aln.locus_length,
-                                                aln)
+        for pairs, s, t_len, _ in self._iter_pairwise_similarity(
+                ns, include_taxa=True):
 
-                if t_len:
-                    s_data = (t_len - s) / t_len
-                else:
-                    s_data = 0
+            s_data = np.where(t_len, (t_len - s) /
+                              np.maximum(t_len, 1).astype(float), 0.)
 
-                data[tx1].append(s_data)
-                data[tx2].append(s_data)
+            for taxa in pairs:
+                pos = np.array([taxa_pos[x] for x in taxa], dtype=int)
+                np.add.at(totals, pos, s_data)
+                np.add.at(counts, pos, 1)
 
-        for tx, vals in data.items():
-            data[tx] = np.mean(vals)
+        # Taxa without comparisons have a NaN average, as the mean of an
+        # empty list
+        with np.errstate(divide="ignore", invalid="ignore"):
+            data = OrderedDict(zip(self.taxa_names, totals / counts))
 
         # Prepara data for plotting
         data_points = []
@@ -9300,8 +10036,6 @@ class AlignmentList(Base):
         # Get outlier taxa
         outlier_labels = list(data_labels[self._mad_based_outlier(data_points)])
 
-        self._get_similarity("disconnect")
-
         return {"data": data_points,
                 "title": "Sequence variation outlier taxa detection",
                 "outliers": outliers_points,
@@ -9336,39 +10070,14 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        data_labels = []
-        data_points = []
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
-                
-                if prev_idx:
-                    gn_avg = np.mean(gn_l)
-                    data_points.append(gn_avg)
-                    data_labels.append(aln.name)
 
-                self._update_pipes(ns, None, value=c)
-                c += 1
-                
-                gn_l = []
-                aln = self.alignment_idx[aln_idx]
-
-                prev_idx = aln_idx
-
-            gn_l.append(len(seq.replace(aln.sequence_code[1], "").
-                            replace(self.gap_symbol, "")))
-
-        if prev_idx:
-            gn_avg = np.mean(gn_l)
-            data_points.append(gn_avg)
-            data_labels.append(aln.name)
+        cube = self._get_feature_cube(ns=ns)
 
-        data_points = np.asarray(data_points)
-        data_labels = np.asarray(data_labels)
+        # Average sequence size of each alignment
+        data_points = cube.length.sum(axis=1) / \
+            cube.present.sum(axis=1).astype(float)
+        data_labels = np.asarray([self.alignment_idx[x].name
+                                  for x in cube.aln_idx])
 
         # Get outliers
         outliers_points = data_points[self._mad_based_outlier(data_points)]
@@ -9410,39 +10119,13 @@ class AlignmentList(Base):
         """
 
         self._set_pipes(ns, None, total=len(self.alignments))
-        c = 1
-
-        data = dict((tx, []) for tx in self.taxa_names)
-
-        prev_idx = ""
-        for taxon, seq, aln_idx in self.iter_alignments():
-
-            if prev_idx != aln_idx:
 
-                self._update_pipes(ns, None, value=c)
-                c += 1
-
-                aln = self.alignment_idx[aln_idx]
-
-                prev_idx = aln_idx
-
-            s_data = len(seq.replace(aln.sequence_code[1], "").
-                         replace(self.gap_symbol, ""))
-            data[taxon].append(s_data)
+        cube = self._get_feature_cube(ns=ns)
 
         # Get average for each taxon
-        for tx, vals in data.items():
-            data[tx] = np.mean(vals)
-
-        # Preparing data for plotting
-        data_points = []
-        data_labels = []
-        for tx, vals in data.items():
-            data_points.append(vals)
-            data_labels.append(tx)
-
-        data_points = np.asarray(data_points)
-        data_labels = np.asarray(data_labels)
+        data_points = np.asarray(
+            [np.mean(x) for x in cube.per_taxon(cube.length)])
+        data_labels = np.asarray(cube.taxa)
 
         # Get outliers
         outliers_points = data_points[self._mad_based_outlier(data_points)]
@@ -0,0 +1,250 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2012 Unknown <diogo@arch>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+"""
+Fast tokenizers for fasta and phylip alignment files.
+
+The alignment file is memory mapped and record boundaries are located with
+`find`, so that the file is never split into python line objects. Sequences
+are normalized (lower case, without whitespace) with a single
+`str.translate` call per record.
+
+The tokenizers only accept well formed files. Whenever an input is
+unusual (e.g. tab characters, text before the first fasta record or
+phylip files whose number of lines does not match the header), an
+:class:`UnusualInput` exception is raised *before* any record is returned.
+:meth:`~trifusion.process.sequence.Alignment.read_alignment` then falls
+back to the line based parsers.
+"""
+
+import mmap
+import string
+
+# Translation table that converts sequence characters to lower case
+lower_table = string.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Characters removed from the sequence of fasta and phylip records.
+# Newlines are included so that multi-line records are joined by the same
+# translate call
+fasta_delete = "\r\n *"
+phylip_delete = "\r\n "
+
+# Whitespace characters that are not supported by the tokenizers
+unusual_chars = "\t\x0b\x0c"
+
+# Size of the chunks that are scanned for unusual characters. Searching
+# string chunks is considerably faster than searching the memory map directly
+scan_chunk_size = 1 << 24
+
+
+class UnusualInput(Exception):
+    pass
+
+
+def map_file(path):
+    """Memory maps an alignment file for reading.
+
+    Parameters
+    ----------
+    path : str
+        Path to the alignment file.
+
+    Returns
+    -------
+    buf : mmap.mmap
+        Read-only memory map of the file. It must be closed by the caller.
+
+    Raises
+    ------
+    UnusualInput
+        If the file is empty or contains unsupported whitespace characters.
+    """
+
+    with open(path, "rb") as fh:
+        try:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        # Empty files cannot be mapped
+        except (ValueError, mmap.error):
+            raise UnusualInput()
+
+    for i in xrange(0, len(buf), scan_chunk_size):
+        chunk = buf[i:i + scan_chunk_size]
+        if any(char in chunk for char in unusual_chars):
+            buf.close()
+            raise UnusualInput()
+
+    return buf
+
+
+def fasta_records(buf):
+    """Returns the (taxon, sequence) records of a fasta file.
+
+    Records with empty sequences are ignored, as in the line based parser.
+
+    Parameters
+    ----------
+    buf : mmap.mmap
+        Memory map of the fasta file.
+
+    Returns
+    -------
+    _ : generator
+        Generator of (taxon, sequence) tuples. Taxon names are stripped but
+        otherwise unchanged.
+
+    Raises
+    ------
+    UnusualInput
+        If there is text before the first record.
+    """
+
+    start = buf.find(">")
+
+    if start == -1 or buf[:start].strip():
+        raise UnusualInput()
+
+    def records():
+
+        pos = start
+        size = len(buf)
+
+        while pos != -1:
+
+            header_end = buf.find("\n", pos)
+            if header_end == -1:
+                header_end = size
+
+            end = buf.find("\n>", header_end)
+            nxt = end + 1
+            if end == -1:
+                end = nxt = size
+
+            seq = buf[header_end:end].translate(lower_table, fasta_delete)
+
+            if seq:
+                yield buf[pos + 1:header_end].strip(), seq
+
+            pos = nxt if nxt < size else -1
+
+    return records()
+
+
+def _iter_lines(buf, pos):
+    """Yields the (start, end) offsets of the non-empty lines of `buf`"""
+
+    size = len(buf)
+
+    while pos < size:
+
+        # Lines are located in string chunks of the map, which is faster
+        # than calling `find` on the map for each line
+        chunk = buf[pos:pos + scan_chunk_size]
+        cpos = 0
+
+        while cpos < len(chunk):
+
+            end = chunk.find("\n", cpos)
+            if end == -1:
+                # The line continues in the next chunk
+                if pos + len(chunk) < size:
+                    break
+                end = len(chunk)
+
+            # Only copy the whole line when its first characters are blank
+            if chunk[cpos:min(cpos + 64, end)].strip() or \
+                    chunk[cpos:end].strip():
+                yield pos + cpos, pos + end
+
+            cpos = end + 1
+
+        # Lines longer than the chunk are located directly in the map
+        if not cpos:
+            end = buf.find("\n", pos)
+            if end == -1:
+                end = size
+
+            if buf[pos:end].strip():
+                yield pos, end
+
+            cpos = end + 1 - pos
+
+        pos += cpos
+
+
+def phylip_records(buf):
+    """Returns the header and (taxon, sequence) records of a phylip file.
+
+    Supports sequential and interleave phylip files. In interleave files,
+    the lines of each block are assigned to the taxa in the order of the
+    first block.
+
+    Parameters
+    ----------
+    buf : mmap.mmap
+        Memory map of the phylip file.
+
+    Returns
+    -------
+    ntaxa : int
+        Number of taxa in the header.
+    nsites : int
+        Number of sites in the header.
+    records : generator
+        Generator of (taxon, sequence) tuples.
+
+    Raises
+    ------
+    UnusualInput
+        If the header is not valid, or if the number of lines does not
+        match the number of taxa.
+    """
+
+    lines = _iter_lines(buf, 0)
+
+    try:
+        header_start, header_end = next(lines)
+        ntaxa, nsites = [int(x) for x in
+                         buf[header_start:header_end].split()[:2]]
+    except (StopIteration, ValueError):
+        raise UnusualInput()
+
+    # Only the offsets of each line are stored, so that the sequences of
+    # interleave files can be joined without reading the file once per taxon
+    offsets = list(lines)
+
+    if not ntaxa or not offsets or len(offsets) % ntaxa:
+        raise UnusualInput()
+
+    def records():
+
+        for i in xrange(ntaxa):
+
+            start, end = offsets[i]
+            fields = buf[start:end].split(None, 1)
+
+            taxon = fields[0]
+            seq = [fields[1] if len(fields) > 1 else ""]
+
+            for start, end in offsets[i + ntaxa::ntaxa]:
+                seq.append(buf[start:end])
+
+            yield taxon, "".join(seq).translate(lower_table, phylip_delete)
+
+    return ntaxa, nsites, records()
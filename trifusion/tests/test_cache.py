@@ -0,0 +1,141 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import unittest
+from data_files import *
+
+try:
+    from process.sequence import AlignmentList
+    from process.cache import ParseCache
+except ImportError:
+    from trifusion.process.sequence import AlignmentList
+    from trifusion.process.cache import ParseCache
+
+temp_dir = ".temp"
+sql_db = ".temp/sequencedb"
+cache_dir = ".temp/cache"
+aln_file = ".temp/aln.fas"
+
+
+class ParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+
+        shutil.copy(dna_data_fas[0], aln_file)
+        os.utime(aln_file, (1000000000, 1000000000))
+
+        self.cache = ParseCache(cache_dir)
+        self.aln_obj = AlignmentList([aln_file], sql_db=sql_db,
+                                     cache=self.cache)
+
+    def tearDown(self):
+
+        self.aln_obj.clear_alignments()
+        self.aln_obj.close_database()
+        shutil.rmtree(temp_dir)
+
+    def load(self, file_list, **kwargs):
+
+        aln_obj = AlignmentList(file_list, sql_db=".temp/cachedb",
+                                cache=self.cache, **kwargs)
+        data = (aln_obj.taxa_names, list(aln_obj.iter_alignments()),
+                aln_obj.partitions.partitions)
+
+        aln_obj.clear_alignments()
+        aln_obj.close_database()
+        os.remove(".temp/cachedb")
+
+        return data
+
+    def reference(self):
+
+        return (self.aln_obj.taxa_names,
+                list(self.aln_obj.iter_alignments()),
+                self.aln_obj.partitions.partitions)
+
+    def test_cache_hit(self):
+
+        self.assertIn(aln_file, self.cache)
+        self.assertEqual(self.load([aln_file]), self.reference())
+
+    def test_parsing_skipped(self):
+
+        # Changing the contents without changing the size and modification
+        # time of the file can only be detected by parsing it
+        with open(aln_file, "r+") as fh:
+            fh.seek(1)
+            fh.write("X")
+        os.utime(aln_file, (1000000000, 1000000000))
+
+        self.assertEqual(self.load([aln_file])[0], self.aln_obj.taxa_names)
+
+    def test_touched_file(self):
+
+        os.utime(aln_file, (0, 0))
+
+        self.assertIn(aln_file, self.cache)
+
+    def test_modified_file(self):
+
+        with open(aln_file, "a") as fh:
+            fh.write("\n>new_taxon\n{}\n".format(
+                "a" * self.aln_obj.alignments.values()[0].locus_length))
+
+        self.assertNotIn(aln_file, self.cache)
+        self.assertIn("new_taxon", self.load([aln_file])[0])
+        self.assertIn(aln_file, self.cache)
+
+    def test_other_path(self):
+
+        self.assertNotIn(os.path.abspath(aln_file), self.cache)
+
+    def test_no_cache(self):
+
+        self.cache.clear()
+
+        self.assertNotIn(aln_file, self.cache)
+        self.assertEqual(self.cache.get(aln_file), None)
+
+    def test_parallel_load(self):
+
+        AlignmentList(dna_data_fas[:3], sql_db=".temp/paralleldb",
+                      cache=self.cache, jobs=2).close_database()
+
+        self.assertTrue(all(x in self.cache for x in dna_data_fas[:3]))
+        self.assertEqual(self.load(dna_data_fas, jobs=2),
+                         self.load(dna_data_fas))
+
+    def test_lru_eviction(self):
+
+        self.cache.max_size = 1
+
+        cache = ParseCache(cache_dir, max_size=2 ** 20)
+
+        for path in dna_data_fas[:3]:
+            cache.put(path, {"rows": [(0, "spa", os.urandom(300000))]})
+
+        # Access the oldest entry, so that the second is the least recently
+        # used
+        cache.get(dna_data_fas[0])
+        cache.put(dna_data_fas[3], {"rows": [(0, "spa", os.urandom(300000))]})
+
+        self.assertEqual([x in cache for x in dna_data_fas[:4]],
+                         [True, False, True, True])
+
+    def test_cache_dir_env(self):
+
+        os.environ["TRIFUSION_CACHE_DIR"] = cache_dir
+
+        try:
+            self.assertEqual(ParseCache().cache_dir, cache_dir)
+        finally:
+            del os.environ["TRIFUSION_CACHE_DIR"]
+
+
+if __name__ == '__main__':
+    unittest.main()
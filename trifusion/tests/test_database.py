@@ -0,0 +1,315 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import threading
+import unittest
+from copy import deepcopy
+from data_files import *
+
+try:
+    from process.sequence import AlignmentList
+    from process.database import ConnectionPool
+    from process.packing import pack_sequence, unpack_sequence, \
+        unpack_array, substr_sequence
+except ImportError:
+    from trifusion.process.sequence import AlignmentList
+    from trifusion.process.database import ConnectionPool
+    from trifusion.process.packing import pack_sequence, unpack_sequence, \
+        unpack_array, substr_sequence
+
+temp_dir = ".temp"
+sql_db = ".temp/sequencedb"
+packed_db = ".temp/packeddb"
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+
+        self.pool = ConnectionPool(sql_db)
+        self.pool.writer.execute("CREATE TABLE test(val INT)")
+
+    def tearDown(self):
+
+        self.pool.close()
+        shutil.rmtree(temp_dir)
+
+    def test_wal_mode(self):
+
+        self.assertTrue(self.pool.wal)
+
+    def test_memory_database(self):
+
+        pool = ConnectionPool(":memory:")
+
+        self.assertFalse(pool.wal)
+        self.assertIs(pool.reader(), pool.writer)
+
+        pool.close()
+
+    def test_reader_per_thread(self):
+
+        readers = []
+
+        def get_reader():
+            readers.append(self.pool.reader())
+
+        th = threading.Thread(target=get_reader)
+        th.start()
+        th.join()
+
+        self.assertIs(self.pool.reader(), self.pool.reader())
+        self.assertIsNot(readers[0], self.pool.reader())
+        self.assertIsNot(readers[0], self.pool.writer)
+
+    def test_pending_writes_visible(self):
+
+        self.pool.writer.executemany("INSERT INTO test VALUES (?)",
+                                     [(x,) for x in range(10)])
+
+        cur = self.pool.cursor()
+        res = cur.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+        cur.close()
+
+        self.assertEqual(res, 10)
+
+    def test_no_sync_during_write(self):
+
+        res = []
+
+        def read():
+            cur = self.pool.cursor()
+            res.append(cur.execute("SELECT COUNT(*) FROM test").fetchone()[0])
+            cur.close()
+
+        with self.pool.write_lock:
+            self.pool.writer.executemany("INSERT INTO test VALUES (?)",
+                                         [(x,) for x in range(10)])
+
+            # Other threads do not commit the writer mid operation
+            th = threading.Thread(target=read)
+            th.start()
+            th.join()
+
+        read()
+
+        self.assertEqual(res, [0, 10])
+
+
+class ConcurrentReadsTest(unittest.TestCase):
+
+    def setUp(self):
+
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+
+        self.aln_obj = AlignmentList(dna_data_fas, sql_db=sql_db)
+
+    def tearDown(self):
+
+        self.aln_obj.clear_alignments()
+        self.aln_obj.close_database()
+        shutil.rmtree(temp_dir)
+
+    def test_abandoned_generator(self):
+        """
+        A partially consumed generator must not block other generators,
+        either in the same or in another thread.
+        """
+
+        gen = self.aln_obj.iter_alignments()
+        next(gen)
+
+        res = []
+
+        th = threading.Thread(target=lambda: res.append(
+            len(list(self.aln_obj.iter_alignments()))))
+        th.daemon = True
+        th.start()
+        th.join(30)
+
+        self.assertFalse(th.is_alive())
+        self.assertEqual(res, [len(list(self.aln_obj.iter_alignments()))])
+
+    def test_concurrent_reads_stress(self):
+
+        aln = self.aln_obj.alignments.values()[0]
+        taxon = aln.taxa_idx.keys()[0]
+
+        def read_ops(obj):
+            return (
+                len(list(obj.iter_alignments())),
+                len(list(obj.iter_columns())),
+                obj.get_summary_stats()[0],
+                obj.missing_data_per_species()["data"].tolist(),
+                obj.alignments.values()[0].get_sequence(taxon))
+
+        ref = read_ops(self.aln_obj)
+
+        # Each thread works on a copy, as TriFusion's background tasks do
+        copies = [deepcopy(self.aln_obj) for _ in range(8)]
+        for obj in copies:
+            obj.set_database_connections(self.aln_obj.cur, self.aln_obj.con,
+                                         self.aln_obj.pool)
+
+        results = []
+        errors = []
+
+        def worker(obj):
+            try:
+                for _ in range(5):
+                    results.append(read_ops(obj))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(x,))
+                   for x in copies]
+        for th in threads:
+            th.daemon = True
+            th.start()
+
+        for th in threads:
+            th.join(60)
+
+        self.assertFalse(any(th.is_alive() for th in threads))
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 40)
+        self.assertTrue(all(x == ref for x in results))
+
+
+class PackingTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+
+        for seq in ["a", "ac", "acgtn-?", "acgtn-?rykmswbdh" * 3]:
+            packed = pack_sequence(seq)
+            self.assertIsInstance(packed, buffer)
+            self.assertEqual(unpack_sequence(packed), seq)
+            self.assertEqual(unpack_array(packed).tostring(), seq)
+
+    def test_packed_size(self):
+
+        self.assertEqual(len(pack_sequence("acgt" * 100)), 201)
+        self.assertEqual(len(pack_sequence("acgt" * 100 + "a")), 202)
+
+    def test_unsupported_characters(self):
+
+        for seq in ["", "acgtv", "ACGT", "mkvlx", u"acg\xe9"]:
+            self.assertEqual(pack_sequence(seq), seq)
+            self.assertEqual(unpack_sequence(seq), seq)
+
+    def test_substr(self):
+
+        seq = "acgtn-?rykmswbdha"
+        packed = pack_sequence(seq)
+        cur = ConnectionPool(":memory:").cursor()
+
+        for start in range(0, len(seq) + 2):
+            for length in range(0, 5):
+                ref = cur.execute("SELECT substr(?, ?, ?)",
+                                  (seq, start, length)).fetchone()[0]
+                self.assertEqual(substr_sequence(packed, start, length), ref)
+                self.assertEqual(cur.execute(
+                    "SELECT seq_substr(?, ?, ?)",
+                    (packed, start, length)).fetchone()[0], ref)
+
+
+class PackedStorageTest(unittest.TestCase):
+
+    def setUp(self):
+
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+
+        self.aln_obj = AlignmentList(dna_data_fas, sql_db=sql_db)
+        self.packed_obj = AlignmentList(dna_data_fas, sql_db=packed_db,
+                                        packed=True)
+        os.makedirs("output")
+
+    def tearDown(self):
+
+        self.aln_obj.clear_alignments()
+        self.aln_obj.close_database()
+        self.packed_obj.clear_alignments()
+        self.packed_obj.close_database()
+        shutil.rmtree("output")
+        shutil.rmtree(temp_dir)
+
+    def test_packed_rows(self):
+
+        types = self.packed_obj.cur.execute(
+            "SELECT DISTINCT typeof(seq) FROM alignment_data").fetchall()
+        self.assertEqual(types, [("blob",)])
+
+    def test_database_size(self):
+
+        query = "SELECT SUM(LENGTH(seq)) FROM alignment_data"
+        size = self.aln_obj.cur.execute(query).fetchone()[0]
+        packed_size = self.packed_obj.cur.execute(query).fetchone()[0]
+
+        self.assertLess(packed_size, size * 0.55)
+
+    def test_iter_alignments(self):
+
+        self.assertEqual(list(self.aln_obj.iter_alignments()),
+                         list(self.packed_obj.iter_alignments()))
+
+    def test_iter_columns(self):
+
+        self.assertEqual(list(self.aln_obj.iter_columns()),
+                         list(self.packed_obj.iter_columns()))
+
+    def test_alignment_accessors(self):
+
+        for aln, packed in zip(self.aln_obj, self.packed_obj):
+            self.assertEqual(list(aln), list(packed))
+            self.assertEqual(list(aln.iter_sequences()),
+                             list(packed.iter_sequences()))
+            for taxon in aln.taxa_idx:
+                self.assertEqual(aln.get_sequence(taxon),
+                                 packed.get_sequence(taxon))
+
+    def test_summary_stats(self):
+
+        self.assertEqual(self.aln_obj.get_summary_stats(),
+                         self.packed_obj.get_summary_stats())
+        self.assertEqual(
+            self.aln_obj.missing_data_per_species()["data"].tolist(),
+            self.packed_obj.missing_data_per_species()["data"].tolist())
+
+    def test_write_concatenation(self):
+
+        outputs = []
+
+        for i, aln_obj in enumerate([self.aln_obj, self.packed_obj]):
+            output_file = os.path.join("output", "test{}".format(i))
+            aln_obj.concatenate()
+            aln_obj.write_to_file(["fasta", "phylip", "nexus"],
+                                  output_file=output_file)
+            outputs.append([open(output_file + x).read() for x in
+                            [".fas", ".phy", ".nex"]])
+
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_packed_loci(self):
+
+        self.aln_obj.clear_alignments()
+        self.packed_obj.clear_alignments()
+        self.aln_obj.add_alignment_files(dna_data_loci)
+        self.packed_obj.add_alignment_files(dna_data_loci)
+
+        types = self.packed_obj.cur.execute(
+            "SELECT DISTINCT typeof(seq) FROM alignment_data").fetchall()
+        self.assertEqual(types, [("blob",)])
+
+        self.assertEqual(list(self.aln_obj.iter_alignments()),
+                         list(self.packed_obj.iter_alignments()))
+
+
+if __name__ == '__main__':
+    unittest.main()
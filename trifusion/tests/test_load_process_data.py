@@ -9,8 +9,10 @@ from collections import OrderedDict
 from data_files import *
 
 try:
+    from process import sequence
     from process.sequence import AlignmentList, Alignment
 except ImportError:
+    from trifusion.process import sequence
     from trifusion.process.sequence import AlignmentList, Alignment
 
 temp_dir = ".temp"
@@ -251,6 +253,112 @@ class LoadAlignmentsTest(unittest.TestCase):
 
         self.assertEqual(len(non_ascii_tx), 1)
 
+    def test_buffered_insert_flush(self):
+
+        self.aln_obj = AlignmentList(dna_data_fas, sql_db=sql_db)
+
+        for aln in self.aln_obj.alignments.values():
+            self.assertEqual(aln._insert_buffer, [])
+
+    def test_unbuffered_insert_data(self):
+
+        self.aln_obj = AlignmentList(dna_data_fas, sql_db=sql_db)
+        buffered = list(self.aln_obj.iter_alignments())
+
+        default_size = sequence.insert_buffer_size
+        sequence.insert_buffer_size = 0
+
+        try:
+            aln_obj = AlignmentList(dna_data_fas,
+                                    sql_db=join(temp_dir, "unbuffereddb"))
+            unbuffered = list(aln_obj.iter_alignments())
+            aln_obj.con.close()
+        finally:
+            sequence.insert_buffer_size = default_size
+
+        self.assertEqual(buffered, unbuffered)
+
+    def test_parallel_load(self):
+
+        file_list = bad_file + dna_data_fas + unequal_file + dna_data_phy + \
+            dna_data_loci
+
+        self.aln_obj = AlignmentList(list(file_list), sql_db=sql_db)
+        sequential = list(self.aln_obj.iter_alignments())
+
+        aln_obj = AlignmentList(list(file_list),
+                                sql_db=join(temp_dir, "paralleldb"), jobs=2)
+        parallel = list(aln_obj.iter_alignments())
+
+        data = [aln_obj.alignment_idx.keys(),
+                [x.path for x in aln_obj.alignment_idx.values()],
+                aln_obj.bad_alignments,
+                aln_obj.non_alignments,
+                aln_obj.taxa_names,
+                aln_obj.partitions.partitions]
+
+        aln_obj.con.close()
+
+        self.assertEqual(data,
+                         [self.aln_obj.alignment_idx.keys(),
+                          [x.path for x in
+                           self.aln_obj.alignment_idx.values()],
+                          self.aln_obj.bad_alignments,
+                          self.aln_obj.non_alignments,
+                          self.aln_obj.taxa_names,
+                          self.aln_obj.partitions.partitions])
+        self.assertEqual(sequential, parallel)
+
+    def test_fast_parsing(self):
+
+        file_list = bad_file + dna_data_fas + unequal_file + dna_data_phy + \
+            protein_no_missing + alternative_missing
+
+        self.aln_obj = AlignmentList(list(file_list), sql_db=sql_db)
+        fast = list(self.aln_obj.iter_alignments())
+
+        sequence.fast_parsing = False
+
+        try:
+            aln_obj = AlignmentList(list(file_list),
+                                    sql_db=join(temp_dir, "legacydb"))
+            legacy = list(aln_obj.iter_alignments())
+            data = [aln_obj.bad_alignments,
+                    aln_obj.non_alignments,
+                    aln_obj.taxa_names,
+                    [x.sequence_code for x in aln_obj.alignments.values()]]
+            aln_obj.con.close()
+        finally:
+            sequence.fast_parsing = True
+
+        self.assertEqual(data,
+                         [self.aln_obj.bad_alignments,
+                          self.aln_obj.non_alignments,
+                          self.aln_obj.taxa_names,
+                          [x.sequence_code for x in
+                           self.aln_obj.alignments.values()]])
+        self.assertEqual(fast, legacy)
+
+    def test_fast_parsing_interleave_phy(self):
+
+        self.aln_obj = AlignmentList(phylip_interleave, sql_db=sql_db)
+
+        data = list(self.aln_obj.iter_alignments())
+
+        self.assertEqual(len(data), 20)
+        self.assertEqual(set(len(x[1]) for x in data), set([360]))
+
+    def test_fast_parsing_fallback(self):
+
+        # Tab characters are not supported by the tokenizer
+        aln_file = join(temp_dir, "tabs.fas")
+        with open(aln_file, "w") as fh:
+            fh.write(">spa\t\nAACGT\n>spb\nAACGT\n")
+
+        self.aln_obj = AlignmentList([aln_file], sql_db=sql_db)
+
+        self.assertEqual(self.aln_obj.taxa_names, ["spa", "spb"])
+
 
 class AlignmentManipulationTest(unittest.TestCase):
 
@@ -279,7 +387,8 @@ class AlignmentManipulationTest(unittest.TestCase):
                                                          "locus_length",
                                                          "partitions",
                                                          "cur",
-                                                         "con"]))
+                                                         "con",
+                                                         "pool"]))
 
     def test_update_act_anls(self):
 
@@ -0,0 +1,145 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import unittest
+import numpy as np
+from data_files import *
+
+try:
+    from process.sequence import AlignmentList
+    from process.matrix import ColumnMatrix, FeatureCube
+except ImportError:
+    from trifusion.process.sequence import AlignmentList
+    from trifusion.process.matrix import ColumnMatrix, FeatureCube
+
+temp_dir = ".temp"
+sql_db = ".temp/sequencedb"
+
+
+class ColumnMatrixTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.mat = ColumnMatrix.from_sequences(
+            [u"aac-nt",
+             u"aac-na",
+             u"atg-ng",
+             u"ttgann"], "n")
+
+    def test_shape(self):
+
+        self.assertEqual((self.mat.ntaxa, self.mat.nsites), (4, 6))
+
+    def test_gap_count(self):
+
+        self.assertEqual(self.mat.gap_count().tolist(), [0, 0, 0, 3, 0, 0])
+
+    def test_missing_count(self):
+
+        self.assertEqual(self.mat.missing_count().tolist(),
+                         [0, 0, 0, 0, 4, 1])
+
+    def test_state_count(self):
+
+        self.assertEqual(self.mat.state_count().tolist(), [2, 2, 2, 1, 0, 3])
+
+    def test_informative(self):
+
+        self.assertEqual(self.mat.informative().tolist(),
+                         [False, True, True, False, False, False])
+
+    def test_compress(self):
+
+        mask = np.array([True, False, False, False, False, True])
+
+        self.assertEqual(self.mat.compress(mask), ["at", "aa", "ag", "tn"])
+
+    def test_pairwise_similarity(self):
+
+        sim, ef_len = self.mat.pairwise_similarity()
+
+        self.assertEqual(sim.tolist(), [[4, 3, 1, 0],
+                                        [3, 4, 1, 0],
+                                        [1, 1, 4, 2],
+                                        [0, 0, 2, 4]])
+        self.assertEqual(ef_len.tolist(), [[4, 4, 4, 3],
+                                           [4, 4, 4, 3],
+                                           [4, 4, 4, 3],
+                                           [3, 3, 3, 4]])
+
+    def test_pairwise_similarity_blocks(self):
+
+        ref = self.mat.pairwise_similarity()
+
+        for block_size in [1, 2, 4]:
+            res = self.mat.pairwise_similarity(block_size)
+            self.assertEqual([x.tolist() for x in res],
+                             [x.tolist() for x in ref])
+
+    def test_biallelic_counts(self):
+
+        derived, sites = self.mat.biallelic_counts()
+
+        self.assertEqual([derived.tolist(), sites.tolist()],
+                         [[1, 2, 2], [4, 4, 4]])
+
+    def test_profile(self):
+
+        p = self.mat.profile(["t1", "t2", "t3", "t4"])
+
+        self.assertEqual([p.symbols, p.counts.tolist(), p.segregating,
+                          p.informative],
+                         ["-acgnt", [[1, 2, 1, 0, 1, 1],
+                                     [1, 3, 1, 0, 1, 0],
+                                     [1, 1, 0, 2, 1, 1],
+                                     [0, 1, 0, 1, 2, 2]], 4, 2])
+
+    def test_feature_cube(self):
+
+        cube = FeatureCube(["t4", "t1", "t5"], {
+            1: self.mat.profile(["t1", "t2", "t3", "t4"])})
+
+        self.assertEqual([cube.present.tolist(), cube.gaps.tolist(),
+                          cube.missing.tolist(), cube.chars,
+                          cube.length.tolist()],
+                         [[[True, True, False]], [[0, 1, 0]], [[2, 1, 0]],
+                          ["a", "c", "g", "t"], [[4, 4, 0]]])
+
+
+class IterMatricesTest(unittest.TestCase):
+
+    def setUp(self):
+
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+
+        self.aln_obj = AlignmentList(variable_data, sql_db=sql_db)
+
+    def tearDown(self):
+
+        self.aln_obj.clear_alignments()
+        self.aln_obj.con.close()
+        shutil.rmtree(temp_dir)
+
+    def test_iter_matrices(self):
+
+        data = [(mat.ntaxa, mat.nsites, int(mat.variable().sum()),
+                 int(mat.informative().sum()))
+                for mat, _ in self.aln_obj.iter_matrices()]
+
+        self.assertEqual(data, [(10, 50, 0, 0),
+                                (10, 50, 3, 0),
+                                (10, 50, 4, 1)])
+
+    def test_iter_matrices_taxa(self):
+
+        taxa, mat, _ = next(self.aln_obj.iter_matrices(include_taxa=True))
+
+        self.assertEqual([x[1] for x in taxa],
+                         ["Seq{}".format(x) for x in range(1, 11)])
+
+
+if __name__ == "__main__":
+    unittest.main()
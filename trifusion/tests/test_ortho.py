@@ -0,0 +1,855 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import shutil
+import signal
+import sqlite3
+import subprocess
+import unittest
+from functools import partial
+from multiprocessing import Pool
+from os.path import join
+
+try:
+    from ortho import orthomclInstallSchema, orthomclBlastParser, \
+        orthomclPairs, orthomclDumpPairsFiles, orthomclMclToGroups
+    from ortho.fasta_index import FastaIndex, build_fai, read_fai
+    from ortho.OrthomclToolbox import GroupLight, MultiGroupsLight
+    from ortho.protein2dna import convert_group
+    from ortho.orthomclManifest import StageManifest
+    from process.error_handling import KillByUser
+    import orthomcl_pipeline
+except ImportError:
+    from trifusion.ortho import orthomclInstallSchema, orthomclBlastParser, \
+        orthomclPairs, orthomclDumpPairsFiles, orthomclMclToGroups
+    from trifusion.ortho.fasta_index import FastaIndex, build_fai, read_fai
+    from trifusion.ortho.OrthomclToolbox import GroupLight, \
+        MultiGroupsLight
+    from trifusion.ortho.protein2dna import convert_group
+    from trifusion.ortho.orthomclManifest import StageManifest
+    from trifusion.process.error_handling import KillByUser
+    from trifusion import orthomcl_pipeline
+
+temp_dir = ".temp"
+fasta_dir = ".temp/compliantFasta"
+blast_file = ".temp/AllVsAll.out"
+
+mcl_bin = "trifusion/data/resources/mcl/linux/mcl"
+
+pairs_files = ["orthologs.txt", "inparalogs.txt", "coorthologs.txt",
+               "mclInput"]
+
+proteomes = {
+    "tx1": [("tx1|g1", "M" * 100), ("tx1|g2", "M" * 50)],
+    "tx2": [("tx2|g1", "M" * 80)]
+}
+
+# Tabular BLAST output (-outfmt 6). The second pair has two HSPs
+blast_lines = [
+    "tx1|g1\ttx1|g1\t100.0\t100\t0\t0\t1\t100\t1\t100\t1e-50\t200",
+    "tx1|g1\ttx2|g1\t50.0\t40\t0\t0\t1\t40\t1\t40\t2e-10\t80",
+    "tx1|g1\ttx2|g1\t60.0\t20\t0\t0\t61\t80\t41\t60\t2e-10\t80",
+    "tx2|g1\ttx1|g2\t80.0\t50\t0\t0\t1\t50\t1\t50\t0\t100"
+]
+
+similar_sequences = [
+    (u"tx1|g1", u"tx1|g1", u"tx1", u"tx1", 1.0, -50, 100.0, 100.0),
+    (u"tx1|g1", u"tx2|g1", u"tx1", u"tx2", 2.0, -10, 53.0, 75.0),
+    (u"tx2|g1", u"tx1|g2", u"tx2", u"tx1", 0.0, 0, 80.0, 100.0)
+]
+
+
+def write_blast_fixture(lines):
+
+    if not os.path.exists(fasta_dir):
+        os.makedirs(fasta_dir)
+
+    for taxon, seqs in proteomes.items():
+        with open(join(fasta_dir, taxon + ".fasta"), "w") as fh:
+            for name, seq in seqs:
+                fh.write(">{}\n{}\n".format(name, seq))
+
+    with open(blast_file, "w") as fh:
+        fh.write("\n".join(lines) + "\n")
+
+
+def get_similar_sequences(db_dir):
+
+    con = sqlite3.connect(join(db_dir, "orthoDB.db"))
+
+    if orthomclInstallSchema.has_integer_ids(con.cursor()):
+        rows = con.execute(
+            "SELECT q.name, s.name, qt.name, st.name, evalue_mant, "
+            "evalue_exp, percent_identity, percent_match "
+            "FROM SimilarSequences "
+            "JOIN SequenceIds q ON q.id = query_id "
+            "JOIN SequenceIds s ON s.id = subject_id "
+            "JOIN TaxonIds qt ON qt.id = query_taxon_id "
+            "JOIN TaxonIds st ON st.id = subject_taxon_id").fetchall()
+    else:
+        rows = con.execute("SELECT * FROM SimilarSequences").fetchall()
+
+    con.close()
+
+    return sorted(rows)
+
+
+def write_similar_sequences(db_dir, integer_ids=False):
+    """Creates an orthoMCL database with a SimilarSequences table of gene
+    families in three taxa, with one to three copies per taxon, so that
+    orthologs, in-paralogs and co-orthologs are found"""
+
+    rng = random.Random(0)
+
+    orthomclInstallSchema.execute(db_dir, integer_ids=integer_ids)
+
+    families = []
+    for i in range(30):
+        families.append([("tx{}|fam{}_{}".format(t, i, c), "tx{}".format(t))
+                         for t in range(3)
+                         for c in range(rng.randint(1, 3))])
+
+    rows = []
+    for fam in families:
+        for query, query_taxon in fam:
+            for subject, subject_taxon in fam:
+                if rng.random() > 0.9:
+                    continue
+                if query != subject and query_taxon == subject_taxon and \
+                        rng.random() < 0.5:
+                    evalue = (rng.randint(1, 9), -rng.randint(150, 180))
+                else:
+                    evalue = (rng.randint(1, 9), -rng.randint(1, 180))
+                rows.append([query, subject, query_taxon, subject_taxon,
+                             float(evalue[0]), evalue[1],
+                             float(rng.randint(20, 100)),
+                             float(rng.randint(30, 100))])
+
+    con = sqlite3.connect(join(db_dir, "orthoDB.db"))
+
+    if integer_ids:
+        seq_ids = dict((x, i) for i, x in enumerate(
+            sorted(x[0] for fam in families for x in fam)))
+        taxon_ids = dict((x, i) for i, x in enumerate(
+            ["tx0", "tx1", "tx2"]))
+        con.executemany("INSERT INTO SequenceIds VALUES(?, ?)",
+                        ((i, x) for x, i in seq_ids.items()))
+        con.executemany("INSERT INTO TaxonIds VALUES(?, ?)",
+                        ((i, x) for x, i in taxon_ids.items()))
+        rows = [[seq_ids[x[0]], seq_ids[x[1]], taxon_ids[x[2]],
+                 taxon_ids[x[3]]] + x[4:] for x in rows]
+
+    con.executemany("INSERT INTO SimilarSequences VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    orthomclInstallSchema.createSimilarSequencesIndexes(con.cursor())
+    con.commit()
+    con.close()
+
+
+def run_pairs(db_dir, engine="sql"):
+    """Runs orthomclPairs and returns the contents of the dumped pairs
+    files"""
+
+    orthomclPairs.execute(db_dir, engine=engine)
+
+    os.makedirs(join(db_dir, "backstage_files"))
+    orthomclDumpPairsFiles.execute(db_dir, db_dir)
+
+    res = []
+    for fl in pairs_files:
+        with open(join(db_dir, "backstage_files", fl)) as fh:
+            res.append(fh.read())
+
+    return res
+
+
+class BlastParserTest(unittest.TestCase):
+
+    def setUp(self):
+
+        write_blast_fixture(blast_lines)
+
+        self.batch_size = orthomclBlastParser.insert_batch_size
+        self.shard_size = orthomclBlastParser.shard_size
+
+    def tearDown(self):
+
+        orthomclBlastParser.insert_batch_size = self.batch_size
+        orthomclBlastParser.shard_size = self.shard_size
+        shutil.rmtree(temp_dir)
+
+    def parse(self, jobs=1, integer_ids=False):
+
+        orthomclInstallSchema.execute(temp_dir, integer_ids=integer_ids)
+        orthomclBlastParser.orthomcl_blast_parser(blast_file, fasta_dir,
+                                                  temp_dir, None, jobs=jobs)
+
+        return get_similar_sequences(temp_dir)
+
+    def test_similar_sequences(self):
+
+        self.assertEqual(self.parse(), similar_sequences)
+
+    def test_batches(self):
+
+        orthomclBlastParser.insert_batch_size = 1
+
+        self.assertEqual(self.parse(), similar_sequences)
+
+    def test_integer_ids(self):
+
+        self.assertEqual(self.parse(integer_ids=True), similar_sequences)
+
+    def test_parallel_shards(self):
+
+        # One shard per query
+        orthomclBlastParser.shard_size = 1
+
+        self.assertEqual(self.parse(jobs=2), similar_sequences)
+
+    def test_shards_space_delimited(self):
+
+        write_blast_fixture([x.replace("\t", " ") for x in blast_lines])
+
+        shards = orthomclBlastParser.get_shards(blast_file, 1)
+
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(self.parse(), similar_sequences)
+
+    def test_imap_bounded(self):
+
+        pool = Pool(2)
+
+        try:
+            res = list(orthomclBlastParser.imap_bounded(pool, abs,
+                                                        range(0, -20, -1), 3))
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.assertEqual(res, range(20))
+
+
+class PairsTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.names_dir = join(temp_dir, "names")
+        self.ids_dir = join(temp_dir, "ids")
+
+        for path in [self.names_dir, self.ids_dir]:
+            os.makedirs(path)
+
+        write_similar_sequences(self.names_dir)
+        write_similar_sequences(self.ids_dir, integer_ids=True)
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def test_integer_ids(self):
+
+        res = run_pairs(self.names_dir)
+
+        self.assertTrue(all(res))
+        self.assertEqual(run_pairs(self.ids_dir), res)
+
+    def test_pandas_engine(self):
+
+        for db_dir in [self.names_dir, self.ids_dir]:
+            pandas_dir = db_dir + "_pandas"
+            shutil.copytree(db_dir, pandas_dir)
+
+            self.assertEqual(run_pairs(pandas_dir, engine="pandas"),
+                             run_pairs(db_dir))
+
+    def test_zero_evalues(self):
+
+        rows = [("tx0|a", "tx1|a", "tx0", "tx1", 0., 0, 100., 100.),
+                ("tx1|a", "tx0|a", "tx1", "tx0", 0., 0, 100., 100.)]
+
+        # Empty SimilarSequences table and table without evalues other
+        # than 0
+        for i, data in enumerate([[], rows]):
+            res = []
+            for engine in ["sql", "pandas"]:
+                db_dir = join(temp_dir, "{}{}".format(engine, i))
+                os.makedirs(db_dir)
+                orthomclInstallSchema.execute(db_dir)
+
+                con = sqlite3.connect(join(db_dir, "orthoDB.db"))
+                con.executemany("INSERT INTO SimilarSequences VALUES "
+                                "(?, ?, ?, ?, ?, ?, ?, ?)", data)
+                con.commit()
+                con.close()
+
+                res.append(run_pairs(db_dir, engine=engine))
+
+            self.assertEqual(res, [["", "", "", ""]] * 2)
+
+
+class MclTest(unittest.TestCase):
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        self.abc_file = join(temp_dir, "mclInput")
+        self.mci_file = join(temp_dir, "mclInput.mci")
+        self.tab_file = join(temp_dir, "mclInput.tab")
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def read_mci(self):
+        """Returns the edges of the matrix file, with the labels of the tab
+        file"""
+
+        with open(self.tab_file) as fh:
+            labels = dict(x.rstrip("\n").split("\t") for x in fh)
+
+        with open(self.mci_file) as fh:
+            data = fh.read()
+
+        self.assertTrue(data.startswith(
+            "(mclheader\nmcltype matrix\ndimensions {0}x{0}\n)\n".format(
+                len(labels))))
+
+        edges = {}
+        body = data.split("begin\n")[1]
+        self.assertTrue(body.endswith(")\n"))
+
+        # Each row has the node, its edges and a terminating $
+        for row in body[:-2].split("$")[:-1]:
+            fields = row.split()
+            edges[labels[fields[0]]] = dict(
+                (labels[x.split(":")[0]], x.split(":")[1])
+                for x in fields[1:])
+
+        return edges
+
+    def test_abc_to_mci(self):
+
+        with open(self.abc_file, "w") as fh:
+            fh.write("a\tb\t1.5\n"
+                     "b\tc\t0.25\n"
+                     "b\ta\t2.0\n"
+                     "c\td\n"
+                     "e\n"
+                     "\n")
+
+        orthomclMclToGroups.abc_to_mci(self.abc_file, self.mci_file,
+                                       self.tab_file)
+
+        # Edges are mirrored, repeated edges keep the largest weight and
+        # edges without weight have a weight of 1
+        self.assertEqual(self.read_mci(), {
+            "a": {"b": "2.0"},
+            "b": {"a": "2.0", "c": "0.25"},
+            "c": {"b": "0.25", "d": "1"},
+            "d": {"c": "1"},
+            "e": {}})
+
+        # Nodes are numbered in the order of first appearance
+        with open(self.tab_file) as fh:
+            self.assertEqual(fh.read(), "0\ta\n1\tb\n2\tc\n3\td\n4\te\n")
+
+    def record_popen(self):
+        """Stores the subprocesses created by mcl in the popens attribute"""
+
+        popen = subprocess.Popen
+        self.popens = []
+
+        def record(*args, **kwargs):
+            p = popen(*args, **kwargs)
+            self.popens.append(p)
+            return p
+
+        subprocess.Popen = record
+        self.addCleanup(setattr, subprocess, "Popen", popen)
+
+    def test_mcl(self):
+
+        write_mcl_input(temp_dir)
+        self.record_popen()
+
+        # The CPUs that are not used by concurrent runs are given to the
+        # expansion threads of each run
+        for inflation, cpus, threads in [(["1.5", "2", "3"], 2, "1"),
+                                         (["4", "5"], 4, "2")]:
+
+            finished = []
+            orthomcl_pipeline.mcl(inflation, temp_dir, mcl_file=mcl_bin,
+                                  cpus=cpus, callback=finished.append)
+
+            self.assertEqual(sorted(finished), inflation)
+
+            for val in inflation:
+                self.assertTrue(os.path.exists(join(
+                    temp_dir, "backstage_files",
+                    "mclOutput_" + val.replace(".", ""))))
+
+        self.assertEqual(len(self.popens), 5)
+        self.assertEqual([p.returncode for p in self.popens], [0] * 5)
+
+    def test_mcl_stop(self):
+
+        write_mcl_input(temp_dir)
+        self.record_popen()
+
+        # Stub of mcl, where only the run with an inflation of 1.5 finishes
+        stub = join(temp_dir, "mcl_stub.sh")
+        with open(stub, "w") as fh:
+            fh.write("#!/bin/sh\n"
+                     "while [ $# -gt 0 ]; do\n"
+                     "    case $1 in -I) val=$2;; -o) out=$2;; esac\n"
+                     "    shift\n"
+                     "done\n"
+                     "[ \"$val\" = 1.5 ] || exec sleep 60\n"
+                     "touch \"$out\"\n")
+        os.chmod(stub, 0o755)
+
+        nm = Namespace()
+
+        def stop(val):
+            nm.stop = True
+
+        with self.assertRaises(KillByUser):
+            orthomcl_pipeline.mcl(["1.5", "2", "3"], temp_dir, mcl_file=stub,
+                                  nm=nm, cpus=2, callback=stop)
+
+        # The run of 2 is terminated and the run of 3 is never started
+        self.assertEqual(len(self.popens), 2)
+        self.assertEqual(self.popens[1].wait(), -signal.SIGTERM)
+        files = sorted(os.listdir(join(temp_dir, "backstage_files")))
+        self.assertEqual(files, ["mclInput", "mclInput.mci", "mclInput.tab",
+                                 "mclOutput_15"])
+
+
+class FastaIndexTest(unittest.TestCase):
+
+    sequences = [("tx1|g1", "MKVLAAGIVW" * 3 + "MK"),
+                 ("tx1|g2 description", "MSTNPKPQRK"),
+                 ("tx2|g1", "MAL"),
+                 ("tx2|g2", "")]
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        self.fasta_file = join(temp_dir, "goodProteins.fasta")
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def write_fasta(self, width, newline="\n"):
+        """Writes the sequences with lines of `width` residues. With a list
+        of widths, the width of each line is taken in turn"""
+
+        widths = width if isinstance(width, list) else [width]
+
+        with open(self.fasta_file, "wb") as fh:
+            for name, seq in self.sequences:
+                fh.write(">" + name + newline)
+                pos = i = 0
+                while pos < len(seq):
+                    w = widths[i % len(widths)]
+                    fh.write(seq[pos:pos + w] + newline)
+                    pos += w
+                    i += 1
+
+    def fetch(self):
+
+        names = [x[0] for x in self.sequences] + ["missing"]
+
+        index = FastaIndex(self.fasta_file)
+        try:
+            res = index.fetch(names[::-1])[::-1]
+        finally:
+            index.close()
+
+        self.assertEqual(res, [x[1] for x in self.sequences] + [None])
+
+    def test_fixed_width(self):
+
+        self.write_fasta(10)
+        self.fetch()
+
+    def test_crlf(self):
+
+        self.write_fasta(10, "\r\n")
+        self.fetch()
+
+        # The lines of regular sequences are indexed with their widths
+        self.assertEqual(read_fai(self.fasta_file + ".fai")["tx1|g1"][2:],
+                         (10, 12))
+
+    def test_mixed_widths(self):
+
+        for widths, newline in [([10, 7], "\n"), ([4, 12, 1], "\r\n")]:
+            self.write_fasta(widths, newline)
+            self.fetch()
+            os.remove(self.fasta_file + ".fai")
+
+    def test_stored_index(self):
+
+        self.write_fasta([10, 7], "\r\n")
+
+        self.assertEqual(build_fai(self.fasta_file, self.fasta_file + ".fai"),
+                         read_fai(self.fasta_file + ".fai"))
+
+        # The stored index is used, as long as it is newer than the file
+        self.fetch()
+
+
+class GroupLightTest(unittest.TestCase):
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        self.groups_file = join(temp_dir, "groups.txt")
+
+        with open(self.groups_file, "w") as fh:
+            fh.write("g0: tx1|a1 tx2|a1 tx3|a1\n"
+                     "g1: tx1|b1 tx1|b2\ttx2|b1\n"
+                     "\n"
+                     "g2: tx1|c1\n"
+                     "g3: tx2|d1 tx3|d1 tx3|d2 tx3|d3\n")
+
+        self.group = GroupLight(self.groups_file, gene_threshold=1,
+                                species_threshold=2)
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def test_counts(self):
+
+        # Columns of the counts matrix follow the order of the taxa
+        self.assertEqual(
+            dict(zip(self.group.taxa, self.group.counts.T.toarray().tolist())),
+            {"tx1": [1, 2, 1, 0], "tx2": [1, 1, 0, 1], "tx3": [1, 0, 0, 3]})
+        self.assertEqual([self.group.total_seqs, self.group.max_extra_copy],
+                         [11, 3])
+
+    def test_basic_statistics(self):
+
+        self.assertEqual(self.group.basic_group_statistics(),
+                         (4, 11, 2, 3, 1))
+        self.assertEqual(self.group.compliance_mask().tolist(),
+                         [True, False, False, False])
+
+    def test_exclude_taxa(self):
+
+        self.group.exclude_taxa(["tx3"], update_stats=True)
+
+        self.assertEqual(sorted(self.group.species_list), ["tx1", "tx2"])
+        self.assertEqual(self.group.basic_group_statistics(),
+                         (4, 11, 3, 2, 1))
+
+    def test_update_filters(self):
+
+        # Proportions of taxa are converted to absolute values
+        self.group.update_filters(2, 0.5, update_stats=True)
+
+        self.assertEqual(self.group.species_threshold, 1)
+        self.assertEqual(self.group.basic_group_statistics(),
+                         (4, 11, 3, 4, 3))
+
+    def test_distributions(self):
+
+        self.assertEqual(self.group.bar_species_distribution()["data"],
+                         [[1, 2, 1]])
+        self.assertEqual(self.group.bar_genecopy_distribution()["labels"],
+                         ["1", "2", "3"])
+        self.assertEqual(self.group.bar_genecopy_distribution()["data"],
+                         [[2, 1, 1]])
+        self.assertEqual(
+            self.group.bar_species_distribution(filt=True)["labels"], ["3"])
+
+    def test_species_totals(self):
+
+        res = self.group.bar_species_coverage()
+        self.assertEqual(dict(zip(res["labels"], zip(*res["data"]))),
+                         {"tx1": (3, 1), "tx2": (3, 1), "tx3": (2, 2)})
+        self.assertEqual(res["labels"][-1], "tx3")
+
+        res = self.group.bar_genecopy_per_species()
+        self.assertEqual([res["labels"], res["data"]],
+                         [["tx3", "tx1"], [[3, 2]]])
+
+
+class MultiGroupsLightTest(unittest.TestCase):
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        self.groups_file = join(temp_dir, "groups.txt")
+
+        with open(self.groups_file, "w") as fh:
+            fh.write("g0: tx1|a1 tx2|a1 tx3|a1\n"
+                     "g1: tx1|b1 tx1|b2 tx2|b1\n"
+                     "g2: tx1|c1\n"
+                     "g3: tx2|d1 tx3|d1 tx3|d2 tx3|d3\n")
+
+        self.multi = MultiGroupsLight(temp_dir, [self.groups_file])
+        self.name = os.path.abspath(self.groups_file)
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def test_update_filters(self):
+
+        self.multi.update_filters(1, 2, ["tx3"])
+
+        self.assertEqual(self.multi.groups_stats[self.name]["stats"],
+                         (4, 11, 3, 2, 1))
+        self.assertEqual(self.multi.filters[self.name], (1, 2))
+
+        # Filters and excluded taxa are stored with the group
+        group_obj = self.multi.get_group(self.name)
+        self.assertEqual([group_obj.gene_threshold,
+                          group_obj.species_threshold,
+                          group_obj.excluded_taxa], [1, 2, ["tx3"]])
+
+    def test_update_filters_error(self):
+
+        with self.assertRaises(KeyError):
+            self.multi.update_filters(1, 2, [],
+                                      group_names=[self.name, "missing"])
+
+        # The connection of the failed update is closed, so the database
+        # is not locked
+        con = sqlite3.connect(self.multi.db_file, timeout=0)
+        try:
+            con.execute("DELETE FROM groups")
+            con.commit()
+        finally:
+            con.close()
+
+
+def write_mcl_input(dest):
+    """Writes an mclInput file with two clusters in the backstage_files
+    directory of dest"""
+
+    backstage_dir = join(dest, "backstage_files")
+    if not os.path.exists(backstage_dir):
+        os.makedirs(backstage_dir)
+
+    with open(join(backstage_dir, "mclInput"), "w") as fh:
+        fh.write("a\tb\t2.0\n"
+                 "b\tc\t1.5\n"
+                 "a\tc\t1.0\n"
+                 "d\te\t3.0\n")
+
+
+class StageManifestTest(unittest.TestCase):
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        self.manifest_file = join(temp_dir, "manifest.json")
+        self.input_file = join(temp_dir, "input.txt")
+        self.output_file = join(temp_dir, "output.txt")
+
+        with open(self.input_file, "w") as fh:
+            fh.write("input data\n")
+
+        self.calls = []
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def stage(self, name="stage"):
+
+        self.calls.append(name)
+
+        with open(self.output_file, "w") as fh:
+            fh.write(name)
+
+    def run_stage(self, name="stage", params=None, stages=(), funcs=None):
+        """Runs a stage with a new manifest object, as in a new execution
+        of the pipeline"""
+
+        manifest = StageManifest(self.manifest_file)
+
+        return manifest.run(name, funcs or [partial(self.stage, name)],
+                            inputs=[self.input_file], stages=stages,
+                            params=params, outputs=[self.output_file])
+
+    def test_skip_unchanged(self):
+
+        self.assertTrue(self.run_stage(params=[1]))
+        self.assertFalse(self.run_stage(params=[1]))
+        self.assertEqual(self.calls, ["stage"])
+
+    def test_skip_touched(self):
+
+        self.run_stage()
+
+        # The modification time changes, but not the contents
+        st = os.stat(self.input_file)
+        os.utime(self.input_file, (st.st_atime + 10, st.st_mtime + 10))
+
+        self.assertFalse(self.run_stage())
+
+        with open(self.input_file, "w") as fh:
+            fh.write("other data\n")
+
+        self.assertTrue(self.run_stage())
+
+    def test_changed_params(self):
+
+        self.run_stage(params=[1, "a"])
+
+        self.assertTrue(self.run_stage(params=[1, "b"]))
+        self.assertFalse(self.run_stage(params=[1, "b"]))
+
+    def test_missing_output(self):
+
+        self.run_stage()
+        os.remove(self.output_file)
+
+        self.assertTrue(self.run_stage())
+
+    def test_dependent_stage(self):
+
+        self.run_stage("upstream", params=[1])
+        self.run_stage("downstream", stages=["upstream"])
+
+        self.assertFalse(self.run_stage("upstream", params=[1]))
+        self.assertFalse(self.run_stage("downstream", stages=["upstream"]))
+
+        self.assertTrue(self.run_stage("upstream", params=[2]))
+        self.assertTrue(self.run_stage("downstream", stages=["upstream"]))
+
+    def test_interrupted_stage(self):
+
+        self.run_stage()
+
+        def interrupt():
+            raise KillByUser("")
+
+        with self.assertRaises(KillByUser):
+            self.run_stage(params=[1], funcs=[self.stage, interrupt])
+
+        # The previous record of the stage is removed, so the stage is
+        # executed even with the previous parameters
+        self.assertNotIn("stage", StageManifest(self.manifest_file).stages)
+        self.assertTrue(self.run_stage())
+
+    def test_mcl_stages(self):
+
+        write_mcl_input(temp_dir)
+
+        def run_mcl(inflation):
+            manifest = StageManifest(self.manifest_file)
+            orthomcl_pipeline.run_mcl_stages(
+                manifest, inflation, "group", 1, "groups", temp_dir,
+                mcl_file=mcl_bin, cpus=2)
+            return dict((x, manifest.stages["mcl_" + x]["completed"])
+                        for x in inflation)
+
+        first = run_mcl(["1.5", "2"])
+
+        for val in ["1.5", "2"]:
+            self.assertTrue(os.path.exists(join(
+                temp_dir, "Orthology_results", "groups_{}.txt".format(val))))
+
+        # Only the new inflation value is executed
+        second = run_mcl(["1.5", "2", "3"])
+        self.assertEqual(dict((x, second[x]) for x in first), first)
+        self.assertIn("3", second)
+
+        self.assertEqual(run_mcl(["1.5", "2", "3"]), second)
+
+
+class Namespace(object):
+    """Minimal replacement of the shared namespace of the app"""
+
+    def __init__(self):
+        self.stop = False
+
+
+class ConvertGroupTest(unittest.TestCase):
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        # The cds headers differ from the protein headers, so the sequences
+        # can only be matched through their translation
+        cds_data = {
+            "tx1.fas": ">cds1 a\nATGGCTAAACTGTAA\n>cds2\nATGTGGTGGTAA\n",
+            "tx2.fas": ">cds3\nATGCCCGGG\nTTTTAA\n>cds4\nATGCAT\n"}
+        self.cds_files = []
+
+        for name, data in sorted(cds_data.items()):
+            self.cds_files.append(join(temp_dir, name))
+            with open(self.cds_files[-1], "w") as fh:
+                fh.write(data)
+
+        self.protein_db = join(temp_dir, "goodProteins.fas")
+
+        with open(self.protein_db, "w") as fh:
+            fh.write(">tx1|a1\nMAKL\n>tx1|b1\nMWW\n>tx2|a1\nMPGF*\n"
+                     ">tx2|b1\nMEEE\n>tx1|c1\nMH\n")
+
+        groups_file = join(temp_dir, "groups.txt")
+
+        with open(groups_file, "w") as fh:
+            fh.write("g0: tx1|a1 tx2|a1\n"
+                     "g1: tx1|b1 tx2|b1\n"
+                     "g2: tx1|c1\n")
+
+        self.group = GroupLight(groups_file, gene_threshold=1,
+                                species_threshold=2)
+
+    def tearDown(self):
+
+        shutil.rmtree(temp_dir)
+
+    def convert(self, jobs):
+
+        output_dir = join(temp_dir, "output_{}".format(jobs))
+        os.makedirs(output_dir)
+
+        ns = Namespace()
+        convert_group(None, self.cds_files, self.protein_db, self.group, "",
+                      output_dir, shared_namespace=ns, jobs=jobs)
+
+        res = {}
+        for f in os.listdir(output_dir):
+            with open(join(output_dir, f)) as fh:
+                res[f] = fh.read()
+
+        return (ns.good, ns.missed), res
+
+    def test_convert_group(self):
+
+        counts, res = self.convert(1)
+
+        # Only the compliant groups are converted
+        self.assertEqual(counts, (3, 1))
+        self.assertEqual(res, {
+            "g0.fas": ">tx1|a1\nATGGCTAAACTGTAA\n>tx2|a1\nATGCCCGGGTTTTAA\n",
+            "g1.fas": ">tx1|b1\nATGTGGTGGTAA\n",
+            "missed_sequences.log": "g1\ttx2|b1\n"})
+
+    def test_convert_group_jobs(self):
+
+        self.assertEqual(self.convert(2), self.convert(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/python2
+
+import os
+import shutil
+import unittest
+from os.path import join
+from data_files import *
+
+from trifusion.process.sequence import AlignmentList
+from trifusion.process.pipeline import OperationPipeline
+
+temp_dir = ".temp"
+output_dir = ".temp/output"
+
+# Chain of operations with kernels, executed in a single pass
+operations = [
+    ("filter_missing_data", [25, 50], {}),
+    ("filter_codon_positions", [[True, True, False]], {}),
+    ("collapse", [], {"haplotype_name": "Hap"}),
+    ("code_gaps", [], {})
+]
+
+
+class PipelineTest(unittest.TestCase):
+
+    def setUp(self):
+
+        os.makedirs(temp_dir)
+
+        self.aln_objs = {}
+
+        for mode in ["pipeline", "sequential"]:
+            os.makedirs(join(output_dir, mode))
+            self.aln_objs[mode] = AlignmentList(
+                dna_data_fas, sql_db=join(temp_dir, mode))
+
+    def tearDown(self):
+
+        for aln_obj in self.aln_objs.values():
+            aln_obj.clear_alignments()
+            aln_obj.close_database()
+
+        shutil.rmtree(temp_dir)
+
+    def run_chain(self, mode, table_kwargs):
+        """Runs the chain of operations and returns the output files"""
+
+        aln_obj = self.aln_objs[mode]
+        dest = join(output_dir, mode)
+
+        if mode == "pipeline":
+            pipeline = OperationPipeline(aln_obj, **table_kwargs)
+            for name, args, kwargs in operations:
+                pipeline.add(name, args, dict(kwargs, dest=dest)
+                             if name == "collapse" else kwargs)
+            pipeline.run()
+        else:
+            for name, args, kwargs in operations:
+                kwargs = dict(kwargs, **table_kwargs)
+                if name == "collapse":
+                    kwargs["dest"] = dest
+                # The codon filter uses the master table by default
+                if name == "filter_codon_positions":
+                    kwargs.pop("use_main_table", None)
+                getattr(aln_obj, name)(*args, **kwargs)
+
+        aln_obj.write_to_file(["fasta"], output_dir=dest,
+                              table_name=table_kwargs.get("table_out"))
+
+        res = {}
+        for f in os.listdir(dest):
+            with open(join(dest, f)) as fh:
+                res[f] = fh.read()
+
+        return res
+
+    def compare_chains(self, table_kwargs):
+
+        pipeline_res = self.run_chain("pipeline", table_kwargs)
+        sequential_res = self.run_chain("sequential", table_kwargs)
+
+        self.assertEqual(pipeline_res, sequential_res)
+
+        # Both the alignments and the haplotype files are written
+        self.assertEqual(
+            len([x for x in pipeline_res if x.endswith(".haplotypes")]),
+            len(dna_data_fas))
+        self.assertEqual(len(pipeline_res), len(dna_data_fas) * 2)
+
+    def test_fused_main_table(self):
+
+        self.compare_chains({"use_main_table": True})
+
+    def test_fused_tables(self):
+
+        self.compare_chains({"table_in": "main_output",
+                             "table_out": "main_output"})
+
+    def test_single_pass(self):
+
+        aln_obj = self.aln_objs["pipeline"]
+        passes = []
+
+        def run_kernels(*args, **kwargs):
+            passes.append(len(args[0]))
+            return original(*args, **kwargs)
+
+        original = aln_obj._run_kernels
+        aln_obj._run_kernels = run_kernels
+
+        pipeline = OperationPipeline(aln_obj, use_main_table=True)
+        for name, args, kwargs in operations:
+            pipeline.add(name, args, dict(kwargs, dest=temp_dir)
+                         if name == "collapse" else kwargs)
+        pipeline.run()
+
+        self.assertEqual(len(passes), 1)
+
+    def test_plan(self):
+
+        def func(aln):
+            pass
+
+        pipeline = OperationPipeline(self.aln_objs["pipeline"],
+                                     use_main_table=True)
+        pipeline.add("filter_missing_data", [25, 50])
+        pipeline.add("filter_codon_positions", [[True, True, False]])
+        pipeline.add_call(func)
+        pipeline.add("collapse")
+        pipeline.add("code_gaps")
+        pipeline.add("consensus", ["IUPAC"])
+        pipeline.add("filter_segregating_sites", [1, 10])
+
+        self.assertEqual(
+            [[x[0] for x in steps] for steps in pipeline.plan()],
+            [["filter_missing_data", "filter_codon_positions"],
+             [func],
+             ["collapse", "code_gaps"],
+             ["consensus"],
+             ["filter_segregating_sites"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -288,5 +288,144 @@ class ProcessWriteTest(unittest.TestCase):
         self.aln_obj.write_to_file(["phylip", "nexus"],
                                    output_file=self.output_file)
 
+class ProcessWriteStreamTest(unittest.TestCase):
+
+    def setUp(self):
+
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+
+        self.aln_obj = AlignmentList(dna_data_fas, sql_db=sql_db)
+        os.makedirs("output")
+        self.output_file = os.path.join("output", "test")
+        self.stream_file = os.path.join("output", "stream")
+
+    def tearDown(self):
+
+        self.aln_obj.clear_alignments()
+        self.aln_obj.con.close()
+        shutil.rmtree("output")
+        shutil.rmtree(temp_dir)
+
+    def compare_outputs(self, extensions):
+
+        for ext in extensions:
+            with open(self.output_file + ext) as fh1, \
+                    open(self.stream_file + ext) as fh2:
+                self.assertEqual(fh1.read(), fh2.read())
+
+    def test_stream_concatenation(self):
+
+        self.aln_obj.concatenate_to_file(["fasta", "phylip", "nexus"],
+                                         self.stream_file,
+                                         partition_file=True)
+
+        self.aln_obj.concatenate()
+        self.aln_obj.write_to_file(["fasta", "phylip", "nexus"],
+                                   output_file=self.output_file,
+                                   partition_file=True)
+
+        self.compare_outputs([".fas", ".phy", ".nex", "_part.File"])
+
+    def test_stream_concatenation_shelved(self):
+
+        self.aln_obj.update_active_alignments(
+            self.aln_obj.alignments.keys()[2:])
+
+        self.aln_obj.concatenate_to_file(["fasta", "nexus"],
+                                         self.stream_file,
+                                         upper_case=True)
+
+        self.aln_obj.concatenate()
+        self.aln_obj.write_to_file(["fasta", "nexus"],
+                                   output_file=self.output_file,
+                                   upper_case=True)
+
+        self.compare_outputs([".fas", ".nex"])
+
+    def test_stream_concatenation_idx(self):
+
+        idx = self.aln_obj._idx
+
+        self.aln_obj.concatenate_to_file(["fasta"], self.stream_file)
+
+        self.assertEqual(self.aln_obj._idx, idx)
+
+    def test_fanout_conversion(self):
+
+        for fmt in ["fasta", "phylip", "nexus", "stockholm"]:
+            self.aln_obj.write_to_file([fmt], output_dir="output",
+                                       conversion_suffix="_single")
+
+        self.aln_obj.write_to_file(["fasta", "phylip", "nexus", "stockholm"],
+                                   output_dir="output",
+                                   conversion_suffix="_fanout")
+
+        for fl in sorted(os.listdir("output")):
+            if "_single" in fl:
+                with open(os.path.join("output", fl)) as fh1, \
+                        open(os.path.join("output", fl.replace(
+                            "_single", "_fanout"))) as fh2:
+                    self.assertEqual(fh1.read(), fh2.read())
+
+    def test_fanout_interleave(self):
+
+        self.aln_obj.concatenate()
+
+        for fmt in ["fasta", "phylip", "nexus"]:
+            self.aln_obj.interleave_data = False
+            self.aln_obj.write_to_file([fmt], output_file=self.output_file,
+                                       interleave=True, partition_file=True)
+            with open(self.output_file + self.aln_obj.format_ext[fmt]) as fh:
+                ref = fh.read()
+
+            self.aln_obj.interleave_data = False
+            self.aln_obj.write_to_file(["fasta", "phylip", "nexus"],
+                                       output_file=self.stream_file,
+                                       interleave=True, partition_file=True)
+            with open(self.stream_file + self.aln_obj.format_ext[fmt]) as fh:
+                self.assertEqual(ref, fh.read())
+
+    def test_parallel_conversion(self):
+
+        formats = ["fasta", "phylip", "nexus", "stockholm"]
+
+        for interleave in [False, True]:
+            self.aln_obj.write_to_file(formats, output_dir="output",
+                                       conversion_suffix="_single",
+                                       interleave=interleave)
+
+            self.aln_obj.write_to_file(formats, output_dir="output",
+                                       conversion_suffix="_parallel",
+                                       interleave=interleave, jobs=2)
+
+            for fl in sorted(os.listdir("output")):
+                if "_single" in fl:
+                    with open(os.path.join("output", fl)) as fh1, \
+                            open(os.path.join("output", fl.replace(
+                                "_single", "_parallel"))) as fh2:
+                        self.assertEqual(fh1.read(), fh2.read())
+
+    def test_resolve_overwrites(self):
+
+        class Namespace(object):
+            status = "skip"
+            apply_all = True
+
+        self.aln_obj.write_to_file(["fasta"], output_dir="output")
+        paths = [os.path.join("output", x) for x in
+                 sorted(os.listdir("output"))]
+
+        skip = self.aln_obj._resolve_overwrites(
+            paths + [self.output_file], Namespace())
+
+        self.assertEqual(skip, set(paths))
+
+    def test_stream_concatenation_format_error(self):
+
+        with self.assertRaises(ValueError):
+            self.aln_obj.concatenate_to_file(["snapp"], self.stream_file)
+
+
 if __name__ == "__main__":
     unittest.main()
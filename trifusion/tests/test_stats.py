@@ -71,6 +71,89 @@ class SeconaryOpsTest(unittest.TestCase):
                            [1, 24, 85, '0 (0.0%)', 0.0, '1 (0.05%)', 1.0,
                             '1 (1.18%)', 1.0, '0 (0.0%)', 0.0]]])
 
+    def test_summary_stats_cached(self):
+
+        self.aln_obj.get_summary_stats()
+
+        cached = self.aln_obj.cur.execute(
+            "SELECT COUNT(*) FROM aux_stats").fetchone()[0]
+
+        res = self.aln_obj.get_summary_stats([
+            join(data_path, "BaseConc1.fas")])
+
+        self.assertEqual([cached, res[0]["seq_len"],
+                          len(self.aln_obj.summary_gene_table)], [7, 85, 7])
+
+    def test_summary_stats_invalidate_index(self):
+
+        self.aln_obj.get_summary_stats()
+
+        self.aln_obj._invalidate_stats(aln_idx=0)
+
+        self.assertEqual(self.aln_obj.cur.execute(
+            "SELECT COUNT(*) FROM aux_stats").fetchone()[0], 7)
+
+    def test_summary_stats_invalidation(self):
+
+        self.aln_obj.get_summary_stats()
+
+        self.aln_obj.remove_taxa(["1285_RAD_original", "130a_RAD_original",
+                                  "137a_RAD_original", "1427_RAD_original"])
+
+        self.aln_obj.get_summary_stats()
+        gene_table = self.aln_obj.summary_gene_table
+
+        self.assertEqual(
+            list(gene_table["taxa"]),
+            [len(x.taxa_idx) for x in self.aln_obj.alignments.values()
+             if x.taxa_idx])
+
+    def test_feature_cube_cached(self):
+
+        self.aln_obj.missing_data_per_species()
+
+        cached = self.aln_obj.cur.execute(
+            "SELECT COUNT(*) FROM aux_features").fetchone()[0]
+
+        self.aln_obj.update_active_alignments([dna_data_fas[0],
+                                               dna_data_fas[1]])
+        res = self.aln_obj.sequence_segregation()
+
+        self.assertEqual([cached, res["data"]], [7, [1, 3]])
+
+    def test_feature_cube_invalidation(self):
+
+        self.aln_obj.average_seqsize_per_species()
+
+        self.aln_obj.remove_taxa(["1285_RAD_original"])
+        self.aln_obj.average_seqsize_per_species()
+
+        stored_taxa = set(y for x in self.aln_obj.cur.execute(
+            "SELECT taxa FROM aux_features") for y in x[0].split("\n"))
+
+        self.assertEqual(stored_taxa, set(self.aln_obj.taxa_names))
+
+    def test_view(self):
+
+        taxa = list(self.aln_obj.taxa_names)
+
+        aln_view = self.aln_obj.view()
+        aln_view.update_active_alignments(dna_data_fas[:3])
+        aln_view.update_taxa_names(taxa[2:])
+        res = aln_view.missing_data_per_species()
+
+        self.assertEqual(
+            [len(self.aln_obj.alignments), self.aln_obj.taxa_names,
+             [x.shelved_taxa for x in self.aln_obj.alignments.values()]],
+            [7, taxa, [[]] * 7])
+
+        self.aln_obj.update_active_alignments(dna_data_fas[:3])
+        self.aln_obj.update_taxa_names(taxa[2:])
+
+        self.assertEqual(
+            res["data"].tolist(),
+            self.aln_obj.missing_data_per_species()["data"].tolist())
+
     def test_single_aln_outlier_mdata(self):
 
         self.aln_obj.update_active_alignments([dna_data_fas[0]])
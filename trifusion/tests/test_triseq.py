@@ -18,6 +18,7 @@ except ImportError:
     from trifusion.base.sanity import triseq_arg_check
 
 output_dir = "triseq_test"
+cache_dir = "triseq_cache"
 data_path = join("trifusion/tests/data/")
 
 
@@ -121,9 +122,15 @@ class TriSeqTest(unittest.TestCase):
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
+        # Keeps the parse cache out of the user's home directory
+        os.environ["TRIFUSION_CACHE_DIR"] = cache_dir
+
     def tearDown(self):
+        os.environ.pop("TRIFUSION_CACHE_DIR", None)
         if os.path.exists(output_dir):
             shutil.rmtree(output_dir)
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
 
     def test_simple_concatenation(self):
 